@@ -139,11 +139,14 @@ f   st.subheader(f"📈 Inventory & Sales Trends")"
 elif page == "Inventory Management":"
     st.title("Inventory Management")
     
+    # Load the table, low stock flags and alerts once for all tabs
+    snapshot = inventory_manager.get_inventory_snapshot()
+    
     tab1, tab2, tab3 = st.tabs(["Current Inventory", "Stock Alerts", "Analytics"])"
     "
     with tab1:
         st.subheader("Current Inventory")"
-        inventory_data = inventory_manager.get_current_inventory()"
+        inventory_data = snapshot["inventory"]
         
         # Search and filter
         search = st.text_input("Search Products")"
@@ -179,7 +182,7 @@ elif page == "Inventory Management":"
     
     with tab2:
         st.subheader("Stock Alerts")"
-        alerts = inventory_manager.get_stock_alerts()"
+        alerts = snapshot["alerts"]
         
         if len(alerts) > 0:
             for alert in alerts:
@@ -197,7 +200,7 @@ elif page == "Inventory Management":"
         )
         
         if metric_type == "Inventory Value by Category":"
-            data = inventory_manager.get_inventory_value_by_category()"
+            data = snapshot["category_totals"][['inventory_value']]
             st.bar_chart(data)
             
         elif metric_type == "Stock Turnover Rate":"
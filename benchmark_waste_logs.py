@@ -0,0 +1,98 @@
+"""
+Benchmark the newest-first waste log views on a 100k-entry log
+
+Compares the old page render path (parse every timestamp with strptime and
+sort the whole list on each call) with the current one (logs carry a cached
+"ts" epoch and are stored in time order, so newest first is a reversed walk).
+
+Usage:
+    python benchmark_waste_logs.py --entries 100000 --repeat 5
+"""
+
+import argparse
+import datetime
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from utils import atomic_writer
+from utils.json_cache import invalidate
+from modules.waste_partitions import MonthlyLogStore, ensure_time_order
+
+PAGE_SIZE = 100
+
+
+def make_logs(entries):
+    """Build logs one every 10 minutes, ending now"""
+    now = datetime.datetime.now().replace(microsecond=0)
+    logs = []
+    for i in range(entries):
+        logs.append({
+            "id": f"log-{i}",
+            "product_name": f"Product {i % 200}",
+            "quantity": 1 + i % 5,
+            "recipient": "Food Bank" if i % 3 else None,
+            "total_cost": 2.5,
+            "timestamp": (now - datetime.timedelta(minutes=10 * (entries - i))).strftime("%Y-%m-%d %H:%M:%S"),
+            "status": "pending" if i % 4 else "approved"
+        })
+    return logs
+
+
+def timed(function, repeat):
+    """Get the median run time of a function in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def old_page(logs):
+    """First page the way get_all_logs/get_order_adjustments used to build it"""
+    ordered = sorted(logs, key=lambda x: datetime.datetime.strptime(x["timestamp"], "%Y-%m-%d %H:%M:%S"), reverse=True)
+    return ordered[:PAGE_SIZE]
+
+
+def new_adjustments(records):
+    """Newest-first view over records kept in "ts" order"""
+    return list(reversed(records))[:PAGE_SIZE]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark newest-first waste log views")
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logs = make_logs(args.entries)
+    directory = tempfile.mkdtemp()
+    try:
+        store = MonthlyLogStore(directory)
+        store.import_logs([dict(log) for log in logs])
+        atomic_writer.flush()
+        invalidate()
+        # Warm the partition read cache the way an open page would
+        next(store.iter_pages(page_size=PAGE_SIZE))
+
+        records = [dict(log) for log in logs]
+        ensure_time_order(records)
+
+        old_ms = timed(lambda: old_page(logs), args.repeat)
+        logs_ms = timed(lambda: next(store.iter_pages(page_size=PAGE_SIZE)), args.repeat)
+        adjustments_ms = timed(lambda: new_adjustments(records), args.repeat)
+        assert [log["id"] for log in old_page(logs)] == [log["id"] for log in next(store.iter_pages(page_size=PAGE_SIZE))]
+    finally:
+        shutil.rmtree(directory)
+
+    print(f"{args.entries} entries, first page of {PAGE_SIZE}, median of {args.repeat} runs")
+    print(f"  strptime + sort (old):            {old_ms:9.2f} ms")
+    print(f"  log partitions, cached ts (new):  {logs_ms:9.2f} ms  ({old_ms / max(logs_ms, 1e-6):,.0f}x)")
+    print(f"  adjustments, reversed list (new): {adjustments_ms:9.2f} ms  ({old_ms / max(adjustments_ms, 1e-6):,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
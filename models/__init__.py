@@ -1,7 +1,22 @@
 # Models initialization file
 # This allows model classes to be imported from the package
 
-# Import model classes
-from .inventory import InventoryItem, InventoryTransaction
-from .supplier import Supplier, SupplierOrder
+import importlib
 import logging
+
+# Re-exported classes and the modules they live in, imported on first use
+_EXPORTS = {
+    "InventoryItem": ".inventory",
+    "InventoryTransaction": ".inventory",
+    "InventoryTable": ".inventory_table",
+    "TransactionLog": ".inventory_table",
+    "Supplier": ".supplier",
+    "SupplierOrder": ".supplier",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
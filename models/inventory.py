@@ -7,6 +7,9 @@ class InventoryItem:
     Model class representing an inventory item"
     """"
     "
+    __slots__ = ("id", "name", "category", "supplier", "quantity", "cost_price",
+                 "selling_price", "reorder_point", "last_updated")
+
     def __init__(self, name, category, supplier, quantity, cost_price, selling_price, 
                 reorder_point=None, id=None, last_updated=None):
         """"
@@ -136,6 +139,9 @@ class InventoryTransaction:
     Model class representing an inventory transaction"
     """"
     "
+    __slots__ = ("id", "item_id", "item_name", "transaction_type", "quantity_change",
+                 "old_quantity", "new_quantity", "timestamp")
+
     def __init__(self, item_id, item_name, transaction_type, quantity_change, 
                 old_quantity, new_quantity, id=None, timestamp=None):
         """"
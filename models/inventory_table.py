@@ -0,0 +1,552 @@
+"""
+Columnar containers for bulk inventory items and transactions
+
+InventoryItem and InventoryTransaction hold one record each, which is
+convenient for single edits but costs a Python object (plus a string per
+field) for every row. InventoryTable and TransactionLog store the same
+records column by column in numpy arrays:
+
+- UUID identifiers are stored as 16 raw bytes instead of 36-character strings
+- categories, suppliers, item names and transaction types are interned and
+  stored as integer codes
+- timestamps are stored as datetime64 values instead of ISO strings
+
+A million transactions take roughly 50 MB this way.
+"""
+
+import uuid
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class StringInterner:
+    """
+    Two-way mapping between repeated strings and compact integer codes
+    """
+
+    def __init__(self, values=None):
+        """
+        Initialize the interner
+
+        Args:
+            values (list, optional): Strings to intern up front
+        """
+        self._values = []
+        self._codes = {}
+        for value in values or []:
+            self.code(value)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, value):
+        return value in self._codes
+
+    def code(self, value):
+        """
+        Get the code for a string, interning it if it is new
+
+        Args:
+            value (str): String to intern
+
+        Returns:
+            int: Code of the string
+        """
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def lookup(self, value):
+        """Get the code for a string, or -1 if it was never interned"""
+        return self._codes.get(value, -1)
+
+    def encode(self, values):
+        """
+        Intern a sequence of strings
+
+        Args:
+            values (iterable): Strings to intern
+
+        Returns:
+            numpy.ndarray: int32 codes
+        """
+        code = self.code
+        return np.fromiter((code(value) for value in values), dtype=np.int32)
+
+    def decode(self, codes):
+        """
+        Convert codes back to strings
+
+        Args:
+            codes (numpy.ndarray): Codes to convert
+
+        Returns:
+            numpy.ndarray: Object array of strings
+        """
+        values = np.array(self._values + [None], dtype=object)
+        return values[np.asarray(codes)]
+
+    @property
+    def values(self):
+        """Get the interned strings in code order"""
+        return list(self._values)
+
+
+def _uuid_bytes(value):
+    """Get the 16 raw bytes of a canonical UUID string"""
+    if len(value) != 36 or value[8] + value[13] + value[18] + value[23] != "----" or value != value.lower():
+        # Anything else (including uppercase or braced UUIDs) would not round-trip
+        raise ValueError(f"Not a canonical UUID: {value}")
+    raw = bytes.fromhex(value.replace("-", ""))
+    if len(raw) != 16:
+        raise ValueError(f"Not a canonical UUID: {value}")
+    return raw
+
+
+class _IdColumn:
+    """
+    Identifier column that stores UUIDs as 16 raw bytes
+
+    Identifiers that are not UUIDs switch the column to interned strings,
+    so any ID scheme still round-trips.
+    """
+
+    def __init__(self):
+        self._bytes = np.zeros((0, 16), dtype=np.uint8)
+        self._interner = None
+        self._codes = np.zeros(0, dtype=np.int32)
+
+    @property
+    def nbytes(self):
+        if self._interner is None:
+            return self._bytes.nbytes
+        return self._codes.nbytes
+
+    def resize(self, capacity):
+        if self._interner is None:
+            grown = np.zeros((capacity, 16), dtype=np.uint8)
+            grown[:len(self._bytes)] = self._bytes[:capacity]
+            self._bytes = grown
+        else:
+            grown = np.full(capacity, -1, dtype=np.int32)
+            grown[:len(self._codes)] = self._codes[:capacity]
+            self._codes = grown
+
+    def _switch_to_strings(self, size):
+        # Keep the IDs already stored, now as interned strings
+        existing = self.decode(0, size)
+        self._interner = StringInterner()
+        self._codes = np.full(len(self._bytes), -1, dtype=np.int32)
+        self._codes[:size] = self._interner.encode(existing)
+        self._bytes = np.zeros((0, 16), dtype=np.uint8)
+
+    def assign(self, start, ids, size):
+        """Store IDs at positions start.. (size is the number of rows already stored)"""
+        ids = [value if value else str(uuid.uuid4()) for value in ids]
+        if self._interner is None:
+            try:
+                raw = b"".join(_uuid_bytes(value) for value in ids)
+            except (ValueError, TypeError, AttributeError):
+                self._switch_to_strings(size)
+            else:
+                self._bytes[start:start + len(ids)] = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 16)
+                return
+        self._codes[start:start + len(ids)] = self._interner.encode(ids)
+
+    def decode(self, start, stop):
+        if self._interner is not None:
+            return list(self._interner.decode(self._codes[start:stop]))
+        hexed = self._bytes[start:stop].tobytes().hex()
+        return [
+            f"{hexed[i:i + 8]}-{hexed[i + 8:i + 12]}-{hexed[i + 12:i + 16]}-{hexed[i + 16:i + 20]}-{hexed[i + 20:i + 32]}"
+            for i in range(0, len(hexed), 32)
+        ]
+
+    def find(self, item_id, size):
+        if self._interner is not None:
+            code = self._interner.lookup(item_id)
+            return np.flatnonzero(self._codes[:size] == code) if code >= 0 else np.zeros(0, dtype=np.intp)
+        try:
+            target = np.frombuffer(_uuid_bytes(item_id), dtype=np.uint8)
+        except (ValueError, TypeError, AttributeError):
+            return np.zeros(0, dtype=np.intp)
+        return np.flatnonzero((self._bytes[:size] == target).all(axis=1))
+
+
+def _to_datetime64(values):
+    """Convert ISO timestamp strings (or None for now) to datetime64[us]"""
+    if all(values):
+        try:
+            # Fast path: every value is a naive ISO string
+            return np.array(values, dtype="datetime64[us]")
+        except ValueError:
+            pass
+
+    now = np.datetime64(datetime.now().isoformat(), "us")
+    result = np.empty(len(values), dtype="datetime64[us]")
+    for i, value in enumerate(values):
+        if not value:
+            result[i] = now
+            continue
+        try:
+            result[i] = np.datetime64(value, "us")
+        except ValueError:
+            # Timezone-aware strings are normalised to naive UTC
+            parsed = datetime.fromisoformat(value)
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            result[i] = np.datetime64(parsed, "us")
+    return result
+
+
+def _to_isoformat(values):
+    """Convert datetime64[us] values to strings formatted like datetime.isoformat()"""
+    strings = np.datetime_as_string(values, unit="us")
+    return [value[:-7] if value.endswith(".000000") else value for value in strings.tolist()]
+
+
+class _ColumnarTable:
+    """
+    Base class for growable numpy-backed record tables
+
+    Subclasses declare their numeric columns in ``_NUMERIC_COLUMNS`` and
+    their interned string columns in ``_INTERNED_COLUMNS``; every table also
+    has an ``id`` column and one timestamp column named by ``_TIME_COLUMN``.
+    """
+
+    _NUMERIC_COLUMNS = {}
+    _INTERNED_COLUMNS = ()
+    _TIME_COLUMN = None
+    _FIELD_ORDER = ()
+
+    def __init__(self, capacity=0):
+        """
+        Initialize an empty table
+
+        Args:
+            capacity (int): Number of rows to preallocate
+        """
+        self._size = 0
+        self._ids = _IdColumn()
+        self._interners = {name: StringInterner() for name in self._INTERNED_COLUMNS}
+        self._columns = {name: np.zeros(0, dtype=dtype) for name, dtype in self._NUMERIC_COLUMNS.items()}
+        for name in self._INTERNED_COLUMNS:
+            self._columns[name] = np.zeros(0, dtype=np.int32)
+        self._columns[self._TIME_COLUMN] = np.zeros(0, dtype="datetime64[us]")
+        self._capacity = 0
+        if capacity:
+            self._resize(capacity)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("row index out of range")
+        return self._rows(index, index + 1)[0]
+
+    def __iter__(self):
+        return iter(self.to_dicts())
+
+    @property
+    def nbytes(self):
+        """Get the memory used by the stored columns in bytes"""
+        return self._ids.nbytes + sum(column.nbytes for column in self._columns.values())
+
+    def _resize(self, capacity):
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        self._ids.resize(capacity)
+        self._capacity = capacity
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        if needed > self._capacity:
+            self._resize(max(needed, self._capacity * 2, 16))
+
+    def _column(self, name):
+        return self._columns[name][:self._size]
+
+    def _normalize(self, record):
+        """Fill defaults and convert types for a single record"""
+        return record
+
+    def extend(self, records):
+        """
+        Append records to the table
+
+        Args:
+            records (list): Record dictionaries
+        """
+        records = [self._normalize(record) for record in records]
+        if not records:
+            return
+
+        self._reserve(len(records))
+        start, stop = self._size, self._size + len(records)
+
+        self._ids.assign(start, [record.get("id") for record in records], self._size)
+        for name in self._NUMERIC_COLUMNS:
+            self._columns[name][start:stop] = [record[name] for record in records]
+        for name in self._INTERNED_COLUMNS:
+            self._columns[name][start:stop] = self._interners[name].encode(record[name] for record in records)
+        self._columns[self._TIME_COLUMN][start:stop] = _to_datetime64(
+            [record.get(self._TIME_COLUMN) for record in records]
+        )
+        self._size = stop
+
+    def append(self, record):
+        """
+        Append a single record to the table
+
+        Args:
+            record (dict): Record dictionary
+        """
+        self.extend([record])
+
+    @classmethod
+    def from_dicts(cls, records):
+        """
+        Build a table from record dictionaries
+
+        Args:
+            records (list): Record dictionaries, e.g. InventoryItem.to_dict() output
+
+        Returns:
+            A new table holding the records
+        """
+        records = list(records)
+        table = cls(capacity=len(records))
+        table.extend(records)
+        return table
+
+    def _rows(self, start, stop):
+        columns = {"id": self._ids.decode(start, stop)}
+        for name in self._NUMERIC_COLUMNS:
+            columns[name] = self._columns[name][start:stop].tolist()
+        for name in self._INTERNED_COLUMNS:
+            columns[name] = self._interners[name].decode(self._columns[name][start:stop]).tolist()
+        columns[self._TIME_COLUMN] = _to_isoformat(self._columns[self._TIME_COLUMN][start:stop])
+
+        fields = [columns[name] for name in self._FIELD_ORDER]
+        return [dict(zip(self._FIELD_ORDER, row)) for row in zip(*fields)]
+
+    def to_dicts(self):
+        """
+        Convert the table back to record dictionaries
+
+        Returns:
+            list: Record dictionaries in the same format as the model to_dict()
+        """
+        return self._rows(0, self._size)
+
+    def ids(self):
+        """Get the row IDs as strings"""
+        return self._ids.decode(0, self._size)
+
+    def find(self, record_id):
+        """
+        Find the rows with a given ID
+
+        Args:
+            record_id (str): ID to look for
+
+        Returns:
+            numpy.ndarray: Matching row positions
+        """
+        return self._ids.find(record_id, self._size)
+
+    def codes(self, name):
+        """
+        Get the integer codes of an interned column
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            numpy.ndarray: int32 codes, one per row
+        """
+        return self._column(name)
+
+    def interner(self, name):
+        """Get the StringInterner of an interned column"""
+        return self._interners[name]
+
+    def mask(self, name, value):
+        """
+        Get a boolean row mask for an interned column equal to a value
+
+        Args:
+            name (str): Interned column name
+            value (str): Value to compare with
+
+        Returns:
+            numpy.ndarray: Boolean mask, one entry per row
+        """
+        code = self._interners[name].lookup(value)
+        if code < 0:
+            return np.zeros(self._size, dtype=bool)
+        return self._column(name) == code
+
+
+class InventoryTable(_ColumnarTable):
+    """
+    Columnar collection of inventory items with vectorized metrics
+    """
+
+    _NUMERIC_COLUMNS = {
+        "quantity": np.int32,
+        "reorder_point": np.int32,
+        "cost_price": np.float64,
+        "selling_price": np.float64
+    }
+    _INTERNED_COLUMNS = ("name", "category", "supplier")
+    _TIME_COLUMN = "last_updated"
+    _FIELD_ORDER = ("id", "name", "category", "supplier", "quantity", "reorder_point",
+                    "cost_price", "selling_price", "last_updated")
+
+    def _normalize(self, record):
+        quantity = int(record["quantity"])
+        reorder_point = record.get("reorder_point")
+        # Same default as InventoryItem: 20% of the initial quantity
+        if reorder_point is None:
+            reorder_point = max(1, int(quantity * 0.2))
+
+        normalized = dict(record)
+        normalized["quantity"] = quantity
+        normalized["reorder_point"] = int(reorder_point)
+        normalized["cost_price"] = float(record["cost_price"])
+        normalized["selling_price"] = float(record["selling_price"])
+        return normalized
+
+    @property
+    def quantity(self):
+        """Get the quantity column"""
+        return self._column("quantity")
+
+    @property
+    def reorder_point(self):
+        """Get the reorder point column"""
+        return self._column("reorder_point")
+
+    @property
+    def cost_price(self):
+        """Get the cost price column"""
+        return self._column("cost_price")
+
+    @property
+    def selling_price(self):
+        """Get the selling price column"""
+        return self._column("selling_price")
+
+    @property
+    def inventory_value(self):
+        """Calculate the inventory value of every item"""
+        return self.quantity * self.cost_price
+
+    @property
+    def profit_margin(self):
+        """Calculate the profit margin percentage of every item"""
+        selling_price = self.selling_price
+        margin = np.zeros(self._size, dtype=np.float64)
+        priced = selling_price != 0
+        margin[priced] = (selling_price[priced] - self.cost_price[priced]) / selling_price[priced] * 100
+        return margin
+
+    @property
+    def is_low_stock(self):
+        """Check which items are at or below their reorder point"""
+        return self.quantity <= self.reorder_point
+
+    def value_by(self, name):
+        """
+        Sum the inventory value per category or supplier
+
+        Args:
+            name (str): "category" or "supplier"
+
+        Returns:
+            dict: Inventory value keyed by category or supplier
+        """
+        interner = self._interners[name]
+        totals = np.bincount(self._column(name), weights=self.inventory_value, minlength=len(interner))
+        return {value: float(total) for value, total in zip(interner.values, totals)}
+
+
+class TransactionLog(_ColumnarTable):
+    """
+    Columnar, append-only log of inventory transactions
+    """
+
+    _NUMERIC_COLUMNS = {
+        "quantity_change": np.int32,
+        "old_quantity": np.int32,
+        "new_quantity": np.int32
+    }
+    _INTERNED_COLUMNS = ("item_id", "item_name", "transaction_type")
+    _TIME_COLUMN = "timestamp"
+    _FIELD_ORDER = ("id", "item_id", "item_name", "transaction_type", "quantity_change",
+                    "old_quantity", "new_quantity", "timestamp")
+
+    @property
+    def quantity_change(self):
+        """Get the quantity change column"""
+        return self._column("quantity_change")
+
+    @property
+    def old_quantity(self):
+        """Get the quantity before each transaction"""
+        return self._column("old_quantity")
+
+    @property
+    def new_quantity(self):
+        """Get the quantity after each transaction"""
+        return self._column("new_quantity")
+
+    @property
+    def timestamp(self):
+        """Get the timestamp column as datetime64[us]"""
+        return self._column("timestamp")
+
+    def for_item(self, item_id):
+        """
+        Get the positions of an item's transactions
+
+        Args:
+            item_id (str): Inventory item ID
+
+        Returns:
+            numpy.ndarray: Row positions in log order
+        """
+        return np.flatnonzero(self.mask("item_id", item_id))
+
+    def net_change_by_item(self, transaction_type=None):
+        """
+        Sum the quantity change per item
+
+        Args:
+            transaction_type (str, optional): Only count transactions of this type
+
+        Returns:
+            dict: Net quantity change keyed by item ID
+        """
+        codes = self._column("item_id")
+        changes = self.quantity_change
+        if transaction_type is not None:
+            selected = self.mask("transaction_type", transaction_type)
+            codes, changes = codes[selected], changes[selected]
+
+        interner = self._interners["item_id"]
+        totals = np.bincount(codes, weights=changes, minlength=len(interner))
+        present = np.bincount(codes, minlength=len(interner)) > 0
+        return {value: int(total) for value, total, used in zip(interner.values, totals, present) if used}
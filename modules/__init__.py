@@ -1,13 +1,26 @@
 # Modules initialization file
 # This allows modules to be imported from the package
 
-# Import primary modules
-from .inventory_manager import InventoryManager
-from .pricing_analyzer import PricingAnalyzer
-from .local_sourcing import LocalSourcingManager
-from .weather_integration import WeatherIntegration
-from .event_recommender import EventRecommender
-from .hub_integration import LogisticsHubIntegration
-from .demand_predictor import DemandPredictor
+import importlib
 import logging
 logger = logging.getLogger(__name__)
+
+# Re-exported primary modules and where they live. They are imported on first
+# use, so importing one module (or a helper such as modules.perishable_expiry)
+# does not load every manager and its UI dependencies.
+_EXPORTS = {
+    "InventoryManager": ".inventory_manager",
+    "PricingAnalyzer": ".pricing_analyzer",
+    "LocalSourcingManager": ".local_sourcing",
+    "WeatherIntegration": ".weather_integration",
+    "EventRecommender": ".event_recommender",
+    "LogisticsHubIntegration": ".hub_integration",
+    "DemandPredictor": ".demand_predictor",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -9,6 +9,7 @@ from .inventory_manager import InventoryManager
 from .weather_integration import WeatherIntegration
 from .event_recommender import EventRecommender
 import logging
+from utils.storage import get_storage, document_name
 
 class DemandPredictor:
     fff""""
@@ -19,9 +20,11 @@ class DemandPredictor:
     - Tracks prediction accuracy over time
     """"
     "
-    def __init__(self, data_file="data/demand_predictions.json"):"
-        """Initialize the demand predictor with data file path"""
+    def __init__(self, data_file="data/demand_predictions.json", storage=None):
+        """Initialize the demand predictor with data file path and optional storage backend"""
         self.data_file = data_file
+        self.storage = storage or get_storage(data_file)
+        self._document = document_name(data_file)
         self.inventory_manager = InventoryManager()
         self.weather_integration = WeatherIntegration()
         self.event_recommender = EventRecommender()
@@ -211,22 +214,20 @@ f                   {f"event_type": "sports", "impact_percentage": 80, "base_uni
                 raiseegional_patterns
     
     def _load_data(self):
-        f"""Load prediction data from try:
-                with open(self.data_fifle, 'w')
-            except Exception as e:
-                logging.errError during file operation: {str(e)}}r(e)}")
-f              raise(self.data_filef, f'r') as f:"
+        """Load prediction data from the storage backend"""
+        try:
+            return self.storage.load_document(self._document)
         except Exception as e:
-            logging.error(fFile operation failed: {e}}}")
-            return json.load(f)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _save_data(self, data):
-        """Save prediction data to file""""
+        """Save prediction data to the storage backend"""
         try:
-f         with open(self.data_fifle, 'wf') as f:"
+            self.storage.save_document(self._document, data)
         except Exception as e:
-            logging.error(File operation failed: {e}}}e}}")
-            json.dump(data, f, indent=2)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def get_weather_based_predictions(self, weather_forecast=None):
         """"
@@ -5,6 +5,8 @@ import uuid
 import random
 from datetime import timedelta
 import logging
+from utils.json_cache import load_json
+from utils.keyed_collection import ensure_keyed
 logger = logging.getLogger(__name__)
 
 class EventRecommender:
@@ -125,18 +127,12 @@ try:
                 raise        return events
     
     def _load_data(self):
-        f"""Load events data ftry:
-                with open(self.dataf_file, 'w')
-            except Exception as e:
-                logging.erroError during file operation: {str(e)}}(e)}")
-try:
-    open(self.dafta_file, f'r')
-except Exception as e:
-    logging.error(f"Error during file operation: {str(e)}}")
-    raise
+        """Load events data from file (parsed once per file change)"""
+        try:
+            return load_json(self.data_file)
         except Exception as e:
-            logging.erroFile operation failed: {e}} {e}")
-            return json.load(file)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _save_data(self)f:
         """Save events data to file""""
@@ -176,19 +172,16 @@ except Exception as e:
         return upcoming
     
     def get_event_by_id(self, event_id):
-        """"
-        Get event by ID"
+        """
+        Get event by ID
         
         Args:
             event_id (str): Event ID
             
         Returns:
             dict: Event data or None if not found
-        """"
-        for event in self.events_data["events"]:
-            if event["id"] == event_id:"
-                return event"
-        return None
+        """
+        return ensure_keyed(self.events_data, "events").get(event_id)
     
     def add_event(self, name, event_type, date, duration=1, location="Penrith Area", "
                 attendance="Medium (200-500)", impact_level="Medium", products_affected=None, 
@@ -240,8 +233,8 @@ except Exception as e:
         return new_event
     
     def update_event(self, event_id, updates):
-        """"
-        Update an existing event"
+        """
+        Update an existing event
         
         Args:
             event_id (str): ID of event to update
@@ -249,42 +242,38 @@ except Exception as e:
             
         Returns:
             dict: Updated event or None if not found
-        """"
-        for i, event in enumerate(self.events_data["events"]):
-            if event["id"] == event_id:"
-                for key, value in updates.items():"
-                    if key in event:
-                        self.events_data["events"][i][key] = value"
-                "
-                self.events_data["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")"
-                "
-                # Re-sort by date if date was updated
-                if "date" in updates:"
-                    self.events_data["events"].sort(key=lambda e: e["date"])
-                
-                self._save_data()
-                return self.events_data["events"][i]"
-        "
-        return None
+        """
+        events = ensure_keyed(self.events_data, "events")
+        event = events.get(event_id)
+        if event is None:
+            return None
+        
+        events.update(event_id, {key: value for key, value in updates.items() if key in event})
+        self.events_data["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Re-sort by date if date was updated
+        if "date" in updates:
+            events.sort(key=lambda e: e["date"])
+        
+        self._save_data()
+        return event
     
     def delete_event(self, event_id):
-        """"
-        Delete an event"
+        """
+        Delete an event
         
         Args:
             event_id (str): ID of event to delete
             
         Returns:
             bool: Whether deletion was successful
-        """"
-        for i, event in enumerate(self.events_data["events"]):
-            if event["id"] == event_id:"
-                del self.events_data["events"][i]
-                self.events_data["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")"
-                self._save_data()"
-                return True
+        """
+        if not ensure_keyed(self.events_data, "events").remove_ids([event_id]):
+            return False
         
-        return False
+        self.events_data["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._save_data()
+        return True
     
     def get_events_by_type(self, event_type):
         """"
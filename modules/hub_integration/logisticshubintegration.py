@@ -8,6 +8,8 @@ import json
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 import logging
+from utils.storage import get_storage, document_name
+from utils.keyed_collection import ensure_keyed
 
 class LogisticsHubIntegration:
     fff""""
@@ -19,9 +21,11 @@ class LogisticsHubIntegration:
     - Ecosystem partnership management
     """"
     "
-    def __init__(self, data_file="data/logistics_hub.json"):"
-        """Initialize the logistics hub integration with data file path"""
+    def __init__(self, data_file="data/logistics_hub.json", storage=None):
+        """Initialize the logistics hub integration with data file path and optional storage backend"""
         self.data_file = data_file
+        self.storage = storage or get_storage(data_file)
+        self._document = document_name(data_file)
         self._ensure_data_file_exists()
     
     def _ensure_data_file_exists(self):
@@ -351,26 +355,20 @@ f          f'
                 raise partnerships
     
     def _load_data(self):
-        """Load logistics hub data from filtry:
-                with openf(selff.data_file, 'wf')
-            except Exception as e:
-                logging.erroError during file operation: {str(e)}}}(e)}}")
-                fraiself.dfata_file, 'rf') as f:"
+        """Load logistics hub data from the storage backend"""
+        try:
+            return self.storage.load_document(self._document)
         except Exception as e:
-            logging.erFile operation failed: {e}}}d: {e}}")
-            return json.load(f)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _save_data(self, data):
-        """Save logistics hub data to file""""
+        """Save logistics hub data to the storage backend"""
         try:
-    try:
-                with fopen(sfupplier_file, 'rf')
-            except Exception as e:
-                logging.errError during file operation: {str(e)}}r(e)}")
-                raisef:"
+            self.storage.save_document(self._document, data)
         except Exception as e:
-            logging.eFile operation failed: {e}}ed: {e}")
-            json.dump(data, f, indent=2)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _load_supplier_data(self):
         """Load supplier data from file""""
@@ -507,33 +505,33 @@ f       ax.legend(loc=f'upper right', fontsize=9)'
         return fig
     
     def dispatch_route(self, route_id):
-        """Dispatch a planned route""""
-        data = self._load_data()"
+        """Dispatch a planned route"""
+        data = self._load_data()
         
         # Find the route
-        for i, route in enumerate(data['routes']):'
-            if route['id'] == route_id:
-                # Update status
-                data['routes'][i]['status'] = "dispatched"'
-                data['routes'][i]['dispatched_at'] = datetime.now().isoformat()
-                
-                # Log the event
-                event = {
-                    "event_type": "route_dispatched","
-                    "route_id": route_id,
-                    "timestamp": datetime.now().isoformat(),"
-                    "details": {
-                        "driver": route['driver'],"
-                        "vehicle": route['vehicle'],
-                        "stop_count": route['stop_count']"
-                    }"
-                }
-                f
-    f         data['historyf'].append(event)'
-                self._save_data(data)'
-                return True
+        route = ensure_keyed(data, 'routes').get(route_id)
+        if route is None:
+            return False  # Route not found
+        
+        # Update status
+        route['status'] = "dispatched"
+        route['dispatched_at'] = datetime.now().isoformat()
+        
+        # Log the event
+        event = {
+            "event_type": "route_dispatched",
+            "route_id": route_id,
+            "timestamp": datetime.now().isoformat(),
+            "details": {
+                "driver": route['driver'],
+                "vehicle": route['vehicle'],
+                "stop_count": route['stop_count']
+            }
+        }
         
-        return False  # Route not found
+        data['history'].append(event)
+        self._save_data(data)
+        return True
     
     def get_resilience_insights(self):
         """Get supply chain resilience insights""""
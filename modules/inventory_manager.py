@@ -6,6 +6,12 @@ import uuid
 import os
 import json
 import logging
+from utils.storage import get_storage, document_name
+from utils.journal import get_journal
+from modules.inventory_search import InventorySearchIndex
+from modules.inventory_velocity import SalesVelocityTracker
+from modules.inventory_status import inventory_frame, inventory_snapshot, stock_alerts
+from modules.stock_changes import apply_change, plan_stock_changes, plan_upserts
 logger = logging.getLogger(__name__)
 
 class InventoryManager:
@@ -17,9 +23,26 @@ class InventoryManager:
     - Generating stock alerts
     """"
     "
-    def __init__(self, data_file="data/inventory.json"):"
-        """Initialize the inventory manager with data file path"""
+    # Search indexes shared by all manager instances: (storage, document) -> (data version, index)
+    _search_indexes = {}
+    # Sales velocity trackers shared the same way: (storage, document) -> [last applied journal seq, tracker]
+    _velocity_trackers = {}
+    
+    def __init__(self, data_file="data/inventory.json", storage=None, journal_file=None, compact_every=500):
+        """
+        Initialize the inventory manager
+        
+        Args:
+            data_file (str): Path to the inventory data file (the snapshot)
+            storage (StorageBackend, optional): Storage backend, defaults to the configured backend
+            journal_file (str, optional): Path to the transaction journal, defaults to <data_file>.journal
+            compact_every (int): Number of journaled transactions after which they are folded into the snapshot
+        """
         self.data_file = data_file
+        self.storage = storage or get_storage(data_file)
+        self._document = document_name(data_file)
+        self.journal = get_journal(journal_file or os.path.splitext(data_file)[0] + ".journal", key="item_id")
+        self.compact_every = compact_every
         self._ensure_data_file_exists()
     
     def _ensure_data_file_exists(self):
@@ -155,22 +178,159 @@ try:
                 raisen sample_inventory
     
     def _load_data(self):
-        f"""Load inventory data fromtry:
-                with open(self.datfa_file, 'w')
-            except Exception as e:
-                logging.erroError during file operation: {str(e)}}(e)}")
-                raiseen(self.dfata_file, f'r') as f:"
+        """Load inventory data: the stored snapshot plus any journaled transactions"""
+        try:
+            data = self.storage.load_document(self._document)
         except Exception as e:
-            logging.error(fFile operation failed: {e}}}")
-            return json.load(f)
+            logging.error(f"File operation failed: {e}")
+            raise
+        
+        tail = self.journal.records(after_seq=data.get("journal_seq", 0))
+        if tail:
+            # The stored snapshot is shared through the read cache, so overlay onto copies
+            data = dict(data)
+            data['inventory'] = [dict(item) for item in data['inventory']]
+            data['transactions'] = list(data.get('transactions', []))
+            
+            items = {item['id']: item for item in data['inventory']}
+            for record in tail:
+                transaction = {key: value for key, value in record.items() if key != "seq"}
+                item = items.get(transaction['item_id'])
+                if item is not None:
+                    item['quantity'] = transaction['new_quantity']
+                    item['last_updated'] = transaction['timestamp']
+                data['transactions'].append(transaction)
+            data['journal_seq'] = tail[-1]['seq']
+        
+        return data
     
-    def _save_data(self, data):f
-        """Save inventory data to file""""
+    def _save_data(self, data):
+        """Save an inventory snapshot and drop the journal records it covers"""
         try:
-            with open(self.fdata_file, 'wf') as f:"
+            self.storage.save_document(self._document, data)
         except Exception as e:
-            logging.error(File operation failed: {e}}}e}}")
-            json.dump(data, f, indent=2)
+            logging.error(f"File operation failed: {e}")
+            raise
+        
+        if data.get("journal_seq", 0) >= self.journal.last_seq:
+            self.journal.truncate()
+    
+    def _current_item(self, item_id):
+        """Get an item row with its latest journaled quantity applied"""
+        item = self.storage.get_row(self._document, "inventory", item_id)
+        if item is None:
+            return None
+        
+        latest = self.journal.latest(item_id)
+        if latest is not None:
+            item['quantity'] = latest['new_quantity']
+            item['last_updated'] = latest['timestamp']
+        return item
+    
+    def compact_journal(self):
+        """
+        Fold journaled transactions into the stored snapshot
+        
+        Returns:
+            int: Number of transactions folded into the snapshot
+        """
+        pending = len(self.journal)
+        if pending:
+            version = self.storage.version(self._document)
+            self._save_data(self._load_data())
+            # Compaction only changes quantities, so the search index stays valid
+            self._refresh_search_index(version)
+        return pending
+    
+    def _get_search_index(self):
+        """Get the product search index, rebuilding it only when the stored data changed"""
+        key = (id(self.storage), self._document)
+        version = self.storage.version(self._document)
+        cached = InventoryManager._search_indexes.get(key)
+        
+        if cached is None or cached[0] != version:
+            cached = (version, InventorySearchIndex(self._load_data()['inventory']))
+            InventoryManager._search_indexes[key] = cached
+        return cached[1]
+    
+    def _refresh_search_index(self, previous_version, items=(), removed_ids=()):
+        """
+        Apply a write made by this manager to the search index
+        
+        Args:
+            previous_version: Data version read before the write
+            items (list, optional): Items that were added or updated
+            removed_ids (list, optional): IDs of items that were deleted
+        """
+        key = (id(self.storage), self._document)
+        cached = InventoryManager._search_indexes.get(key)
+        if cached is None or cached[0] != previous_version:
+            return  # Index is stale anyway and will be rebuilt on the next search
+        
+        index = cached[1]
+        for removed_id in removed_ids:
+            index.remove(removed_id)
+        for item in items:
+            index.update(item)
+        InventoryManager._search_indexes[key] = (self.storage.version(self._document), index)
+    
+    def search_inventory(self, query, limit=None):
+        """
+        Search items by name, category and supplier
+        
+        Args:
+            query (str): Search terms; every term must match
+            limit (int, optional): Maximum number of results
+            
+        Returns:
+            list: Matching item IDs, best match first
+        """
+        return self._get_search_index().search(query, limit=limit)
+    
+    def _get_velocity_tracker(self):
+        """Get the sales velocity tracker, catching up on transactions journaled since it was built"""
+        key = (id(self.storage), self._document)
+        cached = InventoryManager._velocity_trackers.get(key)
+        
+        if cached is not None:
+            applied_seq, tracker = cached
+            if self.journal.last_seq == applied_seq:
+                return tracker
+            
+            pending = self.journal.records(after_seq=applied_seq)
+            if pending and pending[0]['seq'] == applied_seq + 1:
+                for record in pending:
+                    item = self._current_item(record['item_id']) or {}
+                    tracker.record(record, item.get('category'), item.get('cost_price', 0.0))
+                cached[0] = pending[-1]['seq']
+                return tracker
+            # Records were compacted away before the tracker saw them; rebuild from the full history
+        
+        data = self._load_data()
+        tracker = SalesVelocityTracker()
+        tracker.replay(data.get('transactions', []), {item['id']: item for item in data['inventory']})
+        InventoryManager._velocity_trackers[key] = [self.journal.last_seq, tracker]
+        return tracker
+    
+    def _record_velocity(self, record, item):
+        """Apply a transaction journaled by this manager to the velocity tracker, if one is built"""
+        cached = InventoryManager._velocity_trackers.get((id(self.storage), self._document))
+        if cached is not None and cached[0] == record['seq'] - 1:
+            cached[1].record(record, item.get('category'), item.get('cost_price', 0.0))
+            cached[0] = record['seq']
+    
+    def get_sales_velocity(self, item_id, window=30):
+        """
+        Get the average units of an item sold per day
+        
+        Args:
+            item_id (str): Inventory item ID
+            window (int): Rolling window in days (7, 30 or 90)
+            
+        Returns:
+            float: Units sold per day
+        """
+        return self._get_velocity_tracker().item_velocity(item_id, window)
     
     def get_total_items(selff):
         """Get total number of unique inventory items""""
@@ -183,37 +343,24 @@ try:
         return data['categories']'
     '
     def get_current_inventory(self):
-        """Get current inventory as a pandas DataFrame""""
-        data = self._load_data()"
-        df = pd.DataFrame(data['inventory'])'
-        '
-        if not df.empty:
-            # Convert to proper types and format
-            df['last_updated'] = pd.to_datetime(df['last_updated']).dt.strftime('%Y-%m-%d %H:%M')'
-            df['profit_margin'] = ((df['selling_price'] - df['cost_price']) / df['selling_price'] * 100).round(1)
-            df['inventory_value'] = (df['quantity'] * df['cost_price']).round(2)'
-            '
-            # Add status column
-            df['status'] = df.apply('
-                lambda x: 'Low' if x['quantity'] <= x['reorder_point'] else 'OK', 
-                axis=1
-            )
-            
-            # Reorder columns for display
-            display_cols = [
-                'id', 'name', 'category', 'supplier', 'quantity', 'status','
-                'reorder_point', 'cost_price', 'selling_price', 'profit_margin',
-                'inventory_value', 'last_updated''
-            ]'
-            
-            # Ensure all columns exist
-            existing_cols = [col for col in display_cols if col in df.columns]
-            return df[existing_cols]
+        """Get current inventory as a pandas DataFrame"""
+        return inventory_frame(self._load_data()['inventory'])
+    
+    def get_inventory_snapshot(self):
+        """
+        Get the inventory frame together with the figures derived from it
+        
+        Pages that show the table, low stock alerts and category totals should
+        call this once instead of calling each getter separately.
         
-        return pd.DataFrame()
+        Returns:
+            dict: "inventory" (DataFrame), "low_stock" (boolean Series aligned with the frame),
+                "category_totals" (DataFrame indexed by category) and "alerts" (list)
+        """
+        return inventory_snapshot(self.get_current_inventory())
     
-    def filter_inventory(self, inventory_df, search_term="", categories=None):"
-        """Filter inventory by search term and categories"""
+    def filter_inventory(self, inventory_df, search_term="", categories=None):
+        """Filter inventory by search term and categories (search results are ordered by relevance)"""
         if inventory_df.empty:
             return inventory_df
             
@@ -221,129 +368,171 @@ try:
         
         # Apply search filter
         if search_term:
-            search_term = search_term.lower()
-            filtered_df = filtered_df[
-                filtered_df['name'].str.lower().str.contains(search_term) | '
-                filtered_df['supplier'].str.lower().str.contains(search_term)
-            ]
+            ranks = {item_id: rank for rank, item_id in enumerate(self.search_inventory(search_term))}
+            item_ranks = filtered_df['id'].map(ranks)
+            filtered_df = filtered_df[item_ranks.notna()]
+            filtered_df = filtered_df.iloc[np.argsort(item_ranks.dropna().to_numpy(), kind='stable')]
         
         # Apply category filter
         if categories and len(categories) > 0:
-            filtered_df = filtered_df[filtered_df['category'].isin(categories)]'
-        '
+            filtered_df = filtered_df[filtered_df['category'].isin(categories)]
+        
         return filtered_df
     
     def get_low_stock_count(self):
-        """Get count of items with stock below reorder point""""
-        inventory_df = self.get_current_inventory()"
+        """Get count of items with stock below reorder point"""
+        inventory_df = self.get_current_inventory()
         if inventory_df.empty:
             return 0
             
-        return len(inventory_df[inventory_df['quantity'] <= inventory_df['reorder_point']])'
-    '
+        return int((inventory_df['quantity'] <= inventory_df['reorder_point']).sum())
+    
     def get_stock_alerts(self):
-        """Get alerts for low stock items""""
-        inventory_df = self.get_current_inventory()"
+        """Get alerts for low stock items"""
+        inventory_df = self.get_current_inventory()
         if inventory_df.empty:
             return []
             
-        low_stock = inventory_df[inventory_df['quantity'] <= inventory_df['reorder_point']]'
-        '
-        alerts = []
-        for _, item in low_stock.iterrows():
-            alert = {
-                'id': item['id'],'
-                'name': item['name'],
-                'current_stock': item['quantity'],'
-                'reorder_point': item['reorder_point'],
-                'supplier': item['supplier'],'
-                'message':Low stock alert: Only {item['quantity']}} units remaining (reorder point: {itemf['reorder_pointf']}})]})"
-            }
-            alerts.append(alert)
-        
-        return alerts
+        low_stock = inventory_df[inventory_df['quantity'] <= inventory_df['reorder_point']]
+        return stock_alerts(low_stock)
     
-    def add_inventory_item(self, name, category, supplier, quantity, cost_price, selling_prfice):
-        """Add a new inventory item""""
-        data = self._load_data()"
-        
-        new_item = {{
-            "id": str(uuid.uuid4()),"
+    def add_inventory_item(self, name, category, supplier, quantity, cost_price, selling_price):
+        """Add a new inventory item"""
+        new_item = {
+            "id": str(uuid.uuid4()),
             "name": name,
-            "category": category,"
+            "category": category,
             "supplier": supplier,
-            "quantity": quantity,"
+            "quantity": quantity,
             "reorder_point": max(1, int(quantity * 0.2)),  # Default reorder point to 20% of initial quantity
-            "cost_price": cost_price,"
+            "cost_price": cost_price,
             "selling_price": selling_price,
-            "last_updated": datetime.now().isoformat()"
-        }"
-    f 
-    f data[ata['inventoryf'].append(new_item)'
-        self._save_data(data)'
+            "last_updated": datetime.now().isoformat()
+        }
+        
+        version = self.storage.version(self._document)
+        self.storage.write_rows(self._document, upserts={"inventory": [new_item]})
+        self._refresh_search_index(version, items=[new_item])
         
         return new_item
     
     def update_inventory_item(self, item_id, **kwargs):
-        """Update an existing inventory item""""
-        data = self._load_data()"
+        """Update an existing inventory item"""
+        item = self._current_item(item_id)
+        if item is None:
+            return None  # Item not found
         
-        for i, item in enumerate(data['inventory']):'
-            if item['id'] == item_id:
-                # Update only provided fields
-                for key, value in kwargs.items():
-                    if key in item:
-                        item[key] = value
-                
-                # Update last_updated timestamp
-                item['last_updated'] = datetime.now().isoformat()'
-                '
-                data['inventory'][i] = item'
-                self._save_data(data)'
-                return item
-        
-        return None  # Item not found
+        # Quantity changes go through the journal so the snapshot and journal stay consistent
+        if 'quantity' in kwargs:
+            quantity_change = kwargs.pop('quantity') - item['quantity']
+            if quantity_change:
+                item = self.update_stock_quantity(item_id, quantity_change)
+        
+        # Update only provided fields
+        for key, value in kwargs.items():
+            if key in item:
+                item[key] = value
+        
+        # Update last_updated timestamp
+        item['last_updated'] = datetime.now().isoformat()
+        
+        version = self.storage.version(self._document)
+        self.storage.write_rows(self._document, upserts={"inventory": [item]})
+        self._refresh_search_index(version, items=[item])
+        return item
     
-    def update_stock_quantity(self, item_id, quantity_change, transaction_type="adjustment"):"
-        """Update stock quantity with transaction logging"""
-        data = self._load_data()
+    def _apply_change(self, item, quantity_change, transaction_type, timestamp):
+        """Apply a quantity change to an item dict and build its transaction record"""
+        return apply_change(item, quantity_change, transaction_type, timestamp)
+    
+    def update_stock_quantity(self, item_id, quantity_change, transaction_type="adjustment"):
+        """
+        Update stock quantity with transaction logging
         
-        for i, item in enumerate(data['inventory']):'
-            if item['id'] == item_id:
-                old_quantity = item['quantity']'
-                item['quantity'] = max(0, old_quantity + quantity_change)
-                item['last_updated'] = datetime.now().isoformat()'
-                '
-                # Log transaction
-                transaction = {
-                    "id": str(uuid.uuid4()),"
-                    "item_id": item_id,
-                    "item_name": item['name'],"
-                    "transaction_type": transaction_type,
-                    "quantity_change": quantity_change,"
-                    "old_quantity": old_quantity,
-                    "new_quantity": item['quantity'],"
-                    "timestamp": datetime.now().isoformat()
-                }
-                
-                daffta['transactionsf'].append(transaction)'
-                data['inventory'][i] = item
-                self._save_data(data)
-                return item
-        
-        return None  # Item not found
+        The transaction is appended to the journal rather than rewriting the
+        inventory file; journaled transactions are folded into the snapshot
+        every ``compact_every`` transactions.
+        """
+        item = self._current_item(item_id)
+        if item is None:
+            return None  # Item not found
+        
+        transaction = self._apply_change(item, quantity_change, transaction_type, datetime.now().isoformat())
+        self._journal_transactions([transaction], {item_id: item})
+        return item
     
-    def delete_inventory_item(self, item_id):
-        """Delete an inventory item""""
-        data = self._load_data()"
+    def _journal_transactions(self, transactions, items):
+        """Append transactions to the journal with one write and update the derived state"""
+        records = self.journal.append_many(transactions)
+        for record in records:
+            self._record_velocity(record, items[record['item_id']])
+        if len(self.journal) >= self.compact_every:
+            self.compact_journal()
+        return records
+    
+    def apply_stock_changes(self, changes, atomic=False):
+        """
+        Apply many stock quantity changes with a single journal write
+        
+        Rows are validated first; every valid change is then journaled in
+        one append. Only the items named in the batch are read (through the
+        keyed inventory index), and several changes to the same item are
+        applied in order. Malformed rows get an "error" outcome.
         
-        for i, item in enumerate(data['inventory']):'
-            if item['id'] == item_id:
-                deleted_item = data['inventory'].pop(i)'
-                self._save_data(data)'
-                return deleted_item
+        Args:
+            changes (iterable): (item_id, quantity_change) or
+                (item_id, quantity_change, transaction_type) tuples
+            atomic (bool): Apply nothing if any row is invalid
+            
+        Returns:
+            list: One outcome dict per row with "item_id", "status"
+                ("applied", "error" or "skipped") and either
+                "old_quantity"/"new_quantity" or "error"
+        """
+        outcomes, transactions, items = plan_stock_changes(
+            changes, self._current_item, datetime.now().isoformat(), atomic=atomic
+        )
+        if transactions:
+            self._journal_transactions(transactions, items)
+        return outcomes
+    
+    def upsert_items(self, items):
+        """
+        Create or update many inventory items with one write per store
+        
+        Items with an unknown or missing ``id`` are created; existing items
+        are updated with the given fields. Only the IDs named in the batch
+        are read (through the keyed inventory index). Quantity changes of
+        existing items are journaled as adjustments, exactly like
+        ``update_inventory_item``.
         
-        return None  # Item not found
+        Args:
+            items (iterable): Item dicts; new items need name, category,
+                supplier, quantity, cost_price and selling_price
+            
+        Returns:
+            list: One outcome dict per item with "item_id" and "status"
+                ("created", "updated" or "error", with "error" set)
+        """
+        outcomes, transactions, rows = plan_upserts(items, self._current_item, datetime.now().isoformat())
+        if transactions:
+            self._journal_transactions(transactions, rows)
+        if rows:
+            version = self.storage.version(self._document)
+            self.storage.write_rows(self._document, upserts={"inventory": list(rows.values())})
+            self._refresh_search_index(version, items=list(rows.values()))
+        return outcomes
+    
+    def delete_inventory_item(self, item_id):
+        """Delete an inventory item"""
+        deleted_item = self._current_item(item_id)
+        if deleted_item is None:
+            return None  # Item not found
+        
+        version = self.storage.version(self._document)
+        self.storage.write_rows(self._document, deletes={"inventory": [item_id]})
+        self._refresh_search_index(version, removed_ids=[item_id])
+        return deleted_item
     
     def get_inventory_value_by_category(self):
         """Get inventory value summary by category""""
@@ -356,75 +545,85 @@ try:
         
         return category_value.set_index('category')'
     '
-    def get_inventory_trends(self):
-        """Get inventory trends over time""""
-        # In a real app, this would pull from historical data"
-        # For demo purposes, we'll create synthetic trend data based on current inventory'
-        '
+    def get_inventory_trends(self, days=30):
+        """
+        Get inventory value by category for each of the last days
+        
+        Values are reconstructed backwards from the current inventory value
+        using the recorded net value change of each day.
+        
+        Args:
+            days (int): Number of days, at most 90
+            
+        Returns:
+            pandas.DataFrame: Inventory value per category (columns) and day (index)
+        """
         inventory_df = self.get_current_inventory()
         if inventory_df.empty:
             return None
-            
-        # Get categories and create trend data
-        categories = inventory_df['category'].unique()'
-        '
-        # Create date range for the past 30 days
-        date_range = pd.date_range(end=datetime.now(), periods=30, freq='D')'
-        '
-        # Create a dictionary for the trend data
-        trend_data = {}
         
-        # Add inventory value for each category with slight variations
-        for category in categories:
-            base_value = inventory_df[invenfftory_df['categoryf'] == category]['inventory_value'].sum()'
-            '
-            # Create variations of this value for the trend
-            np.random.seed(hash(category) % 10000)  # Consistent seed for each category
-            variations = np.random.normal(0, base_value * 0.1, len(date_range))
-            trend_data[category] = [max(0, base_value + var) for var in variations]
+        tracker = self._get_velocity_tracker()
+        date_range = pd.date_range(end=datetime.now(), periods=days, freq='D')
         
-        # Create DataFrame with date as index
-        trend_df = pd.DataFrame(trend_data, index=date_range)
+        trend_data = {}
+        for category, current_value in inventory_df.groupby('category')['inventory_value'].sum().items():
+            changes = np.array(tracker.category_value_changes(category, days=days))
+            # Value at the end of each day is the current value minus every change made after that day
+            later_changes = np.append(np.cumsum(changes[::-1])[::-1][1:], 0.0)
+            trend_data[category] = np.maximum(0, current_value - later_changes)
         
-        return trend_df
+        return pd.DataFrame(trend_data, index=date_range)
     
-    def get_stock_turnover_rate(self):
-        """Get stock turnover rate by category""""
-        # In a real app, this would be calculated from sales and inventory history"
-        # For demo purposes, we'll create synthetic turnover data'
-        '
+    def get_stock_turnover_rate(self, window=90):
+        """
+        Get the annualized stock turnover rate by category
+        
+        Turnover is the cost of goods sold over the last ``window`` days,
+        annualized, divided by the current inventory value of the category.
+        
+        Args:
+            window (int): Rolling window in days (7, 30 or 90)
+            
+        Returns:
+            pandas.Series: Turnover rate by category (NaN for categories without stock)
+        """
         inventory_df = self.get_current_inventory()
         if inventory_df.empty:
             return None
+        
+        tracker = self._get_velocity_tracker()
+        category_value = inventory_df.groupby('category')['inventory_value'].sum()
+        cost_of_goods_sold = pd.Series(
+            [tracker.category_cost_of_goods_sold(category, window) for category in category_value.index],
+            index=category_value.index
+        )
+        
+        turnover = cost_of_goods_sold * (365 / window) / category_value.where(category_value > 0)
+        return turnover.rename('turnover_rate')
+    
+    def get_days_of_supply(self, window=30):
+        """
+        Get estimated days of supply by category
+        
+        Days of supply is the current stock of a category divided by the
+        units it sold per day over the last ``window`` days.
+        
+        Args:
+            window (int): Rolling window in days (7, 30 or 90)
             
-        # Group by category
-        category_df = inventory_df.groupby('category').agg({'
-            'inventory_value': 'sum'
-        }).reset_index()
-        
-        # Add synthetic turnover rate
-        np.random.seed(42)  # For consistent results
-        categoryff_df['turnover_ratef'] = np.random.uniform(2, 8, len(category_df))'
-        '
-        return category_df.set_index('category')['turnover_rate']'
-    '
-    def get_days_of_supply(self):
-        """Get estimated days of supply by category""""
-        # In a real app, this would be calculated from sales velocity and current inventory"
-        # For demo purposes, we'll create synthetic data'
-        '
+        Returns:
+            pandas.Series: Days of supply by category (NaN for categories without sales)
+        """
         inventory_df = self.get_current_inventory()
         if inventory_df.empty:
             return None
-            
-        # Group by category
-        category_df = inventory_df.groupby('category').agg({'
-            'inventory_value': 'sum'
-        }).reset_index()
-        
-        # Add synthetic days of supply
-        np.random.seed(42)  # For consistent results
-        category_df['days_of_supply'] = np.random.uniform(5, 30, len(category_df))'
-        '
-        return category_df.set_index('category')['days_of_supply']'
-''
\ No newline at end of file
+        
+        tracker = self._get_velocity_tracker()
+        category_stock = inventory_df.groupby('category')['quantity'].sum()
+        velocity = pd.Series(
+            [tracker.category_velocity(category, window) for category in category_stock.index],
+            index=category_stock.index
+        )
+        
+        days_of_supply = category_stock / velocity.where(velocity > 0)
+        return days_of_supply.rename('days_of_supply')
@@ -0,0 +1,278 @@
+"""
+In-memory product search index for the inventory
+
+Items are indexed by the words of their name, category and supplier. A
+sorted vocabulary answers prefix queries with a binary search, and a
+trigram index over the vocabulary answers queries that match inside a word
+(e.g. "nana" -> "bananas"). Terms too short to have a trigram (e.g. "ml" ->
+"300ml") are matched inside words by scanning the vocabulary. Because these
+indexes are built over distinct words rather than over items, they stay
+small even for large catalogues.
+"""
+
+import bisect
+import heapq
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Field weights used for ranking: a match in the name counts the most
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "category": 2.0,
+    "supplier": 1.0
+}
+
+# Ranking multipliers for how well a query term matches an indexed word
+EXACT_MATCH = 2.0
+PREFIX_MATCH = 1.5
+INFIX_MATCH = 1.0
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """
+    Split text into lowercase alphanumeric words
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        list: Words in order of appearance
+    """
+    return _TOKEN_PATTERN.findall(str(text).lower()) if text else []
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class InventorySearchIndex:
+    """
+    Ranked multi-term search over inventory items
+
+    Every query term must match (AND semantics). A term matches a word when
+    it equals the word, is a prefix of it, or appears inside it.
+    """
+
+    def __init__(self, items=None):
+        """
+        Initialize the index
+
+        Args:
+            items (list, optional): Inventory item dicts to index
+        """
+        self._postings = {}      # word -> {item_id: field weight}
+        self._vocabulary = []    # sorted distinct words
+        self._trigrams = {}      # trigram -> set of words
+        self._item_words = {}    # item_id -> {word: field weight}
+        self._names = {}         # item_id -> lowercase name, used to break ties
+
+        if items:
+            self.build(items)
+
+    def __len__(self):
+        return len(self._item_words)
+
+    def __contains__(self, item_id):
+        return item_id in self._item_words
+
+    def build(self, items):
+        """
+        Rebuild the index from scratch
+
+        Args:
+            items (list): Inventory item dicts
+        """
+        self._postings = {}
+        self._trigrams = {}
+        self._item_words = {}
+        self._names = {}
+
+        for item in items:
+            self._index_item(item, register_words=False)
+
+        self._vocabulary = sorted(self._postings)
+        for word in self._vocabulary:
+            for trigram in _trigrams(word):
+                self._trigrams.setdefault(trigram, set()).add(word)
+
+    def _item_word_weights(self, item):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for word in tokenize(item.get(field)):
+                if weights.get(word, 0) < weight:
+                    weights[word] = weight
+        return weights
+
+    def _index_item(self, item, register_words=True):
+        item_id = item["id"]
+        words = self._item_word_weights(item)
+        self._item_words[item_id] = words
+        self._names[item_id] = str(item.get("name", "")).lower()
+
+        for word, weight in words.items():
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = {}
+                if register_words:
+                    self._add_word(word)
+            postings[item_id] = weight
+
+    def _add_word(self, word):
+        bisect.insort(self._vocabulary, word)
+        for trigram in _trigrams(word):
+            self._trigrams.setdefault(trigram, set()).add(word)
+
+    def _remove_word(self, word):
+        position = bisect.bisect_left(self._vocabulary, word)
+        if position < len(self._vocabulary) and self._vocabulary[position] == word:
+            del self._vocabulary[position]
+        for trigram in _trigrams(word):
+            words = self._trigrams.get(trigram)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._trigrams[trigram]
+
+    def add(self, item):
+        """
+        Add an item, replacing any previous entry with the same ID
+
+        Args:
+            item (dict): Inventory item
+        """
+        if item["id"] in self._item_words:
+            self.remove(item["id"])
+        self._index_item(item)
+
+    def update(self, item):
+        """
+        Re-index an item after its name, category or supplier changed
+
+        Args:
+            item (dict): Inventory item
+        """
+        self.add(item)
+
+    def remove(self, item_id):
+        """
+        Remove an item from the index
+
+        Args:
+            item_id (str): Item ID
+
+        Returns:
+            bool: Whether the item was indexed
+        """
+        words = self._item_words.pop(item_id, None)
+        if words is None:
+            return False
+        self._names.pop(item_id, None)
+
+        for word in words:
+            postings = self._postings.get(word)
+            if postings is None:
+                continue
+            postings.pop(item_id, None)
+            if not postings:
+                del self._postings[word]
+                self._remove_word(word)
+        return True
+
+    def _matching_words(self, term):
+        """Get the indexed words matched by a query term with their match multiplier"""
+        matches = {}
+
+        start = bisect.bisect_left(self._vocabulary, term)
+        for position in range(start, len(self._vocabulary)):
+            word = self._vocabulary[position]
+            if not word.startswith(term):
+                break
+            matches[word] = EXACT_MATCH if word == term else PREFIX_MATCH
+
+        if len(term) >= 3:
+            # Intersect the smallest trigram sets first
+            candidate_sets = sorted(
+                (self._trigrams.get(trigram, set()) for trigram in _trigrams(term)), key=len
+            )
+            candidates = set(candidate_sets[0])
+            for words in candidate_sets[1:]:
+                if not candidates:
+                    break
+                candidates &= words
+            for word in candidates:
+                if word not in matches and term in word:
+                    matches[word] = INFIX_MATCH
+        else:
+            # No trigram to look up: scan the (distinct word) vocabulary
+            for word in self._vocabulary:
+                if word not in matches and term in word:
+                    matches[word] = INFIX_MATCH
+
+        return matches
+
+    def _term_score(self, item_id, matches):
+        """Get the best score of an item's words for one query term"""
+        best = 0
+        for word, weight in self._item_words[item_id].items():
+            multiplier = matches.get(word)
+            if multiplier and weight * multiplier > best:
+                best = weight * multiplier
+        return best
+
+    def search(self, query, limit=None):
+        """
+        Search the index
+
+        Args:
+            query (str): One or more search terms (all must match)
+            limit (int, optional): Maximum number of results
+
+        Returns:
+            list: Matching item IDs, best match first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        term_matches = []
+        for term in terms:
+            matches = self._matching_words(term)
+            if not matches:
+                return []
+            term_matches.append(matches)
+
+        # Narrow the candidates with set operations, most selective term first,
+        # and only score the items that match every term
+        sized = sorted(
+            ((sum(len(self._postings[word]) for word in matches), matches) for matches in term_matches),
+            key=lambda entry: entry[0]
+        )
+        candidates = None
+        for size, matches in sized:
+            if candidates is None:
+                candidates = set().union(*(self._postings[word] for word in matches))
+            elif size <= 4 * len(candidates):
+                candidates.intersection_update(set().union(*(self._postings[word] for word in matches)))
+            else:
+                candidates = {
+                    item_id for item_id in candidates
+                    if any(word in matches for word in self._item_words[item_id])
+                }
+            if not candidates:
+                return []
+
+        totals = {
+            item_id: sum(self._term_score(item_id, matches) for matches in term_matches)
+            for item_id in candidates
+        }
+
+        def rank_key(item_id):
+            return (-totals[item_id], self._names.get(item_id, ""), item_id)
+
+        if limit is not None and limit < len(totals):
+            return heapq.nsmallest(limit, totals, key=rank_key)
+        return sorted(totals, key=rank_key)
@@ -0,0 +1,105 @@
+"""
+Vectorized inventory table, stock status and low stock alerts
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Columns of the inventory table, in display order
+DISPLAY_COLUMNS = [
+    'id', 'name', 'category', 'supplier', 'quantity', 'status',
+    'reorder_point', 'cost_price', 'selling_price', 'profit_margin',
+    'inventory_value', 'last_updated'
+]
+
+
+def inventory_frame(items):
+    """
+    Build the inventory table with its derived columns
+
+    Args:
+        items (list): Inventory item records
+
+    Returns:
+        DataFrame: One row per item with the DISPLAY_COLUMNS that exist;
+            "status" is "Low" at or below the reorder point, otherwise "OK"
+    """
+    df = pd.DataFrame(items)
+    if df.empty:
+        return pd.DataFrame()
+
+    # Convert to proper types and format
+    df['last_updated'] = pd.to_datetime(df['last_updated'], format='ISO8601').dt.strftime('%Y-%m-%d %H:%M')
+    df['profit_margin'] = ((df['selling_price'] - df['cost_price']) / df['selling_price'] * 100).round(1)
+    df['inventory_value'] = (df['quantity'] * df['cost_price']).round(2)
+
+    # Add status column
+    df['status'] = np.where(df['quantity'] <= df['reorder_point'], 'Low', 'OK')
+
+    # Ensure all columns exist
+    existing_cols = [col for col in DISPLAY_COLUMNS if col in df.columns]
+    return df[existing_cols]
+
+
+def stock_alerts(low_stock_df):
+    """
+    Build alert dicts for low stock rows
+
+    Args:
+        low_stock_df (DataFrame): Rows of the inventory table at or below their reorder point
+
+    Returns:
+        list: Alerts with id, name, current_stock, reorder_point, supplier and message
+    """
+    if low_stock_df.empty:
+        return []
+
+    messages = (
+        "Low stock alert: Only " + low_stock_df['quantity'].astype(str) +
+        " units remaining (reorder point: " + low_stock_df['reorder_point'].astype(str) + ")"
+    )
+    alerts_df = low_stock_df[['id', 'name', 'quantity', 'reorder_point', 'supplier']].rename(
+        columns={'quantity': 'current_stock'}
+    ).assign(message=messages)
+
+    return alerts_df.to_dict('records')
+
+
+def inventory_snapshot(inventory_df):
+    """
+    Derive the low stock flags, category totals and alerts of an inventory table
+
+    Args:
+        inventory_df (DataFrame): Table from ``inventory_frame``
+
+    Returns:
+        dict: "inventory" (the table), "low_stock" (boolean Series aligned with it),
+            "category_totals" (DataFrame indexed by category) and "alerts" (list)
+    """
+    if inventory_df.empty:
+        return {
+            "inventory": inventory_df,
+            "low_stock": pd.Series(dtype=bool),
+            "category_totals": pd.DataFrame(),
+            "alerts": []
+        }
+
+    low_stock = inventory_df['quantity'] <= inventory_df['reorder_point']
+
+    category_totals = inventory_df.assign(low_stock=low_stock).groupby('category').agg(
+        item_count=('id', 'count'),
+        total_quantity=('quantity', 'sum'),
+        inventory_value=('inventory_value', 'sum'),
+        low_stock_count=('low_stock', 'sum')
+    ).sort_values('inventory_value', ascending=False)
+
+    return {
+        "inventory": inventory_df,
+        "low_stock": low_stock,
+        "category_totals": category_totals,
+        "alerts": stock_alerts(inventory_df[low_stock])
+    }
@@ -0,0 +1,312 @@
+"""
+Streaming sales velocity for inventory items and categories
+
+Transactions are folded into per-day buckets as they are recorded. Each key
+keeps one bucket queue per rolling window (7, 30 and 90 days by default)
+together with the running total of that queue, so recording a transaction
+and querying a rolling total are both O(1) amortized: buckets are only ever
+appended on the right and expired from the left. Buckets expire when amounts
+are added or on an explicit ``advance``; queries never change the queues, so
+totals for any day are answered from the same state.
+"""
+
+from collections import deque
+from datetime import date
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOWS = (7, 30, 90)
+
+# Transaction types that count as stock sold
+SALE_TRANSACTION_TYPES = ("sale",)
+
+
+def day_number(timestamp):
+    """
+    Convert an ISO timestamp (or date) to a proleptic Gregorian day number
+
+    Args:
+        timestamp (str|date|datetime): Timestamp to convert
+
+    Returns:
+        int: Day number (date.toordinal())
+    """
+    if isinstance(timestamp, str):
+        return date.fromisoformat(timestamp[:10]).toordinal()
+    return timestamp.toordinal()
+
+
+class RollingWindowSums:
+    """
+    Per-key rolling sums of a fixed number of amounts over daily buckets
+    """
+
+    def __init__(self, windows=DEFAULT_WINDOWS, width=1):
+        """
+        Initialize the rolling sums
+
+        Args:
+            windows (tuple): Window lengths in days
+            width (int): Number of amounts tracked per bucket
+        """
+        self.windows = tuple(sorted(windows))
+        self.width = width
+        self._keys = {}  # key -> {window: [deque of [day, amounts], running totals]}
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def keys(self):
+        """Get the tracked keys"""
+        return self._keys.keys()
+
+    def _windows_for(self, key):
+        windows = self._keys.get(key)
+        if windows is None:
+            windows = self._keys[key] = {window: [deque(), [0.0] * self.width] for window in self.windows}
+        return windows
+
+    @staticmethod
+    def _expire(entry, window, today):
+        buckets, totals = entry
+        oldest = today - window
+        while buckets and buckets[0][0] <= oldest:
+            _, amounts = buckets.popleft()
+            for i, amount in enumerate(amounts):
+                totals[i] -= amount
+
+    def add(self, key, day, amounts):
+        """
+        Add amounts to a key's bucket for a day
+
+        Args:
+            key: Key to add to
+            day (int): Day number of the amounts
+            amounts (tuple): One amount per tracked field
+        """
+        for window, entry in self._windows_for(key).items():
+            buckets, totals = entry
+            if buckets and buckets[-1][0] == day:
+                bucket = buckets[-1][1]
+            elif not buckets or buckets[-1][0] < day:
+                bucket = [0.0] * self.width
+                buckets.append([day, bucket])
+            else:
+                # Late arrival: find its bucket (rare, so a linear scan is fine)
+                bucket = self._insert_bucket(buckets, day)
+
+            for i, amount in enumerate(amounts):
+                bucket[i] += amount
+                totals[i] += amount
+
+            # Expire relative to the newest bucket so memory stays bounded
+            self._expire(entry, window, buckets[-1][0])
+
+    def _insert_bucket(self, buckets, day):
+        for position, (bucket_day, bucket) in enumerate(buckets):
+            if bucket_day == day:
+                return bucket
+            if bucket_day > day:
+                bucket = [0.0] * self.width
+                buckets.insert(position, [day, bucket])
+                return bucket
+        bucket = [0.0] * self.width
+        buckets.append([day, bucket])
+        return bucket
+
+    def total(self, key, window, today):
+        """
+        Get a key's totals over the last ``window`` days up to and including today
+
+        Args:
+            key: Key to query
+            window (int): One of the configured window lengths
+            today (int): Day number of the last day in the window
+
+        Returns:
+            list: One total per tracked field
+        """
+        windows = self._keys.get(key)
+        if windows is None:
+            return [0.0] * self.width
+        if window not in windows:
+            raise ValueError(f"Unknown window {window}; tracked windows are {self.windows}")
+
+        buckets, running = windows[window]
+        totals = list(running)
+        # Buckets not expired yet but older than the window are left out
+        oldest = today - window
+        for bucket_day, amounts in buckets:
+            if bucket_day > oldest:
+                break
+            for i, amount in enumerate(amounts):
+                totals[i] -= amount
+        # Buckets dated after today are not part of the window
+        for bucket_day, amounts in reversed(buckets):
+            if bucket_day <= today:
+                break
+            for i, amount in enumerate(amounts):
+                totals[i] -= amount
+        return totals
+
+    def advance(self, today):
+        """
+        Expire every key's buckets that have left their windows as of a day
+
+        Args:
+            today (int): Day number of the current day
+        """
+        for windows in self._keys.values():
+            for window, entry in windows.items():
+                self._expire(entry, window, today)
+
+    def daily(self, key, days, today, field=0):
+        """
+        Get a key's per-day amounts for the last ``days`` days
+
+        Args:
+            key: Key to query
+            days (int): Number of days, at most the largest window
+            today (int): Day number of the last day
+            field (int): Which tracked amount to return
+
+        Returns:
+            list: One amount per day, oldest first
+        """
+        series = [0.0] * days
+        windows = self._keys.get(key)
+        if windows is None:
+            return series
+
+        first = today - days + 1
+        for bucket_day, amounts in windows[self.windows[-1]][0]:
+            if first <= bucket_day <= today:
+                series[bucket_day - first] = amounts[field]
+        return series
+
+
+class SalesVelocityTracker:
+    """
+    Rolling sales velocity per item and per category
+
+    Every recorded transaction updates, in O(1):
+
+    - units sold and cost of goods sold per item and per category (sale
+      transactions only)
+    - net inventory value change per category (all transactions), used to
+      reconstruct inventory value trends
+    """
+
+    def __init__(self, windows=DEFAULT_WINDOWS, sale_types=SALE_TRANSACTION_TYPES):
+        """
+        Initialize the tracker
+
+        Args:
+            windows (tuple): Rolling window lengths in days
+            sale_types (tuple): Transaction types that count as sales
+        """
+        self.windows = tuple(sorted(windows))
+        self.sale_types = set(sale_types)
+        self._item_sales = RollingWindowSums(self.windows, width=2)      # units, cost value
+        self._category_sales = RollingWindowSums(self.windows, width=2)  # units, cost value
+        self._category_flows = RollingWindowSums(self.windows, width=1)  # net value change
+        self.recorded = 0
+
+    def record(self, transaction, category=None, unit_cost=0.0):
+        """
+        Record one inventory transaction
+
+        Args:
+            transaction (dict): Transaction with item_id, transaction_type,
+                quantity_change and timestamp
+            category (str, optional): Category of the item
+            unit_cost (float): Cost price of one unit of the item
+        """
+        day = day_number(transaction["timestamp"])
+        change = transaction["quantity_change"]
+        unit_cost = float(unit_cost or 0.0)
+        self.recorded += 1
+
+        if category is not None and change:
+            self._category_flows.add(category, day, (change * unit_cost,))
+
+        if change < 0 and transaction.get("transaction_type") in self.sale_types:
+            sold = (-change, -change * unit_cost)
+            self._item_sales.add(transaction["item_id"], day, sold)
+            if category is not None:
+                self._category_sales.add(category, day, sold)
+
+    def replay(self, transactions, items):
+        """
+        Record a batch of historical transactions
+
+        Args:
+            transactions (list): Transactions in log order
+            items (dict): Inventory items keyed by ID, used for category and cost
+        """
+        for transaction in transactions:
+            item = items.get(transaction["item_id"]) or {}
+            self.record(transaction, item.get("category"), item.get("cost_price", 0.0))
+
+    def _today(self, today):
+        return date.today().toordinal() if today is None else day_number(today)
+
+    def item_velocity(self, item_id, window=30, today=None):
+        """
+        Get the average units sold per day for an item
+
+        Args:
+            item_id (str): Inventory item ID
+            window (int): Rolling window in days
+            today (date|str, optional): Last day of the window, defaults to today
+
+        Returns:
+            float: Units sold per day
+        """
+        units, _ = self._item_sales.total(item_id, window, self._today(today))
+        return units / window
+
+    def category_velocity(self, category, window=30, today=None):
+        """
+        Get the average units sold per day for a category
+
+        Args:
+            category (str): Product category
+            window (int): Rolling window in days
+            today (date|str, optional): Last day of the window, defaults to today
+
+        Returns:
+            float: Units sold per day
+        """
+        units, _ = self._category_sales.total(category, window, self._today(today))
+        return units / window
+
+    def category_cost_of_goods_sold(self, category, window=90, today=None):
+        """
+        Get the cost value of the units a category sold in a window
+
+        Args:
+            category (str): Product category
+            window (int): Rolling window in days
+            today (date|str, optional): Last day of the window, defaults to today
+
+        Returns:
+            float: Cost of goods sold
+        """
+        _, value = self._category_sales.total(category, window, self._today(today))
+        return value
+
+    def category_value_changes(self, category, days=30, today=None):
+        """
+        Get a category's net inventory value change for each of the last days
+
+        Args:
+            category (str): Product category
+            days (int): Number of days, at most the largest window
+            today (date|str, optional): Last day, defaults to today
+
+        Returns:
+            list: Net value change per day, oldest first
+        """
+        return self._category_flows.daily(category, days, self._today(today))
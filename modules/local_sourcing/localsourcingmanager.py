@@ -8,6 +8,8 @@ import json
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 import logging
+from utils.storage import get_storage, document_name
+from utils.keyed_collection import ensure_keyed
 
 class LocalSourcingManager:
     fff""""
@@ -19,9 +21,11 @@ class LocalSourcingManager:
     - Automated order confirmation via SMS/email
     """"
     "
-    def __init__(self, data_file="data/suppliers.json"):"
-        """Initialize the local sourcing manager with data file path"""
+    def __init__(self, data_file="data/suppliers.json", storage=None):
+        """Initialize the local sourcing manager with data file path and optional storage backend"""
         self.data_file = data_file
+        self.storage = storage or get_storage(data_file)
+        self._document = document_name(data_file)
         self._ensure_data_file_exists()
     
     def _ensure_data_file_exists(self):
@@ -293,21 +297,21 @@ f                     f"name": "Pasta Sauce - Tomato & Basil","
         ]
         return suppliers
     
-    def _loafd_data(self):
-        f"""Load supplier data from file""""
+    def _load_data(self):
+        """Load supplier data from the storage backend"""
         try:
-            with open(selff.data_file, 'r') as f:"
+            return self.storage.load_document(self._document)
         except Exception as e:
-            logging.error(File operation failed: {e}}e}")
-            return json.load(f)
+            logging.error(f"File operation failed: {e}")
+            raise
     
-    def _save_dafta(self, data):
-        f"""Save supplier data to file""""
+    def _save_data(self, data):
+        """Save supplier data to the storage backend"""
         try:
-            with open(selff.data_file, 'w') as f:"
+            self.storage.save_document(self._document, data)
         except Exception as e:
-            logging.errorFile operation failed: {e}}{e}")
-            json.dump(data, f, indent=2)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def get_suppflier_count(self):
         f"""Get total number of local suppliers""""
@@ -668,26 +672,13 @@ f                     f"name": "Pasta Sauce - Tomato & Basil","
         return monthly_savings
         
     def get_supplier_by_id(self, supplier_id):
-        """Get supplier details by ID""""
-        data = self._load_data()"
-        suppliers = data['suppliers']'
-        '
-        for supplier in suppliers:
-            if supplier['id'] == supplier_id:'
-                return supplier'
-                
-        return None
+        """Get supplier details by ID"""
+        return self.storage.get_row(self._document, 'suppliers', supplier_id)
     
     def get_supplier_by_name(self, supplier_name):
-        """Get supplier details by name""""
-        data = self._load_data()"
-        suppliers = data['suppliers']'
-        '
-        for supplier in suppliers:
-            if supplier['name'] == supplier_name:'
-                return supplier'
-                
-        return None
+        """Get supplier details by name"""
+        data = self._load_data()
+        return ensure_keyed(data, 'suppliers', secondary=('name',)).find_one('name', supplier_name)
     
     def get_supplier_products(self, supplier_id=None, supplier_name=None):
         """Get products for a specific supplier""""
@@ -788,36 +779,29 @@ f           ],
         return orders
     
     def get_order_by_id(self, order_id):
-        """Get order details by ID""""
-        data = self._load_data()"
-        orders = data['orders']'
-        '
-        for order in orders:
-            if order['id'] == order_id:'
-                return order'
-                
-        return None
+        """Get order details by ID"""
+        return self.storage.get_row(self._document, 'orders', order_id)
     
     def update_order_status(self, order_id, new_status, note=None):
-        """Update an order's status""""
-        data = self._load_data()"
+        """Update an order's status"""
+        data = self._load_data()
         
-        for i, order in enumerate(data['orders']):'
-            if order['id'] == order_id:
-                data['orders'][i]['status'] = new_status'
-                '
-                # Add status history entry
-                status_entry = {
-                    "status": new_status,"
-                    "timestamp": datetime.now().isoformat(),
-                    f"note": note if note feStatus updafted to {new_status}}tatus}"f"
-                }}"
-                
-                data['orders'][i]['status_history'].append(status_entry)'
-                self._save_data(data)'
-                return data['orders'][i]'
-                '
-        return None
+        order = ensure_keyed(data, 'orders').get(order_id)
+        if order is None:
+            return None
+        
+        order['status'] = new_status
+        
+        # Add status history entry
+        status_entry = {
+            "status": new_status,
+            "timestamp": datetime.now().isoformat(),
+            "note": note if note else f"Status updated to {new_status}"
+        }
+        
+        order['status_history'].append(status_entry)
+        self._save_data(data)
+        return order
     
     def send_order_notification(self, order_id, notification_type="sms"):"
         """Send order notification to supplier via SMS or email"""
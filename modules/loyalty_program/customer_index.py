@@ -0,0 +1,275 @@
+"""
+In-memory index over loyalty program customers
+
+Exact lookups by id, email and phone, prefix search and sorted views by points and last visit.
+"""
+
+import bisect
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Fields with a sorted view
+SORTED_FIELDS = ("points", "last_visit")
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(phone):
+    """
+    Reduce a phone number to its national digits
+
+    "0412-555-001", "0412 555 001" and "+61 412 555 001" all become
+    "0412555001".
+
+    Args:
+        phone (str): Phone number as entered
+
+    Returns:
+        str: Digits only, or "" if there are none
+    """
+    digits = _NON_DIGITS.sub("", phone or "")
+    if digits.startswith("61") and len(digits) == 11:
+        digits = "0" + digits[2:]
+    return digits
+
+
+def _view_value(field, value):
+    """Get the sortable value of a customer field (missing points sort as 0, dates as "")"""
+    return (value or 0) if field == "points" else (value or "")
+
+
+def _search_terms(customer):
+    """Get the prefix search terms of a customer"""
+    terms = set()
+    name = (customer.get("name") or "").lower().strip()
+    if name:
+        terms.add(name)
+        terms.update(name.split())
+    email = (customer.get("email") or "").lower().strip()
+    if email:
+        terms.add(email)
+    phone = normalize_phone(customer.get("phone"))
+    if phone:
+        terms.add(phone)
+    return terms
+
+
+class CustomerIndex:
+    """
+    Hash, prefix and sorted indexes over a customer list
+    """
+
+    def __init__(self, customers):
+        """
+        Build the hash maps (the prefix index and sorted views are built on first use)
+
+        Args:
+            customers (list): Customer records (shared, not copied)
+        """
+        self.source = customers
+        # Incremented on every add/update so derived results know when to recompute
+        self.version = 0
+        self._by_id = {}
+        self._by_email = {}
+        self._by_phone = {}
+        self._keys = {}  # customer id -> (email, phone) as indexed
+        self._terms = None  # sorted "term\0customer id" strings
+        self._views = {}  # field -> sorted (value, customer id)
+        self._view_values = {}  # field -> customer id -> value as indexed
+        for customer in customers:
+            self._index_keys(customer)
+
+    def is_current(self, customers):
+        """Check whether the index was built from (and kept up to date with) a customer list"""
+        return customers is self.source and len(customers) == len(self._by_id)
+
+    def _index_keys(self, customer):
+        """Add a customer to the hash maps"""
+        customer_id = customer["id"]
+        self._by_id[customer_id] = customer
+        email = (customer.get("email") or "").lower().strip()
+        if email:
+            self._by_email.setdefault(email, customer)
+        phone = normalize_phone(customer.get("phone"))
+        if phone:
+            self._by_phone.setdefault(phone, []).append(customer)
+        self._keys[customer_id] = (email, phone)
+
+    def _get_terms(self):
+        if self._terms is None:
+            self._terms = sorted(
+                f"{term}\0{customer_id}"
+                for customer_id, customer in self._by_id.items()
+                for term in _search_terms(customer)
+            )
+        return self._terms
+
+    def _get_view(self, field):
+        view = self._views.get(field)
+        if view is None:
+            values = {customer_id: _view_value(field, customer.get(field))
+                      for customer_id, customer in self._by_id.items()}
+            view = sorted((value, customer_id) for customer_id, value in values.items())
+            self._views[field] = view
+            self._view_values[field] = values
+        return view
+
+    # Maintenance
+
+    def add(self, customer):
+        """
+        Index a customer that was appended to the source list
+
+        Args:
+            customer (dict): New customer record
+        """
+        customer_id = customer["id"]
+        self.version += 1
+        self._index_keys(customer)
+        if self._terms is not None:
+            for term in _search_terms(customer):
+                bisect.insort(self._terms, f"{term}\0{customer_id}")
+        for field, view in self._views.items():
+            value = _view_value(field, customer.get(field))
+            bisect.insort(view, (value, customer_id))
+            self._view_values[field][customer_id] = value
+
+    def update(self, customer, old_values=None):
+        """
+        Refresh the entries of a customer after fields were changed in place
+
+        Args:
+            customer (dict): Changed customer record
+            old_values (dict, optional): Previous name/email/phone if any of
+                them changed (needed to move the customer in the prefix index)
+        """
+        customer_id = customer["id"]
+        if customer_id not in self._by_id:
+            self.add(customer)
+            return
+        self.version += 1
+
+        for field, view in self._views.items():
+            old = self._view_values[field][customer_id]
+            new = _view_value(field, customer.get(field))
+            if old != new:
+                position = bisect.bisect_left(view, (old, customer_id))
+                if position < len(view) and view[position] == (old, customer_id):
+                    del view[position]
+                    bisect.insort(view, (new, customer_id))
+                    self._view_values[field][customer_id] = new
+                else:
+                    del self._views[field]  # Out of step; rebuilt on next use
+                    return self.update(customer, old_values)
+
+        old_email, old_phone = self._keys[customer_id]
+        email = (customer.get("email") or "").lower().strip()
+        phone = normalize_phone(customer.get("phone"))
+        if email != old_email:
+            if self._by_email.get(old_email) is customer:
+                del self._by_email[old_email]
+            if email:
+                self._by_email.setdefault(email, customer)
+        if phone != old_phone:
+            matches = self._by_phone.get(old_phone, [])
+            if customer in matches:
+                matches.remove(customer)
+                if not matches:
+                    del self._by_phone[old_phone]
+            if phone:
+                self._by_phone.setdefault(phone, []).append(customer)
+        self._keys[customer_id] = (email, phone)
+
+        if old_values and self._terms is not None:
+            old_terms = _search_terms(dict(customer, **old_values))
+            terms = _search_terms(customer)
+            for term in old_terms - terms:
+                entry = f"{term}\0{customer_id}"
+                position = bisect.bisect_left(self._terms, entry)
+                if position < len(self._terms) and self._terms[position] == entry:
+                    del self._terms[position]
+            for term in terms - old_terms:
+                bisect.insort(self._terms, f"{term}\0{customer_id}")
+
+    # Lookups
+
+    def get(self, customer_id):
+        """Get a customer by ID (None if not found)"""
+        return self._by_id.get(customer_id)
+
+    def find_by_email(self, email):
+        """Get the customer with an email address (case-insensitive; None if not found)"""
+        return self._by_email.get((email or "").lower().strip())
+
+    def find_by_phone(self, phone):
+        """
+        Get the customers with a phone number, however it is formatted
+
+        Args:
+            phone (str): Phone number
+
+        Returns:
+            list: Matching customers
+        """
+        return list(self._by_phone.get(normalize_phone(phone), []))
+
+    def search(self, text, limit=None):
+        """
+        Get the customers with a name word, name, email or phone starting with text
+
+        Args:
+            text (str): Search text (phone numbers may be formatted)
+            limit (int, optional): Maximum number of customers
+
+        Returns:
+            list: Matching customers in search-term order
+        """
+        prefix = (text or "").lower().strip()
+        if not re.search(r"[a-z@]", prefix):
+            # Phone numbers are indexed as digits only
+            prefix = normalize_phone(prefix) or prefix
+        if not prefix:
+            return []
+
+        terms = self._get_terms()
+        seen = set()
+        matches = []
+        position = bisect.bisect_left(terms, prefix)
+        while position < len(terms) and terms[position].startswith(prefix):
+            customer_id = terms[position].rsplit("\0", 1)[1]
+            if customer_id not in seen:
+                seen.add(customer_id)
+                matches.append(self._by_id[customer_id])
+                if limit is not None and len(matches) >= limit:
+                    break
+            position += 1
+        return matches
+
+    def sorted_by(self, field, descending=True, limit=None):
+        """
+        Get customers ordered by a field with a sorted view
+
+        Args:
+            field (str): One of SORTED_FIELDS
+            descending (bool): Largest first
+            limit (int, optional): Maximum number of customers
+
+        Returns:
+            list: Customers
+        """
+        view = self._get_view(field)
+        count = len(view) if limit is None else min(limit, len(view))
+        positions = range(len(view) - 1, len(view) - 1 - count, -1) if descending else range(count)
+        result = []
+        for position in positions:
+            value, customer_id = view[position]
+            customer = self._by_id[customer_id]
+            if _view_value(field, customer.get(field)) != value:
+                # A record changed without update(); rebuild the view and start over
+                logger.debug(f"Rebuilding stale customer view on {field}")
+                del self._views[field]
+                return self.sorted_by(field, descending, limit)
+            result.append(customer)
+        return result
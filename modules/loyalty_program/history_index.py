@@ -0,0 +1,129 @@
+"""
+Date-ordered index over loyalty transaction and redemption history
+
+Date ranges and per-customer histories are found by bisection and returned in pages, newest first.
+"""
+
+import bisect
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def _history_key(record):
+    return (record["date"], record["id"])
+
+
+def _cursor_key(cursor):
+    """Get the (date, id) sort key encoded in a page cursor"""
+    date, _, record_id = cursor.partition("|")
+    return (date, record_id)
+
+
+def ensure_date_order(records):
+    """
+    Keep history records in (date, id) order
+
+    Args:
+        records (list): Records with "date" and "id" (sorted in place if needed)
+
+    Returns:
+        bool: True if the records were reordered
+    """
+    previous = None
+    for record in records:
+        key = _history_key(record)
+        if previous is not None and key < previous:
+            records.sort(key=_history_key)
+            return True
+        previous = key
+    return False
+
+
+class HistoryIndex:
+    """
+    Date and per-customer index over a transaction or redemption list
+    """
+
+    def __init__(self, records):
+        """
+        Put the records in date order (the per-customer index is built on first use)
+
+        Args:
+            records (list): History records (shared, not copied)
+        """
+        self.source = records
+        if ensure_date_order(records):
+            logger.info(f"Sorted {len(records)} history records by date")
+        self._size = len(records)
+        self._by_customer = None  # customer id -> records in date order
+
+    def is_current(self, records):
+        """Check whether the index was built from (and kept up to date with) a record list"""
+        return records is self.source and len(records) == self._size
+
+    def _get_customer_records(self, customer_id):
+        if self._by_customer is None:
+            self._by_customer = {}
+            for record in self.source:
+                self._by_customer.setdefault(record["customer_id"], []).append(record)
+        return self._by_customer.get(customer_id, [])
+
+    @staticmethod
+    def _insert(records, record):
+        if not records or _history_key(record) >= _history_key(records[-1]):
+            records.append(record)
+        else:
+            bisect.insort(records, record, key=_history_key)
+
+    def add(self, record):
+        """
+        Add a record to the source list and the per-customer index, in date order
+
+        Args:
+            record (dict): Transaction or redemption record
+        """
+        self._insert(self.source, record)
+        self._size += 1
+        if self._by_customer is not None:
+            self._insert(self._by_customer.setdefault(record["customer_id"], []), record)
+
+    def _bounds(self, customer_id, start_date, end_date):
+        """Get the record list to query and the positions of a date range in it"""
+        records = self._get_customer_records(customer_id) if customer_id else self.source
+        low = bisect.bisect_left(records, (start_date,), key=_history_key) if start_date else 0
+        # "~" sorts after any time of day, so the whole end day is included
+        high = bisect.bisect_left(records, (end_date + "~",), key=_history_key) if end_date else len(records)
+        return records, low, high
+
+    def page(self, customer_id=None, start_date=None, end_date=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """
+        Get one page of records, newest first
+
+        Args:
+            customer_id (str, optional): Only this customer's records
+            start_date (str, optional): Earliest day to include (YYYY-MM-DD)
+            end_date (str, optional): Latest day to include (YYYY-MM-DD)
+            limit (int, optional): Maximum number of records
+            cursor (str, optional): Cursor returned with the previous page
+
+        Returns:
+            tuple: (records, cursor of the next page or None if this was the last page)
+        """
+        records, low, high = self._bounds(customer_id, start_date, end_date)
+        if cursor:
+            high = min(high, bisect.bisect_left(records, _cursor_key(cursor), key=_history_key))
+
+        first = max(low, high - limit)
+        page = records[first:high][::-1]
+        next_cursor = None
+        if first > low and page:
+            next_cursor = f"{page[-1]['date']}|{page[-1]['id']}"
+        return page, next_cursor
+
+    def count(self, customer_id=None, start_date=None, end_date=None):
+        """Count the records in a date range (optionally for one customer)"""
+        _records, low, high = self._bounds(customer_id, start_date, end_date)
+        return max(0, high - low)
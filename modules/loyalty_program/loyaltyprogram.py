@@ -5,82 +5,103 @@ import uuid
 import random  # For demo data generation
 from datetime import timedelta
 import logging
+from utils.json_cache import load_json
+from utils.atomic_writer import save_json
+from modules.loyalty_program.customer_index import CustomerIndex, SORTED_FIELDS
+from modules.loyalty_program.history_index import HistoryIndex
+from modules.loyalty_program.segmentation import CustomerSegmentation
+from modules.loyalty_program.points_ledger import PointsLedger
+from utils.square_sync import get_sync_queue, loyalty_adjustment
+
+# Cached offline operations replayed per checkpoint by sync_offline_cache
+OFFLINE_SYNC_CHUNK = 500
 
 class LoyaltyProgram:
-    fff""""
-    Manages the store's loyalty program including:"
+    """
+    Manages the store's loyalty program including:
     - Customer points tracking
     - Event-based bonus points
     - Point redemption management
     - Integration with Square POS (simulated)
     - Offline point caching and syncing
-    """"
-    "
-    def __init__(self, data_file="data/loyalty_program.json"):"
+    """
+    
+    # Customer indexes shared by all instances, keyed by data file path
+    _customer_indexes = {}
+    
+    # Transaction/redemption history indexes, keyed by (data file path, list name)
+    _history_indexes = {}
+    
+    # Segmentations keyed by data file path: (customer index, index version, day, segmentation)
+    _segmentations = {}
+    
+    def __init__(self, data_file="data/loyalty_program.json"):
         """Initialize the loyalty program with data file path"""
         self.data_file = data_file
         self._ensure_data_file_exists()
         self.program_data = self._load_data()
+        self._ledger = None
+        # Replay point changes journaled since the last checkpoint before any balance is read
+        self._get_ledger()
         
     def _ensure_data_file_exists(self):
-        """Ensure the data file exists, create if it doesn't""""
+        """Ensure the data file exists, create if it doesn't"""
+        data_dir = os.path.dirname(self.data_file)
         try:
-            os.makedirs(os.path.dirname(self.data_file)
+            if data_dir:
+                os.makedirs(data_dir, exist_ok=True)
         except Exception as e:
-            logging.error(f"Error during file system operation: {str(e)}}")
+            logging.error(f"Error during file system operation: {str(e)}")
             raise
         if not os.path.exists(self.data_file):
             # Create a sample loyalty program data structure
+            customers = self._generate_sample_customers()
             sample_data = {
-                f"program_settings": {"
+                "program_settings": {
                     "enabled": True,
-                    "points_per_dollar": 1,"
+                    "points_per_dollar": 1,
                     "redemption_threshold": 50,
-                    "redemption_value": "Free item up to $5","
+                    "redemption_value": "Free item up to $5",
                     "double_points_events": [],
-                    "last_square_sync": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"
+                    "last_square_sync": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     "offline_mode": False
                 },
-                "customerffsf": self._generate_sample_customers(),"
-                "transactions": self._generate_sample_transactions(),
-                "redemptions": self._generate_sample_redemptions(),"
+                "customers": customers,
+                "transactions": self._generate_sample_transactions(customers),
+                "redemptions": self._generate_sample_redemptions(customers),
                 "offline_cache": []
             }
             try:
-try:
-                    with open(self.data_file, 'w')
-                except Exception as e:
-                    logging.error(f"Error during file operation: {str(e)}}}")
-                    raise as fifle:f'
+                with open(self.data_file, 'w') as file:
+                    json.dump(sample_data, file, indent=4)
             except Exception as e:
-                logging.error(fError: {str(e)}}}}")
-                logging.error(File operation failed: {e}}}}}}")
-                json.dump(sample_data, file, indentf=4)'
+                logging.error(f"File operation failed: {e}")
+                raise
     
     def _generate_sample_customers(self):
-f      f"""Generate sample customer data for demonstration""""
-        today = datetime.datetime.now()"
+        """Generate sample customer data for demonstration"""
+        today = datetime.datetime.now()
         
         # Sample customer names and emails
         sample_names = [
-            {"name": "John Smith", "email": "john.smith@example.com", "phone": "0412-555-001"},"
-    f      {f"name": "Sarah Johnson", "email": "sarah.j@example.com", "phone": "0412-555-002"},
-            {"name": "Michael Wong", "email": "michael.w@example.com", "phone": "0412-555-003"},"
-    f       {f"name": "Emma Davis", "email": "emma.d@example.com", "phone": "0412-555-004"},
-            {"name": "Robert Chen", "email": "robert.c@example.com", "phone": "0412-555-005"},"
-    f        {f"name": "Olivia Patel", "email": "olivia.p@example.com", "phone": "0412-555-006"},
-            {"name": "William Taylor", "email": "william.t@example.com", "phone": "0412-555-007"},"
-f         {f"name": "Sophia Martinez", "email": "sophia.m@example.com", "phone": "0412-555-008"},
-            {"name": "David Johnson", "email": "david.j@example.com", "phone": "0412-555-009"},"
-f          {f"name": "Isabella Brown", "email": "isabella.b@example.com", "phone": "0412-555-010"}
+            {"name": "John Smith", "email": "john.smith@example.com", "phone": "0412-555-001"},
+            {"name": "Sarah Johnson", "email": "sarah.j@example.com", "phone": "0412-555-002"},
+            {"name": "Michael Wong", "email": "michael.w@example.com", "phone": "0412-555-003"},
+            {"name": "Emma Davis", "email": "emma.d@example.com", "phone": "0412-555-004"},
+            {"name": "Robert Chen", "email": "robert.c@example.com", "phone": "0412-555-005"},
+            {"name": "Olivia Patel", "email": "olivia.p@example.com", "phone": "0412-555-006"},
+            {"name": "William Taylor", "email": "william.t@example.com", "phone": "0412-555-007"},
+            {"name": "Sophia Martinez", "email": "sophia.m@example.com", "phone": "0412-555-008"},
+            {"name": "David Johnson", "email": "david.j@example.com", "phone": "0412-555-009"},
+            {"name": "Isabella Brown", "email": "isabella.b@example.com", "phone": "0412-555-010"}
         ]
         
         customers = []
         
         # Generate customer records
         for i, customer_info in enumerate(sample_names):
-            # Generate different point levels with one "top" customer"
-            points = 0"
+            # Generate different point levels with one "top" customer
+            points = 0
             if i == 0:  # Top customer with 100 points
                 points = 100
             elif i < 3:  # A few customers with medium points
@@ -91,36 +112,36 @@ f          {f"name": "Isabella Brown", "email": "isabella.b@example.com", "phone
             signup_date = today - timedelta(days=random.randint(1, 90))
             last_visit = today - timedelta(days=random.randint(0, 30))
             
-            # Preferences - items they've purchfased'
-            preferences = []'
+            # Preferences - items they've purchased
+            preferences = []
             num_preferences = random.randint(1, 4)
-            potential_items = ["Water Bottles", "Coffee", "Sandwiches", "Fruit", "Snacks", "Bread", "Milk", "Eggs"]"
-            for _ in range(num_preferences):"
+            potential_items = ["Water Bottles", "Coffee", "Sandwiches", "Fruit", "Snacks", "Bread", "Milk", "Eggs"]
+            for _ in range(num_preferences):
                 item = random.choice(potential_items)
                 if item not in preferences:
                     preferences.append(item)
             
             customers.append({
-                "id": str(uuid.uuid4()),"
+                "id": str(uuid.uuid4()),
                 "name": customer_info["name"],
-                "email": customer_info["email"],"
+                "email": customer_info["email"],
                 "phone": customer_info["phone"],
-                "points": points,"
+                "points": points,
                 "lifetime_points": points + random.randint(10, 50),  # Some have been redeemed
-                "signup_date": signup_date.strftime("%Y-%m-%d"),"
+                "signup_date": signup_date.strftime("%Y-%m-%d"),
                 "last_visit": last_visit.strftime("%Y-%m-%d"),
-                "visit_count": random.randint(1, 20),"
+                "visit_count": random.randint(1, 20),
                 "total_spend": round(random.uniform(20, 500), 2),
-                "preferences": preferences,"
+                "preferences": preferences,
                 "opted_out": False,
-                "notes": """
-            })"
+                "notes": ""
+            })
         
         return customers
     
-    def _generate_sample_transactions(selff):
-        f"""Generate sample transaction data for demonstration""""
-        today = datetime.datetime.now()"
+    def _generate_sample_transactions(self, customers):
+        """Generate sample transaction data for demonstration"""
+        today = datetime.datetime.now()
         
         transactions = []
         
@@ -129,7 +150,7 @@ f          {f"name": "Isabella Brown", "email": "isabella.b@example.com", "phone
             transaction_date = today - timedelta(days=random.randint(0, 30))
             
             # Select a customer (more transactions for the most active customers)
-            customer_idx = random.choices(range(10), weights=[5, 4, 4, 2, 2, 1, 1, 1, 1, 1], k=1)[0]
+            customer = random.choices(customers, weights=[5, 4, 4, 2, 2, 1, 1, 1, 1, 1], k=1)[0]
             
             # Generate a transaction amount between $5 and $50
             amount = round(random.uniform(5, 50), 2)
@@ -143,23 +164,23 @@ f          {f"name": "Isabella Brown", "email": "isabella.b@example.com", "phone
                 points_earned *= 2
             
             transactions.append({
-                "id": str(uuid.uuid4()),"
-                "customer_id": self._generate_sample_customers()[customer_idx]["id"],
-                "customer_name": self._generate_sample_customers()[customer_idx]["name"],"
+                "id": str(uuid.uuid4()),
+                "customer_id": customer["id"],
+                "customer_name": customer["name"],
                 "date": transaction_date.strftime("%Y-%m-%d %H:%M:%S"),
-                "amount": amount,"
+                "amount": amount,
                 "points_earned": points_earned,
-                "double_points": is_double_points,"
+                "double_points": is_double_points,
                 "event_name": "Local Festival" if is_double_points else None,
-                "synced_to_square": True,"
-                "receipt_number": fREC-{random.randint(10000, 99999)}}}"
+                "synced_to_square": True,
+                "receipt_number": f"REC-{random.randint(10000, 99999)}"
             })
         
         return transactions
     
-    def _generate_sample_redemptions(seflf):
-        f"""Generate sample redemption data for demonstration""""
-        today = datetime.datetime.now()"
+    def _generate_sample_redemptions(self, customers):
+        """Generate sample redemption data for demonstration"""
+        today = datetime.datetime.now()
         
         redemptions = []
         
@@ -168,138 +189,192 @@ f          {f"name": "Isabella Brown", "email": "isabella.b@example.com", "phone
             redemption_date = today - timedelta(days=random.randint(0, 15))
             
             # Select a customer (more likely to be from the most active customers)
-            customer_idx = random.choices(range(10), weights=[5, 4, 4, 2, 2, 1, 1, 1, 1, 1], k=1)[0]
+            customer = random.choices(customers, weights=[5, 4, 4, 2, 2, 1, 1, 1, 1, 1], k=1)[0]
             
             # Points redeemed (typically 50)
             points_redeemed = 50
             
             # Item redeemed
-            potential_items = ["Water Bottle", "Coffee", "Sandwich", "Fruit Bowl", "Snack Pack"]"
-            item_redeemed = random.choice(potential_items)"
+            potential_items = ["Water Bottle", "Coffee", "Sandwich", "Fruit Bowl", "Snack Pack"]
+            item_redeemed = random.choice(potential_items)
             
             redemptions.append({
-                "id": str(uuid.uuid4()),"
-                "customer_id": self._generate_sample_customers()[customer_idx]["id"],
-                "customer_name": self._generate_sample_customers()[customer_idx]["name"],"
+                "id": str(uuid.uuid4()),
+                "customer_id": customer["id"],
+                "customer_name": customer["name"],
                 "date": redemption_date.strftime("%Y-%m-%d %H:%M:%S"),
-                "points_redeemed": points_redeemed,"
+                "points_redeemed": points_redeemed,
                 "item_redeemed": item_redeemed,
-                "staff_member": random.choice(["Alice", "Bob", "Charlie", "Dana"]),"
+                "staff_member": random.choice(["Alice", "Bob", "Charlie", "Dana"]),
                 "synced_to_square": True,
-                "transaction_id": TRX-{random.randint(10000, 99999)}})}try:
-                with open(self.data_ffile, 'r')
-            except Exception as e:
-                logging.errorError during file operatiofn: {str(e)}}e)}")
-                raiseredemptions
+                "transaction_id": f"TRX-{random.randint(10000, 99999)}"
+            })
+        
+        return redemptions
     
     def _load_data(self):
-        f"""Load loyalty program data from file"try:
-                with open(self.dataf_file, 'w')
-            except Exception as e:
-                logging.erroError during file operation: {str(e)}}(e)}")
-                rfaise.data_ffile, f'r') as file:"
+        """Load loyalty program data from file (parsed once per file change)"""
+        try:
+            return load_json(self.data_file)
         except Exception as e:
-            logging.errorFile operation failed: {e}}{e}")
-            return json.load(file)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _save_data(self):
-        """Save loyalty program data to file""""
+        """Save loyalty program data to file (atomic; bursts of saves are coalesced)"""
         try:
-            with open(sfelf.dataf_file, 'wf') as file:"
+            save_json(self.data_file, self.program_data)
         except Exception as e:
-            logging.erroFile operation failed: {e}} {e}")
-            json.dump(self.program_data, file, indent=4)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def is_enabled(self):
-        """Check if the loyalty program is enabled""""
+        """Check if the loyalty program is enabled"""
         return self.program_data["program_settings"]["enabled"]
     
     def toggle_program(self, enabled):
-        """Enable or disable the loyalty program""""
+        """Enable or disable the loyalty program"""
         self.program_data["program_settings"]["enabled"] = enabled
         self._save_data()
         return enabled
     
     def update_settings(self, settings_dict):
-        """"
-        Update loyalty program settings"
+        """
+        Update loyalty program settings
         
         Args:
             settings_dict (dict): Dictionary of settings to update
             
         Returns:
             dict: Updated settings
-        """"
-        for key, value in settings_dict.items():"
-            if key in self.program_data["program_settings"]:"
+        """
+        for key, value in settings_dict.items():
+            if key in self.program_data["program_settings"]:
                 self.program_data["program_settings"][key] = value
         
         self._save_data()
-        return self.program_data["program_settings"]"
-    "
+        return self.program_data["program_settings"]
+    
     def get_settings(self):
-        """Get current loyalty program settings""""
+        """Get current loyalty program settings"""
         return self.program_data["program_settings"]
     
-    def get_customers(self, search_term=None, sort_by="points", descending=True):"
+    def _get_customer_index(self):
+        """Get the customer index, rebuilding it if the customer list was replaced or grew behind its back"""
+        customers = self.program_data["customers"]
+        key = os.path.abspath(self.data_file)
+        index = LoyaltyProgram._customer_indexes.get(key)
+        if index is None or not index.is_current(customers):
+            index = CustomerIndex(customers)
+            LoyaltyProgram._customer_indexes[key] = index
+        return index
+    
+    def _get_history(self, name):
+        """Get the date index of "transactions" or "redemptions", rebuilding it if the list changed behind its back"""
+        records = self.program_data.setdefault(name, [])
+        key = (os.path.abspath(self.data_file), name)
+        index = LoyaltyProgram._history_indexes.get(key)
+        if index is None or not index.is_current(records):
+            index = HistoryIndex(records)
+            LoyaltyProgram._history_indexes[key] = index
+        return index
+    
+    def _get_ledger(self):
+        """Get the points ledger (created, and journaled point changes replayed, on initialization)"""
+        if self._ledger is None:
+            self._ledger = PointsLedger(
+                self.program_data,
+                self.data_file,
+                os.path.splitext(self.data_file)[0] + ".points.journal",
+                self._get_customer_index,
+                history=self._get_history
+            )
+        return self._ledger
+    
+    def checkpoint_points(self):
+        """
+        Write journaled point changes to the data file now (e.g. at closing time)
+        
+        Returns:
+            int: Number of ledger rows written to the data file
+        """
+        return self._get_ledger().checkpoint()
+    
+    def get_customers(self, search_term=None, sort_by="points", descending=True, limit=None):
         """
         Get loyalty program customers with optional filtering
         
+        Searching matches the start of a name word, the full name, the email
+        or the phone number (formatting ignored) through the customer index.
+        
         Args:
             search_term (str, optional): Search by name, email, or phone
-            sort_by (str, optional): Field to sort by (e.g., "points", "last_visit")"
-            descending (bool, optional): Sort in descending order"
+            sort_by (str, optional): Field to sort by (e.g., "points", "last_visit")
+            descending (bool, optional): Sort in descending order
+            limit (int, optional): Maximum number of customers
             
         Returns:
             list: Filtered and sorted customer list
-        """"
-        customers = self.program_data["customers"]
+        """
+        index = self._get_customer_index()
         
-        # Apply search filter
-        if search_term:
-            search_term = search_term.lower()
-            customers = [c for c in customers if 
-                        search_term in c["name"].lower() or"
-                        search_term in c["email"].lower() or
-                        search_term in c["phone"].lower()]"
-        "
-        # Apply sorting
-        if sort_by in customers[0] if customers else {{}:
-            customers = sorted(customers, key=lambda c: c[sort_by], reverse=descending)
+        if not search_term and sort_by in SORTED_FIELDS:
+            return index.sorted_by(sort_by, descending=descending, limit=limit)
         
-        return customers
+        customers = index.search(search_term) if search_term else list(index.source)
+        
+        # Apply sorting (search results are small; fields without a sorted view are rare)
+        if customers and sort_by in customers[0]:
+            customers.sort(key=lambda c: c[sort_by], reverse=descending)
+        
+        return customers if limit is None else customers[:limit]
     
     def get_top_customers(self, limit=5):
-        """"
-        Get top customers by points"
+        """
+        Get top customers by points
         
         Args:
             limit (int): Number of top customers to return
             
         Returns:
             list: Top customers
-        """"
-        customers = self.get_customers(sort_by="points", descending=True)
-        return customers[:limit]
+        """
+        return self.get_customers(sort_by="points", descending=True, limit=limit)
     
     def get_customer(self, customer_id):
-        """"
-        Get customer by ID"
+        """
+        Get customer by ID
         
         Args:
             customer_id (str): Customer ID
             
         Returns:
             dict: Customer data or None if not found
-        """"
-        for customer in self.program_data["customers"]:
-            if customer["id"] == customer_id:"
-                return customer"
+        """
+        return self._get_customer_index().get(customer_id)
+    
+    def find_customer(self, phone=None, email=None):
+        """
+        Look up a customer by exact phone number or email (e.g. at the till)
+        
+        Args:
+            phone (str, optional): Phone number in any format ("0412 555 001", "+61 412 555 001")
+            email (str, optional): Email address (case-insensitive)
+            
+        Returns:
+            dict: Customer data or None if not found
+        """
+        index = self._get_customer_index()
+        if phone:
+            matches = index.find_by_phone(phone)
+            return matches[0] if matches else None
+        if email:
+            return index.find_by_email(email)
         return None
     
     def add_customer(self, name, email, phone):
-        """"
-        Add a new customer to the loyalty program"
+        """
+        Add a new customer to the loyalty program
         
         Args:
             name (str): Customer name
@@ -308,32 +383,34 @@ f          {f"name": "Isabella Brown", "email": "isabella.b@example.com", "phone
             
         Returns:
             dict: New customer record
-        """"
-        today = datetime.datetime.now()"
+        """
+        today = datetime.datetime.now()
         
-        new_customer = {{
-            "id": str(uuid.uuid4()),"
+        new_customer = {
+            "id": str(uuid.uuid4()),
             "name": name,
-            "email": email,"
+            "email": email,
             "phone": phone,
-            "points": 0,"
+            "points": 0,
             "lifetime_points": 0,
-            "signup_date": today.strftime("%Y-%m-%d"),"
+            "signup_date": today.strftime("%Y-%m-%d"),
             "last_visit": today.strftime("%Y-%m-%d"),
-            "visit_count": 1,"
+            "visit_count": 1,
             "total_spend": 0,
-            "preferences": [],"
+            "preferences": [],
             "opted_out": False,
-            "notes": """
-        }"
+            "notes": ""
+        }
         
-        self.program_data["customers"].append(new_customer)"
-        self._save_data()"
+        index = self._get_customer_index()
+        self.program_data["customers"].append(new_customer)
+        index.add(new_customer)
+        self._save_data()
         return new_customer
     
     def update_customer(self, customer_id, updates):
-        """"
-        Update customer information"
+        """
+        Update customer information
         
         Args:
             customer_id (str): ID of the customer to update
@@ -341,21 +418,21 @@ f          {f"name": "Isabella Brown", "email": "isabella.b@example.com", "phone
             
         Returns:
             dict: Updated customer or None if not found
-        """"
-        for i, customer in enumerate(self.program_data["customers"]):
-            if customer["id"] == customer_id:"
-                for key, value in updates.items():"
-                    if key in customer:
-                        self.program_data["customers"][i][key] = value"
-                "
-                self._save_data()
-                return self.program_data["customers"][i]"
-        "
-        return None
+        """
+        customer = self.get_customer(customer_id)
+        if customer is None:
+            return None
+        
+        updates = {key: value for key, value in updates.items() if key in customer and key != "id"}
+        old_values = {key: customer[key] for key in ("name", "email", "phone") if key in updates}
+        customer.update(updates)
+        self._get_customer_index().update(customer, old_values)
+        self._save_data()
+        return customer
     
     def record_transaction(self, customer_id, amount, double_points=False, event_name=None, offline_mode=False):
-        """"
-        Record a purchase transaction and award points"
+        """
+        Record a purchase transaction and award points
         
         Args:
             customer_id (str): Customer ID
@@ -366,65 +443,60 @@ f          {f"name": "Isabella Brown", "email": "isabella.b@example.com", "phone
             
         Returns:
             dict: Transaction record
-        """"
-        # Verify program is enabled"
+        """
+        # Verify program is enabled
         if not self.is_enabled():
-            return {{"error": "Loyalty program is disabled"}"
-        "
+            return {"error": "Loyalty program is disabled"}
+        
         # Find the customer
         customer = self.get_customer(customer_id)
         if not customer:
-            return {{"error": "Customer not found"}"
-        "
+            return {"error": "Customer not found"}
+        
         today = datetime.datetime.now()
         
         # Calculate points (default 1 point per dollar)
-        points_per_dollar = self.program_data["program_settings"]["points_per_dollar"]"
-        points_earned = int(amount * points_per_dollar)"
+        points_per_dollar = self.program_data["program_settings"]["points_per_dollar"]
+        points_earned = int(amount * points_per_dollar)
         
-        # Apply double points if specified or if therefheref's an afctive eventf'
-        if double_points or (event_name and event_name in self.program_data["program_settings"]["double_points_events"]):'
+        # Apply double points if specified or if there's an active event
+        if double_points or (event_name and event_name in self.program_data["program_settings"]["double_points_events"]
+                             and self._is_event_target(event_name, customer_id)):
             points_earned *= 2
             double_points = True
         
         # Create transaction record
         transaction = {
-            "id": str(uuid.uuid4()),"
+            "id": str(uuid.uuid4()),
             "customer_id": customer_id,
-            "customer_name": customer["name"],"
+            "customer_name": customer["name"],
             "date": today.strftime("%Y-%m-%d %H:%M:%S"),
-            "amount": amount,"
+            "amount": amount,
             "points_earned": points_earned,
-            "double_points": double_points,"
+            "double_points": double_points,
             "event_name": event_name,
-            "synced_to_square": not offline_mode,"
-            "receipt_numberREC-{random.randint(10000, 99999)}}999)}"
+            "synced_to_square": not offline_mode,
+            "receipt_number": f"REC-{random.randint(10000, 99999)}"
         }
         
         # Store transaction
         if offline_mode:
-            self.program_data["offline_cache"].append(transaction)"
-        else:"
-            self.program_data["transactions"].append(transaction)"
-            "
-            # Update customer data
-            for i, c in enumerate(self.program_data["customers"]):"
-                if c["id"] == customer_id:
-                    self.program_data["customers"][i]["points"] += points_earned"
-                    self.program_data["customers"][i]["lifetime_points"] += points_earned
-                    self.program_data["customers"][i]["visit_count"] += 1"
-                    self.program_data["customers"][i]["total_spend"] += amount
-                    self.program_data["customers"][i]["last_visit"] = today.strftime("%Y-%m-%d")"
-            "
+            self.program_data["offline_cache"].append(transaction)
+            self._save_data()
+        else:
+            # Apply the points and append one ledger row (no full file rewrite)
+            self._get_ledger().post([
+                PointsLedger.earn_row(customer_id, points_earned, amount, transaction, today.strftime("%Y-%m-%d"))
+            ])
+            
             # Simulate updating Square POS
             self._update_square_pos_transaction(transaction)
         
-        self._save_data()
         return transaction
     
     def redeem_points(self, customer_id, points=None, item=None, staff_member=None, offline_mode=False):
-        """"
-        Redeem customer points for rewards"
+        """
+        Redeem customer points for rewards
         
         Args:
             customer_id (str): Customer ID
@@ -435,259 +507,363 @@ f          {f"name": "Isabella Brown", "email": "isabella.b@example.com", "phone
             
         Returns:
             dict: Redemption record
-        """"
-        # Verify program is enabled"
+        """
+        # Verify program is enabled
         if not self.is_enabled():
-            return {"error": "Loyalty program is disabled"}"
-        "
+            return {"error": "Loyalty program is disabled"}
+        
         # Find the customer
         customer = self.get_customer(customer_id)
         if not customer:
-            return {"error": "Customer not found"}"
-        "
+            return {"error": "Customer not found"}
+        
         # Default to standard redemption threshold
         if points is None:
-            points = self.program_data["program_settings"]["redemption_threshold"]"
-        "
+            points = self.program_data["program_settings"]["redemption_threshold"]
+        
         # Verify customer has enough points
-        if customer["points"] < points:"
-            return {"erroInsufficient points. Customer hafs {customer[f'pointsf']}} points, needs {points}}.ints}."}
+        if customer["points"] < points:
+            return {"error": f"Insufficient points. Customer has {customer['points']} points, needs {points}."}
         
         today = datetime.datetime.now()
         
         # Create redemption record
         redemption = {
-            "id": str(uuid.uuid4()),"
+            "id": str(uuid.uuid4()),
             "customer_id": customer_id,
-            "customer_name": customer["name"],"
+            "customer_name": customer["name"],
             "date": today.strftime("%Y-%m-%d %H:%M:%S"),
-            "points_redeemed": points,"
+            "points_redeemed": points,
             "item_redeemed": item or self.program_data["program_settings"]["redemption_value"],
-            "staff_member": staff_member or "Unknown","
+            "staff_member": staff_member or "Unknown",
             "synced_to_square": not offline_mode,
-            "transactionTRX-{random.randint(10000, 99999)}} 99999)}""
-        }"
+            "transaction_id": f"TRX-{random.randint(10000, 99999)}"
+        }
         
         # Store redemption
         if offline_mode:
-            self.program_data["offline_cache"].append("
+            self.program_data["offline_cache"].append(
                 {"type": "redemption", "data": redemption}
             )
+            self._save_data()
         else:
-            self.program_data["redemptions"].append(redemption)"
-            "
-            # Update customer points
-            for i, c in enumerate(self.program_data["customers"]):"
-                if c["id"] == customer_id:
-                    self.program_data["customers"][i]["points"] -= points"
-            "
+            # Deduct the points with one ledger row (no full file rewrite)
+            self._get_ledger().post([PointsLedger.redeem_row(customer_id, points, redemption)])
+            
             # Simulate updating Square POS
             self._update_square_pos_redemption(redemption)
         
-        self._save_data()
         return redemption
     
-    def sync_offline_cache(self):
-        """"
-        Sync offline cached transactions and redemptions with Square"
+    def _offline_row(self, cached_item):
+        """
+        Build the ledger row for an operation from the offline cache
+        
+        Args:
+            cached_item (dict): Cached transaction, or {"type": "redemption", "data": redemption}
+            
+        Returns:
+            dict: Ledger row (its "record" is the cached transaction/redemption)
+        """
+        if cached_item.get("type") == "redemption":
+            redemption = cached_item["data"]
+            return PointsLedger.redeem_row(redemption["customer_id"], redemption["points_redeemed"], redemption)
+        return PointsLedger.earn_row(cached_item["customer_id"], cached_item["points_earned"],
+                                     cached_item["amount"], cached_item, cached_item["date"].split()[0])
+    
+    def sync_offline_cache(self, chunk_size=OFFLINE_SYNC_CHUNK):
+        """
+        Replay offline cached transactions and redemptions and sync them with Square
+        
+        The cache is replayed in chunks. Each chunk applies one net change
+        per customer, queues the Square point adjustments and then commits
+        its progress: the replayed operations leave the cache and the
+        ledger is checkpointed. An operation is identified by its
+        transaction/redemption ID, so operations already in the history
+        (e.g. replayed before a crash) are skipped, and their Square
+        adjustments reuse the same idempotency keys. Operations that cannot
+        be replayed (unknown customer, malformed entry) are logged, counted
+        as errors and dropped.
         
+        Args:
+            chunk_size (int, optional): Cached operations committed per checkpoint
+            
         Returns:
             dict: Sync results
-        """"
+        """
         if not self.program_data["offline_cache"]:
-            return {"synced": 0, "errors": 0}"
-        "
+            return {"synced": 0, "skipped": 0, "errors": 0}
+        
+        ledger = self._get_ledger()
+        index = self._get_customer_index()
+        recorded = ledger.recorded_ids()
         synced = 0
+        skipped = 0
         errors = 0
         
-        # Process each cached item
-        for cached_item in self.program_data["offline_cache"]:"
-            try:"
-                if "type" in cached_item and cached_item["type"] == "redemption":"
-                    # Handle redemption"
-                    redemption_data = cached_item["data"]"
-                    customer_id = redemption_data["customer_id"]
-                    points = redemption_data["points_redeemed"]"
-                    "
-                    # Update customer points
-                    for i, c in enumerate(self.program_data["customers"]):"
-                        if c["id"] == customer_id:
-                            self.program_data["customers"][i]["points"] -= points"
-                    "
-                    # Add to redemptions
-                    redemption_data["synced_to_square"] = True"
-                    self.program_data["redemptions"].append(redemption_data)
-                    
-                    # Simulate updating Square POS
-                    self._update_square_pos_redemption(redemption_data)
-                    
-                else:
-                    # Handle transaction
-                    transaction = cached_item
-                    customer_id = transaction["customer_id"]"
-                    points_earned = transaction["points_earned"]
-                    amount = transaction["amount"]"
-                    "
-                    # Update customer data
-                    for i, c in enumerate(self.program_data["customers"]):"
-                        if c["id"] == customer_id:
-                            self.program_data["customers"][i]["points"] += points_earned"
-                            self.program_data["customers"][i]["lifetime_points"] += points_earned
-                            self.program_data["customers"][i]["total_spend"] += amount"
-                    "
-                    # Add to transactions
-                    transaction["synced_to_square"] = True"
-                    self.program_data["transactions"].append(transaction)
-                    
-                    # Simulate updating Square POS
-                    self._update_square_pos_transaction(transaction)
-                
-                synced += 1
-                
-            except Exception as e:
-                logging.error(f"Error: {str(e)}")
-            Error syncing item: {e}}item: {e}")"
-                errors += 1"
+        while self.program_data["offline_cache"]:
+            chunk = self.program_data["offline_cache"][:chunk_size]
+            rows = []
+            for cached_item in chunk:
+                try:
+                    row = self._offline_row(cached_item)
+                except (KeyError, TypeError, AttributeError) as e:
+                    logging.error(f"Error syncing cached item: {e}")
+                    errors += 1
+                    continue
+                if row["record"]["id"] in recorded:
+                    skipped += 1
+                    continue
+                if index.get(row["customer_id"]) is None:
+                    logging.error(f"Error syncing cached item: customer {row['customer_id']} not found")
+                    errors += 1
+                    continue
+                recorded.add(row["record"]["id"])
+                row["record"]["synced_to_square"] = True
+                rows.append(row)
+            
+            # Square first: a crash after this point replays the same idempotency keys
+            self._queue_square_points([row["record"] for row in rows])
+            ledger.post(PointsLedger.net_rows(rows))
+            synced += len(rows)
+            
+            # Commit progress
+            self.program_data["offline_cache"] = self.program_data["offline_cache"][len(chunk):]
+            if not ledger.checkpoint():
+                self._save_data()
         
-        # Clear the offline cache
-        self.program_data["offline_cache"] = []"
-        "
         # Update last sync time
-        self.program_data["program_settings"]["last_square_sync"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")"
-        "
+        self.program_data["program_settings"]["last_square_sync"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self._save_data()
         
         return {
-            "synced": synced,"
+            "synced": synced,
+            "skipped": skipped,
             "errors": errors,
-            "last_sync": self.program_data["program_settings"]["last_square_sync"]"
-        }"
+            "last_sync": self.program_data["program_settings"]["last_square_sync"]
+        }
     
-    def get_transactions(self, customer_id=None, start_date=None, end_date=None, limit=50):
-        """"
-        Get transaction history with optional filtering"
+    def get_transactions(self, customer_id=None, start_date=None, end_date=None, limit=50, cursor=None):
+        """
+        Get transaction history with optional filtering, newest first
         
         Args:
             customer_id (str, optional): Filter by customer
             start_date (str, optional): Start date (YYYY-MM-DD)
             end_date (str, optional): End date (YYYY-MM-DD)
             limit (int, optional): Maximum number of transactions to return
+            cursor (str, optional): Continue after the page that returned this cursor
             
         Returns:
             list: Filtered transactions
-        """"
-        transactions = self.program_data["transactions"]
-        
-        # Apply customer filter
-        if customer_id:
-            transactions = [t for t in transactions if t["customer_id"] == customer_id]"
-        "
-        # Apply date filters
-        if start_date:
-            start = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()"
-            transactions = [t for t in transactions if "
-                        datetime.datetime.strptime(t["date"].split()[0], "%Y-%m-%d").date() >= start]"
-        "
-        if end_date:
-            end = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()"
-            transactions = [t for t in transactions if "
-                        datetime.datetime.strptime(t["date"].split()[0], "%Y-%m-%d").date() <= end]"
-        "
-        # Sort by date (newest first)
-        transactions = sorted(transactions, key=lambda t: t["date"], reverse=True)"
-        "
-        # Apply limit
-        return transactions[:limit]
-    
-    def get_redemptions(self, customer_id=None, start_date=None, end_date=None, limit=50):
-        """"
-        Get redemption history with optional filtering"
+        """
+        return self.get_transactions_page(customer_id, start_date, end_date, limit, cursor)["transactions"]
+    
+    def get_transactions_page(self, customer_id=None, start_date=None, end_date=None, limit=50, cursor=None):
+        """
+        Get one page of transaction history, newest first
+        
+        Args:
+            customer_id (str, optional): Filter by customer
+            start_date (str, optional): Start date (YYYY-MM-DD)
+            end_date (str, optional): End date (YYYY-MM-DD)
+            limit (int, optional): Maximum number of transactions to return
+            cursor (str, optional): "next_cursor" of the previous page
+            
+        Returns:
+            dict: "transactions", "total" in the date range and "next_cursor" (None on the last page)
+        """
+        history = self._get_history("transactions")
+        transactions, next_cursor = history.page(customer_id, start_date, end_date, limit, cursor)
+        return {
+            "transactions": transactions,
+            "total": history.count(customer_id, start_date, end_date),
+            "next_cursor": next_cursor
+        }
+    
+    def get_redemptions(self, customer_id=None, start_date=None, end_date=None, limit=50, cursor=None):
+        """
+        Get redemption history with optional filtering, newest first
         
         Args:
             customer_id (str, optional): Filter by customer
             start_date (str, optional): Start date (YYYY-MM-DD)
             end_date (str, optional): End date (YYYY-MM-DD)
             limit (int, optional): Maximum number of redemptions to return
+            cursor (str, optional): Continue after the page that returned this cursor
             
         Returns:
             list: Filtered redemptions
-        """"
-        redemptions = self.program_data["redemptions"]
-        
-        # Apply customer filter
-        if customer_id:
-            redemptions = [r for r in redemptions if r["customer_id"] == customer_id]"
-        "
-        # Apply date filters
-        if start_date:
-            start = datetime.datetime.strptime(start_date, "%Y-%m-%d").date()"
-            redemptions = [r for r in redemptions if "
-                        datetime.datetime.strptime(r["date"].split()[0], "%Y-%m-%d").date() >= start]"
-        "
-        if end_date:
-            end = datetime.datetime.strptime(end_date, "%Y-%m-%d").date()"
-            redemptions = [r for r in redemptions if "
-                        datetime.datetime.strptime(r["date"].split()[0], "%Y-%m-%d").date() <= end]"
-        "
-        # Sort by date (newest first)
-        redemptions = sorted(redemptions, key=lambda r: r["date"], reverse=True)"
-        "
-        # Apply limit
-        return redemptions[:limit]
+        """
+        return self.get_redemptions_page(customer_id, start_date, end_date, limit, cursor)["redemptions"]
+    
+    def get_redemptions_page(self, customer_id=None, start_date=None, end_date=None, limit=50, cursor=None):
+        """
+        Get one page of redemption history, newest first
+        
+        Args:
+            customer_id (str, optional): Filter by customer
+            start_date (str, optional): Start date (YYYY-MM-DD)
+            end_date (str, optional): End date (YYYY-MM-DD)
+            limit (int, optional): Maximum number of redemptions to return
+            cursor (str, optional): "next_cursor" of the previous page
+            
+        Returns:
+            dict: "redemptions", "total" in the date range and "next_cursor" (None on the last page)
+        """
+        history = self._get_history("redemptions")
+        redemptions, next_cursor = history.page(customer_id, start_date, end_date, limit, cursor)
+        return {
+            "redemptions": redemptions,
+            "total": history.count(customer_id, start_date, end_date),
+            "next_cursor": next_cursor
+        }
     
     def opt_out_customer(self, customer_id):
-        """"
-        Process customer opt-out request"
+        """
+        Process customer opt-out request
         
         Args:
             customer_id (str): Customer ID
             
         Returns:
             dict: Result of the opt-out operation
-        """"
-        for i, customer in enumerate(self.program_data["customers"]):
-            if customer["id"] == customer_id:"
-                self.program_data["customers"][i]["opted_out"] = True
-                self.program_data["customers"][i]["not Opted out on {datetime.datetime.now(f).strftime('f%Y-%m-%df')}}}.-%m-%d')}.""
-                "
-                # Schedule data deletion (in a real system, this would set up a job to delete after 24 hours)
-            Scheduled deletion for customer {customer_id}} in 24 hoursin 24 hours")"
-                "
-                self._save_data()
-                return {"success": True, "message": "Customer opted out and scheduled for deletion within 24 hours"}"
-        "
-        return {"success": False, "message": "Customer not found"}"
-    "
+        """
+        customer = self.get_customer(customer_id)
+        if not customer:
+            return {"success": False, "message": "Customer not found"}
+        
+        customer["opted_out"] = True
+        customer["notes"] = (customer.get("notes") or "") + f"\nOpted out on {datetime.datetime.now().strftime('%Y-%m-%d')}."
+        self._get_customer_index().update(customer)
+        
+        # Schedule data deletion (in a real system, this would set up a job to delete after 24 hours)
+        logging.info(f"Scheduled deletion for customer {customer_id} in 24 hours")
+        
+        self._save_data()
+        return {"success": True, "message": "Customer opted out and scheduled for deletion within 24 hours"}
+    
+    def segment_customers(self, today=None):
+        """
+        Get the RFM segmentation of the members (cached until a customer changes or the day changes)
+        
+        Args:
+            today (date, optional): Reference date, defaults to today
+            
+        Returns:
+            CustomerSegmentation: Scores, segments and churn risk per member
+        """
+        today = today or datetime.date.today()
+        index = self._get_customer_index()
+        key = os.path.abspath(self.data_file)
+        cached = LoyaltyProgram._segmentations.get(key)
+        if cached is None or cached[0] is not index or cached[1] != index.version or cached[2] != today:
+            cached = (index, index.version, today, CustomerSegmentation(self.program_data["customers"], today))
+            LoyaltyProgram._segmentations[key] = cached
+        return cached[3]
+    
+    def get_segment_summary(self):
+        """
+        Get the number of members, average spend, visits and churn risk per segment
+        
+        Returns:
+            dict: Summary per segment
+        """
+        return self.segment_customers().summary()
+    
+    def get_customer_segment(self, customer_id):
+        """
+        Get the RFM scores, segment and churn risk of a customer
+        
+        Args:
+            customer_id (str): Customer ID
+            
+        Returns:
+            dict: Segment details, or None if the customer is unknown or opted out
+        """
+        return self.segment_customers().get(customer_id)
+    
+    def target_double_points(self, event_name, segments=None, min_churn_risk=None):
+        """
+        Run a double points event for the members of some segments only
+        
+        Args:
+            event_name (str): Event name (added to the double points events)
+            segments (list, optional): Segments to target (all members if not given)
+            min_churn_risk (float, optional): Only target members at least this likely to churn
+            
+        Returns:
+            dict: Event name, number of members targeted and the count per segment
+        """
+        segmentation = self.segment_customers()
+        customer_ids = segmentation.select(segments, min_churn_risk)
+        customer_segments = segmentation.frame.loc[customer_ids, "segment"].tolist()
+        
+        settings = self.program_data["program_settings"]
+        if event_name not in settings["double_points_events"]:
+            settings["double_points_events"].append(event_name)
+        settings.setdefault("double_points_targets", {})[event_name] = dict(zip(customer_ids, customer_segments))
+        self._save_data()
+        
+        by_segment = {}
+        for segment in customer_segments:
+            by_segment[segment] = by_segment.get(segment, 0) + 1
+        return {"event_name": event_name, "targeted": len(customer_ids), "by_segment": by_segment}
+    
+    def _is_event_target(self, event_name, customer_id):
+        """Check whether a customer earns double points in an event (events without targets apply to everyone)"""
+        targets = self.program_data["program_settings"].get("double_points_targets", {}).get(event_name)
+        return targets is None or customer_id in targets
+    
+    def _queue_square_points(self, records):
+        """
+        Queue the Square point adjustments for transactions and redemptions
+        
+        Each adjustment is keyed and made idempotent by its record ID, so
+        queuing a record again never adjusts the points twice.
+        
+        Args:
+            records (list): Transaction and/or redemption records
+        """
+        index = self._get_customer_index()
+        updates = []
+        for record in records:
+            if "points_redeemed" in record:
+                points = -record["points_redeemed"]
+                reason = f"Redeemed: {record['item_redeemed']}"
+            else:
+                points = record["points_earned"]
+                reason = f"Purchase {record.get('receipt_number', record['id'])}"
+            customer = index.get(record["customer_id"]) or {}
+            # Customers linked to Square carry their loyalty account ID; otherwise the customer ID stands in
+            account_id = customer.get("square_loyalty_account_id", record["customer_id"])
+            idempotency_key = str(uuid.uuid5(uuid.NAMESPACE_URL, f"loyalty:{record['id']}"))
+            updates.append(("loyalty", f"loyalty:{record['id']}",
+                            loyalty_adjustment(account_id, points, reason, idempotency_key)))
+        get_sync_queue().enqueue_many(updates)
+    
     def _update_square_pos_transaction(self, transaction):
-        """"
-        Simulate updating the Square POS with transaction data"
+        """
+        Queue the Square POS point adjustment for a transaction
         
         Args:
             transaction (dict): Transaction data
             
         Returns:
-            bool: Whether update was successful
-        """"
-        # In a real implementation, this would make API calls to Square"
-    Square POS would be updated with transacftion {transafction['idf']}}}ction['id']}")'
-Points earned: {transaction['points_fearned']}}nts_earned']}f")
-        if transaction["double_points"]:"
-    Double points applied for event: {transaction['fevent_name']}}'event_name']}")
-        
+            bool: Whether the update was queued
+        """
+        self._queue_square_points([transaction])
         return True
     
-    def _update_square_pos_redemption(selff, redemption):
-        f""""
-        Simulate updating the Square POS with redemption data"
+    def _update_square_pos_redemption(self, redemption):
+        """
+        Queue the Square POS point adjustment for a redemption
         
         Args:
             redemption (dict): Redemption data
             
         Returns:
-            bool: Whether update was successful
-        """"
-        # In a real implementation, this would make API calls to Square"
-Square POS would be updated with redemption {redemption[f'id']}}demptiofn['id']}")f'
-Points redeemed: {redemption['points_redfeemed']}}ints_fredeemed']}f")Item redeemed: {redemption['item_redeemed']}}}'item_redeemed']}}")'
-        '
-        return True'"
\ No newline at end of file
+            bool: Whether the update was queued
+        """
+        self._queue_square_points([redemption])
+        return True
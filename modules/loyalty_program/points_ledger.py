@@ -0,0 +1,224 @@
+"""
+Append-only points ledger for the loyalty program
+
+Balance changes are journaled and written to the program file every ``checkpoint_every`` rows.
+"""
+
+import datetime
+import logging
+
+from utils.atomic_writer import document_lock, write_json_atomic
+from utils.journal import get_journal
+
+logger = logging.getLogger(__name__)
+
+# Ledger row kinds and the document list their records belong to
+# ("net" rows carry several records, each with its own kind)
+ENTRY_LISTS = {"earn": "transactions", "redeem": "redemptions"}
+
+
+class PointsLedger:
+    """
+    Journaled point balance changes for a loyalty program document
+    """
+
+    def __init__(self, document, data_file, log_file, customer_index, checkpoint_every=500,
+                 fsync_every=50, fsync_interval=1.0, history=None):
+        """
+        Initialize the ledger and replay rows journaled since the last checkpoint
+
+        Args:
+            document (dict): Loyalty program data (with "customers")
+            data_file (str): Path the document is checkpointed to
+            log_file (str): Path to the points journal
+            customer_index (callable): Returns the current CustomerIndex
+            checkpoint_every (int): Number of journaled rows after which the document is checkpointed
+            fsync_every (int): Maximum number of rows between journal fsyncs
+            fsync_interval (float): Maximum seconds between journal fsyncs
+            history (callable, optional): Returns the HistoryIndex of a document list
+                ("transactions"/"redemptions"); records are appended as-is without it
+        """
+        self.document = document
+        self.data_file = data_file
+        self.customer_index = customer_index
+        self.checkpoint_every = checkpoint_every
+        self.history = history
+        self.journal = get_journal(log_file, key="customer_id", fsync_every=fsync_every, fsync_interval=fsync_interval)
+        self._replay()
+
+    def _replay(self):
+        """Apply journaled rows that the document does not include yet"""
+        pending = self.journal.records(after_seq=self.document.get("points_ledger_seq", 0))
+        index = self.customer_index()
+        for row in pending:
+            customer = index.get(row["customer_id"])
+            if customer is not None:
+                self._apply(customer, row)
+        if pending:
+            self.document["points_ledger_seq"] = pending[-1]["seq"]
+            logger.info(f"Replayed {len(pending)} journaled point changes")
+
+    def _apply(self, customer, row):
+        """Apply a ledger row to a customer record and store its transaction/redemption"""
+        customer["points"] += row["points"]
+        customer["lifetime_points"] += row.get("lifetime_points", 0)
+        customer["total_spend"] += row.get("spend", 0)
+        visits = row.get("visits", 1 if row.get("visit") else 0)
+        if visits:
+            customer["visit_count"] += visits
+            customer["last_visit"] = max(customer.get("last_visit") or "", row["visited_on"])
+        if row["entry"] == "net":
+            for entry, record in row["records"]:
+                self._store(ENTRY_LISTS[entry], record)
+        else:
+            self._store(ENTRY_LISTS[row["entry"]], row["record"])
+        self.customer_index().update(customer)
+
+    def _store(self, name, record):
+        """Add a transaction/redemption to its document list (in date order when indexed)"""
+        if self.history is not None:
+            self.history(name).add(record)
+        else:
+            self.document.setdefault(name, []).append(record)
+
+    @staticmethod
+    def earn_row(customer_id, points, amount, transaction, visited_on=None):
+        """
+        Build the ledger row for a purchase
+
+        Args:
+            customer_id (str): Customer ID
+            points (int): Points earned
+            amount (float): Purchase amount
+            transaction (dict): Transaction record
+            visited_on (str, optional): Visit day (YYYY-MM-DD), defaults to today
+
+        Returns:
+            dict: Ledger row
+        """
+        return {
+            "customer_id": customer_id,
+            "entry": "earn",
+            "points": points,
+            "lifetime_points": points,
+            "spend": amount,
+            "visit": True,
+            "visited_on": visited_on or datetime.datetime.now().strftime("%Y-%m-%d"),
+            "record": transaction
+        }
+
+    @staticmethod
+    def redeem_row(customer_id, points, redemption):
+        """
+        Build the ledger row for a redemption
+
+        Args:
+            customer_id (str): Customer ID
+            points (int): Points redeemed
+            redemption (dict): Redemption record
+
+        Returns:
+            dict: Ledger row
+        """
+        return {"customer_id": customer_id, "entry": "redeem", "points": -points, "record": redemption}
+
+    @staticmethod
+    def net_rows(rows):
+        """
+        Fold rows into one net row per customer (in order of first appearance)
+
+        Args:
+            rows (list): Rows from earn_row/redeem_row
+
+        Returns:
+            list: Net rows, each listing the (entry, record) pairs it covers
+        """
+        net = {}
+        for row in rows:
+            total = net.get(row["customer_id"])
+            if total is None:
+                total = net[row["customer_id"]] = {
+                    "customer_id": row["customer_id"],
+                    "entry": "net",
+                    "points": 0,
+                    "lifetime_points": 0,
+                    "spend": 0,
+                    "visits": 0,
+                    "visited_on": "",
+                    "records": []
+                }
+            total["points"] += row["points"]
+            total["lifetime_points"] += row.get("lifetime_points", 0)
+            total["spend"] += row.get("spend", 0)
+            if row.get("visit"):
+                total["visits"] += 1
+                total["visited_on"] = max(total["visited_on"], row["visited_on"])
+            total["records"].append([row["entry"], row["record"]])
+        return list(net.values())
+
+    def recorded_ids(self):
+        """Get the IDs of the transactions and redemptions already in the document"""
+        return {record["id"] for name in ENTRY_LISTS.values() for record in self.document.get(name, [])}
+
+    def balance(self, customer_id):
+        """
+        Get a customer's point balance
+
+        Args:
+            customer_id (str): Customer ID
+
+        Returns:
+            int: Points, or None if the customer does not exist
+        """
+        customer = self.customer_index().get(customer_id)
+        return None if customer is None else customer["points"]
+
+    def post(self, rows):
+        """
+        Apply ledger rows and journal them with one write
+
+        Args:
+            rows (list): Rows from earn_row/redeem_row/net_rows
+
+        Returns:
+            list: Rows whose customer exists (the others are skipped)
+        """
+        index = self.customer_index()
+        applied = [row for row in rows if index.get(row["customer_id"]) is not None]
+
+        if applied:
+            stored = self.journal.append_many(applied)
+            # A background save sees either none or all of the rows, always with their sequence number
+            with document_lock:
+                for row in applied:
+                    self._apply(index.get(row["customer_id"]), row)
+                self.document["points_ledger_seq"] = stored[-1]["seq"]
+            if len(self.journal) >= self.checkpoint_every:
+                self.checkpoint()
+        return applied
+
+    def checkpoint(self):
+        """
+        Write a snapshot of the document and truncate the points journal
+
+        Returns:
+            int: Number of journaled rows folded into the data file
+        """
+        pending = len(self.journal)
+        if not pending:
+            return 0
+
+        try:
+            # Written synchronously: the journal may only be dropped once the data file has the rows
+            write_json_atomic(self.data_file, self.document)
+        except Exception as e:
+            logging.error(f"File operation failed: {e}")
+            raise
+
+        if self.document.get("points_ledger_seq", 0) >= self.journal.last_seq:
+            self.journal.truncate()
+        return pending
+
+    def flush(self):
+        """Fsync journaled rows to disk"""
+        self.journal.flush()
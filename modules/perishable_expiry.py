@@ -0,0 +1,155 @@
+"""
+Expiry-ordered index of perishable batches for threshold and FIFO queries
+"""
+
+import bisect
+import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def expiry_ordinal(item):
+    """
+    Get the proleptic ordinal of a batch's expiration date
+
+    Args:
+        item (dict): Inventory batch with an "expiration_date" (YYYY-MM-DD)
+
+    Returns:
+        int: Day ordinal, or None if the date is missing or invalid
+    """
+    value = item.get("expiration_date")
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.date.fromisoformat(value[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+class ExpiryIndex:
+    """
+    Batches sorted by expiration date (oldest first)
+    """
+
+    def __init__(self, items=()):
+        """
+        Build the index
+
+        Args:
+            items (list): Inventory batches; the index keeps a reference to
+                the list to detect when it was replaced or changed
+        """
+        self.source = items
+        # Mutation count of a KeyedList source this index is in step with
+        self._mutations = getattr(items, "mutations", None)
+        # Incremented on every add/remove so derived structures know when to rebuild
+        self.version = 0
+        keyed = []
+        self.undated = []
+        for item in items:
+            ordinal = expiry_ordinal(item)
+            if ordinal is None:
+                self.undated.append(item)
+            else:
+                keyed.append((ordinal, item))
+        if self.undated:
+            logger.warning(f"{len(self.undated)} batches have no valid expiration date")
+
+        # Stable sort: batches expiring the same day keep their list order
+        keyed.sort(key=lambda entry: entry[0])
+        self._ordinals = [ordinal for ordinal, _ in keyed]
+        self._items = [item for _, item in keyed]
+
+    def __len__(self):
+        return len(self._items) + len(self.undated)
+
+    def is_current(self, items):
+        """Check whether the index was built from this list and has not missed additions or removals"""
+        if items is not self.source:
+            return False
+        if self._mutations is None:
+            # A plain list has no mutation count; only a change in length shows
+            return len(items) == len(self)
+        return items.mutations == self._mutations
+
+    def _track(self):
+        """Account for the source list change mirrored by an add or remove"""
+        self.version += 1
+        if self._mutations is not None:
+            self._mutations += 1
+
+    def add(self, item):
+        """
+        Insert a batch after any batches expiring the same day
+
+        Call after appending the batch to the source list.
+
+        Args:
+            item (dict): Inventory batch
+        """
+        self._track()
+        ordinal = expiry_ordinal(item)
+        if ordinal is None:
+            self.undated.append(item)
+            return
+        position = bisect.bisect_right(self._ordinals, ordinal)
+        self._ordinals.insert(position, ordinal)
+        self._items.insert(position, item)
+
+    def remove(self, item, ordinal=None):
+        """
+        Remove a batch
+
+        Call after removing the batch from the source list.
+
+        Args:
+            item (dict): Inventory batch (matched by identity)
+            ordinal (int, optional): Expiry ordinal the batch was indexed
+                under, if its expiration date was changed since
+
+        Returns:
+            bool: Whether the batch was in the index
+        """
+        if ordinal is None:
+            ordinal = expiry_ordinal(item)
+        if ordinal is not None:
+            start = bisect.bisect_left(self._ordinals, ordinal)
+            end = bisect.bisect_right(self._ordinals, ordinal, lo=start)
+            for position in range(start, end):
+                if self._items[position] is item:
+                    self._track()
+                    del self._ordinals[position]
+                    del self._items[position]
+                    return True
+        for position, other in enumerate(self.undated):
+            if other is item:
+                self._track()
+                del self.undated[position]
+                return True
+        return False
+
+    def expiring_within(self, days, today=None):
+        """
+        Get the batches expiring within a number of days, oldest first
+
+        Args:
+            days (int): Days from today (already expired batches are included)
+            today (date, optional): Reference date, defaults to today
+
+        Returns:
+            list: Matching batches
+        """
+        if today is None:
+            today = datetime.date.today()
+        end = bisect.bisect_right(self._ordinals, today.toordinal() + days)
+        return self._items[:end]
+
+    def ordered(self):
+        """Get every batch, oldest expiry first (batches without a date last)"""
+        return self._items + self.undated
+
+    def earliest(self):
+        """Get the batch that expires first, or None"""
+        return self._items[0] if self._items else None
@@ -0,0 +1,173 @@
+"""
+FEFO (first expired, first out) sale allocation across perishable batches
+
+``allocate_bulk`` reconciles a day of sales at once with numpy.
+"""
+
+import datetime
+import logging
+
+import numpy as np
+import pandas as pd
+
+from modules.perishable_expiry import expiry_ordinal
+
+logger = logging.getLogger(__name__)
+
+
+class FefoAllocator:
+    """
+    Batches grouped by product name, each group ordered by expiration date
+    """
+
+    def __init__(self, ordered_items):
+        """
+        Build the allocator
+
+        Args:
+            ordered_items (list): Inventory batches sorted by expiration date
+                (e.g. ``ExpiryIndex.ordered()``)
+        """
+        self.products = {}
+        for item in ordered_items:
+            self.products.setdefault(item["name"], []).append(item)
+
+        # Batches laid out contiguously per product for the vectorized bulk mode
+        self._names = list(self.products)
+        self._batches = [item for name in self._names for item in self.products[name]]
+        self._codes = np.repeat(
+            np.arange(len(self._names)),
+            [len(self.products[name]) for name in self._names]
+        )
+        # Batches without a valid expiration date never count as expired
+        self._ordinals = np.array(
+            [ordinal if ordinal is not None else np.inf for ordinal in map(expiry_ordinal, self._batches)],
+            dtype=float
+        )
+
+    def batches(self, product_name):
+        """Get a product's batches, oldest expiry first"""
+        return list(self.products.get(product_name, []))
+
+    def allocate(self, product_name, quantity, apply=True, today=None):
+        """
+        Allocate a sale across a product's batches, oldest expiry first
+
+        Batches that expired before today are not sold from; their stock is
+        reported under "expired" so it can be logged as waste.
+
+        Args:
+            product_name (str): Product name
+            quantity (int): Units sold
+            apply (bool): Decrement the batch quantities
+            today (date, optional): Reference date, defaults to today
+
+        Returns:
+            dict: Allocation with "depletions" (item_id, batch_number,
+                expiration_date, quantity taken), any "shortfall" and the
+                "expired" batches skipped (with their quantity left)
+        """
+        if quantity < 0:
+            raise ValueError("Sold quantity cannot be negative")
+        today_ordinal = (today or datetime.date.today()).toordinal()
+
+        remaining = quantity
+        depletions = []
+        expired = []
+        for item in self.products.get(product_name, []):
+            ordinal = expiry_ordinal(item)
+            if ordinal is not None and ordinal < today_ordinal:
+                if item["quantity"] > 0:
+                    expired.append(self._depletion(item, item["quantity"]))
+                continue
+            if remaining <= 0:
+                break
+            take = min(item["quantity"], remaining)
+            if take <= 0:
+                continue
+            depletions.append(self._depletion(item, take))
+            remaining -= take
+            if apply:
+                item["quantity"] -= take
+
+        return {
+            "product_name": product_name,
+            "requested": quantity,
+            "allocated": quantity - remaining,
+            "shortfall": remaining,
+            "depletions": depletions,
+            "expired": expired
+        }
+
+    def allocate_bulk(self, sales, apply=True, today=None):
+        """
+        Allocate a day of sales at once
+
+        Args:
+            sales (DataFrame or list): Sales with "product_name" and "quantity"
+                (one row per sale; products may repeat)
+            apply (bool): Decrement the batch quantities
+            today (date, optional): Reference date, defaults to today
+
+        Returns:
+            dict: Allocation per product name (same structure as ``allocate``)
+        """
+        if not isinstance(sales, pd.DataFrame):
+            sales = pd.DataFrame(list(sales), columns=["product_name", "quantity"])
+        if sales.empty:
+            return {}
+        if (sales["quantity"] < 0).any():
+            raise ValueError("Sold quantity cannot be negative")
+
+        totals = sales.groupby("product_name", sort=False)["quantity"].sum()
+        results = {
+            name: {"product_name": name, "requested": total, "allocated": 0, "shortfall": total,
+                   "depletions": [], "expired": []}
+            for name, total in zip(totals.index, totals.tolist())
+        }
+
+        demand_by_code = np.zeros(len(self._names))
+        codes = {name: code for code, name in enumerate(self._names)}
+        known = [name for name in totals.index if name in codes]
+        demand_by_code[[codes[name] for name in known]] = totals[known].to_numpy()
+        unknown = len(totals) - len(known)
+        if unknown:
+            logger.warning(f"{unknown} sold products have no batches in stock")
+        if not len(self._batches):
+            return results
+
+        quantities = np.fromiter((item["quantity"] for item in self._batches), dtype=float, count=len(self._batches))
+        today_ordinal = (today or datetime.date.today()).toordinal()
+        expired = (self._ordinals < today_ordinal) & (quantities > 0)
+        available = np.where(expired, 0, np.maximum(quantities, 0))
+        cumulative = np.cumsum(available)
+        # Stock in the older batches of the same product
+        group_start = np.r_[0, np.flatnonzero(np.diff(self._codes)) + 1]
+        group_base = (cumulative - available)[group_start]
+        older = cumulative - available - group_base[self._codes]
+        takes = np.clip(demand_by_code[self._codes] - older, 0, available)
+
+        for position in np.flatnonzero(takes):
+            item = self._batches[position]
+            take = takes[position]
+            take = int(take) if take == int(take) else float(take)
+            result = results[item["name"]]
+            result["depletions"].append(self._depletion(item, take))
+            result["allocated"] += take
+            result["shortfall"] -= take
+            if apply:
+                item["quantity"] -= take
+
+        for position in np.flatnonzero(expired):
+            item = self._batches[position]
+            if item["name"] in results:
+                results[item["name"]]["expired"].append(self._depletion(item, item["quantity"]))
+        return results
+
+    def _depletion(self, item, take):
+        return {
+            "item_id": item["id"],
+            "batch_number": item.get("batch_number"),
+            "expiration_date": item.get("expiration_date"),
+            "quantity": take
+        }
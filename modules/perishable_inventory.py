@@ -4,6 +4,17 @@ import os
 import random  # For demo data generation
 from datetime import timedelta
 import logging
+import pandas as pd
+from utils.json_cache import load_json
+from utils.atomic_writer import document_lock, save_json
+from utils.keyed_collection import ensure_keyed
+from modules.perishable_expiry import ExpiryIndex
+from modules.perishable_scanner import ScanEngine
+from modules.perishable_fifo import FefoAllocator
+from modules.perishable_table import batch_frame, stock_summary
+from modules.perishable_sales import sales_velocity
+from modules.perishable_markdown import MarkdownOptimizer
+from utils.square_sync import get_sync_queue, catalog_price, inventory_count, square_ids
 logger = logging.getLogger(__name__)
 
 class PerishableInventoryTracker:
@@ -16,11 +27,21 @@ class PerishableInventoryTracker:
     - Email alerts for critical expiration thresholds
     """"
     "
+    # Expiry-ordered batch indexes shared by trackers of the same data file
+    _expiry_indexes = {}
+    # FEFO allocators shared the same way: data file -> (expiry index, index version, allocator)
+    _allocators = {}
+    # Stock summaries: data file -> (document, (scan sequence, date), summary); dropped on save
+    _stock_summaries = {}
+    
     def __init__(self, data_file="data/perishable_inventory.json"):"
         """Initialize the perishable inventory tracker with data file path"""
         self.data_file = data_file
         self._ensure_data_file_exists()
         self.inventory_data = self._load_data()
+        self._scanner = None
+        # Replay scans journaled since the last checkpoint before any quantity is read
+        self._get_scanner()
         
     def _ensure_data_file_exists(self):
         """Ensure the data file exists, create if it doesn't""""
@@ -141,30 +162,36 @@ f          {f"name": "Prepared Salad", "category": "Prepared Foods", "shelf_life
                 raisen inventory_items
     
     def _load_data(self):
-        """Load inventory data from file""""
+        """Load inventory data from file (parsed once per file change)"""
         try:
-            with open(selfff.data_file, 'rf') as file:"
-        except Exceptiotry:
-            logging.error(f"Error: {str(e)}")
-                with open(sfelf.data_file, 'w')
-            except Exception as e:
-                logging.erroError during file operation: {str(e)}}(e)}")
-                raisefailed: {e}}led: {e}")
-            return json.load(file)
+            return load_json(self.data_file)
+        except Exception as e:
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _save_data(self):
-        """Save inventory data to file""""
+        """Save inventory data to file (atomic; bursts of saves are coalesced)"""
         self.inventory_data["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        PerishableInventoryTracker._stock_summaries.pop(os.path.abspath(self.data_file), None)
         try:
-            with open(sffelf.data_file, 'wf') as file:'
+            save_json(self.data_file, self.inventory_data)
         except Exception as e:
-            logging.error(f"Error: {str(e)}")
-            loggingFile operation failed: {e}}iled: {e}")
-            json.dump(self.inventory_data, file, indent=4)'
+            logging.error(f"File operation failed: {e}")
+            raise
     
-    def get_inventory_items(self, category=None, expiry_days=None, low_stoffck=False):
-        f""""
-        Get inventory items with optional filtering"
+    def _get_expiry_index(self):
+        """Get the expiry-ordered batch index, rebuilding it only when the batch list was replaced"""
+        items = ensure_keyed(self.inventory_data, "inventory_items")
+        key = os.path.abspath(self.data_file)
+        index = PerishableInventoryTracker._expiry_indexes.get(key)
+        if index is None or not index.is_current(items):
+            index = ExpiryIndex(items)
+            PerishableInventoryTracker._expiry_indexes[key] = index
+        return index
+    
+    def get_inventory_items(self, category=None, expiry_days=None, low_stock=False):
+        """
+        Get inventory items with optional filtering
         
         Args:
             category (str, optional): Filter by category
@@ -172,76 +199,245 @@ f          {f"name": "Prepared Salad", "category": "Prepared Foods", "shelf_life
             low_stock (bool, optional): Filter to show only low stock items
             
         Returns:
-            list: Filtered inventory items
-        """"
-        items = self.inventory_data["inventory_items"]
-        today = datetime.datetime.now().date()
+            list: Filtered inventory items, sorted by expiration date (oldest first) to enforce FIFO
+        """
+        index = self._get_expiry_index()
+        if expiry_days is not None:
+            items = index.expiring_within(expiry_days, today=datetime.datetime.now().date())
+        else:
+            items = index.ordered()
         
         if category:
-            items = [item for item in items if item["category"] == category]"
-            "
-        if expiry_days is not None:
-            items = [item for item in items if 
-                    (datetime.datetime.strptime(item["expiration_date"], "%Y-%m-%d").date() - today).days <= expiry_days]"
-            "
+            items = [item for item in items if item["category"] == category]
+            
         if low_stock:
             # Group by product name and check if any product is low in total stock
             product_totals = {}
-            for item in self.inventory_dffata["inventory_itemsf"]:"
-                name = item["name"]
-                if name not in product_totals:
-                    product_totals[name] = 0
-                product_totals[name] += item["quantity"]"
-            "
+            for item in self.inventory_data["inventory_items"]:
+                product_totals[item["name"]] = product_totals.get(item["name"], 0) + item["quantity"]
+            
             # Assume low stock is 20% of typical stock for that product
             # (This would be more sophisticated in a real implementation)
             low_stock_items = set()
-            for item in self.inventory_data["inventory_items"]:"
-                name = item["name"]
+            for name, total in product_totals.items():
                 # Just an example threshold calculation
-                if name == "Water Bottles" and product_totals[name] <= 80 * 0.2:  # 20% of 80"
-                    low_stock_items.add(name)"
-                elif product_totals[name] <= 30:  # Generic low threshold
+                if name == "Water Bottles" and total <= 80 * 0.2:  # 20% of 80
+                    low_stock_items.add(name)
+                elif total <= 30:  # Generic low threshold
                     low_stock_items.add(name)
             
-            items = [item for item in items if item["name"] in low_stock_items]"
-        "
-        # Sort by expiration date (oldest first) to enforce FIFO
-        return sorted(items, key=lambda x: x["expiration_date"])"
-    "
+            items = [item for item in items if item["name"] in low_stock_items]
+        
+        return items
+    
     def get_expiring_items(self, days_threshold=None):
-        """"
-        Get items expiring within specified days"
+        """
+        Get items expiring within specified days
         
         Args:
             days_threshold (int, optional): Days threshold, defaults to warning threshold in settings
             
         Returns:
             list: Items expiring within threshold
-        """"
-        if days_threshold is None:"
-            days_threshold = self.inventory_data["settings"]["expiry_thresholds"]["warning"]"
-            "
+        """
+        if days_threshold is None:
+            days_threshold = self.inventory_data["settings"]["expiry_thresholds"]["warning"]
+            
         return self.get_inventory_items(expiry_days=days_threshold)
     
     def get_critical_items(self):
-        """"
-        Get items at critical expiration threshold"
+        """
+        Get items at critical expiration threshold
         
         Returns:
             list: Items at critical expiration threshold
-        """"
+        """
         critical_days = self.inventory_data["settings"]["expiry_thresholds"]["critical"]
         return self.get_inventory_items(expiry_days=critical_days)
     
     def get_low_stock_items(self):
-        """"
-        Get items with low stock levels"
+        """
+        Get items with low stock levels
         
         Returns:
             list: Items with low stock
-        """"
-        return self.get_inventory_items(low_stock=True)"
+        """
+        return self.get_inventory_items(low_stock=True)
+    
+    def add_batch(self, item):
+        """
+        Add a received batch to the inventory
+        
+        Args:
+            item (dict): Batch information (id, name, category, quantity, expiration_date, ...)
+            
+        Returns:
+            dict: The added batch
+        """
+        index = self._get_expiry_index()
+        self.inventory_data["inventory_items"].append(item)
+        index.add(item)
+        self._save_data()
+        return item
+    
+    def remove_batch(self, item_id):
+        """
+        Remove a batch (e.g. sold out or written off) from the inventory
+        
+        Args:
+            item_id (str): ID of the batch
+            
+        Returns:
+            dict: The removed batch or None if not found
+        """
+        index = self._get_expiry_index()
+        items = self.inventory_data["inventory_items"]
+        item = items.get(item_id)
+        if item is None:
+            return None
+        
+        items.remove(item)
+        index.remove(item)
+        self._save_data()
+        return item
+    
+    def _get_allocator(self):
+        """Get the FEFO allocator, rebuilding it only when batches were added or removed"""
+        index = self._get_expiry_index()
+        key = os.path.abspath(self.data_file)
+        cached = PerishableInventoryTracker._allocators.get(key)
+        if cached is None or cached[0] is not index or cached[1] != index.version:
+            cached = (index, index.version, FefoAllocator(index.ordered()))
+            PerishableInventoryTracker._allocators[key] = cached
+        return cached[2]
+    
+    def sell_product(self, product_name, quantity):
+        """
+        Record a sale of a product, taking the units from its oldest batches first
+        
+        The depletions are journaled like "sold" scans (see
+        ScanEngine.record_depletions) rather than rewriting the data file.
+        
+        Args:
+            product_name (str): Name of the product
+            quantity (int): Units sold
+            
+        Returns:
+            dict: Allocation with the units taken from each batch, any shortfall
+                and the expired batches that were skipped
+        """
+        # Allocated and journaled under the document lock so concurrent sales and scans cannot take the same units
+        with document_lock:
+            allocation = self._get_allocator().allocate(product_name, quantity, apply=False)
+            self._get_scanner().record_depletions(allocation["depletions"])
+        if allocation["expired"]:
+            logger.warning(f"{len(allocation['expired'])} expired {product_name} batches still in stock; log them as waste")
+        return allocation
+    
+    def reconcile_sales(self, sales):
+        """
+        Allocate a day of POS sales across batches at once (end-of-day reconciliation)
+        
+        Args:
+            sales (str, DataFrame or list): Path to a sales CSV, or sales with
+                "product_name" and "quantity" columns
+            
+        Returns:
+            dict: Allocation per product name
+        """
+        if isinstance(sales, str):
+            try:
+                sales = pd.read_csv(sales)
+            except Exception as e:
+                logging.error(f"File operation failed: {e}")
+                raise
+        
+        with document_lock:
+            allocations = self._get_allocator().allocate_bulk(sales, apply=False)
+            self._get_scanner().record_depletions(
+                [depletion for allocation in allocations.values() for depletion in allocation["depletions"]]
+            )
+        expired = sum(len(allocation["expired"]) for allocation in allocations.values())
+        if expired:
+            logger.warning(f"{expired} expired batches of sold products still in stock; log them as waste")
+        return allocations
+    
+    def optimize_markdowns(self, apply=True, velocity_window=14):
+        """
+        Choose revenue-maximizing discounts for every batch in the warning window
+        
+        Meant to run nightly. Discounts come from MarkdownOptimizer using each
+        product's recent sales velocity; the chosen prices are applied with one
+        save and pushed to the POS in one batch.
+        
+        Args:
+            apply (bool): Apply the recommended prices (False only reports them)
+            velocity_window (int): Days of sales history used for velocity
+            
+        Returns:
+            dict: Recommendations and the expected revenue and waste reduction
+        """
+        settings = self.inventory_data["settings"]
+        today = datetime.datetime.now().date()
+        candidates = self._get_expiry_index().expiring_within(settings["expiry_thresholds"]["warning"], today=today)
+        optimizer = MarkdownOptimizer(
+            elasticity=settings.get("markdown_elasticity", 2.0),
+            max_discount=settings["discount_rates"].get("max", 60)
+        )
+        report = optimizer.optimize(candidates, sales_velocity(self.inventory_data, velocity_window, today), today=today)
+        
+        if apply:
+            items = self.inventory_data["inventory_items"]
+            changed = []
+            for recommendation in report["recommendations"]:
+                item = items.get(recommendation["item_id"])
+                rate = recommendation["discount_rate"]
+                if item is None or rate == (item.get("discount_rate") or 0):
+                    continue
+                item["original_price"] = recommendation["base_price"]
+                item["current_price"] = recommendation["new_price"]
+                item["discount_applied"] = rate > 0
+                item["discount_rate"] = rate
+                changed.append(item)
+            
+            if changed:
+                self._save_data()
+                self._sync_square_pos(changed)
+            report["applied"] = len(changed)
+        
+        return report
+    
+    def _sync_square_pos(self, items):
+        """
+        Queue item price/quantity changes for the Square POS
+        
+        The shared sync queue coalesces repeated changes to an item and sends
+        them in batches in the background (see utils.square_sync). With a
+        live Square connection, items without a Square variation ID are
+        skipped, and prices are only sent for items that also carry their
+        Square item ID and catalog version.
+        
+        Args:
+            items (list): Updated items
+            
+        Returns:
+            bool: Whether any change was queued
+        """
+        queue = get_sync_queue()
+        updates = []
+        for item in items:
+            variation_id, square_item_id, version = square_ids(item)
+            if queue.live and variation_id is None:
+                logger.warning(f"Item {item['id']} has no Square variation ID; not synced")
+                continue
+            variation_id = variation_id or item["id"]
+            if not queue.live or (square_item_id is not None and version is not None):
+                updates.append(("catalog", f"catalog:item:{item['id']}",
+                                catalog_price(variation_id, item["current_price"], square_item_id, version)))
+            updates.append(("inventory", f"inventory:item:{item['id']}",
+                            inventory_count(variation_id, item["quantity"], queue.location_id)))
+        queue.enqueue_many(updates)
+        return bool(updates)
     
     def apply_discount(self, item_id, custom_discount=None):
         """"
@@ -279,51 +475,55 @@ f          {f"name": "Prepared Salad", "category": "Prepared Foods", "shelf_life
                 "
         return None
     
-    def scan_item(self, item_id=None, sku=None, batch_number=None, scan_action="check"):"
+    def _get_scanner(self):
+        """Get the scan engine (created, and journaled scans replayed, on initialization)"""
+        if self._scanner is None:
+            self._scanner = ScanEngine(
+                self.inventory_data,
+                self.data_file,
+                os.path.splitext(self.data_file)[0] + ".scans.journal"
+            )
+        return self._scanner
+    
+    def scan_item(self, item_id=None, sku=None, batch_number=None, scan_action="check"):
         """
         Scan an item via barcode or manual entry
         
+        The scan is journaled rather than rewriting the data file; quantities
+        are checkpointed to the file in batches (see ScanEngine).
+        
         Args:
             item_id (str, optional): ID of the item
             sku (str, optional): SKU code of the item
             batch_number (str, optional): Batch number of the item
-            scan_action (str): Action to perform ('check', 'sold', 'adjust')'
-            '
+            scan_action (str): Action to perform ('check', 'sold', 'adjust')
+            
         Returns:
             dict: Scanned item information or None if not found
-        """"
-        found_item = None"
-        found_idx = -1
-        
-        # Find the item
-        for i, item in enumerate(self.inventory_data["inventory_items"]):"
-            if ((item_id and item["id"] == item_id) or 
-                (sku and item["sku"] == sku) or "
-                (batch_number and item["batch_number"] == batch_number)):
-                
-                found_item = item
-                found_idx = i
-                break
-                
-        if not found_item or found_idx == -1:
-            return None
+        """
+        return self._get_scanner().scan(item_id=item_id, sku=sku, batch_number=batch_number, scan_action=scan_action)
+    
+    def scan_many(self, scans):
+        """
+        Process a session of scans uploaded by a handheld scanner
+        
+        Args:
+            scans (list): Scans as dicts with item_id, sku and/or batch_number and an optional scan_action
             
-        # Update last scanned timestamp
-        self.inventory_data["inventory_items"][found_idx]["last_scanned"] = datetime.datetime.now().strftime("%Y-%m-%d")"
-        "
-        # Perform action based on scan_action
-        if scan_action == "sold":"
-            # Deduct one unit as sold"
-            if self.inventory_data["inventory_items"][found_idx]["quantity"] > 0:"
-                self.inventory_data["inventory_items"][found_idx]["quantity"] -= 1
-                
-        elif scan_action == "adjust":"
-            # This would open a quantity adjustment dialog in the UI"
-            pass
+        Returns:
+            list: Scanned item information (or None if not found) for each scan
+        """
+        return self._get_scanner().scan_many(scans)
+    
+    def checkpoint_scans(self):
+        """
+        Write scanned quantities to the data file now (e.g. at closing time)
         
-        self._save_data()
-        return self.inventory_data["inventory_items"][found_idx]"
-    "
+        Returns:
+            int: Number of journaled scans written to the data file
+        """
+        return self._get_scanner().checkpoint()
+    
     def update_quantity(self, item_id, new_quantity):
         """"
         Update the quantity of an item"
@@ -347,57 +547,35 @@ f          {f"name": "Prepared Salad", "category": "Prepared Foods", "shelf_life
                 "
         return None
     
+    def get_batch_table(self):
+        """
+        Get the batches as a columnar table
+        
+        Returns:
+            DataFrame: One row per batch (see perishable_table.BATCH_COLUMNS)
+        """
+        return batch_frame(self.inventory_data["inventory_items"])
+    
     def get_stock_summary(self):
-        """"
-        Get a summary of stock levels by product"
+        """
+        Get a summary of stock levels by product
+        
+        The summary is computed with one groupby over the batch table and
+        cached until the data is next changed.
         
         Returns:
             dict: Summary of stock levels by product
-        """"
-        summary = {}"
-        
-        for item inff self.inventory_data[f"inventory_items"]:"
-            name = item["name"]
-            if name not in summary:
-                summary[name] = {
-                    "total_quantity": 0,"
-                    "batches": 0,
-                    "oldest_expiry": None,"
-                    "newest_expiry": None,
-                    "categories": set(),"
-                    "locations": set()
-                }
-            
-            summaryff[name]["total_quantityf"] += item["quantity"]"
-            summary[name]["batches"] += 1
-            summary[name]["categories"].add(item["category"])"
-            summary[name]["locations"].add(item["location"])
-            
-            expiry_date = datetime.datetime.strptime(item["expiration_date"], "%Y-%m-%d").date()"
-            "
-            if summary[name]["oldest_expiry"] is None or expiry_date < summary[name]["oldest_expiry"]:"
-                summary[name]["oldest_expiry"] = expiry_date
-                
-            if summary[name]["newest_expiry"] is None or expiry_date > summary[name]["newest_expiry"]:"
-                summary[name]["newest_expiry"] = expiry_date
-        
-        # Convert sets to lists for JSON serialization
-        for name in summary:
-            summary[name]["categories"] = list(summary[name]["categories"])"
-            summary[name]["locations"] = list(summary[name]["locations"])
-            
-            # Convert dates to strings
-            if summary[name]["oldest_expiry"]:"
-                days_to_oldest_expiry = (summary[name]["oldest_expiry"] - datetime.datetime.now().date()).days
-                summary[name]["oldest_expiry_str"] = summary[name]["oldest_expiry"].strftime("%Y-%m-%d")"
-                summary[name]["days_to_oldest_expiry"] = days_to_oldest_expiry
-                
-            if summary[name]["newest_expiry"]:"
-                days_to_newest_expiry = (summary[name]["newest_expiry"] - datetime.datetime.now().date()).days
-                summary[name]["newest_expiry_str"] = summary[name]["newest_expiry"].strftime("%Y-%m-%d")"
-                summary[name]["days_to_newest_expiry"] = days_to_newest_expiry
+        """
+        key = os.path.abspath(self.data_file)
+        # Scans change quantities without saving, so the scan sequence is part of the cache key
+        state = (self.inventory_data.get("scan_log_seq", 0), datetime.datetime.now().date())
+        cached = PerishableInventoryTracker._stock_summaries.get(key)
+        if cached is None or cached[0] is not self.inventory_data or cached[1] != state:
+            summary = stock_summary(self.get_batch_table(), today=state[1])
+            cached = (self.inventory_data, state, summary)
+            PerishableInventoryTracker._stock_summaries[key] = cached
         
-        return summary
+        return {name: dict(entry) for name, entry in cached[2].items()}
     
     def _send_expiry_alert(self, items):
         """"
@@ -417,22 +595,17 @@ f          {f"name": "Prepared Salad", "category": "Prepared Foods", "shelf_life
         return True
     
     def _update_square_pos(self, item_id, item_data):
-        """"
-        Simulate updating the Square POS with inventory changes"
+        """
+        Queue the Square POS update for one changed item
         
         Args:
             item_id (str): ID of the item
             item_data (dict): Updated item data
             
         Returns:
-            bool: Whether update was successful
-        """"
-        # In a real implementation, this would make API calls to Square"
-    Square POS would be updated for iftemf {item_id}}em {item_id}")f"
-New price: ${item_data['current_price']}}}rfent_price']}}")
-fNew quantity: {item_dafta[f'quantity']}}a['quantity']}")'
-        '
-        return True
+            bool: Whether the update was queued
+        """
+        return self._sync_square_pos([dict(item_data, id=item_id)])
     
     def update_next_order_quantity(self, product_name, new_quantity):
         """"
@@ -0,0 +1,134 @@
+"""
+Markdown optimizer for near-expiry perishable batches
+
+Instead of a flat discount rate, every batch inside the warning window gets
+the discount that maximizes its expected recovered revenue before expiry.
+
+For a batch with ``q`` units, base price ``p`` and ``d`` selling days left,
+and a product selling ``v`` units per day at full price, a discount ``r``
+lifts demand to ``v * (1 - r) ** -elasticity`` units per day. Units of the
+same product in batches that expire earlier are sold first (FEFO), so they
+are subtracted from the demand the batch sees. The expected units sold are
+``q * (1 - exp(-demand / q))`` (sell-through saturates as demand exceeds the
+stock) and the expected revenue is ``p * (1 - r) * sold``. All candidates
+and discount rates are evaluated at once as a numpy matrix.
+"""
+
+import datetime
+import logging
+
+import numpy as np
+import pandas as pd
+
+from modules.perishable_expiry import expiry_ordinal
+
+logger = logging.getLogger(__name__)
+
+
+class MarkdownOptimizer:
+    """
+    Chooses revenue-maximizing discounts for batches close to expiry
+    """
+
+    def __init__(self, elasticity=2.0, max_discount=60, step=5):
+        """
+        Initialize the optimizer
+
+        Args:
+            elasticity (float): Price elasticity of demand (demand grows by
+                (1 - discount) ** -elasticity)
+            max_discount (int): Highest discount considered, in percent
+            step (int): Granularity of the discounts considered, in percent
+        """
+        self.elasticity = elasticity
+        self.rates = np.arange(0, max_discount + step, step, dtype=float)
+        self.rates = self.rates[self.rates <= max_discount]
+
+    def optimize(self, batches, velocity, today=None):
+        """
+        Find the best discount for each batch
+
+        Args:
+            batches (list): Candidate batches sorted by expiration date
+            velocity (dict): Units sold per day at full price by product name
+            today (date, optional): Reference date, defaults to today
+
+        Returns:
+            dict: Report with a "recommendations" list (one entry per batch)
+                and the expected revenue and waste with and without markdowns
+        """
+        if today is None:
+            today = datetime.date.today()
+        today_ordinal = today.toordinal()
+
+        batches = [
+            batch for batch in batches
+            if batch.get("quantity", 0) > 0 and (expiry_ordinal(batch) or 0) >= today_ordinal
+        ]
+        if not batches:
+            return self._report([], np.zeros(0), np.zeros((0, len(self.rates))), np.zeros((0, len(self.rates))))
+
+        frame = pd.DataFrame({
+            "name": [batch["name"] for batch in batches],
+            "quantity": [float(batch["quantity"]) for batch in batches],
+            "price": [float(self._base_price(batch)) for batch in batches],
+            # Selling days left, including today
+            "days": [expiry_ordinal(batch) - today_ordinal + 1 for batch in batches]
+        })
+        frame["velocity"] = frame["name"].map(velocity).fillna(0.0)
+        frame["older"] = frame.groupby("name", sort=False)["quantity"].cumsum() - frame["quantity"]
+
+        quantity = frame["quantity"].to_numpy()[:, None]
+        price = frame["price"].to_numpy()[:, None]
+        lift = (1 - self.rates / 100) ** -self.elasticity
+        demand = (frame["velocity"].to_numpy() * frame["days"].to_numpy())[:, None] * lift[None, :]
+        demand = np.maximum(demand - frame["older"].to_numpy()[:, None], 0)
+        sold = quantity * -np.expm1(-demand / quantity)
+        revenue = price * (1 - self.rates / 100)[None, :] * sold
+
+        return self._report(batches, frame["days"].to_numpy() - 1, sold, revenue)
+
+    @staticmethod
+    def _base_price(batch):
+        """Price before any markdown already applied"""
+        if batch.get("discount_applied") and batch.get("original_price"):
+            return batch["original_price"]
+        return batch.get("current_price", 0)
+
+    def _report(self, batches, days_to_expiry, sold, revenue):
+        """Pick the best discount per batch and summarize the expected effect"""
+        rows = np.arange(len(batches))
+        best = revenue.argmax(axis=1)
+        quantity = np.array([float(batch["quantity"]) for batch in batches])
+        price = np.array([float(self._base_price(batch)) for batch in batches])
+        waste_without = quantity - sold[:, 0]
+        waste_with = quantity - sold[rows, best]
+
+        recommendations = []
+        for position, batch in enumerate(batches):
+            rate = int(self.rates[best[position]])
+            recommendations.append({
+                "item_id": batch["id"],
+                "name": batch["name"],
+                "quantity": batch["quantity"],
+                "days_to_expiry": int(days_to_expiry[position]),
+                "base_price": round(float(price[position]), 2),
+                "discount_rate": rate,
+                "new_price": round(float(price[position]) * (1 - rate / 100), 2),
+                "expected_units_sold": round(float(sold[position, best[position]]), 2),
+                "expected_revenue": round(float(revenue[position, best[position]]), 2),
+                "expected_waste_units": round(float(waste_with[position]), 2)
+            })
+
+        waste_reduction = waste_without - waste_with
+        return {
+            "candidates": len(batches),
+            "marked_down": int(np.count_nonzero(best)),
+            "expected_revenue_without_markdown": round(float(revenue[:, 0].sum()), 2),
+            "expected_revenue_with_markdown": round(float(revenue[rows, best].sum()), 2),
+            "expected_waste_units_without_markdown": round(float(waste_without.sum()), 2),
+            "expected_waste_units_with_markdown": round(float(waste_with.sum()), 2),
+            "expected_waste_reduction_units": round(float(waste_reduction.sum()), 2),
+            "expected_waste_reduction_value": round(float((waste_reduction * price).sum()), 2),
+            "recommendations": recommendations
+        }
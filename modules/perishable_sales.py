@@ -0,0 +1,65 @@
+"""
+Daily per-product sales history for perishable inventory
+
+Sales recorded by the scan engine and the FEFO allocator are rolled up into
+``sales_history`` in the perishable data document: product name -> day
+(YYYY-MM-DD) -> units sold. Only the last ``HISTORY_DAYS`` days are kept, so
+the document stays small, and sales velocity is a sum over a few days per
+product rather than a pass over raw sale events.
+"""
+
+import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = 90
+
+
+def record_sales(document, sales, day=None):
+    """
+    Add units sold to the daily sales history
+
+    Args:
+        document (dict): Perishable inventory data
+        sales (dict): Units sold per product name
+        day (str, optional): Sale day (YYYY-MM-DD), defaults to today
+    """
+    if day is None:
+        day = datetime.date.today().isoformat()
+    history = document.setdefault("sales_history", {})
+    cutoff = None
+    for name, units in sales.items():
+        if not units:
+            continue
+        days = history.setdefault(name, {})
+        if day not in days:
+            # A new day for this product: drop the days that fell out of the history
+            if cutoff is None:
+                cutoff = (datetime.date.fromisoformat(day) - datetime.timedelta(days=HISTORY_DAYS)).isoformat()
+            for old_day in [old_day for old_day in days if old_day <= cutoff]:
+                del days[old_day]
+        days[day] = days.get(day, 0) + units
+
+
+def sales_velocity(document, window=14, today=None):
+    """
+    Get the average units sold per day over a window
+
+    Args:
+        document (dict): Perishable inventory data
+        window (int): Number of days, including today
+        today (date, optional): Reference date, defaults to today
+
+    Returns:
+        dict: Units per day by product name
+    """
+    if today is None:
+        today = datetime.date.today()
+    start = (today - datetime.timedelta(days=window - 1)).isoformat()
+    end = today.isoformat()
+    velocity = {}
+    for name, days in document.get("sales_history", {}).items():
+        units = sum(sold for day, sold in days.items() if start <= day <= end)
+        velocity[name] = units / window
+    return velocity
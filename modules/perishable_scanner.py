@@ -0,0 +1,239 @@
+"""
+Barcode scan engine for perishable inventory
+
+Scans and sales are journaled and written to the data file every ``checkpoint_every`` records.
+"""
+
+import datetime
+import logging
+
+from utils.atomic_writer import document_lock, write_json_atomic
+from utils.journal import get_journal
+from utils.keyed_collection import ensure_keyed
+from modules.perishable_sales import record_sales
+
+logger = logging.getLogger(__name__)
+
+SCAN_ACTIONS = ("check", "sold", "adjust")
+
+
+class ScanEngine:
+    """
+    Indexed, journaled scan processing for a perishable inventory document
+    """
+
+    def __init__(self, document, data_file, log_file, checkpoint_every=500, fsync_every=50, fsync_interval=1.0):
+        """
+        Initialize the engine and replay scans journaled since the last checkpoint
+
+        Args:
+            document (dict): Perishable inventory data (with "inventory_items")
+            data_file (str): Path the document is checkpointed to
+            log_file (str): Path to the scan journal
+            checkpoint_every (int): Number of journaled scans after which the document is checkpointed
+            fsync_every (int): Maximum number of scans between journal fsyncs
+            fsync_interval (float): Maximum seconds between journal fsyncs
+        """
+        self.document = document
+        self.data_file = data_file
+        self.checkpoint_every = checkpoint_every
+        self.journal = get_journal(log_file, key="item_id", fsync_every=fsync_every, fsync_interval=fsync_interval)
+        self._replay()
+
+    def _items(self):
+        return ensure_keyed(self.document, "inventory_items", secondary=("sku", "batch_number"))
+
+    def _replay(self):
+        """Apply journaled scans that the document does not include yet"""
+        items = self._items()
+        pending = self.journal.records(after_seq=self.document.get("scan_log_seq", 0))
+        for record in pending:
+            item = items.get(record["item_id"])
+            if item is not None:
+                self._apply(item, record)
+        if pending:
+            self.document["scan_log_seq"] = pending[-1]["seq"]
+            logger.info(f"Replayed {len(pending)} journaled scans")
+
+    def _apply(self, item, record):
+        """Apply a scan record to a batch"""
+        item["last_scanned"] = record["scanned_on"]
+        if record.get("quantity_change"):
+            item["quantity"] += record["quantity_change"]
+            if record["scan_action"] == "sold":
+                record_sales(self.document, {item["name"]: -record["quantity_change"]}, record["scanned_on"])
+
+    def find(self, item_id=None, sku=None, batch_number=None):
+        """
+        Find a batch by ID, SKU or batch number
+
+        Args:
+            item_id (str, optional): ID of the batch
+            sku (str, optional): SKU code of the batch
+            batch_number (str, optional): Batch number
+
+        Returns:
+            dict: The batch (not a copy) or None if not found
+        """
+        items = self._items()
+        if item_id:
+            item = items.get(item_id)
+            if item is not None:
+                return item
+        if sku:
+            item = items.find_one("sku", sku)
+            if item is not None:
+                return item
+        if batch_number:
+            return items.find_one("batch_number", batch_number)
+        return None
+
+    def _prepare(self, scan, scanned_on, remaining):
+        """
+        Resolve a scan to its batch and the record to journal, without changing the batch
+
+        Args:
+            scan (dict): Scan to resolve
+            scanned_on (str): Scan day (YYYY-MM-DD)
+            remaining (dict): Batch ID -> quantity left after the earlier scans of the session
+
+        Returns:
+            tuple: (batch, record), or (None, None) if the batch was not found
+
+        Raises:
+            ValueError: If the scan action is unknown
+        """
+        action = scan.get("scan_action", "check")
+        if action not in SCAN_ACTIONS:
+            raise ValueError(f"Unknown scan action: {action}")
+
+        item = self.find(scan.get("item_id"), scan.get("sku"), scan.get("batch_number"))
+        if item is None:
+            return None, None
+
+        change = 0
+        quantity = remaining.get(item["id"], item["quantity"])
+        if action == "sold" and quantity > 0:
+            # Deduct one unit as sold
+            change = -1
+            remaining[item["id"]] = quantity - 1
+        # "adjust" would open a quantity adjustment dialog in the UI
+        return item, {"item_id": item["id"], "scan_action": action, "quantity_change": change, "scanned_on": scanned_on}
+
+    def scan(self, item_id=None, sku=None, batch_number=None, scan_action="check"):
+        """
+        Process a single scan
+
+        Args:
+            item_id (str, optional): ID of the batch
+            sku (str, optional): SKU code of the batch
+            batch_number (str, optional): Batch number
+            scan_action (str): Action to perform ('check', 'sold', 'adjust')
+
+        Returns:
+            dict: Scanned batch or None if not found
+        """
+        return self.scan_many([{
+            "item_id": item_id,
+            "sku": sku,
+            "batch_number": batch_number,
+            "scan_action": scan_action
+        }])[0]
+
+    def scan_many(self, scans):
+        """
+        Process a session of scans (e.g. uploaded by a handheld scanner) with one journal write
+
+        Scans are resolved in order, so several "sold" scans of a batch with
+        one unit left only deduct that unit once. The whole session is
+        validated and journaled before any batch is changed; if one scan is
+        invalid, none is applied.
+
+        Args:
+            scans (list): Scans as dicts with item_id, sku and/or batch_number
+                and an optional scan_action (defaults to 'check')
+
+        Returns:
+            list: Scanned batch (or None if not found) for each scan
+
+        Raises:
+            ValueError: If a scan action is unknown (nothing is applied)
+        """
+        scanned_on = datetime.datetime.now().strftime("%Y-%m-%d")
+        remaining = {}
+        prepared = [self._prepare(scan, scanned_on, remaining) for scan in scans]
+        records = [record for _item, record in prepared if record is not None]
+
+        if records:
+            stored = self.journal.append_many(records)
+            # A background save sees either none or all of the scans, always with their sequence number
+            with document_lock:
+                for item, record in prepared:
+                    if record is not None:
+                        self._apply(item, record)
+                self.document["scan_log_seq"] = stored[-1]["seq"]
+            if len(self.journal) >= self.checkpoint_every:
+                self.checkpoint()
+        return [item for item, _record in prepared]
+
+    def record_depletions(self, depletions, sold_on=None):
+        """
+        Journal and apply units sold from batches (e.g. a FEFO allocation)
+
+        Sales take the same journaled, locked path as "sold" scans, so a
+        crash replays them exactly once and a concurrent save sees either
+        none or all of them.
+
+        Args:
+            depletions (list): Dicts with "item_id" and the "quantity" taken
+            sold_on (str, optional): Sale day (YYYY-MM-DD), defaults to today
+
+        Returns:
+            list: The journaled records
+        """
+        sold_on = sold_on or datetime.datetime.now().strftime("%Y-%m-%d")
+        items = self._items()
+        records = [
+            {"item_id": depletion["item_id"], "scan_action": "sold",
+             "quantity_change": -depletion["quantity"], "scanned_on": sold_on}
+            for depletion in depletions
+            if depletion["quantity"] and items.get(depletion["item_id"]) is not None
+        ]
+        if not records:
+            return []
+
+        stored = self.journal.append_many(records)
+        with document_lock:
+            for record in stored:
+                self._apply(items.get(record["item_id"]), record)
+            self.document["scan_log_seq"] = stored[-1]["seq"]
+        if len(self.journal) >= self.checkpoint_every:
+            self.checkpoint()
+        return stored
+
+    def checkpoint(self):
+        """
+        Write the document with the scanned quantities and truncate the scan journal
+
+        Returns:
+            int: Number of journaled scans folded into the data file
+        """
+        pending = len(self.journal)
+        if not pending:
+            return 0
+
+        self.document["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            # Written synchronously: the journal may only be dropped once the data file has the scans
+            write_json_atomic(self.data_file, self.document)
+        except Exception as e:
+            logging.error(f"File operation failed: {e}")
+            raise
+
+        if self.document.get("scan_log_seq", 0) >= self.journal.last_seq:
+            self.journal.truncate()
+        return pending
+
+    def flush(self):
+        """Fsync journaled scans to disk"""
+        self.journal.flush()
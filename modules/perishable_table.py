@@ -0,0 +1,92 @@
+"""
+Columnar (pandas) view of perishable batches and the per-product stock summary
+"""
+
+import datetime
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BATCH_COLUMNS = ["id", "name", "category", "location", "quantity", "expiration_date"]
+
+
+def batch_frame(items):
+    """
+    Build a columnar table of batches
+
+    Args:
+        items (list): Inventory batch records
+
+    Returns:
+        DataFrame: One row per batch with BATCH_COLUMNS; "expiration_date"
+            is parsed to datetime64 (NaT when missing or invalid)
+    """
+    frame = pd.DataFrame.from_records(list(items), columns=BATCH_COLUMNS)
+    frame["quantity"] = pd.to_numeric(frame["quantity"], errors="coerce").fillna(0)
+    frame["expiration_date"] = pd.to_datetime(frame["expiration_date"], format="%Y-%m-%d", errors="coerce")
+    return frame
+
+
+def _unique_by_name(frame, column):
+    """Get the distinct values of a column per product, in order of first appearance"""
+    pairs = frame[["name", column]].dropna().drop_duplicates()
+    return pairs.groupby("name", sort=False)[column].agg(list)
+
+
+def stock_summary(frame, today=None):
+    """
+    Summarize stock levels by product
+
+    Args:
+        frame (DataFrame): Batch table from ``batch_frame``
+        today (date, optional): Reference date for days to expiry, defaults to today
+
+    Returns:
+        dict: Summary per product name with total_quantity, batches,
+            oldest/newest expiry (date, string and days from today),
+            categories and locations
+    """
+    if today is None:
+        today = datetime.date.today()
+    if frame.empty:
+        return {}
+
+    grouped = frame.groupby("name", sort=False).agg(
+        total_quantity=("quantity", "sum"),
+        batches=("quantity", "size"),
+        oldest_expiry=("expiration_date", "min"),
+        newest_expiry=("expiration_date", "max")
+    )
+    categories = _unique_by_name(frame, "category")
+    locations = _unique_by_name(frame, "location")
+    reference = pd.Timestamp(today)
+
+    summary = {}
+    columns = {
+        "total_quantity": grouped["total_quantity"].tolist(),
+        "batches": grouped["batches"].tolist()
+    }
+    for bound in ("oldest", "newest"):
+        dates = grouped[f"{bound}_expiry"]
+        columns[f"{bound}_expiry"] = [None if pd.isna(value) else value.date() for value in dates]
+        columns[f"{bound}_expiry_str"] = dates.dt.strftime("%Y-%m-%d").tolist()
+        columns[f"days_to_{bound}_expiry"] = (dates - reference).dt.days.tolist()
+
+    for position, name in enumerate(grouped.index):
+        total = columns["total_quantity"][position]
+        entry = {
+            "total_quantity": int(total) if total == int(total) else total,
+            "batches": columns["batches"][position],
+            "oldest_expiry": columns["oldest_expiry"][position],
+            "newest_expiry": columns["newest_expiry"][position],
+            "categories": list(categories.get(name, [])),
+            "locations": list(locations.get(name, []))
+        }
+        for bound in ("oldest", "newest"):
+            if entry[f"{bound}_expiry"] is not None:
+                entry[f"{bound}_expiry_str"] = columns[f"{bound}_expiry_str"][position]
+                entry[f"days_to_{bound}_expiry"] = int(columns[f"days_to_{bound}_expiry"][position])
+        summary[name] = entry
+    return summary
@@ -6,6 +6,7 @@ import uuid
 import os
 import json
 import logging
+from utils.storage import get_storage, document_name
 logger = logging.getLogger(__name__)
 
 class PricingAnalyzer:
@@ -16,9 +17,11 @@ class PricingAnalyzer:
     - Price recommendations
     """"
     "
-    def __init__(self, data_file="data/pricing.json"):"
-        """Initialize the pricing analyzer with data file path"""
+    def __init__(self, data_file="data/pricing.json", storage=None):
+        """Initialize the pricing analyzer with data file path and optional storage backend"""
         self.data_file = data_file
+        self.storage = storage or get_storage(data_file)
+        self._document = document_name(data_file)
         self._ensure_data_file_exists()
     
     def _ensure_data_file_exists(self):
@@ -111,21 +114,20 @@ f         f"BigMart Supermarket","
                 raise        return competitor_prices
     
     def _load_data(self):
-        """Load pricing data from file""""
+        """Load pricing data from the storage backend"""
         try:
-            with open(self.fdata_ffile, 'rf') as f:"
+            return self.storage.load_document(self._document)
         except Exception as e:
-            logging.erroFile operation failed: {e}}} try:
-                with open(invefntfory_file, 'rf')
-            except Exception as e:
-                logging.erError during file operation: {str(e)}}}tr(e)}}")
-                raise    def _save_data(self, data):
-        """Save pricing data to file""""
+            logging.error(f"File operation failed: {e}")
+            raise
+    
+    def _save_data(self, data):
+        """Save pricing data to the storage backend"""
         try:
-            with open(seflf.datfa_file, 'wf') as f:"
+            self.storage.save_document(self._document, data)
         except Exception as e:
-            logging.errFile operation failed: {e}}: {e}")
-            json.dump(data, f, indent=2)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _load_inventory_data(self):
         """Load inventory data from file""""
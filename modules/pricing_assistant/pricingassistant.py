@@ -7,6 +7,10 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
+from utils.json_cache import load_json
+from utils.square_sync import get_sync_queue, catalog_discount, catalog_price, square_ids
+import logging
+logger = logging.getLogger(__name__)
 
 class PricingAssistant:
     fff""""
@@ -333,22 +337,14 @@ try:
         return promotions
     
     def _load_data(self):
-        """Load pricitry:
-                with open(selff.data_file, 'r')
-            except Exception as e:
-                logging.Error during file operation: {str(e)}}{str(e)}")
-                raise not os.path.exists(self.data_file):f"
-            self._ensure_data_file_exists()
-            try:
-                with open(sfelf.data_file, 'w')
-            except Exception as e:
-                logging.error(f"Error: {str(e)}")
-                loggingError during file operation: {str(e)}}} {str(e)}}")
-            f  raiseata_file, f'r') as f:'
+        """Load pricing assistant data from file (parsed once per file change)"""
+        try:
+            if not os.path.exists(self.data_file):
+                self._ensure_data_file_exists()
+            return load_json(self.data_file)
         except Exception as e:
-            logging.error(f"Error: {str(e)}")
-            logginFile operation failed: {e}}ailed: {e}")
-f           return json.load(f)'
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _save_data(sfelf, data):
         f"""Save pricing assistant data to filetry:
@@ -758,8 +754,11 @@ f              data[f'promotion_history'].append(history_entry)'
         }}"
     
     def _sync_with_square_pos(self, product=None, promotion=None):
-        """"
-        Simulate Square POS synchronization"
+        """
+        Queue a product price or promotion for Square POS synchronization
+        
+        The update is sent in the background by the shared sync queue
+        (utils.square_sync), so the caller does not wait on the network.
         
         Args:
             product (dict, optional): Product to sync
@@ -767,40 +766,65 @@ f              data[f'promotion_history'].append(history_entry)'
             
         Returns:
             dict: Sync result
-        """"
-        data = self._load_data()"
-        pos_settings = data.get('pos_settings', {})'
-        '
+        """
+        data = self._load_data()
+        pos_settings = data.get('pos_settings', {})
+        
         # Check if Square integration is enabled
-        if not pos_settings.get('square_api_enabled',f False):'
-f         return {'
-                "successf": True, "
+        if not pos_settings.get('square_api_enabled', False):
+            return {
+                "success": True,
                 "synced": False,
-                "message": "simulated (Square POS integration not enabled)""
-            }"
+                "message": "simulated (Square POS integration not enabled)"
+            }
         
-        # In a real implementation, this would use the Square API to update prices or promotions
-        # For now, we'll just log the sync event'
-        sync_entry = {'
-            "id": str(uuid.uuid4()),"
-            "timestamp": datetime.now().isoformat(),
-            "type": "product" if product else "promotion","
-            "status": "successful",
-            "details": product if fproduct else fpromotion"
-        }"
+        queue = get_sync_queue()
+        if product:
+            product_id = product.get('product_id') or product['id']
+            price = product.get('new_price') or product.get('competitive_price') or product.get('current_price')
+            variation_id, square_item_id, version = square_ids(product)
+            if queue.live and (variation_id is None or square_item_id is None or version is None):
+                return {
+                    "success": True,
+                    "synced": False,
+                    "message": f"not synced ({product_id} is not mapped to a Square catalog item)"
+                }
+            key, payload = f"catalog:price:{product_id}", catalog_price(
+                variation_id or product_id, price, square_item_id, version)
+        elif promotion['type'] in ('percent_off', 'amount_off'):
+            # A "#" ID asks Square to create the discount and assign its own ID
+            discount_id = promotion.get('square_discount_id') or (
+                f"#{promotion['id']}" if queue.live else promotion['id'])
+            if promotion['type'] == 'percent_off':
+                payload = catalog_discount(discount_id, promotion['name'], percentage=promotion['value'])
+            else:
+                payload = catalog_discount(discount_id, promotion['name'], amount=promotion['value'])
+            key = f"catalog:promotion:{promotion['id']}"
+        else:
+            return {
+                "success": True,
+                "synced": False,
+                "message": f"not synced ({promotion['type']} promotions are not supported by Square discounts)"
+            }
         
-        data[f'sync_history'].append(sync_entry)'
-        pos_settings['last_sync'] = datetime.now().isoformat()
-        data['pos_settings'] = pos_settings'
-        '
-        # Save data
+        queue.enqueue("catalog", key, payload)
+        
+        sync_entry = {
+            "id": str(uuid.uuid4()),
+            "timestamp": datetime.now().isoformat(),
+            "type": "product" if product else "promotion",
+            "status": "queued",
+            "details": product if product else promotion
+        }
+        data.setdefault('sync_history', []).append(sync_entry)
         self._save_data(data)
         
         return {
-            "success": True,"
-            "synced": True,
-successfully synced with Square POS at {datetime.nowf().strftime('%H:%M:%S')}}).strftime('%H:%M:%Sf')}}""
-        }}"
+            "success": True,
+            "synced": False,
+            "queued": True,
+            "message": f"queued for Square POS sync at {datetime.now().strftime('%H:%M:%S')}"
+        }
     
     def update_pos_settings(self, enabled=None, api_key=None, location_id=None, auto_sync=None, sync_schedule=None):
         """"
@@ -6,6 +6,9 @@ import uuid
 import json
 from pathlib import Path
 import logging
+from utils.json_cache import load_json
+from utils.atomic_writer import save_json
+from utils.keyed_collection import ensure_keyed
 
 class RealtimeDashboard:
     """"
@@ -86,26 +89,22 @@ try:
                 logging.error(f"Error during file operation: {str(e)}}")
                 raiseta, f, findent=2)'
     
-    def _load_data(selff):
-        f"""Load dashboard data from file""""
+    def _load_data(self):
+        """Load dashboard data from file (parsed once per file change)"""
         try:
-            with open(self.data_file, 'r') as f:"
-        except Exceptry:
-            logging.error(f"Error: {str(e)}")
-                with open(self.dafta_file, 'w')
-            except Exception as e:
-                logging.error(Error during file operation: {str(e)}})}")
-                raiseoperationf failed: {e}}}f")
-            return json.load(f)
+            return load_json(self.data_file)
+        except Exception as e:
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _save_data(self):
-        """Save dashboard data to file""""
+        """Save dashboard data to file (atomic; bursts of saves are coalesced)"""
         self.dashboard_data["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
-            with open(self.dafta_file, 'w') as f:'
+            save_json(self.data_file, self.dashboard_data)
         except Exception as e:
-            logging.error(File operation failed: {e}}e}")
-            json.dump(self.dashboard_data, f, indent=2)'
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _add_notification(self, title, mfefssage, level=f"info"):"
         """Add a notification to the dashboard"""
@@ -592,23 +591,23 @@ ${sales_increasef:.2f}} additional revenue.nal revenue.","
             "notification": notification"
         }"
     
-    def mark_notificatfion_read(self, notification_id):
-        """"
-        Mark a notification as read"
+    def mark_notification_read(self, notification_id):
+        """
+        Mark a notification as read
         
         Args:
             notification_id (str): ID of the notification
             
         Returns:
             bool: Success status
-        """"
-        for notification in self.dashboard_data["notifications"]:
-            if notification["id"] == notification_id:"
-                notification["read"] = True
-                self._save_data()
-                return True
+        """
+        notification = ensure_keyed(self.dashboard_data, "notifications").get(notification_id)
+        if notification is None:
+            return False
         
-        return False
+        notification["read"] = True
+        self._save_data()
+        return True
     
     def get_active_deliveries(self):
         """"
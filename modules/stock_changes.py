@@ -0,0 +1,220 @@
+"""
+Validation and planning of bulk stock quantity changes and item upserts
+"""
+
+import numbers
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Fields a new item needs in plan_upserts
+REQUIRED_ITEM_FIELDS = ("name", "category", "supplier", "quantity", "cost_price", "selling_price")
+
+
+def parse_change(change):
+    """
+    Unpack a change row
+
+    Args:
+        change (tuple): (item_id, quantity_change) or
+            (item_id, quantity_change, transaction_type)
+
+    Returns:
+        tuple: (item_id, quantity_change, transaction_type, error message or None)
+    """
+    if not isinstance(change, (tuple, list)) or not 2 <= len(change) <= 3:
+        item_id = change[0] if isinstance(change, (tuple, list)) and change else None
+        return item_id, None, None, f"Change must be (item_id, quantity_change[, transaction_type]), got {change!r}"
+
+    item_id, quantity_change = change[0], change[1]
+    transaction_type = change[2] if len(change) > 2 else "adjustment"
+    if isinstance(quantity_change, bool) or not isinstance(quantity_change, numbers.Integral):
+        return item_id, None, None, f"Quantity change must be an integer, got {quantity_change!r}"
+    if not transaction_type or not isinstance(transaction_type, str):
+        return item_id, None, None, f"Invalid transaction type {transaction_type!r}"
+    return item_id, int(quantity_change), transaction_type, None
+
+
+def apply_change(item, quantity_change, transaction_type, timestamp):
+    """
+    Apply a quantity change to an item dict and build its transaction record
+
+    Args:
+        item (dict): Inventory item (modified in place)
+        quantity_change (int): Change in quantity
+        transaction_type (str): Transaction type, e.g. "sale"
+        timestamp (str): ISO timestamp of the change
+
+    Returns:
+        dict: Transaction record
+    """
+    old_quantity = item['quantity']
+    item['quantity'] = max(0, old_quantity + quantity_change)
+    item['last_updated'] = timestamp
+
+    return {
+        "id": str(uuid.uuid4()),
+        "item_id": item['id'],
+        "item_name": item['name'],
+        "transaction_type": transaction_type,
+        "quantity_change": quantity_change,
+        "old_quantity": old_quantity,
+        "new_quantity": item['quantity'],
+        "timestamp": timestamp
+    }
+
+
+def plan_stock_changes(changes, get_item, timestamp, atomic=False):
+    """
+    Validate change rows and apply the valid ones to copies of their items
+
+    Only the items named in the batch are looked up, once each; several
+    changes to the same item are applied in order.
+
+    Args:
+        changes (iterable): Change rows (see ``parse_change``)
+        get_item (callable): Item ID -> copy of the current item dict, or None
+        timestamp (str): ISO timestamp of the changes
+        atomic (bool): Apply nothing if any row is invalid
+
+    Returns:
+        tuple: (outcomes, transactions, items) - one outcome dict per row with
+            "item_id", "status" ("applied", "error" or "skipped") and either
+            "old_quantity"/"new_quantity" or "error"; the transactions to
+            journal; and the changed items by ID
+    """
+    items = {}
+    outcomes = []
+    transactions = []
+    for change in changes:
+        item_id, quantity_change, transaction_type, error = parse_change(change)
+
+        if error is None:
+            try:
+                if item_id not in items:
+                    items[item_id] = get_item(item_id)
+            except TypeError:
+                error = f"Invalid item ID {item_id!r}"  # Unhashable
+            else:
+                if items[item_id] is None:
+                    error = "Item not found"
+
+        if error is not None:
+            outcomes.append({"item_id": item_id, "status": "error", "error": error})
+            continue
+
+        transaction = apply_change(items[item_id], quantity_change, transaction_type, timestamp)
+        transactions.append(transaction)
+        outcomes.append({
+            "item_id": item_id,
+            "status": "applied",
+            "old_quantity": transaction['old_quantity'],
+            "new_quantity": transaction['new_quantity']
+        })
+
+    if atomic and len(transactions) < len(outcomes):
+        outcomes = [
+            outcome if outcome['status'] == "error" else
+            {"item_id": outcome['item_id'], "status": "skipped", "error": "Batch rejected because another row is invalid"}
+            for outcome in outcomes
+        ]
+        return outcomes, [], {}
+
+    return outcomes, transactions, {item_id: item for item_id, item in items.items() if item is not None}
+
+
+def validate_item_fields(fields, require_all):
+    """
+    Validate the fields of an item to create or update
+
+    Args:
+        fields (dict): Item fields
+        require_all (bool): Whether every field of REQUIRED_ITEM_FIELDS is needed
+
+    Returns:
+        str: Error message, or None if the fields are valid
+    """
+    if require_all:
+        missing = [key for key in REQUIRED_ITEM_FIELDS if fields.get(key) in (None, "")]
+        if missing:
+            return f"Missing required fields: {', '.join(missing)}"
+
+    for key in ('quantity', 'reorder_point'):
+        value = fields.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, numbers.Integral) or value < 0):
+            return f"{key} must be a non-negative integer, got {value!r}"
+    for key in ('cost_price', 'selling_price'):
+        value = fields.get(key)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, numbers.Real) or value < 0):
+            return f"{key} must be a non-negative number, got {value!r}"
+    return None
+
+
+def plan_upserts(items, get_item, timestamp):
+    """
+    Validate item dicts and build the rows to create or update
+
+    Only the IDs named in the batch are looked up, once each. Items with an
+    unknown or missing ``id`` are created; existing items get the given
+    fields, and a quantity change becomes an "adjustment" transaction.
+
+    Args:
+        items (iterable): Item dicts; new items need REQUIRED_ITEM_FIELDS
+        get_item (callable): Item ID -> copy of the current item dict, or None
+        timestamp (str): ISO timestamp of the changes
+
+    Returns:
+        tuple: (outcomes, transactions, rows) - one outcome dict per item with
+            "item_id" and "status" ("created", "updated" or "error", with
+            "error" set); the transactions to journal; and the rows to write
+            by ID
+    """
+    known = {}
+    rows = {}
+    outcomes = []
+    transactions = []
+    for fields in items:
+        item_id = fields.get('id')
+        existing = None
+        if item_id:
+            if item_id not in known:
+                known[item_id] = get_item(item_id)
+            existing = known[item_id]
+
+        error = validate_item_fields(fields, require_all=existing is None)
+        if error is not None:
+            outcomes.append({"item_id": item_id, "status": "error", "error": error})
+            continue
+
+        if existing is None:
+            quantity = int(fields['quantity'])
+            reorder_point = fields.get('reorder_point')
+            item = {
+                "id": item_id or str(uuid.uuid4()),
+                "name": fields['name'],
+                "category": fields['category'],
+                "supplier": fields['supplier'],
+                "quantity": quantity,
+                "reorder_point": int(reorder_point) if reorder_point is not None else max(1, int(quantity * 0.2)),
+                "cost_price": fields['cost_price'],
+                "selling_price": fields['selling_price'],
+                "last_updated": timestamp
+            }
+            known[item['id']] = item
+            status = "created"
+        else:
+            item = existing
+            quantity = fields.get('quantity')
+            if quantity is not None and int(quantity) != item['quantity']:
+                transactions.append(apply_change(item, int(quantity) - item['quantity'], "adjustment", timestamp))
+            for key, value in fields.items():
+                if key in item and key not in ('id', 'quantity'):
+                    item[key] = value
+            item['last_updated'] = timestamp
+            status = "updated"
+
+        rows[item['id']] = item
+        outcomes.append({"item_id": item['id'], "status": status})
+
+    return outcomes, transactions, rows
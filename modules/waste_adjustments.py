@@ -0,0 +1,124 @@
+"""
+Order adjustment recommendations for every wasted product
+
+``WasteManagement.analyze_product_waste`` looks at one product at a time
+with a fixed -10%/-5% rule. ``suggest_adjustments`` works on the per-product
+totals of one window of the daily waste rollups and sizes each cut from the
+product's waste ratio: the share of the stock received over the window
+(units sold + units donated or wasted) that was not sold. Cutting the order
+by that share brings supply down to what actually sells. Products without
+sales data fall back to the fixed rule.
+
+The job is meant to be run from a scheduler (cron, systemd timer)::
+
+    python -m modules.waste_adjustments --data-file data/waste_management.json \\
+        --perishable-file data/perishable_inventory.json
+"""
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DAYS = 30
+
+# Days of stock covered by one order, used to estimate the current order size
+ORDER_CYCLE_DAYS = 7
+
+# Largest cut suggested, in percent
+MAX_REDUCTION = 50
+
+# Suggested cuts are rounded to multiples of this many percent; smaller ones are dropped
+STEP = 5
+
+
+def suggest_adjustments(products, velocity, days=DEFAULT_DAYS, order_cycle_days=ORDER_CYCLE_DAYS,
+                        max_reduction=MAX_REDUCTION, step=STEP):
+    """
+    Size an order cut for every product with donations or waste
+
+    Args:
+        products (dict): Donated/wasted totals by product name over the window
+            (``window_totals(...)["products"]``)
+        velocity (dict): Units sold per day by product name
+        days (int): Days before today covered by the totals (today included)
+        order_cycle_days (int): Days of stock covered by one order
+        max_reduction (int): Largest cut in percent
+        step (int): Rounding step of the cut in percent
+
+    Returns:
+        list: Suggestions (product_name, current_quantity, adjustment_percent,
+            waste_ratio, reason), largest cut first
+    """
+    names = [name for name, totals in products.items() if totals["donated"] + totals["wasted"] > 0]
+    if not names:
+        return []
+
+    period = days + 1
+    donated = np.array([products[name]["donated"] for name in names], dtype=float)
+    wasted = np.array([products[name]["wasted"] for name in names], dtype=float)
+    rate = np.array([velocity.get(name, np.nan) for name in names], dtype=float)
+    known = ~np.isnan(rate)
+
+    lost = donated + wasted
+    sold = np.where(known, rate, 0.0) * period
+    ratio = lost / (sold + lost)
+
+    # Fitted cut where sales are known, the fixed rule (-10% with waste, -5% donations only) otherwise
+    fitted = np.minimum(np.round(ratio * 100 / step) * step, max_reduction)
+    fixed = np.where(wasted > 0, 10.0, 5.0)
+    reduction = np.where(known, fitted, fixed)
+
+    # Current order size estimated from the stock received per order cycle
+    current = np.maximum(np.ceil((sold + lost) / period * order_cycle_days), 1).astype(int)
+
+    selected = np.flatnonzero(reduction >= step)
+    suggestions = []
+    for position in selected[np.argsort(-reduction[selected], kind="stable")]:
+        name = names[position]
+        if known[position]:
+            reason = (f"{ratio[position]:.0%} of stock donated or wasted over {days} days "
+                      f"({int(lost[position])} units vs {sold[position]:.0f} sold)")
+        else:
+            reason = f"{int(lost[position])} units donated or wasted over {days} days (no sales data)"
+        suggestions.append({
+            "product_name": name,
+            "current_quantity": int(current[position]),
+            "adjustment_percent": -int(reduction[position]),
+            "waste_ratio": round(float(ratio[position]), 4) if known[position] else None,
+            "reason": reason
+        })
+    return suggestions
+
+
+def main(argv=None):
+    """Generate order adjustments for every product (scheduler entry point)"""
+    import argparse
+    import os
+    from utils.json_cache import load_json
+    from modules.perishable_sales import sales_velocity
+    from modules.waste_management import WasteManagement
+
+    parser = argparse.ArgumentParser(description="Create order adjustment recommendations for all wasted products")
+    parser.add_argument("--data-file", default="data/waste_management.json")
+    parser.add_argument("--perishable-file", default="data/perishable_inventory.json")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS)
+    parser.add_argument("--dry-run", action="store_true", help="Print the suggestions without saving them")
+    args = parser.parse_args(argv)
+
+    velocity = {}
+    if os.path.exists(args.perishable_file):
+        velocity = sales_velocity(load_json(args.perishable_file), window=args.days + 1)
+
+    result = WasteManagement(args.data_file).generate_order_adjustments(
+        velocity, days=args.days, apply=not args.dry_run)
+    for suggestion in result["suggestions"]:
+        print(f"{suggestion['product_name']}: {suggestion['adjustment_percent']}% ({suggestion['reason']})")
+    print(f"{result['analyzed']} products analyzed, {result['skipped_pending']} with pending adjustments, "
+          f"{len(result['created'])} adjustments created")
+    return result
+
+
+if __name__ == "__main__":
+    main()
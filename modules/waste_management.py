@@ -9,6 +9,13 @@ import os
 import uuid
 import math
 import logging
+from utils.json_cache import load_json
+from utils.atomic_writer import save_json, write_json_atomic
+from utils.keyed_collection import ensure_keyed
+from modules.waste_rollups import ROLLUP_DAYS, add_log, rebuild_rollups, window_totals, product_totals
+from utils.square_sync import get_sync_queue, inventory_adjustment
+from modules.waste_adjustments import DEFAULT_DAYS, suggest_adjustments
+from modules.waste_partitions import get_log_store, partition_directory, log_month, ensure_time_order, insert_in_time_order
 logger = logging.getLogger(__name__)
 
 class WasteManagement:
@@ -17,11 +24,15 @@ class WasteManagement:
     order adjustment recommendations
     """"
     "
-    def __init__(self, data_file="data/waste_management.json"):"
+    def __init__(self, data_file="data/waste_management.json"):
         """Initialize the waste management system with data file path"""
         self.data_file = data_file
         self._ensure_data_file_exists()
         self._load_data()
+        # Donation/waste logs are stored in monthly partitions next to the data file
+        self.logs = get_log_store(partition_directory(data_file))
+        self._migrate_logs()
+        self._backfill_adjustment_epochs()
         
     def _ensure_data_file_exists(self):
         """Ensure the data file exists, create if it doesn't""""
@@ -72,24 +83,21 @@ try:
                 logging.errorError during file operation: {str(e)}}}e)}}")
                 raise indent=2)f'
     
-    def _load_data(self):f
-        """Load waste management data from file""""
-try:
-                with open(self.data_file, 'w')
-            except Exception as e:
-                logging.erroError during file operation: {str(e)}}(e)}")
-                rfaise_file, 'rf') as f:"
+    def _load_data(self):
+        """Load waste management data from file (parsed once per file change)"""
+        try:
+            self.waste_data = load_json(self.data_file)
         except Exception as e:
-            logging.error(fFile operation failed: {e}}}}")
-            self.waste_data = json.load(f)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _save_data(self):
-f     """Save waste management data to file""""
+        """Save waste management data to file (atomic; bursts of saves are coalesced)"""
         try:
-            with open(self.dfata_file, 'wf') as f:"
+            save_json(self.data_file, self.waste_data)
         except Exception as e:
-            logging.error(File operation failed: {e}}e}")
-            json.dump(self.waste_data, f, indent=2)
+            logging.error(f"File operation failed: {e}")
+            raise
             
     def get_donation_recipients(self):
 f       """"
@@ -116,56 +124,118 @@ f       """"
             return True
         return False
         
-    def log_donation(self, product_name, quantity, recipient, unit_cost=None, reason="Near expiry", notes=""):"
+    def _migrate_logs(self):
+        """Move logs from the old single list in the data file into monthly partitions"""
+        logs = self.waste_data.get("donation_logs")
+        if logs is None:
+            return
+        
+        self.logs.import_logs(logs)
+        del self.waste_data["donation_logs"]
+        self.rebuild_rollups(save=False)
+        try:
+            # Written now: the partitions already hold the logs, and a rerun must not find the old list
+            write_json_atomic(self.data_file, self.waste_data)
+        except Exception as e:
+            logging.error(f"File operation failed: {e}")
+            raise
+        logger.info(f"Moved {len(logs)} waste logs into monthly partitions")
+    
+    def _backfill_adjustment_epochs(self):
+        """Give order adjustments written before they carried a "ts" epoch one, in time order"""
+        adjustments = ensure_keyed(self.waste_data, "order_adjustments")
+        if ensure_time_order(adjustments):
+            self._save_data()
+    
+    def _record_log(self, log):
+        """Store a new log in its month's partition and add it to the rollups and partition counts"""
+        rollups = self._get_rollups()
+        self.logs.append(log)
+        partitions = self.waste_data.setdefault("log_partitions", {})
+        partitions[log_month(log)] = partitions.get(log_month(log), 0) + 1
+        add_log(rollups, log)
+    
+    def _get_rollups(self):
+        """Get the daily waste rollups, rebuilding them if logs were recorded without them"""
+        rollups = self.waste_data.get("rollups")
+        if rollups is None or rollups.get("log_count") != sum(self.waste_data.get("log_partitions", {}).values()):
+            rollups = self.rebuild_rollups(save=False)
+        return rollups
+    
+    def _rollups_for(self, days, today):
+        """Get rollups covering the last `days` days (built from the logs when longer than the kept rollups)"""
+        if days <= ROLLUP_DAYS:
+            return self._get_rollups()
+        start_date = (today - datetime.timedelta(days=days)).isoformat()
+        return rebuild_rollups(self.logs.iter_logs(start_date=start_date), today=today, keep_days=days)
+    
+    def rebuild_rollups(self, save=True):
         """
-        Log a donation of products
+        Rebuild the daily waste rollups (and partition counts) from every log partition
+        
+        Args:
+            save (bool): Save the data file afterwards
+            
+        Returns:
+            dict: Rebuilt rollups
+        """
+        self.waste_data["log_partitions"] = {month: len(self.logs.load(month)) for month in self.logs.months()}
+        self.waste_data["rollups"] = rebuild_rollups(self.logs.iter_logs())
+        if save:
+            self._save_data()
+        return self.waste_data["rollups"]
+    
+    def log_donation(self, product_name, quantity, recipient, unit_cost=None, reason="Near expiry", notes=""):
+        """
+        Log product donation
         
         Args:
             product_name (str): Name of the product donated
             quantity (int): Number of units donated
-            recipient (str): Name of the recipient organization
+            recipient (str): Recipient organization
             unit_cost (float, optional): Cost per unit
             reason (str, optional): Reason for donation/waste
             notes (str, optional): Additional notes
             
         Returns:
             dict: Created donation log
-        """"
-        # Calculate cost if provided"
+        """
+        # Calculate cost if provided
         total_cost = 0
         if unit_cost:
             total_cost = unit_cost * quantity
             
         # Create donation log
-        donation = {{
-            "id": str(uuid.uuid4()),"
+        now = datetime.datetime.now()
+        donation = {
+            "id": str(uuid.uuid4()),
             "product_name": product_name,
-            "quantity": quantity,"
+            "quantity": quantity,
             "recipient": recipient,
-            "unit_cost": unit_cost,"
+            "unit_cost": unit_cost,
             "total_cost": total_cost,
-            "reason": reason,"
+            "reason": reason,
             "notes": notes,
-            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"
+            "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "ts": now.timestamp(),
             "logged_by": "Staff",  # In a real app, this would be the logged-in user
-            "synced_to_square": False"
-        }"
+            "synced_to_square": False
+        }
+        
+        # Add to the current log partition and the daily rollups
+        self._record_log(donation)
         
-        # Add to logs
-        self.wasfte_data["donation_logs"].append(donation)"
-        "
         # Update metrics
-        self.waste_data["waste_metrics"]["total_donated"] += quantity"
-        self.waste_data["waste_metrics"]["cost_savings"] += total_cost
+        metrics = self.waste_data["waste_metrics"]
+        metrics["total_donated"] += quantity
+        metrics["cost_savings"] += total_cost
         
         # Update donations by recipient
-        if recipient not in self.waste_data["waste_metrics"]["donations_by_recipient"]:"
-            self.waste_data["waste_metrics"]["donations_by_recipient"][recipient] = 0
-        self.waste_data["waste_metrics"]["donations_by_recipient"][recipient] += quantity"
-        "
+        metrics["donations_by_recipient"][recipient] = metrics["donations_by_recipient"].get(recipient, 0) + quantity
+        
         # Update timestamp
-        self.waste_data["waste_metrics"]["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")"
-        "
+        metrics["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
         self._save_data()
         
         # Simulate Square POS sync
@@ -173,7 +243,7 @@ f       """"
         
         return donation
     
-    def log_waste(self, product_name, quantity, unit_cost=None, reason="Expired", notes=""):"
+    def log_waste(self, product_name, quantity, unit_cost=None, reason="Expired", notes=""):
         """
         Log product waste
         
@@ -186,36 +256,39 @@ f       """"
             
         Returns:
             dict: Created waste log
-        """"
-        # Calculate cost if provided"
+        """
+        # Calculate cost if provided
         total_cost = 0
         if unit_cost:
             total_cost = unit_cost * quantity
             
-        # Create waste log
-        waste_log = {{
-            "id": str(uuid.uuid4()),"
+        # Create waste log (we reuse the donation logs array but with null recipient)
+        now = datetime.datetime.now()
+        waste_log = {
+            "id": str(uuid.uuid4()),
             "product_name": product_name,
-            "quantity": quantity,"
+            "quantity": quantity,
+            "recipient": None,
             "unit_cost": unit_cost,
-            "total_cost": total_cost,"
+            "total_cost": total_cost,
             "reason": reason,
-            "notes": notes,"
-            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "logged_by": "Staff",  # In a real app, this would be the logged-in user"
+            "notes": notes,
+            "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "ts": now.timestamp(),
+            "logged_by": "Staff",  # In a real app, this would be the logged-in user
             "synced_to_square": False
         }
         
-        # Add to logs (we reuse the donation logs array but with null recipient)
-        waste_log["frecipient"] = None"
-        self.waste_data["donation_logs"].append(waste_log)
+        # Add to the current log partition and the daily rollups
+        self._record_log(waste_log)
         
         # Update metrics
-        self.waste_data["waste_metrics"]["total_wasted"] += quantity"
-        "
+        metrics = self.waste_data["waste_metrics"]
+        metrics["total_wasted"] += quantity
+        
         # Update timestamp
-        self.waste_data["waste_metrics"]["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")"
-        "
+        metrics["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
         self._save_data()
         
         # Simulate Square POS sync
@@ -223,28 +296,56 @@ f       """"
         
         return waste_log
     
-    def get_all_logs(self):
-        """"
-        Get all donation and waste logs"
+    def get_all_logs(self, page_size=100, start_date=None, end_date=None):
+        """
+        Get donation and waste logs, newest first, one page at a time
         
-        Returns:
-            list: All donation and waste logs
-        """"
-        return sorted(self.waste_data["donation_logs"], 
-                    key=lambda x: datetime.datetime.strptime(x["timestamp"], "%Y-%m-%d %H:%M:%S"), "
-                    reverse=True)"
+        Monthly partitions are only read when the iteration reaches them, so
+        taking the first page does not load older months.
+        
+        Args:
+            page_size (int, optional): Maximum number of logs per page
+            start_date (str, optional): Earliest day to include (YYYY-MM-DD)
+            end_date (str, optional): Latest day to include (YYYY-MM-DD)
+            
+        Yields:
+            list: Up to page_size logs
+        """
+        yield from self.logs.iter_pages(page_size=page_size, start_date=start_date, end_date=end_date)
     
     def get_logs_by_product(self, product_name):
-        """"
-        Get logs for a specific product"
+        """
+        Get logs for a specific product
+        
+        Only the days on which the daily rollups show activity for the
+        product are read, so months without it are never loaded. Logs older
+        than the kept rollups (ROLLUP_DAYS) are not returned.
         
         Args:
             product_name (str): Name of the product
             
         Returns:
-            list: Logs for the specified product
-        """"
-        return [log for log in self.waste_data["donation_logs"] if log["product_name"] == product_name]
+            list: Logs for the specified product, newest first
+        """
+        days = sorted((day for day, bucket in self._get_rollups()["days"].items()
+                       if product_name in bucket["products"]), reverse=True)
+        return [log for day in days for log in self.logs.iter_logs(start_date=day, end_date=day)
+                if log["product_name"] == product_name]
+    
+    def get_window_totals(self, days=30, today=None):
+        """
+        Get donated/wasted totals of the last `days` days from the daily rollups
+        
+        Args:
+            days (int, optional): Number of days before today to include
+            today (date, optional): Reference date, defaults to today
+            
+        Returns:
+            dict: Donated/wasted quantity and cost in total, per product and per recipient
+        """
+        if today is None:
+            today = datetime.datetime.now().date()
+        return window_totals(self._rollups_for(days, today), days, today=today)
     
     def get_waste_metrics(self):
         """"
@@ -256,8 +357,8 @@ f       """"
         return self.waste_data["waste_metrics"]
     
     def create_order_adjustment(self, product_name, current_order_quantity, suggested_adjustment_percent, reason):
-        """"
-        Create order adjustment recommendation"
+        """
+        Create order adjustment recommendation
         
         Args:
             product_name (str): Product name
@@ -267,53 +368,107 @@ f       """"
             
         Returns:
             dict: Created order adjustment
-        """"
-        # Calculate suggested new quantity"
+        """
+        # Calculate suggested new quantity
         new_quantity = current_order_quantity * (1 + (suggested_adjustment_percent / 100))
         new_quantity = math.ceil(new_quantity)  # Round up to nearest whole number
         
         # Create adjustment
-        adjustment = {{
-            "id": str(uuid.uuid4()),"
+        adjustment = self._build_order_adjustment(product_name, current_order_quantity,
+                                                  suggested_adjustment_percent, new_quantity, reason)
+        
+        # Add to adjustments (kept in time order)
+        insert_in_time_order(ensure_keyed(self.waste_data, "order_adjustments"), adjustment)
+        self._save_data()
+        
+        return adjustment
+    
+    def _build_order_adjustment(self, product_name, current_quantity, adjustment_percent, suggested_quantity, reason, now=None):
+        """Build a pending order adjustment record"""
+        if now is None:
+            now = datetime.datetime.now()
+        return {
+            "id": str(uuid.uuid4()),
             "product_name": product_name,
-            "current_quantity": current_order_quantity,"
-            "adjustment_percent": suggested_adjustment_percent,
-            "suggested_quantity": new_quantity,"
+            "current_quantity": current_quantity,
+            "adjustment_percent": adjustment_percent,
+            "suggested_quantity": suggested_quantity,
             "reason": reason,
-            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),"
+            "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "ts": now.timestamp(),
             "status": "pending",  # pending, approved, rejected
-            "approved_by": None,"
+            "approved_by": None,
             "applied": False
         }
+    
+    def generate_order_adjustments(self, velocity=None, days=DEFAULT_DAYS, today=None, apply=True):
+        """
+        Create order adjustment recommendations for every product with waste
         
-        # Add to adjustments
-        self.waste_data["order_afdjustments"].append(adjustment)"
-        self._save_data()"
+        All products are analyzed from one window of the daily rollups, each
+        cut is sized from the product's waste ratio against its sales
+        velocity, products that already have a pending adjustment are
+        skipped, and the new adjustments are saved in a single write.
         
-        return adjustment
+        Args:
+            velocity (dict, optional): Units sold per day by product name
+            days (int, optional): Number of days to analyze
+            today (date, optional): Reference date, defaults to today
+            apply (bool, optional): Save the adjustments (False for a dry run)
+            
+        Returns:
+            dict: Number of products analyzed and skipped, the suggestions and the created adjustments
+        """
+        if today is None:
+            today = datetime.datetime.now().date()
+        products = window_totals(self._rollups_for(days, today), days, today=today)["products"]
+        
+        # De-duplicate against the adjustments still waiting for a decision
+        pending = {adj["product_name"] for adj in self.get_order_adjustments(status="pending")}
+        candidates = {name: totals for name, totals in products.items() if name not in pending}
+        suggestions = suggest_adjustments(candidates, velocity or {}, days=days)
+        
+        created = []
+        if apply and suggestions:
+            adjustments = ensure_keyed(self.waste_data, "order_adjustments")
+            now = datetime.datetime.now()
+            for suggestion in suggestions:
+                new_quantity = math.ceil(suggestion["current_quantity"] * (1 + suggestion["adjustment_percent"] / 100))
+                adjustment = self._build_order_adjustment(
+                    suggestion["product_name"], suggestion["current_quantity"],
+                    suggestion["adjustment_percent"], new_quantity, suggestion["reason"], now=now)
+                insert_in_time_order(adjustments, adjustment)
+                created.append(adjustment)
+            self._save_data()
+            logger.info(f"Created {len(created)} order adjustments")
+        
+        return {
+            "analyzed": len(products),
+            "skipped_pending": len(products) - len(candidates),
+            "suggestions": suggestions,
+            "created": created
+        }
     
     def get_order_adjustments(self, status=None):
-        """"
-        Get order adjustment recommendations"
+        """
+        Get order adjustment recommendations
         
         Args:
             status (str, optional): Filter by status (pending, approved, rejected)
             
         Returns:
-            list: Order adjustments
-        """"
-        adjustments = self.waste_data["order_adjustments"]
+            list: Order adjustments, newest first
+        """
+        # Adjustments are stored oldest first, so newest first is a reversed walk
+        adjustments = reversed(ensure_keyed(self.waste_data, "order_adjustments"))
         
         if status:
-            adjustments = [adj for adj in adjustments if adj["status"] == status]"
-            "
-        return sorted(adjustments, 
-                    key=lambda x: datetime.datetime.strptime(x["timestamp"], "%Y-%m-%d %H:%M:%S"), "
-                    reverse=True)"
+            return [adj for adj in adjustments if adj["status"] == status]
+        return list(adjustments)
     
     def update_adjustment_status(self, adjustment_id, new_status, approved_by=None):
-        """"
-        Update status of order adjustment"
+        """
+        Update status of order adjustment
         
         Args:
             adjustment_id (str): ID of adjustment to update
@@ -322,41 +477,40 @@ f       """"
             
         Returns:
             dict: Updated adjustment or None if not found
-        """"
-        for i, adj in enumerate(self.waste_data["order_adjustments"]):
-            if adj["id"] == adjustment_id:"
-                self.waste_data["order_adjustments"][i]["status"] = new_status
-                
-                if approved_by:
-                    self.waste_data["order_adjustments"][i]["approved_by"] = approved_by"
-                    "
-                self._save_data()
-                return self.waste_data["order_adjustments"][i]"
-                "
-        return None
+        """
+        adjustment = ensure_keyed(self.waste_data, "order_adjustments").get(adjustment_id)
+        if adjustment is None:
+            return None
+        
+        adjustment["status"] = new_status
+        if approved_by:
+            adjustment["approved_by"] = approved_by
+        
+        self._save_data()
+        return adjustment
     
     def mark_adjustment_applied(self, adjustment_id):
-        """"
-        Mark order adjustment as applied"
+        """
+        Mark order adjustment as applied
         
         Args:
             adjustment_id (str): ID of adjustment
             
         Returns:
             dict: Updated adjustment or None if not found
-        """"
-        for i, adj in enumerate(self.waste_data["order_adjustments"]):
-            if adj["id"] == adjustment_id:"
-                self.waste_data["order_adjustments"][i]["applied"] = True
-                self.waste_data["order_adjustments"][i]["applied_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")"
-                self._save_data()"
-                return self.waste_data["order_adjustments"][i]"
-                "
-        return None
+        """
+        adjustment = ensure_keyed(self.waste_data, "order_adjustments").get(adjustment_id)
+        if adjustment is None:
+            return None
+        
+        adjustment["applied"] = True
+        adjustment["applied_at"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._save_data()
+        return adjustment
     
     def analyze_product_waste(self, product_name, days=30):
-        """"
-        Analyze waste data for a product and suggest order adjustments"
+        """
+        Analyze waste data for a product and suggest order adjustments
         
         Args:
             product_name (str): Product name
@@ -364,22 +518,17 @@ f       """"
             
         Returns:
             dict: Analysis results and suggestions
-        """"
-        # Get logs for the product within the specified date range"
-        cutoff_date = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime("%Y-%m-%d")"
-        "
-        product_logs = [
-            log for log in self.waste_data["donation_logs"] "
-            if log["product_name"] == product_name and log["timestamp"][:10] >= cutoff_date
-        ]
+        """
+        # Sum the product's daily rollups within the specified date range
+        today = datetime.datetime.now().date()
+        totals = product_totals(self._rollups_for(days, today), product_name, days, today=today)
         
         # Calculate metrics
-        total_quantity = sum(log["quantity"] for log in product_logs)"
-        donated_quantity = sum(log["quantity"] for log in product_logs if log["recipient"])
-        wasted_quantity = sum(log["quantity"] for log in product_logs if not log["recipient"])"
-        "
-        total_cost = sum(log["total_cost"] for log in product_logs if "total_cost" in log)"
-        "
+        donated_quantity = totals["donated"]
+        wasted_quantity = totals["wasted"]
+        total_quantity = donated_quantity + wasted_quantity
+        total_cost = totals["donated_cost"] + totals["wasted_cost"]
+        
         # Determine if order adjustment is needed
         needs_adjustment = total_quantity > 0
         suggested_adjustment_percent = 0
@@ -394,89 +543,91 @@ f       """"
                 # More donations suggest smaller reduction
                 suggested_adjustment_percent = -5
         
-        return {{
-            "product_name": product_name,"
+        return {
+            "product_name": product_name,
             "days_analyzed": days,
-            "total_quantity": total_quantity,"
+            "total_quantity": total_quantity,
             "donated_quantity": donated_quantity,
-            "wasted_quantity": wasted_quantity,"
+            "wasted_quantity": wasted_quantity,
             "total_cost": total_cost,
-            "needs_adjustment": needs_adjustment,"
+            "needs_adjustment": needs_adjustment,
             "suggested_adjustment_percent": suggested_adjustment_percent,
-            "reason":Based on {days}} days of waste trackfing dataata""
-        }"
+            "reason": f"Based on {days} days of waste tracking data"
+        }
     
     def get_summary(self):
-        """"
-        Get a summary of waste management data"
+        """
+        Get a summary of waste management data
         
         Returns:
             dict: Summary data
-        """"
-        # Get overall metrics"
-        metrics = self.waste_data["waste_metrics"]"
-        "
-        # Get recent logs (last 7 days)
-        cutoff_date = (datetime.datetime.now() - datetime.timedelta(days=7)).strftime("%Y-%m-%d")"
-        recent_logs = ["
-            log for log in self.waste_data["donation_logs"] "
-            if log["timestamp"][:10] >= cutoff_date
-        ]
+        """
+        # Get overall metrics
+        metrics = self.waste_data["waste_metrics"]
+        
+        # Recent activity (last 7 days) from the daily rollups
+        recent = window_totals(self._get_rollups(), 7, today=datetime.datetime.now().date())
         
         # Get pending adjustments
-        pending_adjustments = self.get_order_adjustments(status="pending")"
-        "
-        # Summary stats for recent activity
-        recent_donated = sum(log["quantity"] for log in recent_logs if log["recipient"])"
-        recent_wasted = sum(log["quantity"] for log in recent_logs if not log["recipient"])
+        pending_adjustments = self.get_order_adjustments(status="pending")
         
         # Group by product
-        product_summary = {{}
-        for log in recent_logs:
-            product = log[f"product_name"]"
-            if product not in product_summary:"
-                product_summary[product] = {{
-                    "donated": 0,"
-                    "wasted": 0,
-                    "total": 0"
-                }"
-            
-            product_sumfmary[product]["total"] += log["quantity"]"
-            "
-            if log["recipient"]:"
-                product_summary[product]["donated"] += log["quantity"]
-            else:
-                product_summary[product]["wasted"] += log["quantity"]"
-        "
-        return {{
-            "total_donated": metrics["total_donated"],"
+        product_summary = {
+            product: {
+                "donated": totals["donated"],
+                "wasted": totals["wasted"],
+                "total": totals["donated"] + totals["wasted"]
+            }
+            for product, totals in recent["products"].items()
+        }
+        
+        return {
+            "total_donated": metrics["total_donated"],
             "total_wasted": metrics["total_wasted"],
-            "cost_savings": metrics["cost_savings"],"
-            "recent_donated": recent_donated,
-            "recent_wasted": recent_wasted,"
+            "cost_savings": metrics["cost_savings"],
+            "recent_donated": recent["donated"],
+            "recent_wasted": recent["wasted"],
             "pending_adjustments": len(pending_adjustments),
-            "product_summary": product_summary,"
+            "product_summary": product_summary,
             "as_of": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
     
-    def _sync_with_square(self, log_enftry):
-        """"
-        Simulate syncing waste/donation data with Square POS"
+    def _sync_with_square(self, log_entry):
+        """
+        Queue a waste/donation log for the Square POS
+        
+        The stock leaves Square inventory as a WASTE adjustment of the
+        product's variation, looked up by product name in the
+        "square_catalog_ids" setting. The log is marked as synced when the
+        background sync queue has delivered it, even after its month closed.
         
         Args:
             log_entry (dict): Log entry to sync
             
         Returns:
-            bool: Success status
-        """"
-        # This would make actual API calls to Square in a real implementation"
-        prinSyncing with Square POS: {log_entry[fg_entry[f'product_namef']}}} x {log_entry['quantity']}}y']}")'
-        '
-        # Find and update the log entry
-        for i, log in enumerate(self.waste_data["donation_logs"]):"
-            if log["id"] == log_entry["id"]:
-                self.waste_data["donation_logs"][i]["synced_to_square"] = True"
-                self._save_data()"
-                break
-                
-        return True''"
\ No newline at end of file
+            bool: Whether the log was queued
+        """
+        settings = self.waste_data["settings"]
+        if not settings.get("square_pos_integration", True):
+            return False
+        
+        queue = get_sync_queue()
+        variation_id = settings.get("square_catalog_ids", {}).get(log_entry["product_name"])
+        if queue.live and variation_id is None:
+            logger.warning(f"{log_entry['product_name']} has no Square variation ID; log {log_entry['id']} not synced")
+            return False
+        
+        logs = self.logs
+        
+        def mark_synced(entries):
+            for entry in entries:
+                if entry["key"].startswith("inventory:waste:"):
+                    # Keys queued before they carried the month default to the current month
+                    month, _, log_id = entry["key"][len("inventory:waste:"):].rpartition(":")
+                    logs.update(log_id, {"synced_to_square": True}, month=month or None)
+        
+        queue.add_listener(f"waste:{logs.directory}", mark_synced)
+        queue.enqueue("inventory", f"inventory:waste:{log_month(log_entry)}:{log_entry['id']}",
+                      inventory_adjustment(variation_id or log_entry["product_name"], log_entry["quantity"],
+                                           location_id=queue.location_id))
+        return True
@@ -0,0 +1,366 @@
+"""
+Month-partitioned storage for donation and waste logs, one file per month
+
+Partitions are kept in order of the logs' "ts" epoch seconds.
+"""
+
+import bisect
+import datetime
+import logging
+import os
+import re
+import threading
+
+from utils.json_cache import load_json
+from utils.atomic_writer import save_json, write_json_atomic
+from utils.keyed_collection import ensure_keyed
+
+logger = logging.getLogger(__name__)
+
+_PARTITION_FILE = re.compile(r"^(\d{4}-\d{2})\.json$")
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def partition_directory(data_file):
+    """Get the partition directory belonging to a waste data file"""
+    return os.path.splitext(data_file)[0] + "_logs"
+
+
+def log_month(log):
+    """Get the partition (YYYY-MM) a log belongs to"""
+    return log["timestamp"][:7]
+
+
+def timestamp_epoch(timestamp):
+    """Get the epoch seconds of a local "YYYY-MM-DD HH:MM:SS" timestamp"""
+    return datetime.datetime.fromisoformat(timestamp).timestamp()
+
+
+def _record_epoch(record):
+    return record["ts"]
+
+
+def ensure_time_order(records):
+    """
+    Backfill the cached "ts" epoch of records and keep them in time order
+
+    Records written with a "ts" are appended in order, so after the first
+    call this is a single pass without any timestamp parsing.
+
+    Args:
+        records (list): Records with a "timestamp" (sorted in place if needed)
+
+    Returns:
+        bool: True if records were stamped or reordered
+    """
+    changed = False
+    previous = None
+    ordered = True
+    for record in records:
+        ts = record.get("ts")
+        if ts is None:
+            ts = record["ts"] = timestamp_epoch(record["timestamp"])
+            changed = True
+        if previous is not None and ts < previous:
+            ordered = False
+        previous = ts
+    if not ordered:
+        records.sort(key=_record_epoch)
+        changed = True
+    return changed
+
+
+def insert_in_time_order(records, record):
+    """
+    Add a record to a list kept in "ts" order (appending in the usual case)
+
+    Args:
+        records (list): Records sorted by "ts"
+        record (dict): Record with a "ts" epoch
+    """
+    if not records or records[-1]["ts"] <= record["ts"]:
+        records.append(record)
+    else:
+        records.insert(bisect.bisect_right(records, record["ts"], key=_record_epoch), record)
+
+
+def _previous_month(month):
+    """Get the YYYY-MM month before a YYYY-MM month"""
+    year, number = int(month[:4]), int(month[5:7])
+    return f"{year - 1}-12" if number == 1 else f"{year}-{number - 1:02d}"
+
+
+def _day_epoch(day, offset=0):
+    """Get the epoch seconds of local midnight at the start of a YYYY-MM-DD day (plus offset days)"""
+    start = datetime.datetime.fromisoformat(day[:10]) + datetime.timedelta(days=offset)
+    return start.timestamp()
+
+
+class MonthlyLogStore:
+    """
+    Donation/waste logs partitioned into one file per month
+    """
+
+    def __init__(self, directory):
+        """
+        Open (or create) a partition directory
+
+        Args:
+            directory (str): Directory holding the YYYY-MM.json partitions
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._months = sorted(
+            match.group(1) for match in map(_PARTITION_FILE.match, os.listdir(directory)) if match
+        )
+        self._open = {}  # month -> document of the writable partitions held in memory
+
+    def _path(self, month):
+        return os.path.join(self.directory, f"{month}.json")
+
+    def months(self):
+        """Get the months that have a partition, oldest first"""
+        with self._lock:
+            return list(self._months)
+
+    def current_month(self):
+        """Get the month of the writable partition"""
+        return datetime.datetime.now().strftime("%Y-%m")
+
+    def writable_months(self):
+        """Get the months that accept new logs: the current one and the one that just closed"""
+        current = self.current_month()
+        return (_previous_month(current), current)
+
+    def load(self, month):
+        """
+        Get the logs of a month, oldest first
+
+        Args:
+            month (str): Partition month (YYYY-MM)
+
+        Returns:
+            list: Logs (shared; do not modify closed months)
+        """
+        with self._lock:
+            if month in self._open:
+                return self._open[month]["logs"]
+            if month not in self._months:
+                return []
+            try:
+                logs = load_json(self._path(month), shared=True)["logs"]
+            except Exception as e:
+                logging.error(f"File operation failed: {e}")
+                raise
+            # Partitions written before logs carried "ts" are stamped in the shared cached copy
+            ensure_time_order(logs)
+            return logs
+
+    def _writable(self, month=None):
+        """Get the document of a writable partition (the current month's by default)"""
+        month = month or self.current_month()
+        document = self._open.get(month)
+        if document is None:
+            if month in self._months:
+                try:
+                    document = load_json(self._path(month), shared=True)
+                except Exception as e:
+                    logging.error(f"File operation failed: {e}")
+                    raise
+            else:
+                document = {"month": month, "logs": []}
+            ensure_time_order(ensure_keyed(document, "logs"))
+            writable = self.writable_months()
+            for other in list(self._open):
+                if other not in writable:
+                    del self._open[other]
+            self._open[month] = document
+        return document
+
+    def _save(self, month):
+        document = self._open[month]
+        try:
+            save_json(self._path(month), document)
+        except Exception as e:
+            logging.error(f"File operation failed: {e}")
+            raise
+        if month not in self._months:
+            self._months.append(month)
+            self._months.sort()
+
+    def append(self, log):
+        """
+        Add a log to the partition of its month
+
+        A log stamped just before midnight at the end of a month may arrive
+        after the month has closed, so the previous month stays writable.
+
+        Args:
+            log (dict): Log with an "id" and a "timestamp" (YYYY-MM-DD HH:MM:SS);
+                its "ts" epoch is added if missing
+
+        Raises:
+            ValueError: If the log belongs to an older month
+        """
+        month = log_month(log)
+        with self._lock:
+            writable = self.writable_months()
+            if month not in writable:
+                raise ValueError(f"Partition {month} is closed; only {' and '.join(writable)} are writable")
+            document = self._writable(month)
+            if log.get("ts") is None:
+                log["ts"] = timestamp_epoch(log["timestamp"])
+            insert_in_time_order(document["logs"], log)
+            self._save(month)
+
+    def update(self, log_id, fields, month=None):
+        """
+        Update a log
+
+        Writable months are saved through the coalescing writer; a closed
+        month's partition is rewritten at once.
+
+        Args:
+            log_id (str): Log ID
+            fields (dict): Fields to set
+            month (str, optional): Partition month (YYYY-MM), defaults to the current month
+
+        Returns:
+            dict: Updated log, or None if the month has no such log
+        """
+        with self._lock:
+            month = month or self.current_month()
+            if month in self.writable_months():
+                log = self._writable(month)["logs"].update(log_id, fields)
+                if log is not None:
+                    self._save(month)
+                return log
+
+            if month not in self._months:
+                return None
+            try:
+                document = load_json(self._path(month), shared=True)
+            except Exception as e:
+                logging.error(f"File operation failed: {e}")
+                raise
+            logs = ensure_keyed(document, "logs")
+            ensure_time_order(logs)
+            log = logs.update(log_id, fields)
+            if log is not None:
+                try:
+                    write_json_atomic(self._path(month), document)
+                except Exception as e:
+                    logging.error(f"File operation failed: {e}")
+                    raise
+            return log
+
+    def iter_pages(self, page_size=100, start_date=None, end_date=None):
+        """
+        Iterate over logs newest first, one page at a time
+
+        Partitions are only read when the iteration reaches them, and the
+        date range is located in each partition by bisecting the "ts" epochs.
+
+        Args:
+            page_size (int): Maximum number of logs per page
+            start_date (str, optional): Earliest day to include (YYYY-MM-DD)
+            end_date (str, optional): Latest day to include (YYYY-MM-DD)
+
+        Yields:
+            list: Up to page_size logs
+        """
+        start_ts = _day_epoch(start_date) if start_date else None
+        end_ts = _day_epoch(end_date, offset=1) if end_date else None
+        page = []
+        for month in reversed(self.months()):
+            if start_date and month < start_date[:7]:
+                break
+            if end_date and month > end_date[:7]:
+                continue
+            logs = self.load(month)
+            low = bisect.bisect_left(logs, start_ts, key=_record_epoch) if start_ts is not None else 0
+            high = bisect.bisect_left(logs, end_ts, key=_record_epoch) if end_ts is not None else len(logs)
+            for position in range(high - 1, low - 1, -1):
+                page.append(logs[position])
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+        if page:
+            yield page
+
+    def iter_logs(self, start_date=None, end_date=None):
+        """Iterate over logs newest first (see ``iter_pages``)"""
+        for page in self.iter_pages(start_date=start_date, end_date=end_date):
+            yield from page
+
+    def import_logs(self, logs):
+        """
+        Move logs (e.g. from the old single-list format) into their partitions
+
+        Closed months are written too; this is a migration, not a regular write.
+
+        Args:
+            logs (list): Logs in any order
+
+        Returns:
+            dict: Number of logs imported per month (logs whose id is already
+                in their partition, e.g. from an interrupted import, are skipped)
+        """
+        by_month = {}
+        for log in logs:
+            if log.get("ts") is None:
+                log["ts"] = timestamp_epoch(log["timestamp"])
+            by_month.setdefault(log_month(log), []).append(log)
+
+        imported = {}
+        with self._lock:
+            for month, month_logs in sorted(by_month.items()):
+                existing = list(self.load(month))
+                seen = {log["id"] for log in existing}
+                new_logs = []
+                for log in month_logs:
+                    if log["id"] not in seen:
+                        seen.add(log["id"])
+                        new_logs.append(log)
+                imported[month] = len(new_logs)
+                if not new_logs:
+                    continue
+                merged = sorted(existing + new_logs, key=_record_epoch)
+                document = {"month": month, "logs": merged}
+                try:
+                    write_json_atomic(self._path(month), document)
+                except Exception as e:
+                    logging.error(f"File operation failed: {e}")
+                    raise
+                if month not in self._months:
+                    self._months.append(month)
+                    self._months.sort()
+                if month in self._open:
+                    ensure_keyed(document, "logs")
+                    self._open[month] = document
+        return imported
+
+
+def get_log_store(directory):
+    """
+    Get the shared log store for a partition directory
+
+    Every writer in the process must use the same instance so that the
+    in-memory current partition is not overwritten by a stale copy.
+
+    Args:
+        directory (str): Partition directory
+
+    Returns:
+        MonthlyLogStore: Shared store
+    """
+    key = os.path.abspath(directory)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = MonthlyLogStore(directory)
+            _stores[key] = store
+        return store
@@ -0,0 +1,176 @@
+"""
+Daily rollups of donated and wasted stock, kept in the waste data document
+
+Migrate existing data files with ``python -m modules.waste_rollups``.
+"""
+
+import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOTAL_FIELDS = ("donated", "wasted", "donated_cost", "wasted_cost")
+
+# Number of days before the newest bucket that are kept
+ROLLUP_DAYS = 400
+
+
+def empty_rollups():
+    """Get rollups with no activity"""
+    return {"days": {}, "log_count": 0}
+
+
+def _empty_totals():
+    return dict.fromkeys(TOTAL_FIELDS, 0)
+
+
+def _cutoff(day, keep_days):
+    """Get the oldest day kept when `day` is the newest"""
+    return (datetime.date.fromisoformat(day) - datetime.timedelta(days=keep_days)).isoformat()
+
+
+def add_log(rollups, log, keep_days=ROLLUP_DAYS):
+    """
+    Add a donation or waste log to the rollups
+
+    Args:
+        rollups (dict): Rollups to update
+        log (dict): Log with product_name, quantity, total_cost, timestamp
+            and recipient (None for waste)
+        keep_days (int): Days kept before the newest bucket
+    """
+    rollups["log_count"] = rollups.get("log_count", 0) + 1
+    day = log["timestamp"][:10]
+    quantity = log.get("quantity") or 0
+    cost = log.get("total_cost") or 0
+    kind = "donated" if log.get("recipient") else "wasted"
+
+    bucket = rollups["days"].get(day)
+    if bucket is None:
+        cutoff = _cutoff(max(day, max(rollups["days"], default=day)), keep_days)
+        if day < cutoff:
+            return  # Older than anything the rollups keep
+        for old_day in [old_day for old_day in rollups["days"] if old_day < cutoff]:
+            del rollups["days"][old_day]
+        bucket = _empty_totals()
+        bucket["products"] = {}
+        bucket["recipients"] = {}
+        rollups["days"][day] = bucket
+
+    product = bucket["products"].get(log["product_name"])
+    if product is None:
+        product = bucket["products"][log["product_name"]] = _empty_totals()
+
+    for totals in (bucket, product):
+        totals[kind] += quantity
+        totals[f"{kind}_cost"] += cost
+
+    if kind == "donated":
+        recipient = bucket["recipients"].setdefault(log["recipient"], {"quantity": 0, "cost": 0})
+        recipient["quantity"] += quantity
+        recipient["cost"] += cost
+
+
+def rebuild_rollups(logs, today=None, keep_days=ROLLUP_DAYS):
+    """
+    Build rollups from scratch
+
+    Args:
+        logs (iterable): Every donation and waste log, in any order
+        today (date, optional): Newest day kept, defaults to today
+        keep_days (int): Days kept before today
+
+    Returns:
+        dict: New rollups
+    """
+    if today is None:
+        today = datetime.date.today()
+    cutoff = _cutoff(today.isoformat(), keep_days)
+
+    rollups = empty_rollups()
+    for log in logs:
+        if log["timestamp"][:10] < cutoff:
+            rollups["log_count"] += 1
+        else:
+            add_log(rollups, log, keep_days=keep_days)
+    return rollups
+
+
+def _window_days(days, today):
+    """Get the day keys from `days` days ago through today"""
+    start = today - datetime.timedelta(days=days)
+    return [(start + datetime.timedelta(days=offset)).isoformat() for offset in range(days + 1)]
+
+
+def window_totals(rollups, days, today=None):
+    """
+    Sum the rollups over a window of days
+
+    Args:
+        rollups (dict): Rollups
+        days (int): Number of days before today to include (today is always included)
+        today (date, optional): Reference date, defaults to today
+
+    Returns:
+        dict: Donated/wasted quantity and cost in total, per product and per recipient
+    """
+    if today is None:
+        today = datetime.date.today()
+
+    result = _empty_totals()
+    result["products"] = {}
+    result["recipients"] = {}
+    for day in _window_days(days, today):
+        bucket = rollups["days"].get(day)
+        if bucket is None:
+            continue
+        for field in TOTAL_FIELDS:
+            result[field] += bucket[field]
+        for name, totals in bucket["products"].items():
+            product = result["products"].setdefault(name, _empty_totals())
+            for field in TOTAL_FIELDS:
+                product[field] += totals[field]
+        for name, totals in bucket["recipients"].items():
+            recipient = result["recipients"].setdefault(name, {"quantity": 0, "cost": 0})
+            recipient["quantity"] += totals["quantity"]
+            recipient["cost"] += totals["cost"]
+    return result
+
+
+def product_totals(rollups, product_name, days, today=None):
+    """
+    Sum one product's rollups over a window of days
+
+    Args:
+        rollups (dict): Rollups
+        product_name (str): Product name
+        days (int): Number of days before today to include (today is always included)
+        today (date, optional): Reference date, defaults to today
+
+    Returns:
+        dict: Donated/wasted quantity and cost of the product
+    """
+    if today is None:
+        today = datetime.date.today()
+
+    result = _empty_totals()
+    for day in _window_days(days, today):
+        bucket = rollups["days"].get(day)
+        totals = bucket["products"].get(product_name) if bucket is not None else None
+        if totals is not None:
+            for field in TOTAL_FIELDS:
+                result[field] += totals[field]
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+    from modules.waste_management import WasteManagement
+
+    parser = argparse.ArgumentParser(description="Rebuild the waste rollups from the donation/waste logs")
+    parser.add_argument("--data-file", default="data/waste_management.json")
+    args = parser.parse_args()
+
+    # Opening the data file also moves logs from the old single-list format into partitions
+    rollups = WasteManagement(args.data_file).rebuild_rollups()
+    print(f"{args.data_file}: {rollups['log_count']} logs in {len(rollups['days'])} day buckets")
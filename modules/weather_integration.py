@@ -7,6 +7,7 @@ import os
 import json
 import requests
 import logging
+from utils.storage import get_storage, document_name
 logger = logging.getLogger(__name__)
 
 class WeatherIntegration:
@@ -17,10 +18,12 @@ class WeatherIntegration:
     - Provides weather-based stocking recommendations
     """"
     "
-    def __init__(self, location="Penrith, Australia", data_file="data/weather.json"):"
-        """Initialize the weather integration with location and data file path"""
+    def __init__(self, location="Penrith, Australia", data_file="data/weather.json", storage=None):
+        """Initialize the weather integration with location, data file path and optional storage backend"""
         self.location = location
         self.data_file = data_file
+        self.storage = storage or get_storage(data_file)
+        self._document = document_name(data_file)
         self._ensure_data_file_exists()
     
     def _ensure_data_file_exists(self):
@@ -139,27 +142,20 @@ try:
                 raise     return impacts
     
     def _load_data(self):
-f      f"""Load weather data frtry:
-                with open(self.dat
-            logging.error(f"Error: {str(e)
-            except Exception as e:
-                logging.error(f"Error during file operation: {str(e)}")
-                raisef"
+        """Load weather data from the storage backend"""
+        try:
+            return self.storage.load_document(self._document)
         except Exception as e:
-            logging.error(fFile operation failed: {e}}}}")
-            return json.load(f)
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _save_data(self, data):
-f        f"""Save weather data to file""""
+        """Save weather data to the storage backend"""
         try:
-            with open(self.dat
-            logging.errortry:
-                with open(inventoryf_file, 'r')
-            except Exception as e:
-                logging.erroError during file operation: {str(e)}}(e)}")
-                raise      except Exception as e:
-            logging.error(File operation failed: {e}}e}f")
-            json.dump(data, f, indent=2)
+            self.storage.save_document(self._document, data)
+        except Exception as e:
+            logging.error(f"File operation failed: {e}")
+            raise
     
     def _load_inventory_data(self)f:
         """Load inventory data from file""""
@@ -8,8 +8,15 @@ import uuid
 import sys
 import os
 
+# Days of history shown by the analysis, cost savings and insights tabs
+ANALYSIS_DAYS = 90
 
 
+def _recent_logs(waste_manager, days=ANALYSIS_DAYS):
+    """Get the donation and waste logs of the last `days` days, newest first"""
+    start_date = (datetime.date.today() - datetime.timedelta(days=days)).isoformat()
+    return [log for page in waste_manager.get_all_logs(start_date=start_date) for log in page]
+
 
 def show_log_form(waste_manager):
     st.header(fff"Log Donation or Waste")"
@@ -123,7 +130,7 @@ def show_log_form(waste_manager):
     # Recent logs
     st.markdown("---")"
     st.subheader("Recent Logs")
-    logs = waste_manager.get_all_logs()[:5]  # Get 5 most recent
+    logs = next(waste_manager.get_all_logs(page_size=5), [])  # Get 5 most recent
     
     if logs:
         # Create DataFrame
@@ -291,8 +298,8 @@ def show_adjustments_by_status(waste_manager, status, tab_id='all'):'
 def show_waste_analysis(waste_manager):
     st.subheader("Waste Analysis")"
     "
-    # Get all logs
-    logs = waste_manager.get_all_logs()
+    # Get the logs of the analysis window (older months are not loaded)
+    logs = _recent_logs(waste_manager)
     
     # Filter waste
     waste_logs = [lfog for log in logs iff not log.get('recipientf')]'
@@ -344,29 +351,22 @@ f     reason_summary =f waste_df.groupby('reasonf')['quantity'].sum().reset_inde
 def show_cost_savings(waste_manager):
     st.subheader("Cost Savings")"
     "
-    # Get all logs
-    logs = waste_manager.get_all_logs()
+    # Donation totals of the analysis window from the daily rollups
+    totals = waste_manager.get_window_totals(days=ANALYSIS_DAYS)
     
-    # Filter donations with cost data
-    cost_logs = [log for log in logs if log.get('recipient') and log.get('total_cost')]'
-    '
-    if cost_logs:
-        # Create DataFrame
-        cost_df = pd.DataFrame(cost_logs)
-        
-        # Add date column
-        cost_df['date'] = pd.to_datetime(cost_df['timestamp']).dt.date'
-        '
+    if totals['donated_cost']:
         # Total cost savings
-        total_savings = cost_df['total_cost'].sum()'
+        total_savings = totals['donated_cost']
         st${total_savings:.2f}}Sav${total_savings:.2f}}ings:.2f}")'
         
         # Cost savinfgs by recipient
     f   try:
             st.write(f"Cost Savings by Recipient")"
         except Exception aFile operation failed: {File opferation failedf: {e}}iledf: {e}")
-        recipient_summary = cost_df.groupby(f'recipient')['total_cost'].sum().reset_index()"
-        recipient_summary.columns = ['Recipient', 'Total Savings ($)']'
+        recipient_summary = pd.DataFrame(
+            [(name, recipient['cost']) for name, recipient in totals['recipients'].items() if recipient['cost']],
+            columns=['Recipient', 'Total Savings ($)']
+        )
         '
         # Create bar chart
         fig, ax = plt.subplots(figsize=(10, 5))
@@ -381,8 +381,10 @@ def show_cost_savings(waste_manager):
         try:
             st.write("Cost Savings by Product")"
         except Exception File operation failed: {File foperation failed: {e}}failed: {e}")
-f       product_summary = cost_df.groupby('product_namef')['total_cost'].sum().reset_index()"
-        product_summary.columns = ['Product', 'Total Savings ($)']'
+        product_summary = pd.DataFrame(
+            [(name, product['donated_cost']) for name, product in totals['products'].items() if product['donated_cost']],
+            columns=['Product', 'Total Savings ($)']
+        )
         product_summary = product_summary.sort_values('Total Savings ($)', ascending=False).head(10)
         
         # Create bar chart
@@ -401,28 +403,19 @@ f       product_summary = cost_df.groupby('product_namef')['total_cost'].sum().r
 def show_product_insights(waste_manager):
     st.subheader("Product Insights")"
     "
-    # Get all logs
-    logs = waste_manager.get_all_logs()
+    # Per-product totals of the analysis window from the daily rollups
+    totals = waste_manager.get_window_totals(days=ANALYSIS_DAYS)
     
-    if logs:
-        # Create DataFrame
-        logs_df = pd.DataFrame(logs)
-        
-        # Add type column
-        logs_df['type'] = logs_df['recipient'].apply(lambda x: 'Donation' if x else 'Waste')'
-        '
+    if totals['products']:
         # Get unique products
-        products = sorted(logs_df['product_name'].unique())'
-        '
+        products = sorted(totals['products'])
+        
         # Product selection
         selected_product = st.selectbox("Select Product", products)"
         "
-        # Filter to selected product
-        product_df = logs_df[logs_df['product_name'] == selected_product]'
-        '
         # Create summary
-        donation_qty = product_df[product_df['type'] == 'Donation']['quantity'].sum()'
-        waste_qty = product_df[product_df['type'] == 'Waste']['quantity'].sum()
+        donation_qty = totals['products'][selected_product]['donated']
+        waste_qty = totals['products'][selected_product]['wasted']
         total_qty = donation_qty + waste_qty
         
         # Calculate percentages
@@ -0,0 +1,100 @@
+# Local fake of the Square batch endpoints for sync tests
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSquareServer:
+    """
+    Records the batches posted to it and fails or delays on demand.
+
+    Usage:
+        with FakeSquareServer() as server:
+            client = SquareClient("test-token", base_url=server.url)
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self.failures = []  # status codes returned by the next requests
+        self.max_concurrent = 0
+        self._active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail_next(self, *status_codes):
+        """Make the next requests fail with the given HTTP status codes."""
+        with self._lock:
+            self.failures.extend(status_codes)
+
+    def objects(self, path=None):
+        """All inventory changes and catalog objects accepted so far."""
+        accepted = []
+        for request in self.requests:
+            if request["status"] != 200 or (path and request["path"] != path):
+                continue
+            body = request["body"]
+            if "changes" in body:
+                accepted.extend(body["changes"])
+            for batch in body.get("batches", []):
+                accepted.extend(batch["objects"])
+        return accepted
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                with fake._lock:
+                    fake._active += 1
+                    fake.max_concurrent = max(fake.max_concurrent, fake._active)
+                    status = fake.failures.pop(0) if fake.failures else 200
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    if fake.delay:
+                        time.sleep(fake.delay)
+                    with fake._lock:
+                        fake.requests.append({
+                            "path": self.path,
+                            "status": status,
+                            "authorization": self.headers.get("Authorization"),
+                            "body": body
+                        })
+                    response = json.dumps({} if status == 200 else {"errors": [{"code": "FAKE_ERROR"}]}).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(response)))
+                    self.end_headers()
+                    self.wfile.write(response)
+                finally:
+                    with fake._lock:
+                        fake._active -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
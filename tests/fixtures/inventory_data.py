@@ -34,3 +34,15 @@ SAMPLE_INVENTORY = [
         "expiry_date": "2025-12-31"
     }
 ]
+
+# Sample stock items with prices and reorder points (milk sits exactly on its reorder point)
+SAMPLE_STOCK_ITEMS = [
+    {"id": "apples", "name": "Apples", "category": "Produce", "supplier": "Local Farms", "quantity": 50,
+     "reorder_point": 10, "cost_price": 1.25, "selling_price": 2.99, "last_updated": "2025-04-01T09:00:00"},
+    {"id": "milk", "name": "Milk 2L", "category": "Dairy", "supplier": "Penrith Dairy", "quantity": 5,
+     "reorder_point": 5, "cost_price": 2.10, "selling_price": 3.50, "last_updated": "2025-04-02T10:30:00"},
+    {"id": "yogurt", "name": "Yogurt", "category": "Dairy", "supplier": "Penrith Dairy", "quantity": 2,
+     "reorder_point": 6, "cost_price": 1.80, "selling_price": 3.20, "last_updated": "2025-04-03T08:15:00"},
+    {"id": "bananas", "name": "Bananas", "category": "Produce", "supplier": "Local Farms", "quantity": 12,
+     "reorder_point": 15, "cost_price": 0.75, "selling_price": 1.60, "last_updated": "2025-04-03T08:20:00"}
+]
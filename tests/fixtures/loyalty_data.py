@@ -0,0 +1,30 @@
+import logging
+
+# Sample loyalty members with differently formatted phone numbers
+SAMPLE_CUSTOMERS = [
+    {"id": "c1", "name": "John Smith", "email": "john.smith@example.com", "phone": "0412-555-001",
+     "points": 100, "last_visit": "2025-04-01"},
+    {"id": "c2", "name": "Sarah Johnson", "email": "sarah.j@example.com", "phone": "0412-555-002",
+     "points": 60, "last_visit": "2025-04-20"},
+    {"id": "c3", "name": "David Johnson", "email": "david.j@example.com", "phone": "0413 777 003",
+     "points": 20, "last_visit": "2025-03-15"}
+]
+
+# Sample loyalty program document without any history
+SAMPLE_LOYALTY_DOCUMENT = {
+    "customers": [
+        {"id": "c1", "name": "John Smith", "email": "john@example.com", "phone": "0412555001", "points": 10,
+         "lifetime_points": 10, "visit_count": 1, "total_spend": 10.0, "last_visit": "2025-04-01"},
+        {"id": "c2", "name": "Sarah Johnson", "email": "sarah@example.com", "phone": "0412555002", "points": 60,
+         "lifetime_points": 80, "visit_count": 5, "total_spend": 90.0, "last_visit": "2025-04-10"}
+    ],
+    "transactions": [],
+    "redemptions": []
+}
+
+# Sample transaction history: two customers, one record each at 09:00 and 15:00 for ten days
+SAMPLE_HISTORY = [
+    {"id": f"t{day:02d}{hour:02d}", "customer_id": customer_id, "date": f"2025-04-{day:02d} {hour:02d}:00:00"}
+    for day in range(1, 11)
+    for hour, customer_id in ((9, "c1"), (15, "c2"))
+]
@@ -1,6 +1,7 @@
 # Mock configuration for testing
 import os
 import logging
+from datetime import date
 
 # Mock database configuration
 MOCK_DB_CONFIG = {
@@ -19,3 +20,6 @@ MOCK_API_KEYS = {
 
 # Test data directory
 TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Reference date the sample data is dated against
+SAMPLE_TODAY = date(2025, 4, 30)
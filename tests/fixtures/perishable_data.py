@@ -0,0 +1,38 @@
+import logging
+
+from tests.fixtures.mock_config import SAMPLE_TODAY
+
+# Sample batches in no particular expiry order (eggs_1 expired yesterday)
+SAMPLE_EXPIRY_BATCHES = [
+    {"id": "milk_2", "expiration_date": "2025-05-10"},
+    {"id": "milk_1", "expiration_date": "2025-05-02"},
+    {"id": "bread_1", "expiration_date": "2025-05-02"},
+    {"id": "eggs_1", "expiration_date": "2025-04-29"},
+    {"id": "cheese_1", "expiration_date": "2025-06-09"}
+]
+
+# Sample scannable batches, found by id, SKU or batch number
+SAMPLE_SCAN_DOCUMENT = {
+    "inventory_items": [
+        {"id": "milk_1", "name": "Milk", "sku": "DAI1001", "batch_number": "B1", "quantity": 2},
+        {"id": "milk_2", "name": "Milk", "sku": "DAI1002", "batch_number": "B2", "quantity": 10},
+        {"id": "bread_1", "name": "Bread", "sku": "BAK2001", "batch_number": "B3", "quantity": 0}
+    ]
+}
+
+# Sample batches of two products for FEFO sale allocation
+SAMPLE_FEFO_BATCHES = [
+    {"id": "milk_new", "name": "Milk", "batch_number": "M3", "quantity": 10, "expiration_date": "2025-05-20"},
+    {"id": "milk_old", "name": "Milk", "batch_number": "M1", "quantity": 3, "expiration_date": "2025-05-01"},
+    {"id": "milk_mid", "name": "Milk", "batch_number": "M2", "quantity": 0, "expiration_date": "2025-05-05"},
+    {"id": "milk_mid2", "name": "Milk", "batch_number": "M4", "quantity": 4, "expiration_date": "2025-05-05"},
+    {"id": "bread_1", "name": "Bread", "batch_number": "B1", "quantity": 5, "expiration_date": "2025-05-02"}
+]
+
+# Sample batches with categories and locations for the stock summary
+SAMPLE_STOCK_BATCHES = [
+    {"id": "milk_1", "name": "Milk", "category": "Dairy", "location": "Fridge 1", "quantity": 4, "expiration_date": "2025-05-03"},
+    {"id": "bread_1", "name": "Bread", "category": "Bakery", "location": "Shelf A", "quantity": 7, "expiration_date": "2025-04-29"},
+    {"id": "milk_2", "name": "Milk", "category": "Dairy", "location": "Fridge 2", "quantity": 6, "expiration_date": "2025-05-12"},
+    {"id": "milk_3", "name": "Milk", "category": "Dairy", "location": "Fridge 1", "quantity": 0, "expiration_date": "2025-05-08"}
+]
@@ -0,0 +1,17 @@
+import logging
+
+# Sample donation and waste logs (logs with a recipient are donations)
+SAMPLE_WASTE_LOGS = [
+    {"product_name": "Milk", "quantity": 4, "recipient": "Food Bank", "total_cost": 6.0, "timestamp": "2025-04-30 09:00:00"},
+    {"product_name": "Milk", "quantity": 2, "recipient": None, "total_cost": 3.0, "timestamp": "2025-04-28 18:00:00"},
+    {"product_name": "Bread", "quantity": 5, "recipient": "Local Shelter", "total_cost": 0, "timestamp": "2025-04-23 12:00:00"},
+    {"product_name": "Bread", "quantity": 3, "recipient": None, "total_cost": 3.6, "timestamp": "2025-04-01 12:00:00"}
+]
+
+# Sample waste logs spread over three months, in no particular order
+SAMPLE_PARTITION_LOGS = [
+    {"id": "feb", "product_name": "Milk", "quantity": 1, "recipient": None, "timestamp": "2025-02-14 10:00:00"},
+    {"id": "apr-2", "product_name": "Milk", "quantity": 1, "recipient": None, "timestamp": "2025-04-20 10:00:00"},
+    {"id": "mar", "product_name": "Milk", "quantity": 1, "recipient": None, "timestamp": "2025-03-03 10:00:00"},
+    {"id": "apr-1", "product_name": "Milk", "quantity": 1, "recipient": None, "timestamp": "2025-04-02 10:00:00"}
+]
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the atomic, coalescing JSON writer.
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from utils import atomic_writer, json_cache
+from utils.atomic_writer import CoalescingWriter, write_json_atomic
+
+
+class TestWriteJsonAtomic(unittest.TestCase):
+    """Test cases for write_json_atomic."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "data.json")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_writes_compact_json(self):
+        """Test that the document is written without indentation."""
+        write_json_atomic(self.path, {"items": [1, 2], "name": "store"})
+
+        with open(self.path) as f:
+            content = f.read()
+        self.assertEqual(json.loads(content), {"items": [1, 2], "name": "store"})
+        self.assertNotIn("\n", content)
+        self.assertEqual(os.listdir(self.temp_dir), ["data.json"])
+
+    def test_failed_write_keeps_old_file(self):
+        """Test that a failure during the write leaves the previous file intact."""
+        write_json_atomic(self.path, {"version": 1})
+
+        with patch("utils.atomic_writer.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                write_json_atomic(self.path, {"version": 2})
+
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"version": 1})
+        self.assertEqual(os.listdir(self.temp_dir), ["data.json"])
+
+    def test_unserializable_document_keeps_old_file(self):
+        """Test that a document that cannot be serialized never touches the file."""
+        write_json_atomic(self.path, {"version": 1})
+
+        with self.assertRaises(TypeError):
+            write_json_atomic(self.path, {"version": object()})
+
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"version": 1})
+
+
+class TestCoalescingWriter(unittest.TestCase):
+    """Test cases for the CoalescingWriter class."""
+
+    def setUp(self):
+        """Create a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "data.json")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_burst_is_coalesced(self):
+        """Test that many saves within the debounce window produce one write."""
+        write_json_atomic(self.path, {"count": -1}, fsync=False)
+        writer = CoalescingWriter(debounce=0.05, fsync=False)
+        data = {"count": 0}
+        for i in range(100):
+            data["count"] = i
+            writer.save(self.path, data)
+
+        # The latest document is visible to readers before it reaches the disk
+        self.assertEqual(json_cache.load_json(self.path)["count"], 99)
+        self.assertEqual(writer.pending(), [os.path.abspath(self.path)])
+
+        deadline = time.time() + 5
+        while writer.pending() and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(writer.stats, {"saves": 100, "writes": 1})
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"count": 99})
+
+    def test_flush_writes_immediately(self):
+        """Test that flush writes pending documents without waiting."""
+        writer = CoalescingWriter(debounce=60, fsync=False)
+        writer.save(self.path, {"saved": True})
+        self.assertFalse(os.path.exists(self.path))
+        # A new file is loadable before its first write reaches the disk
+        self.assertEqual(json_cache.load_json(self.path), {"saved": True})
+
+        self.assertEqual(writer.flush(), 1)
+        self.assertEqual(writer.pending(), [])
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"saved": True})
+
+    def test_zero_debounce_writes_every_save(self):
+        """Test that a zero debounce window writes synchronously."""
+        writer = CoalescingWriter(debounce=0, fsync=False)
+        writer.save(self.path, {"a": 1})
+        writer.save(self.path, {"a": 2})
+
+        self.assertEqual(writer.stats["writes"], 2)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"a": 2})
+
+    def test_failed_write_stays_pending(self):
+        """Test that a document whose write failed is retried by the next flush."""
+        writer = CoalescingWriter(debounce=60, fsync=False)
+        writer.save(self.path, {"retry": True})
+
+        with patch("utils.atomic_writer.write_json_atomic", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                writer.flush()
+        self.assertEqual(writer.pending(), [os.path.abspath(self.path)])
+
+        self.assertEqual(writer.flush(), 1)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"retry": True})
+
+
+class TestDumps(unittest.TestCase):
+    """Test cases for the serializer."""
+
+    def test_json_fallback(self):
+        """Test that documents serialize the same with and without orjson."""
+        with patch.object(atomic_writer, "orjson", None):
+            self.assertEqual(atomic_writer.dumps({"a": [1, "b"]}), b'{"a":[1,"b"]}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the loyalty customer index.
+"""
+
+import unittest
+import sys
+import os
+import copy
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.loyalty_program.customer_index import CustomerIndex, normalize_phone
+
+# Import test fixtures
+from tests.fixtures.loyalty_data import SAMPLE_CUSTOMERS
+
+
+class TestCustomerIndex(unittest.TestCase):
+    """Test cases for the CustomerIndex class."""
+
+    def setUp(self):
+        """Index a few customers."""
+        self.customers = copy.deepcopy(SAMPLE_CUSTOMERS)
+        self.index = CustomerIndex(self.customers)
+
+    def ids(self, customers):
+        return [c["id"] for c in customers]
+
+    def test_phone_and_email_lookup(self):
+        """Test exact lookups ignore phone formatting and email case."""
+        self.assertEqual(normalize_phone("+61 412 555 001"), "0412555001")
+        self.assertEqual(self.ids(self.index.find_by_phone("+61 412 555 001")), ["c1"])
+        self.assertEqual(self.ids(self.index.find_by_phone("0413777003")), ["c3"])
+        self.assertEqual(self.index.find_by_phone("0400000000"), [])
+        self.assertEqual(self.index.find_by_email("Sarah.J@Example.com")["id"], "c2")
+
+    def test_prefix_search(self):
+        """Test prefix search over name words, full name, email and phone digits."""
+        self.assertEqual(sorted(self.ids(self.index.search("john"))), ["c1", "c2", "c3"])
+        self.assertEqual(sorted(self.ids(self.index.search("Johns"))), ["c2", "c3"])
+        self.assertEqual(self.ids(self.index.search("david j")), ["c3"])
+        self.assertEqual(sorted(self.ids(self.index.search("0412 555"))), ["c1", "c2"])
+        self.assertEqual(self.index.search(""), [])
+        self.assertEqual(len(self.index.search("john", limit=1)), 1)
+
+    def test_sorted_views_follow_updates(self):
+        """Test points/last visit views after add and in-place updates."""
+        self.assertEqual(self.ids(self.index.sorted_by("points")), ["c1", "c2", "c3"])
+
+        new = {"id": "c4", "name": "Emma Davis", "email": "emma.d@example.com", "phone": "0412-555-004",
+               "points": 80, "last_visit": "2025-04-25"}
+        self.customers.append(new)
+        self.index.add(new)
+        self.assertTrue(self.index.is_current(self.customers))
+        self.assertEqual(self.ids(self.index.sorted_by("points", limit=2)), ["c1", "c4"])
+        self.assertEqual(self.ids(self.index.sorted_by("last_visit", descending=False)), ["c3", "c1", "c2", "c4"])
+
+        self.index.search("warm up the prefix index")
+        old_values = {"phone": self.customers[2]["phone"], "name": self.customers[2]["name"]}
+        self.customers[2].update({"points": 150, "phone": "0499 000 111", "name": "David Jones"})
+        self.index.update(self.customers[2], old_values)
+        self.assertEqual(self.ids(self.index.sorted_by("points", limit=1)), ["c3"])
+        self.assertEqual(self.ids(self.index.find_by_phone("0499000111")), ["c3"])
+        self.assertEqual(self.index.find_by_phone("0413777003"), [])
+        self.assertEqual(self.ids(self.index.search("johnson")), ["c2"])
+
+    def test_stale_view_is_rebuilt(self):
+        """Test that a record changed without update() does not leave a wrong order."""
+        self.customers[0]["points"] = 5
+        self.assertEqual(self.ids(self.index.sorted_by("points")), ["c2", "c3", "c1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
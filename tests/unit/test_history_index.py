@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the loyalty history index.
+"""
+
+import unittest
+import sys
+import os
+import copy
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.loyalty_program.history_index import HistoryIndex, ensure_date_order
+
+# Import test fixtures
+from tests.fixtures.loyalty_data import SAMPLE_HISTORY
+
+
+class TestHistoryIndex(unittest.TestCase):
+    """Test cases for the HistoryIndex class."""
+
+    def setUp(self):
+        """Index twenty records over ten days, shuffled."""
+        records = copy.deepcopy(SAMPLE_HISTORY)
+        self.records = records[1::2] + records[::2]
+        self.index = HistoryIndex(self.records)
+
+    def test_records_are_kept_in_date_order(self):
+        """Test that the source list is sorted once and new records are inserted in order."""
+        self.assertEqual(self.records, SAMPLE_HISTORY)
+        self.assertFalse(ensure_date_order(self.records))
+
+        self.index.add({"id": "late", "customer_id": "c1", "date": "2025-04-11 08:00:00"})
+        self.index.add({"id": "old", "customer_id": "c1", "date": "2025-04-03 12:00:00"})
+        self.assertEqual(self.records[-1]["id"], "late")
+        self.assertEqual(self.records[5]["id"], "old")
+        self.assertTrue(self.index.is_current(self.records))
+        self.assertFalse(self.index.is_current(list(self.records)))
+
+    def test_date_range(self):
+        """Test that both bounds are whole days and results are newest first."""
+        page, cursor = self.index.page(start_date="2025-04-03", end_date="2025-04-04")
+        self.assertEqual([r["id"] for r in page], ["t0415", "t0409", "t0315", "t0309"])
+        self.assertIsNone(cursor)
+        self.assertEqual(self.index.count(start_date="2025-04-10"), 2)
+        self.assertEqual(self.index.count(end_date="2025-03-31"), 0)
+
+    def test_customer_pages_with_cursor(self):
+        """Test paging through one customer's history, including a record added between pages."""
+        page, cursor = self.index.page(customer_id="c2", limit=4)
+        self.assertEqual([r["id"] for r in page], ["t1015", "t0915", "t0815", "t0715"])
+
+        self.index.add({"id": "new", "customer_id": "c2", "date": "2025-04-12 10:00:00"})
+        seen = [r["id"] for r in page]
+        while cursor:
+            page, cursor = self.index.page(customer_id="c2", limit=4, cursor=cursor)
+            seen.extend(r["id"] for r in page)
+        self.assertEqual(seen, [f"t{day:02d}15" for day in range(10, 0, -1)])
+        self.assertEqual(self.index.page(customer_id="c3"), ([], None))
+
+
+if __name__ == '__main__':
+    unittest.main()
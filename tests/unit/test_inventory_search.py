@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the inventory search index.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.inventory_search import InventorySearchIndex, tokenize
+
+SAMPLE_ITEMS = [
+    {"id": "apples", "name": "Apples - Royal Gala", "category": "Fruits & Vegetables", "supplier": "Local Organic Farms"},
+    {"id": "milk", "name": "Milk - Full Cream 2L", "category": "Dairy & Eggs", "supplier": "Penrith Dairy Co-op"},
+    {"id": "bananas", "name": "Bananas", "category": "Fruits & Vegetables", "supplier": "Local Organic Farms"},
+    {"id": "eggs", "name": "Eggs - Free Range Dozen", "category": "Dairy & Eggs", "supplier": "Happy Hens Farm"},
+    {"id": "cream", "name": "Thickened Cream 300ml", "category": "Dairy & Eggs", "supplier": "Penrith Dairy Co-op"}
+]
+
+
+class TestInventorySearchIndex(unittest.TestCase):
+    """Test cases for the InventorySearchIndex class."""
+
+    def setUp(self):
+        """Build an index over the sample items."""
+        self.index = InventorySearchIndex(SAMPLE_ITEMS)
+
+    def test_tokenize(self):
+        """Test that text is split into lowercase words."""
+        self.assertEqual(tokenize("Milk - Full Cream 2L"), ["milk", "full", "cream", "2l"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_prefix_search(self):
+        """Test that a term matches words starting with it."""
+        self.assertEqual(self.index.search("ban"), ["bananas"])
+        self.assertEqual(set(self.index.search("penr")), {"milk", "cream"})
+
+    def test_infix_search(self):
+        """Test that terms of three or more characters match inside words."""
+        self.assertEqual(self.index.search("nana"), ["bananas"])
+
+    def test_short_infix_search(self):
+        """Test that terms shorter than three characters also match inside words."""
+        self.assertEqual(self.index.search("ml"), ["cream"])
+        self.assertEqual(self.index.search("na"), ["bananas"])
+        self.assertEqual(self.index.search("re"), ["eggs", "milk", "cream"])
+
+    def test_multi_term_and(self):
+        """Test that every term must match."""
+        self.assertEqual(self.index.search("cream penrith 2l"), ["milk"])
+        self.assertEqual(self.index.search("cream bananas"), [])
+
+    def test_ranking_prefers_name_matches(self):
+        """Test that a name match ranks above a supplier or category match."""
+        self.assertEqual(self.index.search("eggs"), ["eggs", "milk", "cream"])
+
+    def test_ranking_prefers_exact_words(self):
+        """Test that an exact word match ranks above a prefix match."""
+        self.assertEqual(self.index.search("farm")[0], "eggs")
+
+    def test_limit(self):
+        """Test that the number of results can be limited."""
+        self.assertEqual(len(self.index.search("dairy", limit=2)), 2)
+
+    def test_incremental_updates(self):
+        """Test that add, update and remove keep the index consistent."""
+        self.index.add({"id": "bread", "name": "Bread - Multigrain Loaf", "category": "Bakery", "supplier": "Penrith Bakehouse"})
+        self.assertEqual(self.index.search("multigrain"), ["bread"])
+
+        self.index.update({"id": "bread", "name": "Sourdough Loaf", "category": "Bakery", "supplier": "Penrith Bakehouse"})
+        self.assertEqual(self.index.search("multigrain"), [])
+        self.assertEqual(self.index.search("sourd"), ["bread"])
+
+        self.assertTrue(self.index.remove("bread"))
+        self.assertEqual(self.index.search("bakehouse"), [])
+        self.assertFalse(self.index.remove("bread"))
+        self.assertNotIn("sourdough", self.index._vocabulary)
+
+    def test_empty_query(self):
+        """Test that an empty query returns no results."""
+        self.assertEqual(self.index.search(""), [])
+        self.assertEqual(self.index.search("  - "), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
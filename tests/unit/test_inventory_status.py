@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the vectorized inventory table, stock status and alerts.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.inventory_status import inventory_frame, inventory_snapshot, stock_alerts
+
+# Import test fixtures
+from tests.fixtures.inventory_data import SAMPLE_STOCK_ITEMS
+
+
+class TestInventoryStatus(unittest.TestCase):
+    """Test cases for inventory_frame, stock_alerts and inventory_snapshot."""
+
+    def test_status_matches_per_item_logic(self):
+        """Test that the vectorized status and low stock flags match the row-wise rule."""
+        frame = inventory_frame(SAMPLE_STOCK_ITEMS)
+        snapshot = inventory_snapshot(frame)
+
+        expected_status = ['Low' if item['quantity'] <= item['reorder_point'] else 'OK' for item in SAMPLE_STOCK_ITEMS]
+        self.assertEqual(frame['status'].tolist(), expected_status)
+        self.assertEqual(snapshot['low_stock'].tolist(), [status == 'Low' for status in expected_status])
+        self.assertEqual(frame['last_updated'].tolist()[0], "2025-04-01 09:00")
+
+    def test_alerts_match_per_item_logic(self):
+        """Test that alerts are built for exactly the low stock items, in table order."""
+        expected = [
+            {
+                "id": item['id'],
+                "name": item['name'],
+                "current_stock": item['quantity'],
+                "reorder_point": item['reorder_point'],
+                "supplier": item['supplier'],
+                "message": f"Low stock alert: Only {item['quantity']} units remaining (reorder point: {item['reorder_point']})"
+            }
+            for item in SAMPLE_STOCK_ITEMS if item['quantity'] <= item['reorder_point']
+        ]
+        snapshot = inventory_snapshot(inventory_frame(SAMPLE_STOCK_ITEMS))
+        self.assertEqual(snapshot['alerts'], expected)
+        self.assertEqual(stock_alerts(snapshot['inventory'][snapshot['low_stock']]), expected)
+
+    def test_category_totals(self):
+        """Test the per-category counts, values and low stock counts."""
+        totals = inventory_snapshot(inventory_frame(SAMPLE_STOCK_ITEMS))['category_totals']
+        self.assertEqual(totals.index.tolist(), ["Produce", "Dairy"])
+        self.assertEqual(totals.loc["Dairy", "item_count"], 2)
+        self.assertEqual(totals.loc["Dairy", "low_stock_count"], 2)
+        self.assertAlmostEqual(totals.loc["Produce", "inventory_value"], 62.5 + 9.0)
+
+    def test_empty_inventory(self):
+        """Test that an empty inventory gives an empty snapshot."""
+        snapshot = inventory_snapshot(inventory_frame([]))
+        self.assertTrue(snapshot['inventory'].empty)
+        self.assertEqual(snapshot['alerts'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
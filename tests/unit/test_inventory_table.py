@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the columnar inventory containers.
+"""
+
+import unittest
+import sys
+import os
+import uuid
+
+import numpy as np
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from models.inventory_table import InventoryTable, TransactionLog, StringInterner
+
+SAMPLE_ITEMS = [
+    {
+        "id": "6d3d30fe-6847-433a-a31c-9ce720195521",
+        "name": "Apples - Royal Gala",
+        "category": "Fruits & Vegetables",
+        "supplier": "Local Organic Farms",
+        "quantity": 50,
+        "reorder_point": 15,
+        "cost_price": 1.25,
+        "selling_price": 2.99,
+        "last_updated": "2025-04-01T22:54:56.160071"
+    },
+    {
+        "id": "0e8fd8a4-5ad1-4f5e-9f4e-3c2b0b1d7f00",
+        "name": "Milk - Full Cream 2L",
+        "category": "Dairy & Eggs",
+        "supplier": "Penrith Dairy Co-op",
+        "quantity": 8,
+        "reorder_point": 10,
+        "cost_price": 2.10,
+        "selling_price": 0.0,
+        "last_updated": "2025-04-02T09:00:00"
+    },
+    {
+        "id": "7b3a4c2e-1f0d-4e8a-b2c1-5d6e7f8a9b0c",
+        "name": "Eggs - Free Range Dozen",
+        "category": "Dairy & Eggs",
+        "supplier": "Happy Hens Farm",
+        "quantity": 30,
+        "reorder_point": 30,
+        "cost_price": 4.00,
+        "selling_price": 6.50,
+        "last_updated": "2025-04-03T10:15:30.500000"
+    }
+]
+
+
+def make_transaction(item_id, change, old, transaction_type="sale"):
+    return {
+        "id": str(uuid.uuid4()),
+        "item_id": item_id,
+        "item_name": "Item " + item_id[:4],
+        "transaction_type": transaction_type,
+        "quantity_change": change,
+        "old_quantity": old,
+        "new_quantity": old + change,
+        "timestamp": "2025-04-01T12:00:00.000001"
+    }
+
+
+class TestInventoryTable(unittest.TestCase):
+    """Test cases for the InventoryTable class."""
+
+    def setUp(self):
+        """Build a table over the sample items."""
+        self.table = InventoryTable.from_dicts(SAMPLE_ITEMS)
+
+    def test_round_trip(self):
+        """Test that to_dicts returns exactly what from_dicts received."""
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(self.table.to_dicts(), SAMPLE_ITEMS)
+        self.assertEqual(self.table[-1], SAMPLE_ITEMS[-1])
+
+    def test_vectorized_metrics(self):
+        """Test inventory value, profit margin and low stock flags."""
+        np.testing.assert_allclose(self.table.inventory_value, [62.5, 16.8, 120.0])
+        np.testing.assert_allclose(self.table.profit_margin, [(2.99 - 1.25) / 2.99 * 100, 0.0, (6.5 - 4.0) / 6.5 * 100])
+        self.assertEqual(self.table.is_low_stock.tolist(), [False, True, True])
+
+    def test_interned_columns(self):
+        """Test that repeated categories share one code."""
+        codes = self.table.codes("category")
+        self.assertEqual(codes[1], codes[2])
+        self.assertEqual(self.table.mask("category", "Dairy & Eggs").tolist(), [False, True, True])
+        self.assertEqual(self.table.value_by("category")["Dairy & Eggs"], 136.8)
+
+    def test_default_reorder_point(self):
+        """Test that a missing reorder point defaults to 20% of the quantity."""
+        table = InventoryTable.from_dicts([dict(SAMPLE_ITEMS[0], reorder_point=None, quantity=40)])
+        self.assertEqual(table[0]["reorder_point"], 8)
+
+    def test_non_uuid_ids(self):
+        """Test that tables fall back to interned strings for other ID schemes."""
+        self.table.append(dict(SAMPLE_ITEMS[0], id="item1"))
+        self.assertEqual(self.table.ids()[0], SAMPLE_ITEMS[0]["id"])
+        self.assertEqual(self.table.ids()[-1], "item1")
+        self.assertEqual(self.table.find("item1").tolist(), [3])
+
+
+class TestTransactionLog(unittest.TestCase):
+    """Test cases for the TransactionLog class."""
+
+    def test_append_and_round_trip(self):
+        """Test appending transactions one at a time."""
+        item_id = SAMPLE_ITEMS[0]["id"]
+        records = [make_transaction(item_id, -1, 50 - i) for i in range(40)]
+
+        log = TransactionLog()
+        for record in records:
+            log.append(record)
+
+        self.assertEqual(len(log), 40)
+        self.assertEqual(log.to_dicts(), records)
+        self.assertEqual(log.find(records[7]["id"]).tolist(), [7])
+
+    def test_per_item_aggregates(self):
+        """Test per-item lookups and net quantity change."""
+        first, second = SAMPLE_ITEMS[0]["id"], SAMPLE_ITEMS[1]["id"]
+        log = TransactionLog.from_dicts([
+            make_transaction(first, -5, 50),
+            make_transaction(second, 10, 8, "purchase"),
+            make_transaction(first, -3, 45)
+        ])
+
+        self.assertEqual(log.for_item(first).tolist(), [0, 2])
+        self.assertEqual(log.net_change_by_item(), {first: -8, second: 10})
+        self.assertEqual(log.net_change_by_item("sale"), {first: -8})
+
+    def test_compact_memory(self):
+        """Test that each transaction costs a few dozen bytes."""
+        item_ids = [str(uuid.uuid4()) for _ in range(50)]
+        log = TransactionLog.from_dicts(
+            make_transaction(item_ids[i % 50], -1, 100) for i in range(10000)
+        )
+        self.assertLess(log.nbytes / len(log), 64)
+
+
+class TestStringInterner(unittest.TestCase):
+    """Test cases for the StringInterner class."""
+
+    def test_encode_decode(self):
+        """Test that codes map back to the original strings."""
+        interner = StringInterner(["Dairy"])
+        codes = interner.encode(["Bakery", "Dairy", "Bakery"])
+        self.assertEqual(codes.tolist(), [1, 0, 1])
+        self.assertEqual(interner.decode(codes).tolist(), ["Bakery", "Dairy", "Bakery"])
+        self.assertEqual(interner.lookup("Meat"), -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
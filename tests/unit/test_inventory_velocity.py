@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the streaming sales velocity tracker.
+"""
+
+import unittest
+import sys
+import os
+from datetime import date, timedelta
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.inventory_velocity import SalesVelocityTracker, RollingWindowSums, day_number
+
+TODAY = date(2025, 4, 30)
+
+
+def sale(item_id, units, days_ago, transaction_type="sale"):
+    return {
+        "item_id": item_id,
+        "transaction_type": transaction_type,
+        "quantity_change": -units,
+        "timestamp": (TODAY - timedelta(days=days_ago)).isoformat() + "T10:00:00"
+    }
+
+
+class TestRollingWindowSums(unittest.TestCase):
+    """Test cases for the RollingWindowSums class."""
+
+    def test_windows_expire_old_buckets(self):
+        """Test that each window only counts its own days."""
+        sums = RollingWindowSums(windows=(7, 30))
+        today = day_number(TODAY)
+        sums.add("a", today - 40, (1,))
+        sums.add("a", today - 10, (2,))
+        sums.add("a", today - 1, (4,))
+        sums.add("a", today, (8,))
+
+        self.assertEqual(sums.total("a", 7, today), [12.0])
+        self.assertEqual(sums.total("a", 30, today), [14.0])
+        self.assertEqual(sums.total("missing", 7, today), [0.0])
+        with self.assertRaises(ValueError):
+            sums.total("a", 90, today)
+
+    def test_total_does_not_change_state(self):
+        """Test that queries for other days do not expire buckets, and advance does."""
+        sums = RollingWindowSums(windows=(7,))
+        today = day_number(TODAY)
+        sums.add("a", today - 5, (2,))
+        sums.add("a", today, (3,))
+
+        self.assertEqual(sums.total("a", 7, today + 3), [3.0])
+        self.assertEqual(sums.total("a", 7, today - 1), [2.0])
+        self.assertEqual(sums.total("a", 7, today), [5.0])
+        self.assertEqual(sums.total("a", 7, today - 20), [0.0])
+
+        sums.advance(today + 3)
+        self.assertEqual(sums.daily("a", 7, today), [0.0] * 6 + [3.0])
+        self.assertEqual(sums.total("a", 7, today + 3), [3.0])
+
+    def test_late_arrivals_and_daily_series(self):
+        """Test out-of-order days and the per-day series."""
+        sums = RollingWindowSums(windows=(7,))
+        today = day_number(TODAY)
+        sums.add("a", today, (3,))
+        sums.add("a", today - 2, (5,))
+        sums.add("a", today - 2, (1,))
+
+        self.assertEqual(sums.daily("a", 3, today), [6.0, 0.0, 3.0])
+        self.assertEqual(sums.total("a", 7, today), [9.0])
+
+
+class TestSalesVelocityTracker(unittest.TestCase):
+    """Test cases for the SalesVelocityTracker class."""
+
+    def setUp(self):
+        """Replay a small sales history."""
+        self.tracker = SalesVelocityTracker()
+        items = {
+            "milk": {"category": "Dairy", "cost_price": 2.0},
+            "cheese": {"category": "Dairy", "cost_price": 5.0}
+        }
+        self.tracker.replay([
+            sale("milk", 14, 2),
+            sale("milk", 7, 20),
+            sale("cheese", 3, 60),
+            sale("milk", 100, 120),
+            sale("milk", 50, 1, transaction_type="adjustment"),
+            {"item_id": "milk", "transaction_type": "purchase", "quantity_change": 40,
+             "timestamp": TODAY.isoformat() + "T08:00:00"}
+        ], items)
+
+    def test_item_velocity(self):
+        """Test units sold per day over each window."""
+        self.assertEqual(self.tracker.item_velocity("milk", 7, today=TODAY), 2.0)
+        self.assertEqual(self.tracker.item_velocity("milk", 30, today=TODAY), 0.7)
+        self.assertEqual(self.tracker.item_velocity("unknown", 30, today=TODAY), 0.0)
+
+    def test_category_aggregates(self):
+        """Test category velocity and cost of goods sold."""
+        self.assertEqual(self.tracker.category_velocity("Dairy", 90, today=TODAY), 24 / 90)
+        self.assertEqual(self.tracker.category_cost_of_goods_sold("Dairy", 90, today=TODAY), 21 * 2.0 + 3 * 5.0)
+
+    def test_value_changes_cover_all_transaction_types(self):
+        """Test that trends see purchases and adjustments as well as sales."""
+        changes = self.tracker.category_value_changes("Dairy", days=3, today=TODAY)
+        self.assertEqual(changes, [-28.0, -100.0, 80.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
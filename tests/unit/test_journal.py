@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the append-only journal.
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from utils.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+    """Test cases for the Journal class."""
+
+    def setUp(self):
+        """Set up a journal in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "inventory.journal")
+        self.journal = Journal(self.path, key="item_id")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.journal.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_append_assigns_sequence_numbers(self):
+        """Test that records get increasing sequence numbers."""
+        first = self.journal.append({"item_id": "item1", "new_quantity": 9})
+        second, third = self.journal.append_many([
+            {"item_id": "item2", "new_quantity": 4},
+            {"item_id": "item1", "new_quantity": 8}
+        ])
+
+        self.assertEqual([first["seq"], second["seq"], third["seq"]], [1, 2, 3])
+        self.assertEqual(len(self.journal), 3)
+        self.assertEqual(self.journal.latest("item1")["new_quantity"], 8)
+        self.assertEqual([r["seq"] for r in self.journal.records(after_seq=1)], [2, 3])
+
+    def test_reopen_replays_records(self):
+        """Test that records survive reopening the journal."""
+        self.journal.append_many([{"item_id": "item1", "new_quantity": 9},
+                                  {"item_id": "item1", "new_quantity": 7}])
+        self.journal.close()
+
+        reopened = Journal(self.path, key="item_id")
+        self.assertEqual(reopened.last_seq, 2)
+        self.assertEqual(reopened.latest("item1")["new_quantity"], 7)
+        reopened.close()
+
+    def test_torn_last_line_is_skipped(self):
+        """Test that a partially written record does not break recovery."""
+        self.journal.append({"item_id": "item1", "new_quantity": 9})
+        self.journal.close()
+        with open(self.path, 'a') as f:
+            f.write('{"item_id": "item1", "new_qu')
+
+        reopened = Journal(self.path)
+        self.assertEqual(len(reopened), 1)
+        reopened.close()
+
+    def test_truncate_keeps_sequence(self):
+        """Test that sequence numbers keep increasing after truncation."""
+        self.journal.append_many([{"item_id": "item1"}, {"item_id": "item2"}])
+        self.journal.truncate()
+        self.assertEqual(len(self.journal), 0)
+        self.assertIsNone(self.journal.latest("item1"))
+        self.journal.close()
+
+        reopened = Journal(self.path)
+        self.assertEqual(len(reopened), 0)
+        self.assertEqual(reopened.append({"item_id": "item3"})["seq"], 3)
+        reopened.close()
+
+    def test_truncate_keeps_live_records(self):
+        """Test that records passed to truncate survive with their sequence numbers."""
+        stored = self.journal.append_many([{"item_id": "item1"}, {"item_id": "item2"}, {"item_id": "item1"}])
+        self.journal.truncate(keep=[stored[1]])
+        self.assertEqual(self.journal.records(), [stored[1]])
+        self.assertEqual(self.journal.latest("item2"), stored[1])
+        self.journal.close()
+
+        reopened = Journal(self.path, key="item_id")
+        self.assertEqual(reopened.records(), [stored[1]])
+        self.assertEqual(reopened.append({"item_id": "item3"})["seq"], 4)
+        reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared JSON read cache.
+"""
+
+import unittest
+import sys
+import os
+import json
+import time
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from utils import json_cache
+
+# Import test fixtures
+from tests.fixtures.inventory_data import SAMPLE_INVENTORY
+from tests.fixtures.test_utils import temp_file_with_content
+
+
+class TestJSONCache(unittest.TestCase):
+    """Test cases for load_json and the cache counters."""
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        json_cache.invalidate()
+        json_cache.reset_cache_stats()
+
+    def test_repeated_loads_hit_cache(self):
+        """Test that an unchanged file is parsed only once."""
+        with temp_file_with_content(json.dumps(SAMPLE_INVENTORY)) as path:
+            first = json_cache.load_json(path, shared=True)
+            second = json_cache.load_json(path, shared=True)
+
+        self.assertIs(first, second)
+        stats = json_cache.get_cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_changed_file_is_reloaded(self):
+        """Test that a write to the file invalidates the cached document."""
+        with temp_file_with_content(json.dumps({"inventory": []})) as path:
+            self.assertEqual(json_cache.load_json(path), {"inventory": []})
+
+            with open(path, 'w') as f:
+                json.dump({"inventory": [1, 2, 3]}, f)
+            # Make sure the signature changes even on coarse-grained filesystems
+            os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+
+            self.assertEqual(json_cache.load_json(path), {"inventory": [1, 2, 3]})
+        self.assertEqual(json_cache.get_cache_stats()["misses"], 2)
+
+    def test_store_primes_cache(self):
+        """Test that a writer can hand the saved document to the cache."""
+        data = {"inventory": ["written"]}
+        with temp_file_with_content(json.dumps(data)) as path:
+            json_cache.store(path, data)
+            self.assertIs(json_cache.load_json(path, shared=True), data)
+        self.assertEqual(json_cache.get_cache_stats()["misses"], 0)
+
+    def test_loads_are_private_copies(self):
+        """Test that unsaved changes to one loaded document are not seen by other loaders."""
+        with temp_file_with_content(json.dumps({"inventory": SAMPLE_INVENTORY})) as path:
+            first = json_cache.load_json(path)
+            second = json_cache.load_json(path)
+            first["inventory"][0]["quantity"] = -1
+            first["inventory"].append({"id": "unsaved"})
+
+            self.assertEqual(second["inventory"], SAMPLE_INVENTORY)
+            self.assertEqual(json_cache.load_json(path)["inventory"], SAMPLE_INVENTORY)
+            self.assertEqual(json_cache.load_json(path, shared=True)["inventory"], SAMPLE_INVENTORY)
+        self.assertEqual(json_cache.get_cache_stats()["misses"], 1)
+
+    def test_missing_file(self):
+        """Test that loading a missing file raises FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            json_cache.load_json("/nonexistent/file.json")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the KeyedList collection.
+"""
+
+import unittest
+import sys
+import os
+import json
+import copy
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from utils.keyed_collection import KeyedList, ensure_keyed
+
+
+def make_customers():
+    return [
+        {"id": "c1", "name": "Alice", "email": "alice@example.com", "phone": "0400 000 001"},
+        {"id": "c2", "name": "Bob", "email": "bob@example.com", "phone": "0400 000 002"},
+        {"id": "c3", "name": "Carol", "email": "shared@example.com", "phone": None},
+        {"id": "c4", "name": "Dana", "email": "shared@example.com", "phone": "0400 000 004"}
+    ]
+
+
+class TestKeyedList(unittest.TestCase):
+    """Test cases for the KeyedList class."""
+
+    def setUp(self):
+        """Build a keyed customer list."""
+        self.customers = KeyedList(make_customers(), secondary=("email", "phone"))
+
+    def test_serializes_like_a_list(self):
+        """Test that the collection round-trips through JSON as a plain list."""
+        self.assertEqual(json.loads(json.dumps({"customers": self.customers})), {"customers": make_customers()})
+        self.assertEqual(self.customers, make_customers())
+
+    def test_lookups(self):
+        """Test primary and secondary key lookups."""
+        self.assertEqual(self.customers.get("c2")["name"], "Bob")
+        self.assertIsNone(self.customers.get("missing"))
+        self.assertEqual({c["id"] for c in self.customers.find("email", "shared@example.com")}, {"c3", "c4"})
+        self.assertEqual(self.customers.find("phone", None), [])
+        self.assertEqual(self.customers.find_one("phone", "0400 000 001")["id"], "c1")
+        with self.assertRaises(KeyError):
+            self.customers.find("name", "Alice")
+
+    def test_list_mutations_keep_indexes(self):
+        """Test append, insert, pop, remove, del and slice assignment."""
+        self.customers.append({"id": "c5", "email": "eve@example.com"})
+        self.customers.insert(0, {"id": "c6", "email": "frank@example.com"})
+        self.assertEqual(self.customers.get("c5")["email"], "eve@example.com")
+        self.assertEqual(self.customers.find_one("email", "frank@example.com")["id"], "c6")
+
+        self.customers.pop(0)
+        del self.customers[0]
+        self.customers.remove(self.customers.get("c2"))
+        self.assertIsNone(self.customers.get("c6"))
+        self.assertIsNone(self.customers.get("c1"))
+        self.assertEqual(self.customers.find("email", "bob@example.com"), [])
+
+        self.customers[0] = {"id": "c7", "email": "shared@example.com"}
+        self.assertIsNone(self.customers.get("c3"))
+        self.assertEqual({c["id"] for c in self.customers.find("email", "shared@example.com")}, {"c4", "c7"})
+
+        self.assertEqual(self.customers.mutations, 6)
+
+        self.customers.sort(key=lambda c: c["id"], reverse=True)
+        self.assertEqual(self.customers.get("c5")["id"], "c5")
+
+    def test_slices_stay_keyed(self):
+        """Test that slicing (e.g. trimming a list) keeps the indexes."""
+        trimmed = self.customers[:2]
+        self.assertIsInstance(trimmed, KeyedList)
+        self.assertEqual(trimmed.get("c2")["name"], "Bob")
+        self.assertIsNone(trimmed.get("c3"))
+
+    def test_update_and_reindex(self):
+        """Test that key changes through update are reflected in the indexes."""
+        self.customers.update("c1", {"email": "alice@new.example.com", "points": 10})
+        self.assertEqual(self.customers.find("email", "alice@example.com"), [])
+        self.assertEqual(self.customers.find_one("email", "alice@new.example.com")["points"], 10)
+
+        record = self.customers.get("c2")
+        record["phone"] = "0499 999 999"
+        self.customers.reindex(record, {"phone": "0400 000 002"})
+        self.assertEqual(self.customers.find("phone", "0400 000 002"), [])
+        self.assertIs(self.customers.find_one("phone", "0499 999 999"), record)
+
+    def test_upsert_and_remove_ids(self):
+        """Test replacing, appending and bulk deleting by ID."""
+        self.assertTrue(self.customers.upsert({"id": "c2", "name": "Robert", "email": "rob@example.com"}))
+        self.assertFalse(self.customers.upsert({"id": "c9", "name": "Zed"}))
+        self.assertEqual(self.customers[1]["name"], "Robert")
+        self.assertEqual(self.customers.find("email", "bob@example.com"), [])
+
+        self.assertEqual(self.customers.remove_ids(["c1", "c9", "missing"]), 2)
+        self.assertEqual([c["id"] for c in self.customers], ["c2", "c3", "c4"])
+        self.assertFalse(self.customers.has("c1"))
+
+    def test_positions_follow_reordering(self):
+        """Test that upserts find the right position after sorting and inserting."""
+        self.customers.sort(key=lambda c: c["id"], reverse=True)
+        self.customers.upsert({"id": "c3", "name": "Caroline"})
+        self.customers.insert(0, {"id": "c0"})
+        self.customers.upsert({"id": "c1", "name": "Alicia"})
+
+        self.assertEqual([c["id"] for c in self.customers], ["c0", "c4", "c3", "c2", "c1"])
+        self.assertEqual(self.customers.position("c3"), 2)
+        self.assertEqual(self.customers[2]["name"], "Caroline")
+        self.assertEqual(self.customers[4]["name"], "Alicia")
+        self.assertIsNone(self.customers.position("missing"))
+
+    def test_duplicate_ids_resolve_to_first(self):
+        """Test that duplicate IDs behave like a linear scan."""
+        records = KeyedList([{"id": "a", "n": 1}, {"id": "a", "n": 2}])
+        self.assertEqual(records.get("a")["n"], 1)
+        del records[0]
+        self.assertEqual(records.get("a")["n"], 2)
+
+    def test_copies(self):
+        """Test that copies and deep copies keep working indexes."""
+        clone = copy.deepcopy(self.customers)
+        clone.get("c1")["name"] = "Changed"
+        self.assertEqual(self.customers.get("c1")["name"], "Alice")
+        self.assertEqual(clone.find_one("email", "alice@example.com")["name"], "Changed")
+
+
+class TestEnsureKeyed(unittest.TestCase):
+    """Test cases for ensure_keyed."""
+
+    def test_wraps_in_place_once(self):
+        """Test that the document keeps the keyed list between calls."""
+        document = {"customers": make_customers()}
+        customers = ensure_keyed(document, "customers", secondary=("email",))
+        self.assertIs(document["customers"], customers)
+        self.assertIs(ensure_keyed(document, "customers", secondary=("phone",)), customers)
+        self.assertEqual(customers.find_one("phone", "0400 000 002")["id"], "c2")
+
+    def test_missing_collection(self):
+        """Test that a missing collection is created empty."""
+        document = {}
+        ensure_keyed(document, "orders").append({"id": "o1"})
+        self.assertEqual(document, {"orders": [{"id": "o1"}]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the LoyaltyProgram class.
+"""
+
+import unittest
+import sys
+import os
+import copy
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.loyalty_program.loyaltyprogram import LoyaltyProgram
+from utils import atomic_writer, json_cache
+from utils.journal import get_journal
+from utils.square_sync import SquareSyncQueue
+
+# Import test fixtures
+from tests.fixtures.loyalty_data import SAMPLE_LOYALTY_DOCUMENT
+
+
+class TestLoyaltyProgram(unittest.TestCase):
+    """Test cases for the LoyaltyProgram class."""
+
+    def setUp(self):
+        """Create a program file and a Square queue in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.temp_dir, "loyalty_program.json")
+        document = copy.deepcopy(SAMPLE_LOYALTY_DOCUMENT)
+        document["program_settings"] = {
+            "enabled": True,
+            "points_per_dollar": 1,
+            "redemption_threshold": 50,
+            "redemption_value": "Free item up to $5",
+            "double_points_events": [],
+            "last_square_sync": "2025-04-30 09:00:00",
+            "offline_mode": False
+        }
+        document["offline_cache"] = []
+        with open(self.data_file, 'w') as f:
+            json.dump(document, f)
+
+        self.queue = SquareSyncQueue(os.path.join(self.temp_dir, "square_sync.journal"), autostart=False)
+        queue_patch = patch("modules.loyalty_program.loyaltyprogram.get_sync_queue", return_value=self.queue)
+        queue_patch.start()
+        self.addCleanup(queue_patch.stop)
+        self.program = LoyaltyProgram(self.data_file)
+
+    def tearDown(self):
+        """Close the journals and remove the temporary directory."""
+        atomic_writer.flush(self.data_file)
+        self.close_program()
+        get_journal(self.queue._journal.path).close()
+        shutil.rmtree(self.temp_dir)
+
+    def close_program(self):
+        """Close the points journal and drop every in-process cache of the program file."""
+        get_journal(os.path.splitext(self.data_file)[0] + ".points.journal").close()
+        json_cache.invalidate(self.data_file)
+        LoyaltyProgram._customer_indexes.clear()
+        LoyaltyProgram._history_indexes.clear()
+        LoyaltyProgram._segmentations.clear()
+
+    def restart(self):
+        """Open the program file again as a new process would."""
+        self.close_program()
+        return LoyaltyProgram(self.data_file)
+
+    def test_record_transaction_survives_restart(self):
+        """Test that journaled points are replayed into the balance after a restart."""
+        transaction = self.program.record_transaction("c1", 25.0)
+        self.assertEqual(transaction["points_earned"], 25)
+        self.assertEqual(self.program.get_customer("c1")["points"], 35)
+        self.assertEqual(len(self.queue._pending), 1)
+
+        reopened = self.restart()
+        customer = reopened.get_customer("c1")
+        self.assertEqual((customer["points"], customer["visit_count"]), (35, 2))
+        self.assertEqual([t["id"] for t in reopened.get_transactions()], [transaction["id"]])
+
+    def test_instances_do_not_share_unsaved_changes(self):
+        """Test that a second instance on the same file does not see another's unsaved edits."""
+        other = LoyaltyProgram(self.data_file)
+        self.program.program_data["program_settings"]["enabled"] = False
+        self.program.program_data["customers"][0]["points"] = 999
+
+        self.assertTrue(other.is_enabled())
+        self.assertTrue(LoyaltyProgram(self.data_file).is_enabled())
+        self.assertNotEqual(other.program_data["customers"][0]["points"], 999)
+
+    def test_sync_offline_cache_retry_is_idempotent(self):
+        """Test that a sync that crashed before committing is not applied twice."""
+        self.program.record_transaction("c1", 12.0, offline_mode=True)
+        self.program.redeem_points("c2", 50, offline_mode=True)
+        self.program.record_transaction("nobody", 5.0, offline_mode=True)
+        self.assertEqual(len(self.program.program_data["offline_cache"]), 2)
+        atomic_writer.flush(self.data_file)
+
+        # Crash after the points were journaled but before the cache was committed
+        ledger = self.program._get_ledger()
+        post = ledger.post
+
+        def post_then_crash(rows):
+            post(rows)
+            raise OSError("power lost")
+
+        with patch.object(ledger, "post", side_effect=post_then_crash):
+            with self.assertRaises(OSError):
+                self.program.sync_offline_cache()
+
+        reopened = self.restart()
+        self.assertEqual(len(reopened.program_data["offline_cache"]), 2)
+        self.assertEqual(reopened.get_customer("c1")["points"], 22)
+
+        result = reopened.sync_offline_cache()
+        self.assertEqual((result["synced"], result["skipped"], result["errors"]), (0, 2, 0))
+        self.assertEqual(reopened.program_data["offline_cache"], [])
+        self.assertEqual(reopened.get_customer("c1")["points"], 22)
+        self.assertEqual(reopened.get_customer("c2")["points"], 10)
+        self.assertEqual(len(reopened.get_transactions()), 1)
+        self.assertEqual(len(reopened.get_redemptions()), 1)
+
+        # The Square adjustments were queued once per operation
+        self.assertEqual(len(self.queue._pending), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the expiry-ordered batch index.
+"""
+
+import unittest
+import sys
+import os
+import copy
+from datetime import date
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.perishable_expiry import ExpiryIndex, expiry_ordinal
+from utils.keyed_collection import KeyedList
+
+# Import test fixtures
+from tests.fixtures.perishable_data import SAMPLE_EXPIRY_BATCHES, SAMPLE_TODAY
+
+
+class TestExpiryIndex(unittest.TestCase):
+    """Test cases for the ExpiryIndex class."""
+
+    def setUp(self):
+        """Index a few batches in arbitrary order."""
+        self.items = copy.deepcopy(SAMPLE_EXPIRY_BATCHES)
+        self.index = ExpiryIndex(self.items)
+
+    def ids(self, items):
+        return [item["id"] for item in items]
+
+    def test_threshold_queries_match_filter_and_sort(self):
+        """Test that threshold queries equal a full filter and stable sort."""
+        for days in (-5, -1, 0, 2, 9, 10, 40, 100):
+            expected = sorted(
+                (item for item in self.items
+                 if (date.fromisoformat(item["expiration_date"]) - SAMPLE_TODAY).days <= days),
+                key=lambda item: item["expiration_date"])
+            self.assertEqual(self.index.expiring_within(days, today=SAMPLE_TODAY), expected)
+
+        self.assertEqual(self.ids(self.index.ordered()), ["eggs_1", "milk_1", "bread_1", "milk_2", "cheese_1"])
+        self.assertEqual(self.index.earliest()["id"], "eggs_1")
+
+    def test_incremental_add_and_remove(self):
+        """Test that added batches land after same-day batches and removals are by identity."""
+        added = {"id": "bread_2", "expiration_date": "2025-05-02"}
+        self.items.append(added)
+        self.index.add(added)
+        self.assertTrue(self.index.is_current(self.items))
+        self.assertEqual(self.ids(self.index.expiring_within(2, today=SAMPLE_TODAY)), ["eggs_1", "milk_1", "bread_1", "bread_2"])
+
+        twin = dict(self.items[1])
+        self.assertFalse(self.index.remove(twin))
+        self.assertTrue(self.index.remove(self.items[1]))
+        self.assertEqual(self.ids(self.index.expiring_within(2, today=SAMPLE_TODAY)), ["eggs_1", "bread_1", "bread_2"])
+
+    def test_detects_replaced_or_changed_list(self):
+        """Test that a reloaded or externally changed list is reported as stale."""
+        self.assertTrue(self.index.is_current(self.items))
+        self.assertFalse(self.index.is_current(list(self.items)))
+        self.items.append({"id": "jam_1", "expiration_date": "2026-02-24"})
+        self.assertFalse(self.index.is_current(self.items))
+
+    def test_detects_swapped_batches_in_keyed_list(self):
+        """Test that an add and a removal outside the index leave it stale even at the same length."""
+        items = KeyedList(self.items)
+        index = ExpiryIndex(items)
+        added = {"id": "bread_2", "expiration_date": "2025-05-02"}
+        items.append(added)
+        index.add(added)
+        self.assertTrue(index.is_current(items))
+
+        items.append({"id": "jam_1", "expiration_date": "2026-02-24"})
+        items.remove(items.get("milk_2"))
+        self.assertEqual(len(items), len(index))
+        self.assertFalse(index.is_current(items))
+
+    def test_invalid_dates(self):
+        """Test that batches without a valid date are kept but never match a threshold."""
+        broken = {"id": "mystery", "expiration_date": "soon"}
+        index = ExpiryIndex([broken, {"id": "milk_1", "expiration_date": "2025-05-01"}])
+        self.assertIsNone(expiry_ordinal(broken))
+        self.assertEqual(self.ids(index.expiring_within(1000, today=SAMPLE_TODAY)), ["milk_1"])
+        self.assertEqual(self.ids(index.ordered()), ["milk_1", "mystery"])
+        self.assertTrue(index.remove(broken))
+        self.assertEqual(len(index), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the FEFO sale allocator.
+"""
+
+import unittest
+import sys
+import os
+import copy
+import random
+from datetime import date
+
+import pandas as pd
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.perishable_expiry import ExpiryIndex
+from modules.perishable_fifo import FefoAllocator
+
+# Import test fixtures
+from tests.fixtures.perishable_data import SAMPLE_FEFO_BATCHES, SAMPLE_TODAY
+
+
+class TestFefoAllocator(unittest.TestCase):
+    """Test cases for the FefoAllocator class."""
+
+    def setUp(self):
+        """Build an allocator over a few batches."""
+        self.batches = copy.deepcopy(SAMPLE_FEFO_BATCHES)
+        self.allocator = FefoAllocator(ExpiryIndex(self.batches).ordered())
+
+    def quantities(self):
+        return {batch["id"]: batch["quantity"] for batch in self.batches}
+
+    def test_sale_spreads_over_oldest_batches(self):
+        """Test that a sale empties the oldest batches first."""
+        allocation = self.allocator.allocate("Milk", 5, today=SAMPLE_TODAY)
+
+        self.assertEqual([(d["item_id"], d["quantity"]) for d in allocation["depletions"]],
+                         [("milk_old", 3), ("milk_mid2", 2)])
+        self.assertEqual(allocation["shortfall"], 0)
+        self.assertEqual(self.quantities(), {"milk_new": 10, "milk_old": 0, "milk_mid": 0, "milk_mid2": 2, "bread_1": 5})
+
+    def test_shortfall_and_dry_run(self):
+        """Test overselling and allocating without applying."""
+        allocation = self.allocator.allocate("Milk", 20, apply=False, today=SAMPLE_TODAY)
+        self.assertEqual(allocation["allocated"], 17)
+        self.assertEqual(allocation["shortfall"], 3)
+        self.assertEqual(self.quantities(), {batch["id"]: batch["quantity"] for batch in SAMPLE_FEFO_BATCHES})
+
+        self.assertEqual(self.allocator.allocate("Cheese", 2)["shortfall"], 2)
+        with self.assertRaises(ValueError):
+            self.allocator.allocate("Milk", -1)
+
+    def test_bulk_matches_sequential_sales(self):
+        """Test that the vectorized day allocation equals selling one sale at a time."""
+        rng = random.Random(7)
+        names = ["Milk", "Bread", "Eggs", "Cheese"]
+        batches = [
+            {"id": f"b{i}", "name": rng.choice(names[:3]), "quantity": rng.randint(0, 12),
+             "expiration_date": f"2025-05-{rng.randint(1, 28):02d}"}
+            for i in range(60)
+        ]
+        sales = [{"product_name": rng.choice(names), "quantity": rng.randint(1, 9)} for _ in range(80)]
+
+        sequential_batches = copy.deepcopy(batches)
+        sequential = FefoAllocator(ExpiryIndex(sequential_batches).ordered())
+        taken = {}
+        for sale in sales:
+            for depletion in sequential.allocate(sale["product_name"], sale["quantity"], today=SAMPLE_TODAY)["depletions"]:
+                taken[depletion["item_id"]] = taken.get(depletion["item_id"], 0) + depletion["quantity"]
+
+        bulk = FefoAllocator(ExpiryIndex(batches).ordered())
+        results = bulk.allocate_bulk(pd.DataFrame(sales), today=SAMPLE_TODAY)
+
+        self.assertEqual([b["quantity"] for b in batches], [b["quantity"] for b in sequential_batches])
+        bulk_taken = {d["item_id"]: d["quantity"] for result in results.values() for d in result["depletions"]}
+        self.assertEqual(bulk_taken, taken)
+        self.assertEqual(results["Cheese"]["allocated"], 0)
+        for result in results.values():
+            self.assertEqual(result["allocated"] + result["shortfall"], result["requested"])
+
+    def test_bulk_accepts_records(self):
+        """Test the bulk mode with a list of sale records."""
+        results = self.allocator.allocate_bulk([
+            {"product_name": "Milk", "quantity": 2},
+            {"product_name": "Milk", "quantity": 2},
+            {"product_name": "Bread", "quantity": 1}
+        ], today=SAMPLE_TODAY)
+        self.assertEqual([(d["item_id"], d["quantity"]) for d in results["Milk"]["depletions"]],
+                         [("milk_old", 3), ("milk_mid2", 1)])
+        self.assertEqual(self.quantities()["bread_1"], 4)
+        self.assertEqual(self.allocator.allocate_bulk([]), {})
+
+    def test_expired_batches_are_skipped_and_reported(self):
+        """Test that sales are not booked against batches that expired before today."""
+        today = date(2025, 5, 2)
+        allocation = self.allocator.allocate("Milk", 5, apply=False, today=today)
+        self.assertEqual([(d["item_id"], d["quantity"]) for d in allocation["depletions"]],
+                         [("milk_mid2", 4), ("milk_new", 1)])
+        self.assertEqual([(d["item_id"], d["quantity"]) for d in allocation["expired"]], [("milk_old", 3)])
+
+        # Expiring today is still sellable
+        results = self.allocator.allocate_bulk([{"product_name": "Milk", "quantity": 5},
+                                                {"product_name": "Bread", "quantity": 1}], today=today)
+        self.assertEqual([(d["item_id"], d["quantity"]) for d in results["Milk"]["depletions"]],
+                         [("milk_mid2", 4), ("milk_new", 1)])
+        self.assertEqual([d["item_id"] for d in results["Milk"]["expired"]], ["milk_old"])
+        self.assertEqual(results["Bread"]["expired"], [])
+        self.assertEqual(self.quantities()["milk_old"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the perishable markdown optimizer and sales history.
+"""
+
+import unittest
+import sys
+import os
+from datetime import date
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.perishable_markdown import MarkdownOptimizer
+from modules.perishable_sales import record_sales, sales_velocity, HISTORY_DAYS
+
+TODAY = date(2025, 4, 30)
+
+
+def batch(batch_id, name, quantity, expiration_date, price=10.0):
+    return {"id": batch_id, "name": name, "quantity": quantity, "expiration_date": expiration_date,
+            "current_price": price, "original_price": price, "discount_applied": False, "discount_rate": 0}
+
+
+class TestMarkdownOptimizer(unittest.TestCase):
+    """Test cases for the MarkdownOptimizer class."""
+
+    def setUp(self):
+        """Create an optimizer with a coarse discount grid."""
+        self.optimizer = MarkdownOptimizer(elasticity=2.0, max_discount=50, step=10)
+
+    def test_slow_stock_is_marked_down(self):
+        """Test that slow sellers close to expiry get a discount and fast sellers do not."""
+        report = self.optimizer.optimize([
+            batch("yogurt_1", "Yogurt", 40, "2025-05-02"),
+            batch("milk_1", "Milk", 5, "2025-05-02")
+        ], {"Yogurt": 3.0, "Milk": 20.0}, today=TODAY)
+
+        rates = {r["item_id"]: r["discount_rate"] for r in report["recommendations"]}
+        self.assertGreater(rates["yogurt_1"], 0)
+        self.assertEqual(rates["milk_1"], 0)
+        self.assertEqual(report["marked_down"], 1)
+        self.assertGreaterEqual(report["expected_revenue_with_markdown"], report["expected_revenue_without_markdown"])
+        self.assertGreater(report["expected_waste_reduction_units"], 0)
+        self.assertAlmostEqual(
+            report["expected_waste_units_without_markdown"] - report["expected_waste_units_with_markdown"],
+            report["expected_waste_reduction_units"], places=1)
+
+    def test_older_batches_sell_first(self):
+        """Test that a later batch only sees the demand left over by earlier ones."""
+        full_price = MarkdownOptimizer(max_discount=0)
+        later = batch("bread_2", "Bread", 30, "2025-05-02")
+        alone = full_price.optimize([later], {"Bread": 10.0}, today=TODAY)
+        behind = full_price.optimize([batch("bread_1", "Bread", 30, "2025-05-01"), later], {"Bread": 10.0}, today=TODAY)
+
+        self.assertLess(behind["recommendations"][1]["expected_units_sold"],
+                        alone["recommendations"][0]["expected_units_sold"])
+
+    def test_skips_expired_empty_and_unknown(self):
+        """Test that expired or empty batches are ignored and products without sales keep their price."""
+        report = self.optimizer.optimize([
+            batch("old", "Milk", 5, "2025-04-29"),
+            batch("empty", "Milk", 0, "2025-05-03"),
+            batch("jam", "Jam", 5, "2025-05-03")
+        ], {"Milk": 2.0}, today=TODAY)
+
+        self.assertEqual([r["item_id"] for r in report["recommendations"]], ["jam"])
+        self.assertEqual(report["recommendations"][0]["discount_rate"], 0)
+        self.assertEqual(self.optimizer.optimize([], {}, today=TODAY)["candidates"], 0)
+
+    def test_uses_price_before_previous_markdown(self):
+        """Test that an already discounted batch is priced from its original price."""
+        marked = batch("yogurt_1", "Yogurt", 40, "2025-05-02", price=10.0)
+        marked.update({"current_price": 8.0, "discount_applied": True, "discount_rate": 20})
+        report = self.optimizer.optimize([marked], {"Yogurt": 3.0}, today=TODAY)
+        recommendation = report["recommendations"][0]
+        self.assertEqual(recommendation["base_price"], 10.0)
+        self.assertEqual(recommendation["new_price"], round(10.0 * (1 - recommendation["discount_rate"] / 100), 2))
+
+
+class TestSalesHistory(unittest.TestCase):
+    """Test cases for record_sales and sales_velocity."""
+
+    def test_velocity_over_window(self):
+        """Test daily rollups and the average over a window."""
+        document = {}
+        record_sales(document, {"Milk": 6, "Bread": 0}, "2025-04-30")
+        record_sales(document, {"Milk": 8}, "2025-04-25")
+        record_sales(document, {"Milk": 100}, "2025-04-01")
+
+        self.assertEqual(document["sales_history"]["Milk"]["2025-04-30"], 6)
+        self.assertNotIn("Bread", document["sales_history"])
+        self.assertEqual(sales_velocity(document, window=7, today=TODAY), {"Milk": 2.0})
+
+    def test_old_days_are_pruned(self):
+        """Test that days beyond the history length are dropped."""
+        document = {}
+        record_sales(document, {"Milk": 1}, "2025-01-01")
+        record_sales(document, {"Milk": 1}, date.fromordinal(date(2025, 1, 1).toordinal() + HISTORY_DAYS + 1).isoformat())
+        self.assertEqual(len(document["sales_history"]["Milk"]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
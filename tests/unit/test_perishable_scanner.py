@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the perishable barcode scan engine.
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.perishable_scanner import ScanEngine
+
+# Import test fixtures
+from tests.fixtures.perishable_data import SAMPLE_SCAN_DOCUMENT
+
+
+class TestScanEngine(unittest.TestCase):
+    """Test cases for the ScanEngine class."""
+
+    def setUp(self):
+        """Create a data file and an engine in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.temp_dir, "perishable.json")
+        self.log_file = os.path.join(self.temp_dir, "perishable.scans.journal")
+        with open(self.data_file, 'w') as f:
+            json.dump(SAMPLE_SCAN_DOCUMENT, f)
+        self.engine = self.open_engine()
+
+    def tearDown(self):
+        """Close the journal and remove the temporary directory."""
+        self.engine.journal.close()
+        shutil.rmtree(self.temp_dir)
+
+    def open_engine(self, checkpoint_every=500):
+        with open(self.data_file) as f:
+            document = json.load(f)
+        return ScanEngine(document, self.data_file, self.log_file, checkpoint_every=checkpoint_every)
+
+    def test_lookup_by_any_code(self):
+        """Test that scans resolve by ID, SKU or batch number."""
+        self.assertEqual(self.engine.scan(sku="DAI1002")["id"], "milk_2")
+        self.assertEqual(self.engine.scan(batch_number="B3")["id"], "bread_1")
+        self.assertEqual(self.engine.scan(item_id="milk_1")["id"], "milk_1")
+        self.assertIsNone(self.engine.scan(sku="UNKNOWN"))
+        with self.assertRaises(ValueError):
+            self.engine.scan(sku="DAI1001", scan_action="teleport")
+
+    def test_scan_many_applies_in_order(self):
+        """Test that a session never sells more units than a batch holds."""
+        results = self.engine.scan_many([{"sku": "DAI1001", "scan_action": "sold"}] * 3 + [{"sku": "NOPE"}])
+
+        self.assertEqual(results[:3], [self.engine.find(item_id="milk_1")] * 3)
+        self.assertIsNone(results[3])
+        self.assertEqual(self.engine.find(item_id="milk_1")["quantity"], 0)
+        self.assertEqual(list(self.engine.document["sales_history"]["Milk"].values()), [2])
+        self.assertEqual(len(self.engine.journal), 3)
+
+    def test_invalid_session_applies_nothing(self):
+        """Test that a session with an unknown action leaves batches, sales and the journal untouched."""
+        with self.assertRaises(ValueError):
+            self.engine.scan_many([{"sku": "DAI1002", "scan_action": "sold"}, {"sku": "DAI1001", "scan_action": "teleport"}])
+        self.assertEqual(self.engine.find(sku="DAI1002")["quantity"], 10)
+        self.assertNotIn("sales_history", self.engine.document)
+        self.assertNotIn("scan_log_seq", self.engine.document)
+        self.assertEqual(len(self.engine.journal), 0)
+
+    def test_scans_do_not_rewrite_data_file(self):
+        """Test that scans are journaled and replayed when the data file is reopened."""
+        self.engine.scan(sku="DAI1002", scan_action="sold")
+        self.engine.scan(sku="DAI1002", scan_action="sold")
+        with open(self.data_file) as f:
+            self.assertEqual(json.load(f), SAMPLE_SCAN_DOCUMENT)
+
+        reopened = self.open_engine()
+        self.assertEqual(reopened.find(sku="DAI1002")["quantity"], 8)
+        self.assertIsNotNone(reopened.find(sku="DAI1002").get("last_scanned"))
+
+        # Replaying onto a document that already has the scans is a no-op
+        again = ScanEngine(reopened.document, self.data_file, self.log_file)
+        self.assertEqual(again.find(sku="DAI1002")["quantity"], 8)
+
+    def test_record_depletions(self):
+        """Test that sold units are journaled like scans and replayed once."""
+        stored = self.engine.record_depletions([
+            {"item_id": "milk_2", "quantity": 3},
+            {"item_id": "milk_1", "quantity": 2},
+            {"item_id": "missing", "quantity": 1},
+            {"item_id": "bread_1", "quantity": 0}
+        ], sold_on="2025-04-30")
+
+        self.assertEqual([record["item_id"] for record in stored], ["milk_2", "milk_1"])
+        self.assertEqual(self.engine.find(item_id="milk_2")["quantity"], 7)
+        self.assertEqual(self.engine.document["sales_history"]["Milk"], {"2025-04-30": 5})
+        self.assertEqual(self.engine.document["scan_log_seq"], stored[-1]["seq"])
+
+        reopened = self.open_engine()
+        self.assertEqual(reopened.find(item_id="milk_1")["quantity"], 0)
+        self.assertEqual(reopened.document["sales_history"]["Milk"], {"2025-04-30": 5})
+
+    def test_checkpoint(self):
+        """Test that checkpoints write the quantities and truncate the journal."""
+        engine = ScanEngine(self.engine.document, self.data_file, self.log_file, checkpoint_every=3)
+        engine.scan_many([{"batch_number": "B2", "scan_action": "sold"}] * 2)
+        self.assertEqual(len(engine.journal), 2)
+
+        engine.scan(batch_number="B2", scan_action="sold")
+        self.assertEqual(len(engine.journal), 0)
+
+        with open(self.data_file) as f:
+            saved = json.load(f)
+        self.assertEqual(saved["inventory_items"][1]["quantity"], 7)
+        self.assertEqual(saved["scan_log_seq"], engine.journal.last_seq)
+        self.assertEqual(self.open_engine().find(sku="DAI1002")["quantity"], 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
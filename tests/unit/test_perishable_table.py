@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the columnar perishable batch table and stock summary.
+"""
+
+import unittest
+import sys
+import os
+from datetime import date
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.perishable_table import batch_frame, stock_summary
+
+# Import test fixtures
+from tests.fixtures.perishable_data import SAMPLE_STOCK_BATCHES, SAMPLE_TODAY
+
+
+class TestStockSummary(unittest.TestCase):
+    """Test cases for batch_frame and stock_summary."""
+
+    def test_batch_frame(self):
+        """Test that batches become typed columns."""
+        frame = batch_frame(SAMPLE_STOCK_BATCHES + [{"id": "odd", "name": "Jam", "quantity": None, "expiration_date": "soon"}])
+        self.assertEqual(len(frame), 5)
+        self.assertEqual(frame["quantity"].tolist(), [4, 7, 6, 0, 0])
+        self.assertTrue(frame["expiration_date"].isna().iloc[4])
+
+    def test_summary_by_product(self):
+        """Test totals, expiry bounds and distinct categories/locations per product."""
+        summary = stock_summary(batch_frame(SAMPLE_STOCK_BATCHES), today=SAMPLE_TODAY)
+
+        self.assertEqual(list(summary), ["Milk", "Bread"])
+        self.assertEqual(summary["Milk"], {
+            "total_quantity": 10,
+            "batches": 3,
+            "oldest_expiry": date(2025, 5, 3),
+            "newest_expiry": date(2025, 5, 12),
+            "categories": ["Dairy"],
+            "locations": ["Fridge 1", "Fridge 2"],
+            "oldest_expiry_str": "2025-05-03",
+            "days_to_oldest_expiry": 3,
+            "newest_expiry_str": "2025-05-12",
+            "days_to_newest_expiry": 12
+        })
+        self.assertEqual(summary["Bread"]["days_to_oldest_expiry"], -1)
+
+    def test_undated_and_empty(self):
+        """Test products without valid dates and an empty inventory."""
+        summary = stock_summary(batch_frame([{"id": "x", "name": "Jam", "category": "Pantry", "quantity": 2}]), today=SAMPLE_TODAY)
+        self.assertIsNone(summary["Jam"]["oldest_expiry"])
+        self.assertNotIn("oldest_expiry_str", summary["Jam"])
+        self.assertEqual(summary["Jam"]["locations"], [])
+        self.assertEqual(stock_summary(batch_frame([]), today=SAMPLE_TODAY), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the loyalty points ledger.
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.loyalty_program.customer_index import CustomerIndex
+from modules.loyalty_program.points_ledger import PointsLedger
+
+# Import test fixtures
+from tests.fixtures.loyalty_data import SAMPLE_LOYALTY_DOCUMENT
+
+
+class TestPointsLedger(unittest.TestCase):
+    """Test cases for the PointsLedger class."""
+
+    def setUp(self):
+        """Create a data file and a ledger in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.temp_dir, "loyalty_program.json")
+        self.log_file = os.path.join(self.temp_dir, "loyalty_program.points.journal")
+        with open(self.data_file, 'w') as f:
+            json.dump(SAMPLE_LOYALTY_DOCUMENT, f)
+        self.ledger = self.open_ledger()
+
+    def tearDown(self):
+        """Close the journal and remove the temporary directory."""
+        self.ledger.journal.close()
+        shutil.rmtree(self.temp_dir)
+
+    def open_ledger(self, checkpoint_every=500):
+        with open(self.data_file) as f:
+            document = json.load(f)
+        index = CustomerIndex(document["customers"])
+        return PointsLedger(document, self.data_file, self.log_file, lambda: index, checkpoint_every=checkpoint_every)
+
+    def earn(self, ledger, customer_id, points, amount):
+        transaction = {"id": f"t-{customer_id}-{points}", "customer_id": customer_id, "points_earned": points}
+        return ledger.post([PointsLedger.earn_row(customer_id, points, amount, transaction, "2025-04-30")])
+
+    def test_post_updates_balances_and_views(self):
+        """Test that rows update the customer, the history and the sorted views."""
+        self.earn(self.ledger, "c1", 100, 100.0)
+        customer = self.ledger.customer_index().get("c1")
+        self.assertEqual((customer["points"], customer["lifetime_points"], customer["visit_count"]), (110, 110, 2))
+        self.assertEqual(customer["last_visit"], "2025-04-30")
+        self.assertEqual(self.ledger.customer_index().sorted_by("points", limit=1), [customer])
+
+        self.ledger.post([PointsLedger.redeem_row("c2", 50, {"id": "r1", "customer_id": "c2"})])
+        self.assertEqual(self.ledger.balance("c2"), 10)
+        self.assertEqual(len(self.ledger.document["transactions"]), 1)
+        self.assertEqual(len(self.ledger.document["redemptions"]), 1)
+        self.assertEqual(self.earn(self.ledger, "nobody", 5, 5.0), [])
+
+    def test_failed_journal_write_changes_nothing(self):
+        """Test that rows are only applied once they are journaled."""
+        def fail(records):
+            raise OSError("disk full")
+        self.ledger.journal.append_many = fail
+        with self.assertRaises(OSError):
+            self.earn(self.ledger, "c1", 100, 100.0)
+        self.assertEqual(self.ledger.balance("c1"), 10)
+        self.assertEqual(self.ledger.document["transactions"], [])
+        self.assertNotIn("points_ledger_seq", self.ledger.document)
+        del self.ledger.journal.append_many
+
+    def test_rows_are_journaled_and_replayed(self):
+        """Test that posting does not rewrite the data file and a restart replays the rows."""
+        self.earn(self.ledger, "c1", 7, 7.0)
+        self.earn(self.ledger, "c1", 3, 3.0)
+        with open(self.data_file) as f:
+            self.assertEqual(json.load(f), SAMPLE_LOYALTY_DOCUMENT)
+
+        reopened = self.open_ledger()
+        self.assertEqual(reopened.balance("c1"), 20)
+        self.assertEqual(len(reopened.document["transactions"]), 2)
+
+        # Replaying onto a document that already has the rows is a no-op
+        index = reopened.customer_index()
+        again = PointsLedger(reopened.document, self.data_file, self.log_file, lambda: index)
+        self.assertEqual(again.balance("c1"), 20)
+
+    def test_checkpoint(self):
+        """Test that a checkpoint writes the balances and truncates the journal."""
+        ledger = self.open_ledger(checkpoint_every=2)
+        self.earn(ledger, "c2", 1, 1.0)
+        self.assertEqual(len(ledger.journal), 1)
+        self.earn(ledger, "c2", 1, 1.0)
+        self.assertEqual(len(ledger.journal), 0)
+
+        with open(self.data_file) as f:
+            saved = json.load(f)
+        self.assertEqual(saved["customers"][1]["points"], 62)
+        self.assertEqual(saved["points_ledger_seq"], ledger.journal.last_seq)
+        self.assertEqual(self.open_ledger().balance("c2"), 62)
+
+    def test_net_rows(self):
+        """Test that a backlog of rows is applied as one net row per customer."""
+        rows = [
+            PointsLedger.earn_row("c1", 5, 5.0, {"id": "t1", "customer_id": "c1"}, "2025-05-02"),
+            PointsLedger.redeem_row("c2", 50, {"id": "r1", "customer_id": "c2"}),
+            PointsLedger.earn_row("c1", 8, 8.5, {"id": "t2", "customer_id": "c1"}, "2025-05-01"),
+            PointsLedger.earn_row("c2", 4, 4.0, {"id": "t3", "customer_id": "c2"}, "2025-05-03")
+        ]
+        net = PointsLedger.net_rows(rows)
+        self.assertEqual([(row["customer_id"], row["points"], row["visits"]) for row in net], [("c1", 13, 2), ("c2", -46, 1)])
+
+        self.ledger.post(net)
+        customer = self.ledger.customer_index().get("c1")
+        self.assertEqual((customer["points"], customer["total_spend"], customer["visit_count"]), (23, 23.5, 3))
+        self.assertEqual(customer["last_visit"], "2025-05-02")
+        self.assertEqual(self.ledger.balance("c2"), 14)
+        self.assertEqual(self.ledger.recorded_ids(), {"t1", "t2", "t3", "r1"})
+        self.assertEqual(len(self.ledger.journal), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the loyalty RFM segmentation.
+"""
+
+import unittest
+import sys
+import os
+import datetime
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.loyalty_program.segmentation import CustomerSegmentation, SEGMENTS
+
+TODAY = datetime.date(2025, 6, 1)
+
+
+def make_customer(customer_id, days_since_visit, visits, spend, signup_days_ago=365, **fields):
+    customer = {
+        "id": customer_id,
+        "visit_count": visits,
+        "total_spend": spend,
+        "lifetime_points": int(spend),
+        "signup_date": (TODAY - datetime.timedelta(days=signup_days_ago)).isoformat(),
+        "last_visit": (TODAY - datetime.timedelta(days=days_since_visit)).isoformat()
+    }
+    customer.update(fields)
+    return customer
+
+
+class TestCustomerSegmentation(unittest.TestCase):
+    """Test cases for the CustomerSegmentation class."""
+
+    def setUp(self):
+        """Score ten members with clearly different habits."""
+        self.customers = [
+            make_customer("champion", 1, 60, 3000),
+            make_customer("regular", 3, 50, 100),
+            make_customer("newcomer", 2, 1, 20, signup_days_ago=2),
+            make_customer("lapsed", 120, 40, 1500),
+            make_customer("gone", 200, 2, 30),
+            make_customer("casual1", 20, 10, 200),
+            make_customer("casual2", 25, 8, 150),
+            make_customer("casual3", 30, 6, 120),
+            make_customer("casual4", 15, 12, 250),
+            make_customer("left", 1, 80, 5000, opted_out=True)
+        ]
+        self.segmentation = CustomerSegmentation(self.customers, TODAY)
+
+    def test_segments(self):
+        """Test that members get the segment their habits suggest."""
+        segments = {customer_id: self.segmentation.get(customer_id)["segment"]
+                    for customer_id in ("champion", "regular", "newcomer", "lapsed", "gone")}
+        self.assertEqual(segments, {
+            "champion": "champions",
+            "regular": "loyal",
+            "newcomer": "new",
+            "lapsed": "at_risk",
+            "gone": "hibernating"
+        })
+        self.assertEqual(self.segmentation.get("champion")["rfm"], "555")
+        self.assertIsNone(self.segmentation.get("left"))
+        self.assertEqual(len(self.segmentation), 9)
+
+        summary = self.segmentation.summary()
+        self.assertEqual(list(summary), list(SEGMENTS))
+        self.assertEqual(sum(entry["members"] for entry in summary.values()), 9)
+
+    def test_churn_risk(self):
+        """Test that the churn risk compares the time since the last visit with the usual interval."""
+        lapsed = self.segmentation.get("lapsed")["churn_risk"]
+        regular = self.segmentation.get("regular")["churn_risk"]
+        self.assertGreater(lapsed, 0.99)
+        self.assertLess(regular, 0.5)
+
+        self.assertEqual(self.segmentation.select(min_churn_risk=0.6), ["lapsed", "gone"])
+        self.assertEqual(self.segmentation.select(["at_risk", "hibernating"])[:2], ["lapsed", "gone"])
+        with self.assertRaises(ValueError):
+            self.segmentation.select(["whales"])
+
+    def test_missing_fields(self):
+        """Test that members without visit data are scored without errors."""
+        segmentation = CustomerSegmentation([{"id": "blank"}, make_customer("known", 5, 3, 40)], TODAY)
+        self.assertEqual(segmentation.get("blank")["recency_days"], 0)
+        self.assertEqual(len(CustomerSegmentation([], TODAY).select()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
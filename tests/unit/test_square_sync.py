@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Square sync queue, against a local fake Square server.
+"""
+
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from utils import journal
+from utils import square_sync
+from utils.square_sync import (SquareClient, SquareSyncQueue, ENDPOINTS, catalog_price, inventory_count,
+                               loyalty_adjustment, get_sync_queue)
+from tests.fixtures.fake_square import FakeSquareServer
+
+
+class TestSquareSyncQueue(unittest.TestCase):
+    """Test cases for the SquareSyncQueue class."""
+
+    def setUp(self):
+        """Start a fake Square server and open a queue in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "square_sync.journal")
+        self.server = FakeSquareServer().start()
+        self.client = SquareClient("test-token", base_url=self.server.url, timeout=5)
+
+    def tearDown(self):
+        """Stop the server and close the journal."""
+        self.server.stop()
+        journal.get_journal(self.path).close()
+        shutil.rmtree(self.temp_dir)
+
+    def open_queue(self, **kwargs):
+        options = dict(client=self.client, base_delay=0, jitter=0, autostart=False)
+        options.update(kwargs)
+        return SquareSyncQueue(self.path, **options)
+
+    def test_coalesces_and_batches(self):
+        """Test that only the last update per key is sent, in batches per kind."""
+        queue = self.open_queue(batch_size=2)
+        queue.enqueue("catalog", "catalog:item:milk", catalog_price("milk", 2.0))
+        queue.enqueue("catalog", "catalog:item:milk", catalog_price("milk", 1.5))
+        queue.enqueue_many([("inventory", f"inventory:item:{name}", inventory_count(name, 3))
+                            for name in ("milk", "bread", "eggs")])
+
+        self.assertEqual(queue.drain(), 4)
+        paths = sorted(request["path"] for request in self.server.requests)
+        self.assertEqual(paths, sorted([ENDPOINTS["catalog"]] + [ENDPOINTS["inventory"]] * 2))
+        prices = self.server.objects(ENDPOINTS["catalog"])
+        self.assertEqual([p["item_variation_data"]["price_money"]["amount"] for p in prices], [150])
+        self.assertEqual(self.server.requests[0]["authorization"], "Bearer test-token")
+
+        metrics = queue.metrics()
+        self.assertEqual((metrics["depth"], metrics["sent"], metrics["coalesced"], metrics["batches"]), (0, 4, 1, 3))
+        self.assertIsNotNone(metrics["latency_p95"])
+
+    def test_retries_transient_failures_and_drops_rejected(self):
+        """Test that 5xx batches are retried and 4xx batches are dropped."""
+        queue = self.open_queue()
+        self.server.fail_next(503)
+        queue.enqueue("inventory", "inventory:item:milk", inventory_count("milk", 3))
+        self.assertEqual(queue.drain(), 0)
+        self.assertEqual(queue.metrics()["depth"], 1)
+        self.assertEqual(queue.drain(), 1)
+        self.assertEqual(queue.metrics()["retries"], 1)
+        keys = [request["body"]["idempotency_key"] for request in self.server.requests]
+        self.assertEqual(keys[0], keys[1])
+
+        self.server.fail_next(400)
+        queue.enqueue("inventory", "inventory:item:bread", inventory_count("bread", 1))
+        queue.drain()
+        metrics = queue.metrics()
+        self.assertEqual((metrics["depth"], metrics["failed"]), (0, 1))
+
+    def test_backoff_delays_retry(self):
+        """Test that a failed update is not due again until its backoff has passed."""
+        queue = self.open_queue(base_delay=60)
+        self.server.fail_next(500)
+        queue.enqueue("inventory", "inventory:item:milk", inventory_count("milk", 3))
+        queue.drain()
+        self.assertEqual(queue.drain(), 0)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_pending_updates_survive_restart(self):
+        """Test that unsent updates are replayed from the journal and sent ones are not."""
+        queue = self.open_queue()
+        queue.enqueue("inventory", "inventory:item:milk", inventory_count("milk", 3))
+        queue.drain()
+        queue.enqueue("inventory", "inventory:item:bread", inventory_count("bread", 1))
+        journal.get_journal(self.path).close()
+
+        reopened = self.open_queue()
+        self.assertEqual(reopened.metrics()["depth"], 1)
+        self.assertEqual(reopened.drain(), 1)
+        self.assertEqual([c["physical_count"]["catalog_object_id"] for c in self.server.objects()], ["milk", "bread"])
+
+    def test_busy_queue_compacts_journal(self):
+        """Test that the journal is rewritten to the pending updates while the queue never empties."""
+        queue = self.open_queue()
+        with patch.object(square_sync, "COMPACT_MIN_RECORDS", 4):
+            for i in range(20):
+                queue.enqueue("inventory", f"inventory:item:{i}", inventory_count(str(i), i))
+                queue.drain()
+                queue.enqueue("inventory", "inventory:item:late", inventory_count("late", i))
+                self.assertLessEqual(len(journal.get_journal(self.path)), 10)
+        journal.get_journal(self.path).close()
+
+        reopened = self.open_queue()
+        self.assertEqual(reopened.metrics()["depth"], 1)
+        self.assertEqual(reopened.drain(), 1)
+        self.assertEqual(self.server.objects()[-1]["physical_count"]["catalog_object_id"], "late")
+        self.assertEqual(self.server.objects()[-1]["physical_count"]["quantity"], "19")
+
+    def test_loyalty_adjustments_use_their_own_keys(self):
+        """Test that loyalty adjustments are posted per account with per-adjustment idempotency keys."""
+        queue = self.open_queue()
+        queue.enqueue_many([
+            ("loyalty", "loyalty:t1", loyalty_adjustment("acct-1", 12, "Purchase", "key-t1")),
+            ("loyalty", "loyalty:r1", loyalty_adjustment("acct-2", -50, "Redeemed", "key-r1"))
+        ])
+        self.server.fail_next(200, 503)
+        self.assertEqual(queue.drain(), 0)
+        self.assertEqual(queue.drain(), 2)
+
+        requests = [(request["path"], request["body"]["idempotency_key"]) for request in self.server.requests]
+        self.assertEqual(requests, [
+            ("/v2/loyalty/accounts/acct-1/adjust", "key-t1"),
+            ("/v2/loyalty/accounts/acct-2/adjust", "key-r1"),
+            ("/v2/loyalty/accounts/acct-1/adjust", "key-t1"),
+            ("/v2/loyalty/accounts/acct-2/adjust", "key-r1")
+        ])
+        self.assertEqual(self.server.requests[-1]["body"]["adjust_points"], {"points": -50, "reason": "Redeemed"})
+
+    def test_worker_sends_concurrently(self):
+        """Test the background worker with several requests in flight."""
+        self.server.delay = 0.05
+        queue = self.open_queue(batch_size=1, concurrency=3, autostart=True)
+        sent = []
+        queue.add_listener("test", lambda entries: sent.extend(entry["key"] for entry in entries))
+        queue.enqueue_many([("inventory", f"inventory:item:{i}", inventory_count(str(i), i)) for i in range(6)])
+
+        self.assertTrue(queue.wait_idle(timeout=10))
+        queue.stop()
+        self.assertEqual(sorted(sent), sorted(f"inventory:item:{i}" for i in range(6)))
+        self.assertGreater(self.server.max_concurrent, 1)
+        self.assertLessEqual(self.server.max_concurrent, 3)
+
+    def test_catalog_price_carries_item_and_version(self):
+        """Test that a price upsert names the parent item and the catalog version when known."""
+        variation = catalog_price("VAR1", 2.5, item_id="ITEM1", version=7)
+        self.assertEqual(variation["item_variation_data"]["item_id"], "ITEM1")
+        self.assertEqual(variation["version"], 7)
+        self.assertNotIn("version", catalog_price("VAR1", 2.5))
+
+    def test_live_client_needs_a_location(self):
+        """Test that a token without a location keeps the simulated client."""
+        path = os.path.join(self.temp_dir, "env.journal")
+        environ = {"SQUARE_ACCESS_TOKEN": "token", "SQUARE_BASE_URL": self.server.url}
+        with patch.dict(os.environ, environ), patch.dict(square_sync._queues, clear=True):
+            self.assertFalse(get_sync_queue(path).live)
+        journal.get_journal(path).close()
+
+        with patch.dict(os.environ, dict(environ, SQUARE_LOCATION_ID="LOC1")), \
+                patch.dict(square_sync._queues, clear=True):
+            queue = get_sync_queue(path)
+            self.assertTrue(queue.live)
+            self.assertEqual(queue.location_id, "LOC1")
+        journal.get_journal(path).close()
+
+
+if __name__ == '__main__':
+    unittest.main()
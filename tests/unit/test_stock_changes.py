@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Unit tests for bulk stock change planning.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.stock_changes import parse_change, plan_stock_changes, plan_upserts
+from tests.fixtures.inventory_data import SAMPLE_INVENTORY
+
+TIMESTAMP = "2025-04-30T10:00:00"
+
+
+class TestStockChanges(unittest.TestCase):
+    """Test cases for parse_change, plan_stock_changes and plan_upserts."""
+
+    def setUp(self):
+        """Index the sample inventory and count item lookups."""
+        self.rows = {item['id']: item for item in SAMPLE_INVENTORY}
+        self.lookups = []
+
+    def get_item(self, item_id):
+        self.lookups.append(item_id)
+        item = self.rows.get(item_id)
+        return dict(item) if item is not None else None
+
+    def test_parse_change(self):
+        """Test unpacking valid and malformed rows."""
+        self.assertEqual(parse_change(("item1", -2)), ("item1", -2, "adjustment", None))
+        self.assertEqual(parse_change(["item1", 3, "delivery"]), ("item1", 3, "delivery", None))
+
+        for change in [("item1",), (), ("item1", 1, "sale", "extra"), "item1", None,
+                       ("item1", 2.5), ("item1", True), ("item1", 1, "")]:
+            item_id, quantity_change, _transaction_type, error = parse_change(change)
+            self.assertIsNone(quantity_change, change)
+            self.assertIsNotNone(error, change)
+        self.assertEqual(parse_change(("item1",))[0], "item1")
+
+    def test_plan_stock_changes(self):
+        """Test that valid rows are applied in order and invalid rows are reported."""
+        outcomes, transactions, items = plan_stock_changes([
+            ("item1", -5, "sale"),
+            ("item1", -3, "sale"),
+            ("missing", 4, "delivery"),
+            ("item2", 2.5, "delivery"),
+            ("item2",),
+            (["unhashable"], 1)
+        ], self.get_item, TIMESTAMP)
+
+        self.assertEqual([outcome['status'] for outcome in outcomes],
+                         ["applied", "applied", "error", "error", "error", "error"])
+        self.assertEqual(outcomes[1]['old_quantity'], 95)
+        self.assertEqual(outcomes[1]['new_quantity'], 92)
+        self.assertEqual([transaction['old_quantity'] for transaction in transactions], [100, 95])
+        self.assertEqual(items['item1']['quantity'], 92)
+        self.assertEqual(items['item1']['last_updated'], TIMESTAMP)
+        self.assertEqual(set(items), {"item1"})
+
+        # Each named item is looked up once and the source rows are untouched
+        self.assertEqual(self.lookups, ["item1", "missing"])
+        self.assertEqual(self.rows['item1']['quantity'], 100)
+
+    def test_plan_stock_changes_atomic(self):
+        """Test that an atomic batch with an invalid row applies nothing."""
+        outcomes, transactions, items = plan_stock_changes(
+            [("item1", -5, "sale"), ("missing", 1)], self.get_item, TIMESTAMP, atomic=True
+        )
+
+        self.assertEqual([outcome['status'] for outcome in outcomes], ["skipped", "error"])
+        self.assertEqual(transactions, [])
+        self.assertEqual(items, {})
+
+    def test_plan_upserts(self):
+        """Test creating and updating items with one lookup per named ID."""
+        outcomes, transactions, rows = plan_upserts([
+            {"id": "item2", "quantity": 12, "price": 5.25},
+            {"name": "Sourdough", "category": "Bakery", "supplier": "Penrith Bakehouse",
+             "quantity": 10, "cost_price": 3.00, "selling_price": 6.50},
+            {"name": "Incomplete"},
+            {"id": "item2", "quantity": -1},
+            {"id": "item2", "reorder_point": 8}
+        ], self.get_item, TIMESTAMP)
+
+        self.assertEqual([outcome['status'] for outcome in outcomes], ["updated", "created", "error", "error", "updated"])
+        created = rows[outcomes[1]['item_id']]
+        self.assertEqual((created['quantity'], created['reorder_point']), (10, 2))
+        self.assertEqual((rows['item2']['quantity'], rows['item2']['price'], rows['item2']['reorder_point']), (12, 5.25, 8))
+        self.assertEqual(rows['item2']['last_updated'], TIMESTAMP)
+
+        # The quantity change of an existing item becomes an adjustment
+        self.assertEqual([(t['item_id'], t['transaction_type'], t['quantity_change']) for t in transactions],
+                         [("item2", "adjustment", -38)])
+        self.assertEqual(self.lookups, ["item2"])
+        self.assertEqual(self.rows['item2']['quantity'], 50)
+
+if __name__ == '__main__':
+    unittest.main()
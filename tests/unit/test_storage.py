@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the storage backends.
+"""
+
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from utils.storage import JSONFileStorage, SQLiteStorage, migrate_json_to_sqlite
+
+SAMPLE_DOCUMENT = {
+    "inventory": [
+        {"id": "item1", "name": "Milk", "quantity": 10},
+        {"id": "item2", "name": "Bread", "quantity": 5}
+    ],
+    "categories": ["Dairy & Eggs", "Bakery"],
+    "transactions": []
+}
+
+
+class StorageBackendContract:
+    """Behaviour every storage backend must provide."""
+
+    def make_storage(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage = self.make_storage()
+        self.storage.save_document("inventory", json.loads(json.dumps(SAMPLE_DOCUMENT)))
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        """Test that a saved document loads back unchanged."""
+        self.assertEqual(self.storage.load_document("inventory"), SAMPLE_DOCUMENT)
+
+    def test_missing_document(self):
+        """Test loading a document that does not exist."""
+        self.assertIsNone(self.storage.load_document("nonexistent"))
+        self.assertIsNone(self.storage.version("nonexistent"))
+
+    def test_get_row(self):
+        """Test retrieving a single record."""
+        self.assertEqual(self.storage.get_row("inventory", "inventory", "item2")["name"], "Bread")
+        self.assertIsNone(self.storage.get_row("inventory", "inventory", "missing"))
+
+    def test_write_rows(self):
+        """Test row-level upserts and deletes keep the document order."""
+        self.storage.write_rows(
+            "inventory",
+            upserts={
+                "inventory": [{"id": "item1", "name": "Milk", "quantity": 8},
+                              {"id": "item3", "name": "Eggs", "quantity": 12}],
+                "transactions": [{"id": "t1", "item_id": "item1", "quantity_change": -2}]
+            },
+            deletes={"inventory": ["item2"]}
+        )
+
+        data = self.storage.load_document("inventory")
+        self.assertEqual([item["id"] for item in data["inventory"]], ["item1", "item3"])
+        self.assertEqual(data["inventory"][0]["quantity"], 8)
+        self.assertEqual(len(data["transactions"]), 1)
+        self.assertEqual(data["categories"], SAMPLE_DOCUMENT["categories"])
+
+    def test_version_changes_on_write(self):
+        """Test that the version token changes after a write."""
+        before = self.storage.version("inventory")
+        self.storage.write_rows("inventory", upserts={"inventory": [{"id": "item9", "quantity": 1}]})
+        self.assertNotEqual(before, self.storage.version("inventory"))
+
+
+class TestJSONFileStorage(StorageBackendContract, unittest.TestCase):
+    """Test cases for the JSON file backend."""
+
+    def make_storage(self):
+        return JSONFileStorage(self.temp_dir)
+
+
+class TestSQLiteStorage(StorageBackendContract, unittest.TestCase):
+    """Test cases for the SQLite backend."""
+
+    def make_storage(self):
+        return SQLiteStorage(os.path.join(self.temp_dir, "test.db"))
+
+    def test_wal_mode(self):
+        """Test that the database runs in WAL mode."""
+        mode = self.storage._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_save_writes_only_changed_rows(self):
+        """Test that saving a document leaves unchanged rows untouched."""
+        data = self.storage.load_document("inventory")
+        data["inventory"][1]["quantity"] = 4
+        self.storage._conn.execute("CREATE TEMP TABLE writes (row_id TEXT)")
+        self.storage._conn.execute(
+            "CREATE TEMP TRIGGER count_writes AFTER INSERT ON rows "
+            "BEGIN INSERT INTO writes VALUES (NEW.row_id); END"
+        )
+
+        self.storage.save_document("inventory", data)
+
+        written = [row[0] for row in self.storage._conn.execute("SELECT row_id FROM writes")]
+        self.assertEqual(written, ["item2"])
+
+    def test_save_does_not_read_stored_rows(self):
+        """Test that a save compares against remembered hashes instead of the stored rows."""
+        data = self.storage.load_document("inventory")
+        data["inventory"][0]["quantity"] = 9
+        statements = []
+        self.storage._conn.set_trace_callback(statements.append)
+
+        self.storage.save_document("inventory", data)
+
+        self.storage._conn.set_trace_callback(None)
+        self.assertFalse([sql for sql in statements if sql.startswith("SELECT") and "FROM rows" in sql])
+        self.assertEqual(self.storage.get_row("inventory", "inventory", "item1")["quantity"], 9)
+
+    def test_save_after_write_by_other_connection(self):
+        """Test that rows changed by another connection are written back when they differ."""
+        data = self.storage.load_document("inventory")
+        other = SQLiteStorage(os.path.join(self.temp_dir, "test.db"))
+        other.write_rows("inventory", upserts={"inventory": [{"id": "item1", "name": "Milk", "quantity": 3}]})
+
+        self.storage.save_document("inventory", data)
+
+        self.assertEqual(other.load_document("inventory"), SAMPLE_DOCUMENT)
+        other.close()
+
+    def test_row_writes_keep_remembered_hashes(self):
+        """Test that a save after row writes only rewrites what changed since."""
+        self.storage.write_rows(
+            "inventory",
+            upserts={"inventory": [{"id": "item3", "name": "Eggs", "quantity": 12}]},
+            deletes={"inventory": ["item2"]}
+        )
+        data = self.storage.load_document("inventory")
+        data["inventory"].append({"id": "item4", "name": "Butter", "quantity": 2})
+        self.storage._conn.execute("CREATE TEMP TABLE writes (row_id TEXT)")
+        self.storage._conn.execute(
+            "CREATE TEMP TRIGGER count_writes AFTER INSERT ON rows "
+            "BEGIN INSERT INTO writes VALUES (NEW.row_id); END"
+        )
+        statements = []
+        self.storage._conn.set_trace_callback(statements.append)
+
+        self.storage.save_document("inventory", data)
+
+        self.storage._conn.set_trace_callback(None)
+        self.assertFalse([sql for sql in statements if sql.startswith("SELECT") and "FROM rows" in sql])
+        written = [row[0] for row in self.storage._conn.execute("SELECT row_id FROM writes")]
+        self.assertEqual(written, ["item4"])
+        self.assertEqual([item["id"] for item in self.storage.load_document("inventory")["inventory"]],
+                         ["item1", "item3", "item4"])
+
+    def test_seed_from_json(self):
+        """Test that missing documents are imported from the seed directory."""
+        JSONFileStorage(self.temp_dir).save_document("suppliers", {"suppliers": [{"id": "s1"}]})
+        storage = SQLiteStorage(os.path.join(self.temp_dir, "seeded.db"), seed_dir=self.temp_dir)
+
+        self.assertEqual(storage.get_row("suppliers", "suppliers", "s1"), {"id": "s1"})
+        self.assertEqual(storage.load_document("suppliers"), {"suppliers": [{"id": "s1"}]})
+        storage.close()
+
+    def test_seeded_get_row_with_integer_id(self):
+        """Test that integer IDs are found when a row lookup seeds the document."""
+        JSONFileStorage(self.temp_dir).save_document("suppliers", {"suppliers": [{"id": 1}, {"id": 2}]})
+        storage = SQLiteStorage(os.path.join(self.temp_dir, "seeded.db"), seed_dir=self.temp_dir)
+
+        self.assertEqual(storage.get_row("suppliers", "suppliers", 2), {"id": 2})
+        self.assertEqual(storage.get_row("suppliers", "suppliers", 1), {"id": 1})
+        storage.close()
+
+    def test_duplicate_ids_are_rejected(self):
+        """Test that records sharing an ID are not collapsed into one row."""
+        data = self.storage.load_document("inventory")
+        data["inventory"].append({"id": "item1", "name": "Milk (duplicate)", "quantity": 1})
+
+        with self.assertRaises(ValueError):
+            self.storage.save_document("inventory", data)
+        self.assertEqual(self.storage.load_document("inventory"), SAMPLE_DOCUMENT)
+
+
+class TestMigration(unittest.TestCase):
+    """Test cases for importing JSON files into SQLite."""
+
+    def test_migrate_json_files(self):
+        """Test that every JSON document is imported with its collections."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            JSONFileStorage(temp_dir).save_document("inventory", SAMPLE_DOCUMENT)
+            db_path = os.path.join(temp_dir, "smallstore.db")
+
+            report = migrate_json_to_sqlite(temp_dir, db_path)
+
+            self.assertEqual(report, {"inventory": {"inventory": 2, "transactions": 0}})
+            storage = SQLiteStorage(db_path)
+            self.assertEqual(storage.load_document("inventory"), SAMPLE_DOCUMENT)
+            storage.close()
+
+            # A file with duplicate ids is skipped rather than imported with records missing
+            JSONFileStorage(temp_dir).save_document("suppliers", {"suppliers": [{"id": "s1"}, {"id": "s1"}]})
+            report = migrate_json_to_sqlite(temp_dir, db_path)
+            self.assertNotIn("suppliers", report)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the batch order adjustment suggestions.
+"""
+
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.waste_adjustments import suggest_adjustments
+
+
+def totals(donated, wasted):
+    return {"donated": donated, "wasted": wasted, "donated_cost": 0, "wasted_cost": 0}
+
+
+class TestSuggestAdjustments(unittest.TestCase):
+    """Test cases for the suggest_adjustments function."""
+
+    def test_cut_follows_waste_ratio(self):
+        """Test that the cut is the unsold share of supply, rounded and capped."""
+        suggestions = suggest_adjustments({
+            "Milk": totals(0, 31),      # 31 lost vs 93 sold: 25%
+            "Bread": totals(10, 52),    # 62 lost vs 31 sold: 67%, capped at 50%
+            "Eggs": totals(1, 0)        # 1 lost vs 310 sold: below one step
+        }, {"Milk": 3.0, "Bread": 1.0, "Eggs": 10.0}, days=30)
+
+        self.assertEqual([(s["product_name"], s["adjustment_percent"]) for s in suggestions],
+                         [("Bread", -50), ("Milk", -25)])
+        milk = suggestions[1]
+        self.assertEqual(milk["waste_ratio"], 0.25)
+        self.assertEqual(milk["current_quantity"], 28)  # 4 units received per day over a 7 day cycle
+
+    def test_fixed_rule_without_sales_data(self):
+        """Test the -10%/-5% fallback for products without a velocity."""
+        suggestions = suggest_adjustments({"Jam": totals(0, 2), "Cake": totals(3, 0), "Tea": totals(0, 0)}, {})
+        self.assertEqual({s["product_name"]: s["adjustment_percent"] for s in suggestions}, {"Jam": -10, "Cake": -5})
+        self.assertIsNone(suggestions[0]["waste_ratio"])
+        self.assertEqual(suggest_adjustments({}, {}), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
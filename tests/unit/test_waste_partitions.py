@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the month-partitioned waste log store.
+"""
+
+import unittest
+import sys
+import os
+import copy
+import json
+import shutil
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from utils import atomic_writer
+from modules.waste_partitions import MonthlyLogStore, partition_directory, ensure_time_order, timestamp_epoch
+
+
+# Import test fixtures
+from tests.fixtures.waste_data import SAMPLE_PARTITION_LOGS
+
+
+class TestMonthlyLogStore(unittest.TestCase):
+    """Test cases for the MonthlyLogStore class."""
+
+    def setUp(self):
+        """Import logs spread over three months into a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.directory = partition_directory(os.path.join(self.temp_dir, "waste_management.json"))
+        self.store = MonthlyLogStore(self.directory)
+        self.store.import_logs(copy.deepcopy(SAMPLE_PARTITION_LOGS))
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def ids(self, logs):
+        return [log["id"] for log in logs]
+
+    def test_one_file_per_month(self):
+        """Test that imported logs land in sorted monthly partition files."""
+        self.assertEqual(sorted(os.listdir(self.directory)), ["2025-02.json", "2025-03.json", "2025-04.json"])
+        with open(os.path.join(self.directory, "2025-04.json")) as f:
+            self.assertEqual(self.ids(json.load(f)["logs"]), ["apr-1", "apr-2"])
+        self.assertEqual(MonthlyLogStore(self.directory).months(), ["2025-02", "2025-03", "2025-04"])
+
+    def test_pages_newest_first(self):
+        """Test paginated newest-first iteration across partitions."""
+        pages = list(self.store.iter_pages(page_size=3))
+        self.assertEqual([self.ids(page) for page in pages], [["apr-2", "apr-1", "mar"], ["feb"]])
+
+    def test_date_range_only_reads_needed_partitions(self):
+        """Test that closed months outside the range are never loaded."""
+        with patch.object(self.store, "load", wraps=self.store.load) as load:
+            logs = list(self.store.iter_logs(start_date="2025-03-01", end_date="2025-04-10"))
+        self.assertEqual(self.ids(logs), ["apr-1", "mar"])
+        self.assertEqual([call.args[0] for call in load.call_args_list], ["2025-04", "2025-03"])
+
+        with patch.object(self.store, "load", wraps=self.store.load) as load:
+            first_page = next(self.store.iter_pages(page_size=1))
+        self.assertEqual(self.ids(first_page), ["apr-2"])
+        self.assertEqual(load.call_count, 1)
+
+    def test_only_recent_months_are_writable(self):
+        """Test appends go to the current or just closed month and older months are rejected."""
+        with patch.object(MonthlyLogStore, "current_month", return_value="2025-05"):
+            store = MonthlyLogStore(self.directory)
+            store.append(dict(SAMPLE_PARTITION_LOGS[0], id="may", timestamp="2025-05-01 08:00:00"))
+            self.assertEqual(store.update("may", {"synced_to_square": True})["synced_to_square"], True)
+            self.assertIsNone(store.update("apr-1", {"synced_to_square": True}))
+            # Acknowledged after the month closed
+            self.assertIsNone(store.update("mar", {"synced_to_square": True}, month="2025-02"))
+            self.assertEqual(store.update("mar", {"synced_to_square": True}, month="2025-03")["synced_to_square"], True)
+            # Stamped just before the month closed
+            store.append(dict(SAMPLE_PARTITION_LOGS[0], id="late", timestamp="2025-04-30 23:59:59"))
+            self.assertEqual(self.ids(store.load("2025-04")), ["apr-1", "apr-2", "late"])
+            with self.assertRaises(ValueError):
+                store.append(dict(SAMPLE_PARTITION_LOGS[0], id="older", timestamp="2025-03-31 23:00:00"))
+
+        atomic_writer.flush()
+        self.assertEqual(store.months()[-1], "2025-05")
+        with open(os.path.join(self.directory, "2025-05.json")) as f:
+            self.assertEqual(json.load(f)["logs"][0]["synced_to_square"], True)
+        self.assertEqual(self.ids(next(store.iter_pages(page_size=2))), ["may", "late"])
+        with open(os.path.join(self.directory, "2025-03.json")) as f:
+            self.assertEqual(json.load(f)["logs"][0]["synced_to_square"], True)
+
+    def test_reimport_skips_logs_already_imported(self):
+        """Test that rerunning an interrupted import does not duplicate logs."""
+        counts = self.store.import_logs([dict(SAMPLE_PARTITION_LOGS[0], id="mar", timestamp="2025-03-03 10:00:00"), dict(SAMPLE_PARTITION_LOGS[0], id="mar-2", timestamp="2025-03-09 10:00:00")])
+        self.assertEqual(counts, {"2025-03": 1})
+        self.assertEqual(self.ids(MonthlyLogStore(self.directory).load("2025-03")), ["mar", "mar-2"])
+
+    def test_logs_carry_epochs_in_time_order(self):
+        """Test that imported logs get a "ts" epoch and a late append is slotted in by time."""
+        with open(os.path.join(self.directory, "2025-04.json")) as f:
+            logs = json.load(f)["logs"]
+        self.assertEqual(logs[0]["ts"], timestamp_epoch("2025-04-02 10:00:00"))
+
+        with patch.object(MonthlyLogStore, "current_month", return_value="2025-04"):
+            store = MonthlyLogStore(self.directory)
+            store.append(dict(SAMPLE_PARTITION_LOGS[0], id="apr-late", timestamp="2025-04-10 10:00:00"))
+            self.assertEqual(self.ids(store.load("2025-04")), ["apr-1", "apr-late", "apr-2"])
+            self.assertEqual(self.ids(store.iter_logs(start_date="2025-04-10", end_date="2025-04-10")), ["apr-late"])
+
+
+class TestEnsureTimeOrder(unittest.TestCase):
+    """Test cases for the ensure_time_order function."""
+
+    def test_backfills_and_sorts_once(self):
+        """Test that legacy records are stamped and sorted, and a second pass changes nothing."""
+        records = [dict(SAMPLE_PARTITION_LOGS[0], id="b", timestamp="2025-04-02 10:00:00"), dict(SAMPLE_PARTITION_LOGS[0], id="a", timestamp="2025-04-01 10:00:00")]
+        self.assertTrue(ensure_time_order(records))
+        self.assertEqual([record["id"] for record in records], ["a", "b"])
+        self.assertEqual(records[1]["ts"] - records[0]["ts"], 86400)
+        self.assertFalse(ensure_time_order(records))
+
+
+if __name__ == '__main__':
+    unittest.main()
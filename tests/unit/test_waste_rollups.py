@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the daily waste rollups.
+"""
+
+import unittest
+import sys
+import os
+import copy
+from datetime import date
+
+# Add the parent directory to the path so we can import the module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+# Import the module to test
+from modules.waste_rollups import add_log, empty_rollups, product_totals, rebuild_rollups, window_totals, ROLLUP_DAYS
+
+# Import test fixtures
+from tests.fixtures.mock_config import SAMPLE_TODAY
+from tests.fixtures.waste_data import SAMPLE_WASTE_LOGS
+
+
+def scan_totals(logs, days):
+    """Reference implementation: the timestamp prefix scan the rollups replace."""
+    cutoff = date.fromordinal(SAMPLE_TODAY.toordinal() - days).isoformat()
+    recent = [log for log in logs if cutoff <= log["timestamp"][:10] <= SAMPLE_TODAY.isoformat()]
+    return (sum(log["quantity"] for log in recent if log["recipient"]),
+            sum(log["quantity"] for log in recent if not log["recipient"]))
+
+
+class TestWasteRollups(unittest.TestCase):
+    """Test cases for the waste rollup functions."""
+
+    def setUp(self):
+        """Build rollups from a few logs."""
+        self.logs = copy.deepcopy(SAMPLE_WASTE_LOGS)
+        self.rollups = rebuild_rollups(self.logs, today=SAMPLE_TODAY)
+
+    def test_window_totals_match_scan(self):
+        """Test that window sums equal a scan of the logs for several windows."""
+        for days in (0, 1, 2, 7, 30):
+            totals = window_totals(self.rollups, days, today=SAMPLE_TODAY)
+            self.assertEqual((totals["donated"], totals["wasted"]), scan_totals(self.logs, days))
+
+        week = window_totals(self.rollups, 7, today=SAMPLE_TODAY)
+        self.assertEqual(week["products"]["Milk"], {"donated": 4, "wasted": 2, "donated_cost": 6.0, "wasted_cost": 3.0})
+        self.assertEqual(week["recipients"], {"Food Bank": {"quantity": 4, "cost": 6.0},
+                                              "Local Shelter": {"quantity": 5, "cost": 0}})
+
+    def test_product_totals(self):
+        """Test per-product sums over a window."""
+        self.assertEqual(product_totals(self.rollups, "Bread", 30, today=SAMPLE_TODAY)["wasted"], 3)
+        self.assertEqual(product_totals(self.rollups, "Bread", 7, today=SAMPLE_TODAY)["wasted"], 0)
+        self.assertEqual(product_totals(self.rollups, "Cheese", 30, today=SAMPLE_TODAY),
+                         {"donated": 0, "wasted": 0, "donated_cost": 0, "wasted_cost": 0})
+
+    def test_incremental_equals_rebuild(self):
+        """Test that adding logs one at a time gives the same rollups as a rebuild."""
+        rollups = empty_rollups()
+        for log in self.logs:
+            add_log(rollups, log)
+        self.assertEqual(rollups, self.rollups)
+        self.assertEqual(rollups["log_count"], 4)
+
+    def test_old_buckets_are_dropped(self):
+        """Test that buckets older than the kept window are dropped but still counted."""
+        old_day = date.fromordinal(SAMPLE_TODAY.toordinal() - ROLLUP_DAYS - 1).isoformat()
+        old_log = {"product_name": "Jam", "quantity": 1, "recipient": None, "total_cost": 0, "timestamp": old_day + " 08:00:00"}
+
+        rollups = rebuild_rollups(self.logs + [old_log], today=SAMPLE_TODAY)
+        self.assertNotIn(old_day, rollups["days"])
+        self.assertEqual(rollups["log_count"], 5)
+
+        rollups = empty_rollups()
+        add_log(rollups, old_log)
+        add_log(rollups, self.logs[0])
+        self.assertEqual(list(rollups["days"]), ["2025-04-30"])
+        add_log(rollups, old_log)
+        self.assertEqual(list(rollups["days"]), ["2025-04-30"])
+        self.assertEqual(rollups["log_count"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,22 @@
 # Utilities initialization file
 # This allows utility modules to be imported from the package
 
-# Import utility modules
-from .data_processing import format_currency, calculate_percentage_change, parse_date
-from .visualization import get_color_scale, format_chart
+import importlib
 import logging
+
+# Re-exported names and the modules they live in. They are imported on first
+# use, so importing one utility module does not load all the others.
+_EXPORTS = {
+    "format_currency": ".data_processing",
+    "calculate_percentage_change": ".data_processing",
+    "parse_date": ".data_processing",
+    "get_color_scale": ".visualization",
+    "format_chart": ".visualization",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -0,0 +1,275 @@
+"""
+Crash-safe, coalescing writes for JSON data files
+
+``write_json_atomic`` serializes a document compactly (with orjson when it is
+installed), writes it to a temporary file in the same directory and renames
+it over the target with ``os.replace``. Readers therefore see either the old
+or the new file, never a truncated one.
+
+Managers that save on every mutation use ``save_json`` instead. It hands the
+document to a shared ``CoalescingWriter``: saves of the same file within the
+debounce window (``SMALLSTORE_SAVE_DEBOUNCE`` seconds, 0.5 by default) are
+merged into a single physical write of the latest document. Pending writes
+are flushed when the process exits. The saved document is put in the JSON
+read cache straight away, so later loads in this process see it before it
+reaches the disk.
+
+Documents are serialized while holding ``document_lock``. Code that makes
+several related changes to a document that may be saved in the background
+holds the lock too, so a write never contains only some of the changes.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import logging
+
+from utils import json_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = float(os.environ.get("SMALLSTORE_SAVE_DEBOUNCE", "0.5"))
+
+_MISSING = object()
+
+# Held while a document is serialized for writing
+document_lock = threading.RLock()
+
+
+def dumps(data):
+    """
+    Serialize a document to compact JSON bytes
+
+    Args:
+        data: JSON-serializable document
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # Types orjson rejects (e.g. integers above 64 bits) still work with json
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _fsync_directory(directory):
+    """Make a rename in a directory durable (a no-op where directories cannot be opened)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(path, data, fsync=True):
+    """
+    Write a JSON document so that a crash never leaves a partial file
+
+    Args:
+        path (str): Target file path
+        data: JSON-serializable document
+        fsync (bool): Flush the file and the rename to disk before returning
+    """
+    with document_lock:
+        payload = dumps(data)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        mode = 0o644
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync:
+        _fsync_directory(directory)
+    # Cache what is on disk, not the caller's document, which may change again before the next save
+    json_cache.store(path, json.loads(payload))
+
+
+class CoalescingWriter:
+    """
+    Debounced writer that merges bursts of saves into one atomic write per file
+    """
+
+    def __init__(self, debounce=DEFAULT_DEBOUNCE, fsync=True):
+        """
+        Initialize the writer
+
+        Args:
+            debounce (float): Seconds to wait for further saves before writing;
+                0 writes every save immediately
+            fsync (bool): Flush every write to disk
+        """
+        self.debounce = debounce
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending = {}   # absolute path -> latest document
+        self._timers = {}    # absolute path -> threading.Timer
+        self._writing = set()  # absolute paths being written right now
+        self.stats = {"saves": 0, "writes": 0}
+
+    def save(self, path, data):
+        """
+        Schedule a document to be written
+
+        Args:
+            path (str): Target file path
+            data: JSON-serializable document; the object is serialized when
+                it is written, so later changes to it are included
+        """
+        key = os.path.abspath(path)
+        # Later loads in this process see the new document before it reaches the disk
+        json_cache.store(key, data)
+
+        write_now = self.debounce <= 0
+        with self._lock:
+            self._pending[key] = data
+            self.stats["saves"] += 1
+            if not write_now and key not in self._timers:
+                timer = threading.Timer(self.debounce, self._write_in_background, args=(key,))
+                timer.daemon = True
+                try:
+                    timer.start()
+                except RuntimeError:
+                    # No new threads during interpreter shutdown; write synchronously instead
+                    write_now = True
+                else:
+                    self._timers[key] = timer
+
+        if write_now:
+            self._write(key)
+
+    def pending(self):
+        """Get the paths with writes that have not reached the disk yet"""
+        with self._lock:
+            return sorted(self._writing.union(self._pending))
+
+    def _write(self, key):
+        with self._write_lock:
+            with self._lock:
+                timer = self._timers.pop(key, None)
+                data = self._pending.pop(key, _MISSING)
+                if data is not _MISSING:
+                    self._writing.add(key)
+            if timer is not None and timer is not threading.current_thread():
+                timer.cancel()
+            if data is _MISSING:
+                return False
+
+            try:
+                write_json_atomic(key, data, fsync=self.fsync)
+            except Exception as e:
+                # Keep the document so the next save or flush retries it
+                with self._lock:
+                    self._pending.setdefault(key, data)
+                    self._writing.discard(key)
+                logging.error(f"File operation failed: {e}")
+                raise
+
+            with self._lock:
+                self._writing.discard(key)
+                self.stats["writes"] += 1
+            return True
+
+    def _write_in_background(self, key):
+        try:
+            self._write(key)
+        except Exception:
+            pass  # Already logged; the document stays pending
+
+    def flush(self, path=None):
+        """
+        Write pending documents now
+
+        Args:
+            path (str, optional): Only flush this file
+
+        Returns:
+            int: Number of files written
+        """
+        if path is not None:
+            keys = [os.path.abspath(path)]
+        else:
+            with self._lock:
+                keys = list(self._pending)
+        return sum(1 for key in keys if self._write(key))
+
+
+_default_writer = None
+_default_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Get the process-wide CoalescingWriter"""
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = CoalescingWriter()
+        return _default_writer
+
+
+def save_json(path, data):
+    """
+    Save a JSON document through the shared coalescing writer
+
+    Args:
+        path (str): Target file path
+        data: JSON-serializable document
+    """
+    get_writer().save(path, data)
+
+
+def flush(path=None):
+    """
+    Write every pending document of the shared writer to disk
+
+    Args:
+        path (str, optional): Only flush this file
+
+    Returns:
+        int: Number of files written
+    """
+    if _default_writer is None:
+        return 0
+    return _default_writer.flush(path)
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush()
+    except Exception as e:
+        logging.error(f"File operation failed: {e}")
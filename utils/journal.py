@@ -0,0 +1,250 @@
+"""
+Append-only record journal
+
+A journal is a line-delimited JSON file with one record per line. Each
+record gets a monotonically increasing ``seq`` number. Writes are appended
+and fsynced in batches, so recording an event costs the same no matter how
+much history has accumulated. Owners periodically fold the journal into
+their main data file (a snapshot) and then truncate it.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+class Journal:
+    """
+    Line-delimited JSON journal with batched fsync
+
+    Records appended since the last truncation are also kept in memory so
+    that owners can overlay them on a snapshot without re-reading the file.
+    """
+
+    def __init__(self, path, key=None, fsync_every=50, fsync_interval=1.0):
+        """
+        Open (or create) a journal
+
+        Args:
+            path (str): Journal file path
+            key (str, optional): Record field used to track the latest record per key
+            fsync_every (int): Maximum number of records written between fsyncs
+            fsync_interval (float): Maximum seconds between fsyncs
+        """
+        self.path = path
+        self.key = key
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.RLock()
+        self._records = []
+        self._latest = {}
+        self._last_seq = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        journal_dir = os.path.dirname(path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+
+        self._read_existing()
+        self._file = open(path, 'a')
+
+    def _read_existing(self):
+        """Load the records already in the journal file"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final line is what a crash mid-append leaves behind
+                    logging.error(f"Skipping unreadable journal line {line_number} in {self.path}")
+                    continue
+
+                self._last_seq = max(self._last_seq, record.get("seq", 0))
+                if not record.get("checkpoint"):
+                    self._remember(record)
+
+    def _remember(self, record):
+        self._records.append(record)
+        if self.key and self.key in record:
+            self._latest[record[self.key]] = record
+
+    @property
+    def last_seq(self):
+        """Sequence number of the most recent record"""
+        return self._last_seq
+
+    def __len__(self):
+        """Number of records since the last truncation"""
+        return len(self._records)
+
+    def append(self, record):
+        """
+        Append a record to the journal
+
+        Args:
+            record (dict): JSON-serializable record (a "seq" field is added)
+
+        Returns:
+            dict: The stored record
+        """
+        return self.append_many([record])[0]
+
+    def append_many(self, records):
+        """
+        Append several records with a single write
+
+        Args:
+            records (list): JSON-serializable records
+
+        Returns:
+            list: The stored records
+        """
+        with self._lock:
+            stored = []
+            lines = []
+            for record in records:
+                self._last_seq += 1
+                record = dict(record, seq=self._last_seq)
+                lines.append(json.dumps(record, separators=(",", ":")))
+                stored.append(record)
+
+            if lines:
+                # Hand the write to the OS right away; only the fsync is batched
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+                self._unsynced += len(lines)
+                for record in stored:
+                    self._remember(record)
+                self._maybe_sync()
+            return stored
+
+    def _maybe_sync(self):
+        if (self._unsynced >= self.fsync_every or
+                time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.flush()
+
+    def flush(self):
+        """Flush buffered records and fsync them to disk"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            if self._unsynced:
+                os.fsync(self._file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def records(self, after_seq=0):
+        """
+        Get records appended since the last truncation
+
+        Args:
+            after_seq (int): Only return records with a higher sequence number
+
+        Returns:
+            list: Records in append order
+        """
+        with self._lock:
+            if after_seq <= 0:
+                return list(self._records)
+            return [record for record in self._records if record["seq"] > after_seq]
+
+    def latest(self, key_value):
+        """
+        Get the most recent record for a key (see the ``key`` argument)
+
+        Args:
+            key_value: Value of the key field
+
+        Returns:
+            dict: Latest record or None
+        """
+        return self._latest.get(key_value)
+
+    def truncate(self, keep=None):
+        """
+        Drop all records once they have been folded into a snapshot
+
+        A checkpoint line is kept so sequence numbers continue to increase
+        after the journal is reopened.
+
+        Args:
+            keep (list, optional): Stored records that are still live; they are
+                rewritten after the checkpoint line with their sequence numbers
+        """
+        keep = list(keep or [])
+        with self._lock:
+            self._file.close()
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                lines = [json.dumps({"seq": self._last_seq, "checkpoint": True})]
+                lines.extend(json.dumps(record, separators=(",", ":")) for record in keep)
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+
+            self._records = []
+            self._latest = {}
+            for record in keep:
+                self._remember(record)
+            self._unsynced = 0
+            self._file = open(self.path, 'a')
+
+    def close(self):
+        """Flush and close the journal file"""
+        with self._lock:
+            if not self._file.closed:
+                self.flush()
+                self._file.close()
+
+
+def get_journal(path, key=None, **kwargs):
+    """
+    Get the shared journal instance for a path
+
+    Every writer in the process must use the same instance so that sequence
+    numbers stay unique.
+
+    Args:
+        path (str): Journal file path
+        key (str, optional): Record field used to track the latest record per key
+        **kwargs: Extra Journal arguments used when the journal is first opened
+
+    Returns:
+        Journal: Shared journal
+    """
+    abs_path = os.path.abspath(path)
+    with _journals_lock:
+        journal = _journals.get(abs_path)
+        if journal is None or journal._file.closed:
+            journal = Journal(path, key=key, **kwargs)
+            _journals[abs_path] = journal
+        return journal
+
+
+@atexit.register
+def _close_journals():
+    """Flush every open journal on interpreter shutdown"""
+    with _journals_lock:
+        for journal in _journals.values():
+            try:
+                journal.close()
+            except Exception as e:
+                logging.error(f"Error closing journal {journal.path}: {e}")
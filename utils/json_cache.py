@@ -0,0 +1,152 @@
+"""
+Process-wide cache of parsed JSON data files
+
+Pages call several manager methods in a row and each of them loads the same
+data file. ``load_json`` keeps the parsed document in memory and only parses
+the file again when its modification time or size changes.
+
+Each load returns a private copy, so unsaved changes made by one manager
+instance never show up in another. Callers that write every change
+through straight away (the storage backends, the log partitions) pass
+``shared=True`` to get the cached document itself.
+"""
+
+import json
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+_cache = {}
+# Signature of documents saved for a file that is not on disk yet (a pending debounced write)
+_UNWRITTEN = "unwritten"
+_stats = {"hits": 0, "misses": 0}
+_lock = threading.Lock()
+
+
+def file_signature(path):
+    """
+    Get the (mtime, size) signature used to validate cache entries
+
+    Args:
+        path (str): File path
+
+    Returns:
+        tuple: (st_mtime_ns, st_size) or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def copy_document(value):
+    """
+    Copy a parsed JSON document (nested dicts and lists are copied, other values shared)
+
+    Args:
+        value: Parsed JSON value
+
+    Returns:
+        Copy of the value
+    """
+    if isinstance(value, dict):
+        return {key: copy_document(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_document(item) for item in value]
+    return value
+
+
+def load_json(path, shared=False):
+    """
+    Load a JSON file, reusing the parsed document while the file is unchanged
+
+    Args:
+        path (str): Path to the JSON file
+        shared (bool): Return the cached document itself instead of a copy;
+            only for callers that save every change they make to it
+
+    Returns:
+        Parsed JSON document
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    key = os.path.abspath(path)
+    signature = file_signature(key)
+    if signature is None:
+        with _lock:
+            entry = _cache.get(key)
+            if entry is not None and entry[0] == _UNWRITTEN:
+                _stats["hits"] += 1
+                return entry[1] if shared else copy_document(entry[1])
+            _cache.pop(key, None)
+        raise FileNotFoundError(path)
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == signature:
+            _stats["hits"] += 1
+            return entry[1] if shared else copy_document(entry[1])
+        _stats["misses"] += 1
+
+    with open(key, 'r') as f:
+        data = json.load(f)
+
+    with _lock:
+        _cache[key] = (signature, data)
+    return data if shared else copy_document(data)
+
+
+def store(path, data):
+    """
+    Record a document that was just written (or is about to be written) to disk
+
+    Writers call this after saving so the next load does not need to parse
+    the file they have just produced. A document stored for a file that does
+    not exist yet is returned by ``load_json`` until the file is written.
+    The cache keeps a reference: writers store a snapshot once the document
+    has reached the disk.
+
+    Args:
+        path (str): Path of the written file
+        data: Document that was written
+    """
+    key = os.path.abspath(path)
+    signature = file_signature(key)
+    with _lock:
+        _cache[key] = (_UNWRITTEN if signature is None else signature, data)
+
+
+def invalidate(path=None):
+    """
+    Drop cached documents
+
+    Args:
+        path (str, optional): File to drop, or None to clear the whole cache
+    """
+    with _lock:
+        if path is None:
+            _cache.clear()
+        else:
+            _cache.pop(os.path.abspath(path), None)
+
+
+def get_cache_stats():
+    """
+    Get cache hit/miss counters
+
+    Returns:
+        dict: hits, misses and number of cached files
+    """
+    with _lock:
+        return {"hits": _stats["hits"], "misses": _stats["misses"], "entries": len(_cache)}
+
+
+def reset_cache_stats():
+    """Reset the hit/miss counters"""
+    with _lock:
+        _stats["hits"] = 0
+        _stats["misses"] = 0
@@ -0,0 +1,393 @@
+"""
+List of records with hash indexes on their keys
+
+Manager data files keep records (customers, suppliers, orders, events...)
+in JSON lists, and lookups used to scan them. ``KeyedList`` is a ``list``
+subclass, so it serializes exactly like the list it replaces, but it also
+keeps a primary index (``id`` by default) and any declared secondary
+indexes (email, phone, name, ...) up to date as records are inserted,
+replaced and deleted through the list API.
+
+The indexes map key values to the record objects, so sorting the list or
+inserting at the front costs nothing extra. The ``id -> position`` map used
+to replace records is rebuilt lazily after such reorderings and kept up to
+date by appends and in-place replacements. Changing a key field of a record
+in place is not visible to the list; call ``reindex(record)`` (or use
+``update``) afterwards. ``mutations`` counts the records added, removed or
+replaced, so structures derived from the list can tell when to rebuild.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class KeyedList(list):
+    """
+    List of dict records indexed by a primary key and optional secondary keys
+    """
+
+    def __init__(self, records=(), key="id", secondary=()):
+        """
+        Initialize the list
+
+        Args:
+            records (iterable): Initial records
+            key (str): Field holding the unique record ID
+            secondary (tuple): Fields with non-unique lookups (e.g. "email")
+        """
+        super().__init__(records)
+        self.key = key
+        self.secondary = tuple(secondary)
+        # Incremented whenever records are added, removed or replaced
+        self.mutations = 0
+        self._rebuild()
+
+    def __reduce__(self):
+        return (self.__class__, (list(self), self.key, self.secondary))
+
+    # Index maintenance
+
+    def _rebuild(self):
+        self._positions = None
+        self._primary = {}
+        self._indexes = {field: {} for field in self.secondary}
+        for record in self:
+            self._index(record)
+
+    def _index(self, record):
+        if not isinstance(record, dict):
+            return
+        record_id = record.get(self.key)
+        if record_id is not None and _hashable(record_id):
+            # Like a scan, lookups return the first record with an ID
+            self._primary.setdefault(record_id, record)
+        for field, index in self._indexes.items():
+            value = record.get(field)
+            if value is not None and _hashable(value):
+                index.setdefault(value, {})[id(record)] = record
+
+    def _unindex(self, record):
+        self._positions = None
+        if not isinstance(record, dict):
+            return
+        record_id = record.get(self.key)
+        if record_id is not None and _hashable(record_id) and self._primary.get(record_id) is record:
+            del self._primary[record_id]
+            # Another record may share the ID (bad data); keep it reachable
+            for other in self:
+                if other is not record and isinstance(other, dict) and other.get(self.key) == record_id:
+                    self._primary[record_id] = other
+                    break
+        self._unindex_secondary(record)
+
+    def _unindex_secondary(self, record):
+        for field, index in self._indexes.items():
+            value = record.get(field)
+            if value is not None and _hashable(value):
+                matches = index.get(value)
+                if matches is not None:
+                    matches.pop(id(record), None)
+                    if not matches:
+                        del index[value]
+
+    def add_index(self, field):
+        """
+        Start maintaining a secondary index
+
+        Args:
+            field (str): Record field to index
+        """
+        if field not in self._indexes:
+            self.secondary += (field,)
+            self._indexes[field] = {}
+            for record in self:
+                value = record.get(field) if isinstance(record, dict) else None
+                if value is not None and _hashable(value):
+                    self._indexes[field].setdefault(value, {})[id(record)] = record
+
+    def reindex(self, record, old_values=None):
+        """
+        Refresh the indexes after key fields of a record were changed in place
+
+        Args:
+            record (dict): Record that was changed
+            old_values (dict, optional): Previous values of the changed key fields
+        """
+        if old_values:
+            previous = dict(record)
+            previous.update(old_values)
+            self._drop_stale(record, previous)
+        self._index(record)
+
+    def _drop_stale(self, record, previous):
+        self._positions = None
+        record_id = previous.get(self.key)
+        if record_id is not None and _hashable(record_id) and self._primary.get(record_id) is record:
+            del self._primary[record_id]
+        for field, index in self._indexes.items():
+            value = previous.get(field)
+            if value is not None and _hashable(value):
+                matches = index.get(value)
+                if matches is not None:
+                    matches.pop(id(record), None)
+                    if not matches:
+                        del index[value]
+
+    # Lookups
+
+    def get(self, record_id, default=None):
+        """
+        Get a record by its primary key
+
+        Args:
+            record_id: Record ID
+            default: Value returned when no record has the ID
+
+        Returns:
+            dict: The record (not a copy)
+        """
+        if not _hashable(record_id):
+            return default
+        return self._primary.get(record_id, default)
+
+    def has(self, record_id):
+        """Check whether a record with the ID exists"""
+        return _hashable(record_id) and record_id in self._primary
+
+    def position(self, record_id):
+        """
+        Get the list position of a record
+
+        Args:
+            record_id: Record ID
+
+        Returns:
+            int: Position of the first record with the ID, or None
+        """
+        if not _hashable(record_id):
+            return None
+        if self._positions is None:
+            positions = {}
+            for position, record in enumerate(self):
+                if isinstance(record, dict):
+                    current_id = record.get(self.key)
+                    if current_id is not None and _hashable(current_id):
+                        positions.setdefault(current_id, position)
+            self._positions = positions
+        return self._positions.get(record_id)
+
+    def find(self, field, value):
+        """
+        Get every record whose secondary key equals a value
+
+        Args:
+            field (str): Indexed field
+            value: Value to look up
+
+        Returns:
+            list: Matching records
+        """
+        if field == self.key:
+            record = self.get(value)
+            return [] if record is None else [record]
+        if field not in self._indexes:
+            raise KeyError(f"{field} is not an indexed field")
+        if value is None or not _hashable(value):
+            return []
+        return list(self._indexes[field].get(value, {}).values())
+
+    def find_one(self, field, value, default=None):
+        """Get the first record found for a secondary key value"""
+        matches = self.find(field, value)
+        return matches[0] if matches else default
+
+    # Record-level mutations
+
+    def update(self, record_id, fields):
+        """
+        Update fields of a record and its index entries
+
+        Args:
+            record_id: Record ID
+            fields (dict): Fields to set
+
+        Returns:
+            dict: Updated record or None if not found
+        """
+        record = self.get(record_id)
+        if record is None:
+            return None
+        previous = {field: record.get(field) for field in (self.key,) + self.secondary if field in fields}
+        record.update(fields)
+        if previous:
+            self.reindex(record, previous)
+        return record
+
+    def upsert(self, record):
+        """
+        Replace the record with the same ID, or append it
+
+        Args:
+            record (dict): Record to store
+
+        Returns:
+            bool: True if an existing record was replaced
+        """
+        position = self.position(record.get(self.key))
+        if position is None:
+            self.append(record)
+            return False
+        self[position] = record
+        return True
+
+    def remove_ids(self, record_ids):
+        """
+        Delete every record with one of the given IDs
+
+        Args:
+            record_ids (iterable): IDs to delete
+
+        Returns:
+            int: Number of records deleted
+        """
+        removed = {record_id for record_id in record_ids if _hashable(record_id)}
+        kept = [record for record in self if not (isinstance(record, dict) and record.get(self.key) in removed)]
+        deleted = len(self) - len(kept)
+        if deleted:
+            super().__init__(kept)
+            self.mutations += 1
+            self._rebuild()
+        return deleted
+
+    # list API
+
+    def append(self, record):
+        super().append(record)
+        self.mutations += 1
+        self._index(record)
+        if self._positions is not None and isinstance(record, dict):
+            record_id = record.get(self.key)
+            if record_id is not None and _hashable(record_id):
+                self._positions.setdefault(record_id, len(self) - 1)
+
+    def extend(self, records):
+        for record in list(records):
+            self.append(record)
+
+    def __iadd__(self, records):
+        self.extend(records)
+        return self
+
+    def insert(self, position, record):
+        super().insert(position, record)
+        self.mutations += 1
+        self._positions = None
+        if isinstance(record, dict) and self.has(record.get(self.key)):
+            # An inserted duplicate may now come first; let the scan order decide
+            self._rebuild()
+        else:
+            self._index(record)
+
+    def remove(self, record):
+        super().remove(record)
+        self.mutations += 1
+        self._unindex(record)
+
+    def pop(self, position=-1):
+        record = super().pop(position)
+        self.mutations += 1
+        self._unindex(record)
+        return record
+
+    def clear(self):
+        super().clear()
+        self.mutations += 1
+        self._rebuild()
+
+    def __setitem__(self, position, value):
+        self.mutations += 1
+        if isinstance(position, slice):
+            super().__setitem__(position, value)
+            self._rebuild()
+            return
+        old = self[position]
+        super().__setitem__(position, value)
+        record_id = old.get(self.key) if isinstance(old, dict) else None
+        if (isinstance(value, dict) and record_id is not None and _hashable(record_id)
+                and value.get(self.key) == record_id):
+            # Same ID in the same place: swap the record, positions stay valid
+            if self._primary.get(record_id) is old:
+                self._primary[record_id] = value
+            self._unindex_secondary(old)
+            self._index(value)
+            return
+        self._unindex(old)
+        self._index(value)
+
+    def __delitem__(self, position):
+        self.mutations += 1
+        if isinstance(position, slice):
+            super().__delitem__(position)
+            self._rebuild()
+            return
+        record = self[position]
+        super().__delitem__(position)
+        self._unindex(record)
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._positions = None
+
+    def reverse(self):
+        super().reverse()
+        self._positions = None
+
+    def __imul__(self, count):
+        super().__imul__(count)
+        self.mutations += 1
+        self._rebuild()
+        return self
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return KeyedList(super().__getitem__(position), key=self.key, secondary=self.secondary)
+        return super().__getitem__(position)
+
+    def copy(self):
+        return KeyedList(self, key=self.key, secondary=self.secondary)
+
+
+def ensure_keyed(container, name, key="id", secondary=()):
+    """
+    Make sure a collection in a document is a KeyedList
+
+    The KeyedList replaces the plain list inside the document, so documents
+    shared through the JSON read cache keep their indexes between loads.
+
+    Args:
+        container (dict): Document holding the collection
+        name (str): Collection name
+        key (str): Primary key field
+        secondary (tuple): Secondary key fields
+
+    Returns:
+        KeyedList: The indexed collection
+    """
+    records = container.get(name)
+    if isinstance(records, KeyedList) and records.key == key:
+        for field in secondary:
+            records.add_index(field)
+        return records
+
+    keyed = KeyedList(records or [], key=key, secondary=secondary)
+    container[name] = keyed
+    return keyed
@@ -0,0 +1,610 @@
+"""
+Durable, batched outbound sync queue for the Square POS
+
+Waste logs, perishable price/quantity changes and pricing promotions used
+to be pushed to Square one record at a time, inline with the user action,
+so a slow connection stalled the page. Callers now ``enqueue`` an update and
+return immediately; a background worker sends the queue in batches.
+
+- Durable: every update is appended to a journal (see ``utils.journal``)
+  before ``enqueue`` returns, and pending updates are replayed when the
+  queue is reopened after a restart.
+- Coalesced: updates are keyed per record ("inventory:item:<id>", ...);
+  a newer update replaces a pending one for the same key (last write wins).
+- Batched: pending updates are grouped per kind ("inventory", "catalog",
+  "loyalty") into batches of ``batch_size``, sent by up to ``concurrency``
+  workers. Square has no batch endpoint for loyalty point adjustments, so a
+  loyalty batch is sent as one request per adjustment, each with its own
+  idempotency key; resending a partly accepted batch is safe.
+- Retried: failed batches are retried with exponential backoff; updates
+  rejected by Square (4xx other than 429) or out of attempts are dropped
+  and counted as failed.
+
+``metrics()`` reports queue depth, in-flight updates, the age of the oldest
+pending update and enqueue-to-ack latency percentiles.
+
+Without ``SQUARE_ACCESS_TOKEN`` and ``SQUARE_LOCATION_ID`` in the environment
+the shared queue uses a ``SimulatedClient`` that only logs, like the simulated
+syncs it replaces. With a live client only records mapped to Square catalog
+IDs (see ``square_ids``) can be synced.
+"""
+
+import collections
+import datetime
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.journal import get_journal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_PATH = "data/square_sync.journal"
+DEFAULT_BASE_URL = "https://connect.squareup.com"
+DEFAULT_CURRENCY = "AUD"
+
+# Square batch endpoint per update kind
+ENDPOINTS = {
+    "inventory": "/v2/inventory/changes/batch-create",
+    "catalog": "/v2/catalog/batch-upsert",
+    "loyalty": "/v2/loyalty/accounts/{account_id}/adjust"
+}
+
+# Number of enqueue-to-ack latencies kept for the percentiles
+LATENCY_SAMPLES = 1000
+
+# Finished journal records tolerated while updates are still pending
+COMPACT_MIN_RECORDS = 1000
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+class SquareSyncError(Exception):
+    """A batch could not be sent to Square"""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _now_iso():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+def square_ids(record):
+    """
+    Get the Square catalog IDs stored on a local record
+
+    Args:
+        record (dict): Item or batch with optional "square_variation_id",
+            "square_item_id" and "square_version" fields
+
+    Returns:
+        tuple: (variation ID, item ID, catalog version), None where not mapped
+    """
+    return record.get("square_variation_id"), record.get("square_item_id"), record.get("square_version")
+
+
+def inventory_count(item_id, quantity, location_id=None):
+    """Build an inventory change setting the counted stock of an item"""
+    return {
+        "type": "PHYSICAL_COUNT",
+        "physical_count": {
+            "catalog_object_id": item_id,
+            "location_id": location_id,
+            "state": "IN_STOCK",
+            "quantity": str(quantity),
+            "occurred_at": _now_iso()
+        }
+    }
+
+
+def inventory_adjustment(item_id, quantity, to_state="WASTE", location_id=None):
+    """Build an inventory change moving stock out of IN_STOCK (e.g. to WASTE)"""
+    return {
+        "type": "ADJUSTMENT",
+        "adjustment": {
+            "catalog_object_id": item_id,
+            "location_id": location_id,
+            "from_state": "IN_STOCK",
+            "to_state": to_state,
+            "quantity": str(quantity),
+            "occurred_at": _now_iso()
+        }
+    }
+
+
+def catalog_price(variation_id, price, item_id=None, version=None, currency=DEFAULT_CURRENCY):
+    """Build a catalog object setting the price of an item variation (Square needs its item ID and version)"""
+    variation = {
+        "type": "ITEM_VARIATION",
+        "id": variation_id,
+        "item_variation_data": {
+            "pricing_type": "FIXED_PRICING",
+            "price_money": {"amount": int(round(price * 100)), "currency": currency}
+        }
+    }
+    if item_id is not None:
+        variation["item_variation_data"]["item_id"] = item_id
+    if version is not None:
+        variation["version"] = version
+    return variation
+
+
+def catalog_discount(discount_id, name, percentage=None, amount=None, currency=DEFAULT_CURRENCY):
+    """Build a catalog discount (percentage or fixed amount)"""
+    data = {"name": name}
+    if percentage is not None:
+        data["discount_type"] = "FIXED_PERCENTAGE"
+        data["percentage"] = str(percentage)
+    else:
+        data["discount_type"] = "FIXED_AMOUNT"
+        data["amount_money"] = {"amount": int(round((amount or 0) * 100)), "currency": currency}
+    return {"type": "DISCOUNT", "id": discount_id, "discount_data": data}
+
+
+def loyalty_adjustment(account_id, points, reason, idempotency_key):
+    """Build a loyalty account point adjustment (positive adds points, negative deducts)"""
+    return {
+        "account_id": account_id,
+        "idempotency_key": idempotency_key,
+        "adjust_points": {"points": int(points), "reason": reason}
+    }
+
+
+class SquareClient:
+    """
+    Minimal Square batch API client (standard library HTTP)
+    """
+
+    def __init__(self, access_token, base_url=DEFAULT_BASE_URL, timeout=10):
+        """
+        Initialize the client
+
+        Args:
+            access_token (str): Square access token
+            base_url (str): API base URL
+            timeout (float): Request timeout in seconds
+        """
+        self.access_token = access_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def send(self, kind, payloads, idempotency_key):
+        """
+        Send one batch of updates
+
+        Args:
+            kind (str): Update kind (key of ENDPOINTS)
+            payloads (list): Inventory changes, catalog objects or loyalty adjustments
+            idempotency_key (str): Key that makes a retried batch safe to resend
+                (loyalty adjustments carry their own keys)
+
+        Raises:
+            SquareSyncError: If the batch was not accepted
+        """
+        if kind == "loyalty":
+            for payload in payloads:
+                body = {"idempotency_key": payload["idempotency_key"], "adjust_points": payload["adjust_points"]}
+                self._post(kind, ENDPOINTS[kind].format(account_id=payload["account_id"]), body)
+            return
+        if kind == "catalog":
+            body = {"idempotency_key": idempotency_key, "batches": [{"objects": payloads}]}
+        else:
+            body = {"idempotency_key": idempotency_key, "changes": payloads}
+        self._post(kind, ENDPOINTS[kind], body)
+
+    def _post(self, kind, path, body):
+        """POST a JSON body to the API"""
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(body).encode("utf-8"),
+            headers={
+                "Authorization": f"Bearer {self.access_token}",
+                "Content-Type": "application/json"
+            },
+            method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            raise SquareSyncError(f"Square returned {e.code} for {kind} batch",
+                                  retryable=e.code == 429 or e.code >= 500)
+        except (urllib.error.URLError, OSError) as e:
+            raise SquareSyncError(f"Square {kind} batch failed: {e}")
+
+
+class SimulatedClient:
+    """
+    Stand-in client used when no Square credentials are configured
+    """
+
+    def send(self, kind, payloads, idempotency_key):
+        """Log the batch instead of sending it"""
+        logger.info(f"Square POS would be sent {len(payloads)} {kind} updates")
+
+
+class SquareSyncQueue:
+    """
+    Journal-backed queue of updates waiting to be sent to Square
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, client=None, batch_size=100, concurrency=2,
+                 max_attempts=8, base_delay=0.5, max_delay=60.0, jitter=0.1, autostart=True,
+                 location_id=None):
+        """
+        Open (or create) the queue and replay the updates still pending
+
+        Args:
+            path (str): Journal file path
+            client: Object with ``send(kind, payloads, idempotency_key)``
+            batch_size (int): Maximum updates per request
+            concurrency (int): Maximum requests in flight
+            max_attempts (int): Attempts before an update is dropped
+            base_delay (float): Delay in seconds before the first retry
+            max_delay (float): Longest delay between retries
+            jitter (float): Random extra delay as a fraction of the delay
+            autostart (bool): Start the background worker on the first enqueue
+                (otherwise call ``drain`` or ``start`` yourself)
+            location_id (str, optional): Square location of inventory changes
+        """
+        self.client = client or SimulatedClient()
+        self.location_id = location_id
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.autostart = autostart
+
+        self._journal = get_journal(path)
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._pending = {}  # key -> entry
+        self._in_flight = set()
+        self._listeners = {}
+        self._worker = None
+        self._stopping = False
+        self._executor = None
+        self._latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+        self._counters = dict.fromkeys(
+            ("enqueued", "coalesced", "sent", "batches", "retries", "failed"), 0)
+        self._last_error = None
+        self._replay()
+
+    def _replay(self):
+        """Rebuild the pending updates from the journal"""
+        for record in self._journal.records():
+            if record.get("op") == "put":
+                self._pending[record["key"]] = self._entry(record)
+            elif record.get("op") in ("done", "dead"):
+                entry = self._pending.get(record["key"])
+                if entry is not None and entry["seq"] == record["put_seq"]:
+                    del self._pending[record["key"]]
+
+    @staticmethod
+    def _entry(record):
+        return {
+            "key": record["key"],
+            "kind": record["kind"],
+            "payload": record["payload"],
+            "seq": record["seq"],
+            "enqueued_at": record["enqueued_at"],
+            "attempts": 0,
+            "next_attempt": 0.0
+        }
+
+    @property
+    def live(self):
+        """Whether updates reach Square (records need Square catalog IDs)"""
+        return not isinstance(self.client, SimulatedClient)
+
+    def add_listener(self, name, callback):
+        """
+        Register a callback for acknowledged updates
+
+        Args:
+            name (str): Listener name (registering the same name again replaces it)
+            callback (callable): Called with the list of sent entries (key, kind, payload)
+        """
+        with self._lock:
+            self._listeners[name] = callback
+
+    def enqueue(self, kind, key, payload):
+        """
+        Queue an update, replacing any pending update for the same key
+
+        Args:
+            kind (str): Update kind ("inventory", "catalog" or "loyalty")
+            key (str): Record key used for coalescing
+            payload (dict): Inventory change, catalog object or loyalty adjustment
+        """
+        self.enqueue_many([(kind, key, payload)])
+
+    def enqueue_many(self, updates):
+        """
+        Queue several updates with one journal write
+
+        Args:
+            updates (list): (kind, key, payload) tuples
+        """
+        if not updates:
+            return
+        for kind, _key, _payload in updates:
+            if kind not in ENDPOINTS:
+                raise ValueError(f"Unknown Square update kind: {kind}")
+
+        enqueued_at = time.time()
+        with self._lock:
+            stored = self._journal.append_many([
+                {"op": "put", "kind": kind, "key": key, "payload": payload, "enqueued_at": enqueued_at}
+                for kind, key, payload in updates
+            ])
+            for record in stored:
+                previous = self._pending.get(record["key"])
+                if previous is not None and record["key"] not in self._in_flight:
+                    self._counters["coalesced"] += 1
+                self._pending[record["key"]] = self._entry(record)
+            self._counters["enqueued"] += len(stored)
+            self._changed.notify_all()
+        if self.autostart:
+            self.start()
+
+    def _due_batches(self, now):
+        """Take the due, not yet in-flight updates and group them into batches per kind"""
+        by_kind = {}
+        for key, entry in self._pending.items():
+            if key not in self._in_flight and entry["next_attempt"] <= now:
+                by_kind.setdefault(entry["kind"], []).append(entry)
+        batches = []
+        for kind, entries in by_kind.items():
+            entries.sort(key=lambda entry: entry["seq"])
+            for start in range(0, len(entries), self.batch_size):
+                batch = entries[start:start + self.batch_size]
+                self._in_flight.update(entry["key"] for entry in batch)
+                batches.append((kind, batch))
+        return batches
+
+    def _send(self, kind, batch):
+        """Send one batch; returns the error or None"""
+        seqs = ",".join(str(entry["seq"]) for entry in batch)
+        idempotency_key = str(uuid.uuid5(uuid.NAMESPACE_URL, f"{kind}:{seqs}"))
+        try:
+            self.client.send(kind, [entry["payload"] for entry in batch], idempotency_key)
+        except SquareSyncError as e:
+            return e
+        except Exception as e:
+            return SquareSyncError(str(e))
+        return None
+
+    def _backoff(self, attempts):
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * (1 + random.uniform(0, self.jitter))
+
+    def _finish(self, kind, batch, error):
+        """Record the outcome of a batch"""
+        now = time.monotonic()
+        acked = []
+        records = []
+        with self._lock:
+            for entry in batch:
+                self._in_flight.discard(entry["key"])
+                if error is None:
+                    records.append({"op": "done", "key": entry["key"], "put_seq": entry["seq"]})
+                    acked.append(entry)
+                    continue
+                entry["attempts"] += 1
+                if not error.retryable or entry["attempts"] >= self.max_attempts:
+                    records.append({"op": "dead", "key": entry["key"], "put_seq": entry["seq"], "error": str(error)})
+                    self._counters["failed"] += 1
+                else:
+                    entry["next_attempt"] = now + self._backoff(entry["attempts"])
+                    self._counters["retries"] += 1
+
+            for record in records:
+                entry = self._pending.get(record["key"])
+                if entry is not None and entry["seq"] == record["put_seq"]:
+                    del self._pending[record["key"]]
+            self._journal.append_many(records)
+
+            self._counters["batches"] += 1
+            if error is None:
+                self._counters["sent"] += len(acked)
+                acked_at = time.time()
+                self._latencies.extend(acked_at - entry["enqueued_at"] for entry in acked)
+            else:
+                self._last_error = str(error)
+                logger.warning(f"Square sync of {len(batch)} {kind} updates failed: {error}")
+            listeners = list(self._listeners.values())
+            self._compact()
+            self._changed.notify_all()
+
+        for callback in listeners if acked else ():
+            try:
+                callback(acked)
+            except Exception as e:
+                logger.error(f"Square sync listener failed: {e}")
+
+    def _compact(self):
+        """
+        Rewrite the journal down to the pending updates
+
+        Sent, dropped and coalesced records are only dropped once they
+        outnumber the pending updates (and ``COMPACT_MIN_RECORDS``), so each
+        rewrite is paid for by the records appended since the last one,
+        however long the queue stays busy.
+        """
+        finished = len(self._journal) - len(self._pending)
+        if finished <= 0:
+            return
+        if self._pending and finished < max(COMPACT_MIN_RECORDS, len(self._pending)):
+            return
+        self._journal.truncate(keep=[
+            {"op": "put", "kind": entry["kind"], "key": entry["key"], "payload": entry["payload"],
+             "enqueued_at": entry["enqueued_at"], "seq": entry["seq"]}
+            for entry in sorted(self._pending.values(), key=lambda entry: entry["seq"])
+        ])
+
+    def drain(self):
+        """
+        Send every due update once (batched, up to ``concurrency`` requests at a time)
+
+        Returns:
+            int: Number of updates sent successfully
+        """
+        with self._lock:
+            batches = self._due_batches(time.monotonic())
+            sent_before = self._counters["sent"]
+        if not batches:
+            return 0
+
+        if self.concurrency <= 1 or len(batches) == 1:
+            for kind, batch in batches:
+                self._finish(kind, batch, self._send(kind, batch))
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                    thread_name_prefix="square-sync")
+            futures = [(kind, batch, self._executor.submit(self._send, kind, batch)) for kind, batch in batches]
+            for kind, batch, future in futures:
+                self._finish(kind, batch, future.result())
+
+        with self._lock:
+            return self._counters["sent"] - sent_before
+
+    def _next_wakeup(self):
+        """Seconds until the next pending update is due (None when idle)"""
+        waiting = [entry["next_attempt"] for key, entry in self._pending.items() if key not in self._in_flight]
+        if not waiting:
+            return None
+        return max(0.0, min(waiting) - time.monotonic())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stopping:
+                    wait = self._next_wakeup()
+                    if wait == 0.0:
+                        break
+                    self._changed.wait(wait)
+                if self._stopping:
+                    return
+            try:
+                self.drain()
+            except Exception as e:
+                logger.error(f"Square sync worker error: {e}")
+                time.sleep(self.base_delay)
+
+    def start(self):
+        """Start the background worker (idempotent)"""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stopping = False
+            self._worker = threading.Thread(target=self._run, name="square-sync-worker", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout=5.0):
+        """Stop the background worker; pending updates stay in the journal"""
+        with self._lock:
+            self._stopping = True
+            self._changed.notify_all()
+            worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+        self._journal.flush()
+
+    def wait_idle(self, timeout=10.0):
+        """
+        Wait until nothing is pending or in flight
+
+        Returns:
+            bool: True if the queue drained within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+            return True
+
+    def metrics(self):
+        """
+        Get queue depth, throughput and latency metrics
+
+        Returns:
+            dict: depth, in_flight, oldest_pending_seconds, counters
+                (enqueued, coalesced, sent, batches, retries, failed),
+                latency_p50/p95/max in seconds and last_error
+        """
+        with self._lock:
+            now = time.time()
+            oldest = min((entry["enqueued_at"] for entry in self._pending.values()), default=None)
+            latencies = sorted(self._latencies)
+            metrics = dict(self._counters)
+            metrics.update({
+                "depth": len(self._pending),
+                "in_flight": len(self._in_flight),
+                "oldest_pending_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+                "latency_p50": _percentile(latencies, 0.50),
+                "latency_p95": _percentile(latencies, 0.95),
+                "latency_max": latencies[-1] if latencies else None,
+                "last_error": self._last_error
+            })
+            return metrics
+
+
+def _percentile(values, fraction):
+    """Get a percentile of sorted values (None when empty)"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def get_sync_queue(path=DEFAULT_QUEUE_PATH):
+    """
+    Get the shared sync queue for a journal path
+
+    The client is configured from the environment: ``SQUARE_ACCESS_TOKEN``
+    and ``SQUARE_LOCATION_ID`` (and optionally ``SQUARE_BASE_URL``); without
+    both, updates are only logged. Batch size and concurrency come from
+    ``SQUARE_SYNC_BATCH_SIZE`` and ``SQUARE_SYNC_CONCURRENCY``.
+
+    Args:
+        path (str): Journal file path
+
+    Returns:
+        SquareSyncQueue: Shared queue
+    """
+    key = os.path.abspath(path)
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            token = os.environ.get("SQUARE_ACCESS_TOKEN")
+            location_id = os.environ.get("SQUARE_LOCATION_ID")
+            client = None
+            if token and location_id:
+                client = SquareClient(token, os.environ.get("SQUARE_BASE_URL", DEFAULT_BASE_URL))
+            elif token:
+                logger.warning("SQUARE_LOCATION_ID is not set; Square updates are only logged")
+            queue = SquareSyncQueue(
+                path,
+                client=client,
+                batch_size=int(os.environ.get("SQUARE_SYNC_BATCH_SIZE", "100")),
+                concurrency=int(os.environ.get("SQUARE_SYNC_CONCURRENCY", "2")),
+                location_id=location_id
+            )
+            _queues[key] = queue
+        return queue
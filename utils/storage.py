@@ -0,0 +1,566 @@
+"""
+Storage backends for the manager data files
+
+Every manager keeps its state in a single JSON document (``data/<name>.json``).
+This module puts a small abstraction in front of those documents so that a
+manager can either keep using the JSON file or switch to a SQLite database in
+which every record of a top-level collection (e.g. ``inventory``,
+``transactions``, ``suppliers``) is stored as its own row. Row-level methods
+let a manager update one record without rewriting the whole document.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import logging
+
+from utils import json_cache
+from utils.atomic_writer import write_json_atomic
+from utils.keyed_collection import ensure_keyed
+
+logger = logging.getLogger(__name__)
+
+STORAGE_ENV_VAR = "SMALLSTORE_STORAGE"
+DATABASE_ENV_VAR = "SMALLSTORE_DB"
+DEFAULT_DATABASE_NAME = "smallstore.db"
+
+_storage_instances = {}
+_storage_lock = threading.Lock()
+
+
+def document_name(data_file):
+    """
+    Derive the storage document name from a manager data file path
+
+    Args:
+        data_file (str): Path such as "data/inventory.json"
+
+    Returns:
+        str: Document name such as "inventory"
+    """
+    return os.path.splitext(os.path.basename(data_file))[0]
+
+
+def is_row_collection(value):
+    """
+    Check whether a top-level value can be stored as one row per record
+
+    Args:
+        value: Top-level value of a document
+
+    Returns:
+        bool: True for lists whose entries are all dicts carrying an "id"
+    """
+    return isinstance(value, list) and all(isinstance(row, dict) and "id" in row for row in value)
+
+
+class StorageBackend:
+    """
+    Interface shared by all storage backends
+
+    Documents are addressed by name. Collections are the top-level lists of
+    a document whose records carry an "id" field.
+    """
+
+    def load_document(self, name):
+        """
+        Load a full document
+
+        Args:
+            name (str): Document name
+
+        Returns:
+            dict: Document data or None if the document does not exist
+        """
+        raise NotImplementedError
+
+    def save_document(self, name, data):
+        """
+        Save a full document
+
+        Args:
+            name (str): Document name
+            data (dict): Document data
+        """
+        raise NotImplementedError
+
+    def get_row(self, name, collection, row_id):
+        """
+        Get a single record from a collection
+
+        Args:
+            name (str): Document name
+            collection (str): Collection key within the document
+            row_id (str): Record ID
+
+        Returns:
+            dict: Record or None if not found
+        """
+        raise NotImplementedError
+
+    def write_rows(self, name, upserts=None, deletes=None):
+        """
+        Insert/update and delete records in one write
+
+        Args:
+            name (str): Document name
+            upserts (dict, optional): Collection key -> list of records to insert or replace
+            deletes (dict, optional): Collection key -> list of record IDs to delete
+        """
+        raise NotImplementedError
+
+    def version(self, name):
+        """
+        Get a token that changes whenever the document is written
+
+        Args:
+            name (str): Document name
+
+        Returns:
+            hashable: Version token or None if the document does not exist
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class JSONFileStorage(StorageBackend):
+    """
+    Storage backend that keeps each document in ``<data_dir>/<name>.json``
+
+    Reads go through the shared JSON cache. Row-level writes load and
+    rewrite the whole file, which matches the behaviour managers had before
+    the storage layer was introduced.
+    """
+
+    def __init__(self, data_dir="data"):
+        """Initialize the backend with the directory holding the JSON files"""
+        self.data_dir = data_dir
+
+    def path(self, name):
+        """Get the file path for a document"""
+        return os.path.join(self.data_dir, f"{name}.json")
+
+    def load_document(self, name):
+        try:
+            # Every change is written straight through, so the cached document can be shared
+            return json_cache.load_json(self.path(name), shared=True)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"File operation failed: {e}")
+            raise
+
+    def save_document(self, name, data):
+        os.makedirs(self.data_dir, exist_ok=True)
+        path = self.path(name)
+        try:
+            # Manager snapshots are ordered against their journals, so write through immediately
+            write_json_atomic(path, data)
+        except Exception as e:
+            json_cache.invalidate(path)
+            logging.error(f"File operation failed: {e}")
+            raise
+
+    def get_row(self, name, collection, row_id):
+        data = self.load_document(name) or {}
+        if not isinstance(data.get(collection), list):
+            return None
+        # The keyed list lives in the cached document, so the ID index is built once per file version
+        row = ensure_keyed(data, collection).get(row_id)
+        # Callers modify the row before writing it back; keep the cached document intact
+        return dict(row) if row is not None else None
+
+    def write_rows(self, name, upserts=None, deletes=None):
+        data = self.load_document(name) or {}
+
+        for collection, row_ids in (deletes or {}).items():
+            ensure_keyed(data, collection).remove_ids(row_ids)
+
+        for collection, rows in (upserts or {}).items():
+            records = ensure_keyed(data, collection)
+            for row in rows:
+                records.upsert(row)
+
+        self.save_document(name, data)
+
+    def version(self, name):
+        return json_cache.file_signature(self.path(name))
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Storage backend that keeps documents in a SQLite database (WAL mode)
+
+    Scalar parts of a document are stored as one JSON payload in the
+    ``documents`` table. Every record of a collection is a row in the
+    ``rows`` table, so updating a record costs one row write regardless of
+    how large the collection has grown. The backend remembers the position
+    and payload hash of every row it wrote, so saving a full document only
+    serializes the new records instead of reading the stored ones back.
+    """
+
+    def __init__(self, db_path, seed_dir=None):
+        """
+        Initialize the backend
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            seed_dir (str, optional): Directory with JSON files used to seed
+                documents that are not in the database yet
+        """
+        self.db_path = db_path
+        self.seed_dir = seed_dir
+        self._lock = threading.RLock()
+        self._written = {}  # name -> (version, {collection: {row_id: (position, payload hash)}})
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " name TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            " document TEXT NOT NULL,"
+            " collection TEXT NOT NULL,"
+            " row_id TEXT NOT NULL,"
+            " position INTEGER NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " PRIMARY KEY (document, collection, row_id))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS rows_by_position ON rows (document, collection, position)"
+        )
+
+    def _seed(self, name):
+        """Import a document from its JSON seed file, if one exists"""
+        if not self.seed_dir:
+            return None
+        data = JSONFileStorage(self.seed_dir).load_document(name)
+        if data is not None:
+            self.save_document(name, data)
+        return data
+
+    def _split(self, data):
+        """Split a document into its scalar part and its row collections"""
+        meta = {}
+        collections = {}
+        for key, value in data.items():
+            if is_row_collection(value):
+                collections[key] = value
+            else:
+                meta[key] = value
+        meta["__collections__"] = sorted(collections)
+        return meta, collections
+
+    def _bump_version(self, name):
+        self._conn.execute("UPDATE documents SET version = version + 1 WHERE name = ?", (name,))
+
+    @staticmethod
+    def _payload_hash(payload):
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+    def _written_rows(self, name):
+        """
+        Get the positions and payload hashes of a document's stored rows
+
+        The rows are only read from the database when the document was
+        written by another connection since this one last wrote it.
+        """
+        version = self.version(name)
+        cached = self._written.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        written = {}
+        cursor = self._conn.execute(
+            "SELECT collection, row_id, position, payload FROM rows WHERE document = ?", (name,)
+        )
+        for collection, row_id, position, payload in cursor:
+            written.setdefault(collection, {})[row_id] = (position, self._payload_hash(payload))
+        return written
+
+    def load_document(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM documents WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return self._seed(name)
+
+            data = json.loads(row[0])
+            collections = data.pop("__collections__", [])
+            for collection in collections:
+                data[collection] = []
+
+            cursor = self._conn.execute(
+                "SELECT collection, payload FROM rows WHERE document = ? ORDER BY collection, position",
+                (name,)
+            )
+            for collection, payload in cursor:
+                data.setdefault(collection, []).append(json.loads(payload))
+            return data
+
+    def save_document(self, name, data):
+        meta, collections = self._split(data)
+
+        # Rows are keyed by ID; records sharing an ID would silently collapse into one
+        for collection, records in collections.items():
+            seen = set()
+            duplicates = set()
+            for record in records:
+                row_id = str(record["id"])
+                if row_id in seen:
+                    duplicates.add(row_id)
+                seen.add(row_id)
+            if duplicates:
+                duplicates = sorted(duplicates)
+                message = f"Duplicate ids in {name}.{collection}: {', '.join(duplicates[:10])}"
+                logging.error(f"Database operation failed: {message}")
+                raise ValueError(message)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO documents (name, payload) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET payload = excluded.payload",
+                    (name, json.dumps(meta))
+                )
+
+                previous = self._written_rows(name)
+                written = {}
+
+                for collection in set(previous) - set(collections):
+                    self._conn.execute(
+                        "DELETE FROM rows WHERE document = ? AND collection = ?", (name, collection)
+                    )
+
+                for collection, records in collections.items():
+                    existing = dict(previous.get(collection, {}))
+                    rows = written[collection] = {}
+
+                    changed = []
+                    for position, record in enumerate(records):
+                        row_id = str(record["id"])
+                        payload = json.dumps(record)
+                        rows[row_id] = (position, self._payload_hash(payload))
+                        if existing.pop(row_id, None) != rows[row_id]:
+                            changed.append((name, collection, row_id, position, payload))
+
+                    # Only rows that actually changed are written
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO rows (document, collection, row_id, position, payload) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        changed
+                    )
+                    self._conn.executemany(
+                        "DELETE FROM rows WHERE document = ? AND collection = ? AND row_id = ?",
+                        [(name, collection, row_id) for row_id in existing]
+                    )
+
+                self._bump_version(name)
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                self._conn.execute("ROLLBACK")
+                self._written.pop(name, None)
+                logging.error(f"Database operation failed: {e}")
+                raise
+            self._written[name] = (self.version(name), written)
+
+    def get_row(self, name, collection, row_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM rows WHERE document = ? AND collection = ? AND row_id = ?",
+                (name, collection, str(row_id))
+            ).fetchone()
+            if row is None and self._conn.execute(
+                "SELECT 1 FROM documents WHERE name = ?", (name,)
+            ).fetchone() is None:
+                seeded = self._seed(name) or {}
+                for record in seeded.get(collection, []):
+                    if str(record.get("id")) == str(row_id):
+                        return record
+                return None
+        return json.loads(row[0]) if row else None
+
+    def write_rows(self, name, upserts=None, deletes=None):
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM documents WHERE name = ?", (name,)).fetchone() is None:
+                if self._seed(name) is None:
+                    self.save_document(name, {})
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Keep the remembered row hashes in step, unless another connection made them stale
+                cached = self._written.get(name)
+                written = cached[1] if cached is not None and cached[0] == self.version(name) else None
+
+                if upserts:
+                    # Register collections that did not exist in the document yet
+                    meta = json.loads(self._conn.execute(
+                        "SELECT payload FROM documents WHERE name = ?", (name,)
+                    ).fetchone()[0])
+                    known = set(meta.get("__collections__", []))
+                    if not set(upserts) <= known:
+                        meta["__collections__"] = sorted(known | set(upserts))
+                        self._conn.execute(
+                            "UPDATE documents SET payload = ? WHERE name = ?", (json.dumps(meta), name)
+                        )
+
+                for collection, row_ids in (deletes or {}).items():
+                    self._conn.executemany(
+                        "DELETE FROM rows WHERE document = ? AND collection = ? AND row_id = ?",
+                        [(name, collection, str(row_id)) for row_id in row_ids]
+                    )
+                    if written is not None:
+                        rows = written.get(collection, {})
+                        for row_id in row_ids:
+                            rows.pop(str(row_id), None)
+
+                for collection, records in (upserts or {}).items():
+                    next_position = self._conn.execute(
+                        "SELECT COALESCE(MAX(position), -1) + 1 FROM rows WHERE document = ? AND collection = ?",
+                        (name, collection)
+                    ).fetchone()[0]
+                    for record in records:
+                        row_id = str(record["id"])
+                        payload = json.dumps(record)
+                        # Existing rows keep their position, new rows are appended
+                        cursor = self._conn.execute(
+                            "UPDATE rows SET payload = ? WHERE document = ? AND collection = ? AND row_id = ?",
+                            (payload, name, collection, row_id)
+                        )
+                        if cursor.rowcount == 0:
+                            self._conn.execute(
+                                "INSERT INTO rows (document, collection, row_id, position, payload) "
+                                "VALUES (?, ?, ?, ?, ?)",
+                                (name, collection, row_id, next_position, payload)
+                            )
+                            position = next_position
+                            next_position += 1
+                        elif written is not None:
+                            position = written[collection][row_id][0]
+                        if written is not None:
+                            written.setdefault(collection, {})[row_id] = (position, self._payload_hash(payload))
+
+                self._bump_version(name)
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                self._conn.execute("ROLLBACK")
+                self._written.pop(name, None)
+                logging.error(f"Database operation failed: {e}")
+                raise
+            if written is None:
+                self._written.pop(name, None)
+            else:
+                self._written[name] = (self.version(name), written)
+
+    def version(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM documents WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_storage(data_file):
+    """
+    Get the configured storage backend for a manager data file
+
+    The backend is selected with the SMALLSTORE_STORAGE environment variable
+    ("json" by default, or "sqlite"). SQLite databases default to
+    ``<data dir>/smallstore.db`` and can be moved with SMALLSTORE_DB.
+
+    Args:
+        data_file (str): Path to the manager's JSON data file
+
+    Returns:
+        StorageBackend: Shared backend instance
+    """
+    data_dir = os.path.dirname(data_file) or "."
+    backend = os.environ.get(STORAGE_ENV_VAR, "json").lower()
+
+    if backend == "sqlite":
+        db_path = os.environ.get(DATABASE_ENV_VAR, os.path.join(data_dir, DEFAULT_DATABASE_NAME))
+        key = ("sqlite", os.path.abspath(db_path))
+    else:
+        key = ("json", os.path.abspath(data_dir))
+
+    with _storage_lock:
+        if key not in _storage_instances:
+            if backend == "sqlite":
+                _storage_instances[key] = SQLiteStorage(db_path, seed_dir=data_dir)
+            else:
+                _storage_instances[key] = JSONFileStorage(data_dir)
+        return _storage_instances[key]
+
+
+def migrate_json_to_sqlite(data_dir="data", db_path=None):
+    """
+    Import every ``<data_dir>/*.json`` document into a SQLite database
+
+    Documents already in the database are replaced by the JSON contents.
+    Files that cannot be imported whole (e.g. with duplicate record ids) are
+    logged and skipped.
+
+    Args:
+        data_dir (str): Directory containing the JSON data files
+        db_path (str, optional): Database path, defaults to <data_dir>/smallstore.db
+
+    Returns:
+        dict: Document name -> number of rows imported per collection
+    """
+    db_path = db_path or os.path.join(data_dir, DEFAULT_DATABASE_NAME)
+    source = JSONFileStorage(data_dir)
+    target = SQLiteStorage(db_path)
+    report = {}
+
+    try:
+        for file_name in sorted(os.listdir(data_dir)):
+            if not file_name.endswith(".json"):
+                continue
+            name = document_name(file_name)
+            try:
+                data = source.load_document(name)
+            except ValueError as e:
+                logging.error(f"Skipping {file_name}: {e}")
+                continue
+            if not isinstance(data, dict):
+                logging.error(f"Skipping {file_name}: top-level value is not an object")
+                continue
+
+            try:
+                target.save_document(name, data)
+            except ValueError as e:
+                logging.error(f"Skipping {file_name}: {e}")
+                continue
+            report[name] = {key: len(value) for key, value in data.items() if is_row_collection(value)}
+    finally:
+        target.close()
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import data/*.json files into a SQLite database")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--db", default=None)
+    args = parser.parse_args()
+
+    for name, collections in migrate_json_to_sqlite(args.data_dir, args.db).items():
+        rows = ", ".join(f"{key}={count}" for key, count in collections.items()) or "no collections"
+        print(f"{name}: {rows}")